@@ -38,7 +38,8 @@ This file contains several TEMPORARY FIXES to resolve critical freezing bugs:
 
 import logging
 from utils.vlm import VLM
-from .action import action_step
+from .system_prompt import system_prompt
+from .action import action_step, take_planned_positions, CACHEABLE_VLM_MODULES, EXECUTOR_PROMPT_PREFIXES
 from .memory import memory_step
 from .perception import perception_step
 from .planning import planning_step
@@ -71,7 +72,10 @@ class Agent:
         simple_mode = args.simple if args else False
         
         # Initialize VLM
-        self.vlm = VLM(backend=backend, model_name=model_name)
+        self.vlm = VLM(backend=backend, model_name=model_name, cache_modules=CACHEABLE_VLM_MODULES)
+        self.vlm.register_prefix(system_prompt)
+        for prefix in EXECUTOR_PROMPT_PREFIXES:
+            self.vlm.register_prefix(prefix)
         print(f"   VLM: {backend}/{model_name}")
         
         # Initialize agent mode
@@ -474,6 +478,10 @@ class Agent:
                 # Handle empty action list (no action needed)
                 if not action_output:
                     return None  # Signal to client that no action is needed this frame
+                # A planned path segment goes out as one batch the server checks step by step
+                expected_positions = take_planned_positions(action_output)
+                if expected_positions:
+                    return {'action': action_output, 'expected_positions': expected_positions}
                 return {'action': action_output}
                 
             except Exception as e:
@@ -17,7 +17,7 @@ Coordinate System:
 - For warp_tile portals: exit_coords is the door/entrance tile itself
 """
 
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Set, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -659,6 +659,42 @@ def get_connected_locations(location_name: str) -> List[str]:
     return list(portals.keys())
 
 
+def _requirement_names(requirements: Any) -> Set[str]:
+    """Flatten 'SURF', ['CUT', 'STONE_BADGE'] or {'badges': [...], 'items': [...]} into upper-case names"""
+    if not requirements:
+        return set()
+    if isinstance(requirements, str):
+        return {requirements.upper()}
+    if isinstance(requirements, dict):
+        names = set()
+        for name, value in requirements.items():
+            if isinstance(value, bool):
+                if value:
+                    names.add(str(name).upper())
+            else:
+                names |= _requirement_names(value)
+        return names
+    return {str(name).upper() for name in requirements}
+
+
+def portal_requirements_met(portal_info: Dict[str, Any], requirements: Optional[Any] = None) -> bool:
+    """
+    Check whether a portal can be used.
+
+    Args:
+        portal_info: Portal dict; its 'requirements' may be None, a name, a list of names
+            or a dict of name lists (e.g. {'badges': ['STONE_BADGE'], 'hms': ['CUT']})
+        requirements: Player's current items/badges in any of the same forms, or a dict of
+            name -> bool. None means unknown, in which case every portal is allowed.
+
+    Returns:
+        True if every required name is in the player's requirements
+    """
+    if requirements is None:
+        return True
+    return _requirement_names(portal_info.get('requirements')) <= _requirement_names(requirements)
+
+
 def find_shortest_path(start_location: str, end_location: str, 
                        requirements: Optional[Dict[str, Any]] = None) -> Optional[List[Tuple[str, str, Dict]]]:
     """
@@ -668,6 +704,7 @@ def find_shortest_path(start_location: str, end_location: str,
         start_location: Starting location name
         end_location: Destination location name
         requirements: Player's current items/badges for checking portal requirements
+            (see portal_requirements_met; None skips the check)
         
     Returns:
         List of (from_loc, to_loc, portal_info) tuples representing the path,
@@ -689,36 +726,39 @@ def find_shortest_path(start_location: str, end_location: str,
     if start == end:
         return []  # Already at destination
     
-    # BFS to find shortest path
-    queue = deque([(start, [])])
-    visited = {start}
+    # BFS to find shortest path; parent links instead of copying the path on every enqueue
+    queue = deque([start])
+    came_from: Dict[str, Tuple[str, Dict[str, Any]]] = {start: None}
     
     while queue:
-        current_loc, path = queue.popleft()
+        current_loc = queue.popleft()
         
         # Check all portals from current location
         portals = get_location_portals(current_loc)
         
         for next_loc, portal_info in portals.items():
-            if next_loc in visited:
+            if next_loc in came_from:
                 continue
             
             # Check if we meet requirements for this portal
-            if requirements and portal_info.get('requirements'):
-                # TODO: Implement requirement checking
-                # For now, assume all requirements are met
-                pass
+            if not portal_requirements_met(portal_info, requirements):
+                continue
             
-            # Add to path
-            new_path = path + [(current_loc, next_loc, portal_info)]
+            came_from[next_loc] = (current_loc, portal_info)
             
             # Check if we reached destination
             if next_loc == end:
-                return new_path
+                path = []
+                loc = end
+                while came_from[loc] is not None:
+                    previous, info = came_from[loc]
+                    path.append((previous, loc, info))
+                    loc = previous
+                path.reverse()
+                return path
             
             # Continue searching
-            visited.add(next_loc)
-            queue.append((next_loc, new_path))
+            queue.append(next_loc)
     
     # No path found
     logger.warning(f"No path found from '{start}' to '{end}'")
@@ -23,7 +23,7 @@ Usage:
     # Returns: {"action": "NAVIGATE", "target": (10, 0), "location": "LITTLEROOT_TOWN", ...}
 """
 
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, TYPE_CHECKING
 from enum import Enum
 import logging
 from agent.location_graph import (
@@ -32,6 +32,9 @@ from agent.location_graph import (
     LOCATION_GRAPH
 )
 
+if TYPE_CHECKING:
+    from agent.route_planner import RoutePlanner, WorldRoute
+
 logger = logging.getLogger(__name__)
 
 
@@ -96,12 +99,19 @@ class NavigationPlanner:
     to the agent, advancing automatically as stages complete.
     """
     
-    def __init__(self):
+    def __init__(self, route_planner: Optional["RoutePlanner"] = None):
+        """
+        Args:
+            route_planner: Optional RoutePlanner for routes weighted by stitched-map distances;
+                without one (or without start coordinates) journeys use find_shortest_path()
+        """
+        self.route_planner = route_planner
         self.stages: List[NavigationStage] = []
         self.current_stage_index: int = 0
         self.journey_start: Optional[str] = None
         self.journey_end: Optional[str] = None
         self.final_coords: Optional[Tuple[int, int]] = None
+        self.route: Optional["WorldRoute"] = None
     
     def has_active_plan(self) -> bool:
         """Check if there's an active navigation plan"""
@@ -114,6 +124,7 @@ class NavigationPlanner:
         self.journey_start = None
         self.journey_end = None
         self.final_coords = None
+        self.route = None
         logger.info("🗑️ Navigation plan cleared")
     
     def plan_journey(
@@ -140,8 +151,12 @@ class NavigationPlanner:
         # Clear any existing plan
         self.clear_plan()
         
-        # Find shortest path
-        path = find_shortest_path(start_location, end_location)
+        # Find shortest path: weighted over portal distances when we know where we are,
+        # otherwise fewest hops over the location graph
+        route = None
+        if self.route_planner is not None and start_coords is not None:
+            route = self.route_planner.plan(start_location, start_coords, end_location, final_coords)
+        path = route.hops if route is not None else find_shortest_path(start_location, end_location)
         
         if not path:
             logger.error(f"❌ No path found from {start_location} to {end_location}")
@@ -150,6 +165,7 @@ class NavigationPlanner:
         self.journey_start = start_location
         self.journey_end = end_location
         self.final_coords = final_coords
+        self.route = route
         
         # Convert path to stages
         self._build_stages_from_path(path, final_coords)
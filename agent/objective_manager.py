@@ -10,6 +10,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from agent.navigation_planner import NavigationPlanner
+from agent.route_planner import RoutePlanner
 
 logger = logging.getLogger(__name__)
 
@@ -141,7 +142,8 @@ class ObjectiveManager:
         self._pressed_b_after_gym_warp = False
         
         # NEW: Initialize NavigationPlanner for comparison testing
-        self.navigation_planner = NavigationPlanner()
+        # RoutePlanner learns each area's grid from stitched_map_info as the agent explores
+        self.navigation_planner = NavigationPlanner(route_planner=RoutePlanner())
         self._last_planner_location = None
         self._last_planner_coords = None
         
@@ -1538,6 +1540,13 @@ class ObjectiveManager:
                 'error': True
             }
         
+        # Keep the route planner's view of this area current (tables rebuild only on change)
+        current_area = (state_data.get('map', {}).get('stitched_map_info') or {}).get('current_area') or {}
+        if current_area.get('grid'):
+            self.navigation_planner.route_planner.observe_area(
+                graph_location, current_area['grid'], current_area.get('connections'), (current_x, current_y),
+                version=current_area.get('grid_version'))
+        
         # Detect if we changed location (planner might auto-advance)
         location_changed = (graph_location != self._last_planner_location)
         coords_changed = ((current_x, current_y) != self._last_planner_coords)
@@ -1637,7 +1646,8 @@ class ObjectiveManager:
                     success = self.navigation_planner.plan_journey(
                         start_location=graph_location,
                         end_location=target_location,
-                        final_coords=target_coords
+                        final_coords=target_coords,
+                        start_coords=(current_x, current_y)
                     )
                     if success:
                         print(f"\n{'=' * 80}")
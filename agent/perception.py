@@ -20,6 +20,10 @@ TEMPLATE_PHRASES = [
     "describe NPCs, Pokemon, or characters",
 ]
 
+# Secondary yes/no dialogue check for Qwen2-VL-2B, which often copies the extraction template.
+# Mentions a "white text box" and "character dialogue" to avoid false positives (e.g. cardboard boxes in the moving van)
+DIALOGUE_CHECK_PROMPT = "Is there a white text box at the bottom of the screen showing character dialogue or speech? Answer YES or NO."
+
 def is_template_text(text):
     """
     Check if text is template instructions rather than actual game dialogue.
@@ -175,7 +179,16 @@ JSON response:"""
                 # print(f"🖼️ [PERCEPTION] Frame type: {type(frame)}")
                 # print(f"📝 [PERCEPTION] Extraction prompt length: {len(extraction_prompt)} chars")
                 
-                vlm_response = vlm.get_query(frame, system_prompt + extraction_prompt, "PERCEPTION-EXTRACT")
+                # Qwen-2B gets a secondary dialogue check after pressing A (see QWEN-2B DIALOGUE FIX below).
+                # Submit it together with the extraction so both are answered in one batched pass.
+                dialogue_check_future = None
+                if (vlm and 'Qwen2-VL-2B-Instruct' in getattr(vlm, 'model_name', '')
+                        and recent_actions and recent_actions[-1] == 'A'):
+                    extract_future = vlm.submit_query(frame, system_prompt + extraction_prompt, "PERCEPTION-EXTRACT")
+                    dialogue_check_future = vlm.submit_query(frame, DIALOGUE_CHECK_PROMPT, "DIALOGUE_CHECK")
+                    vlm_response = extract_future.result()
+                else:
+                    vlm_response = vlm.get_query(frame, system_prompt + extraction_prompt, "PERCEPTION-EXTRACT")
                 signal.alarm(0)  # Cancel timeout
                 
                 # print(f"🔍 [PERCEPTION] VLM Raw Response:")
@@ -522,15 +535,14 @@ Answer in format: "1: YES/NO, 2: YES/NO" """
                             logger.info("[PERCEPTION] Qwen-2B: Performing secondary dialogue visibility check (last action was A)")
                             
                             try:
-                                # More specific prompt to avoid false positives (e.g., cardboard boxes in moving van)
-                                # Explicitly mention "white text box" and "character dialogue" to be clear
-                                simple_dialogue_prompt = "Is there a white text box at the bottom of the screen showing character dialogue or speech? Answer YES or NO."
-                                
-                                # Make second VLM call with timeout
+                                # Make second VLM call with timeout (usually already answered alongside the extraction)
                                 signal.signal(signal.SIGALRM, timeout_handler)
                                 signal.alarm(30)  # Shorter timeout for simple query
                                 
-                                dialogue_check_response = vlm.get_query(frame, simple_dialogue_prompt, "DIALOGUE_CHECK")
+                                if dialogue_check_future is not None:
+                                    dialogue_check_response = dialogue_check_future.result()
+                                else:
+                                    dialogue_check_response = vlm.get_query(frame, DIALOGUE_CHECK_PROMPT, "DIALOGUE_CHECK")
                                 signal.alarm(0)  # Cancel timeout
                                 
                                 print(f"🔍 [QWEN-2B FIX] Dialogue check response: '{dialogue_check_response}'")
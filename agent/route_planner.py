@@ -0,0 +1,472 @@
+"""
+RoutePlanner - Two-level world route planning over stitched maps
+
+Inter-area routing in agent/location_graph.py only knows which locations are
+connected; intra-area routing is a separate A* that runs one hop at a time.
+This module joins the two:
+
+1. Area level: every location's stitched grid is compiled once into a
+   PassabilityGrid, and single-source distance fields (utils.pathfinding
+   distance_field) from each portal arrival tile give portal-to-portal
+   distance tables. Tables are rebuilt only when the area's grid changes, so
+   they follow exploration.
+
+2. World level: a weighted Dijkstra over portal nodes (LOCATION_GRAPH portals
+   plus warps observed by the MapStitcher) answers queries like "tile in
+   Oldale Town to Rustboro Gym door" with one search, reading leg costs from
+   the tables. Legs through areas without a stitched grid yet are costed by
+   Manhattan distance and marked estimated.
+
+Example:
+    planner = RoutePlanner(map_stitcher)
+    route = planner.plan("OLDALE_TOWN", (10, 10), "RUSTBORO_CITY_GYM", (5, 2))
+    route.hops   # [(from_loc, to_loc, portal_info), ...] like find_shortest_path()
+    route.legs   # per-area tile paths
+"""
+
+import heapq
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from agent.location_graph import LOCATION_GRAPH, portal_requirements_met
+from utils.pathfinding import STITCHED_RULES, DistanceField, PassabilityGrid, PathRules, distance_field
+
+logger = logging.getLogger(__name__)
+
+Coords = Tuple[int, int]
+
+PORTAL_STEP_COST = 1.0  # Stepping across an open-world boundary
+WARP_STEP_COST = 8.0  # Doors/stairs: the fade out, map load and fade in cost several steps' worth of time
+DETOUR_FACTOR = 2.0  # Manhattan multiplier when the explored grid doesn't connect two tiles yet
+FIELD_CACHE_SIZE = 32  # Distance fields kept per area (portal arrivals plus recent player positions)
+
+
+@dataclass(frozen=True)
+class Portal:
+    """One way out of a location"""
+    location: str
+    to_location: str
+    exit_coords: Coords  # Tile in `location` that triggers the transition
+    entry_coords: Optional[Coords]  # Where you appear in `to_location` (None if unknown)
+    info: Mapping[str, Any]  # LOCATION_GRAPH portal dict, or one built from an observed warp
+    source: str = "graph"  # "graph" or "observed"
+
+
+@dataclass
+class RouteLeg:
+    """Walking inside one location, from `start` to `end`"""
+    location: str
+    start: Optional[Coords]
+    end: Optional[Coords]
+    cost: float
+    path: Optional[List[Coords]]  # start..end tiles, or None if the cost is estimated
+    portal: Optional[Portal] = None  # Taken at `end`; None for the final leg
+
+    @property
+    def estimated(self) -> bool:
+        return self.path is None
+
+
+@dataclass
+class WorldRoute:
+    """Result of RoutePlanner.plan()"""
+    cost: float
+    legs: List[RouteLeg] = field(default_factory=list)
+
+    @property
+    def hops(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Portal crossings as (from_loc, to_loc, portal_info), the find_shortest_path() format"""
+        return [(leg.location, leg.portal.to_location, dict(leg.portal.info))
+                for leg in self.legs if leg.portal is not None]
+
+    @property
+    def estimated(self) -> bool:
+        return any(leg.estimated for leg in self.legs)
+
+
+@dataclass
+class _AreaTable:
+    """Compiled grid and cached distance fields for one location"""
+    token: Any  # Grid version the table was built from
+    passability: PassabilityGrid
+    goals: Tuple[Coords, ...]  # Portal exit tiles, reachable even if not walkable (doors)
+    fields: "OrderedDict[Tuple[Coords, Optional[Coords]], Optional[DistanceField]]" = field(default_factory=OrderedDict)
+
+    def field_from(self, source: Coords, target: Optional[Coords] = None) -> Optional[DistanceField]:
+        """Distance field from source (LRU cached); target is added as a goal cell if it isn't a portal"""
+        extra = target if target is not None and target not in self.goals else None
+        key = (source, extra)
+        if key in self.fields:
+            self.fields.move_to_end(key)
+            return self.fields[key]
+        goals = self.goals + (extra,) if extra is not None else self.goals
+        self.fields[key] = distance_field(self.passability, source, goal_cells=goals)
+        while len(self.fields) > FIELD_CACHE_SIZE:
+            self.fields.popitem(last=False)
+        return self.fields[key]
+
+
+def _normalize(name: str) -> str:
+    """'Route 104 (South)' / "Player's House" / 'ROUTE 104' -> 'ROUTE_104' / 'PLAYERS_HOUSE' / 'ROUTE_104'"""
+    name = re.sub(r"\(.*?\)", "", name.upper()).replace("'", "")
+    return re.sub(r"[^A-Z0-9]+", "_", name).strip("_")
+
+
+def _manhattan(a: Coords, b: Coords) -> int:
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class RoutePlanner:
+    """
+    Tile-accurate multi-map routes from LOCATION_GRAPH portals and stitched grids.
+
+    Grids come from a MapStitcher (server side) and/or observe_area() (agent
+    side, which only sees the current area's grid in the state).
+    """
+
+    def __init__(self, map_stitcher=None, graph: Mapping[str, Dict[str, Any]] = LOCATION_GRAPH,
+                 rules: PathRules = STITCHED_RULES, lock=None):
+        """
+        Args:
+            map_stitcher: Optional MapStitcher to read grids and warp connections from
+            graph: Location graph (LOCATION_GRAPH format)
+            rules: Passability rules for stitched grids
+            lock: Held while reading the map stitcher and the area tables (e.g.
+                memory_reader.map_stitcher_lock); a private RLock if None
+        """
+        self.map_stitcher = map_stitcher
+        self.graph = graph
+        self.rules = rules
+        self._lock = lock if lock is not None else threading.RLock()
+        self._tables: Dict[str, _AreaTable] = {}
+        self._observed_grids: Dict[str, Tuple[int, Dict[Coords, str]]] = {}  # key -> (version, grid)
+        self._observed_versions: Dict[str, Optional[int]] = {}  # key -> sender's grid_version
+        self._observed_exits: Dict[str, Dict[str, Coords]] = {}  # key -> {to_key: exit coords}
+        self._stitched_portals: Dict[str, Dict[str, Portal]] = {}
+        self._portal_cache: Dict[str, List[Portal]] = {}  # Cleared whenever portals are learned
+        self._arrival_cache: Dict[str, List[Coords]] = {}
+
+        # Normalized name -> graph keys (several for split areas like Route 104 north/south)
+        self._keys_by_name: Dict[str, List[str]] = {}
+        for key, data in graph.items():
+            for name in {key, _normalize(key), _normalize(data.get("display_name") or key)}:
+                self._keys_by_name.setdefault(name, [])
+                if key not in self._keys_by_name[name]:
+                    self._keys_by_name[name].append(key)
+
+    # ------------------------------------------------------------------
+    # Location names
+    # ------------------------------------------------------------------
+
+    def location_key(self, name: str, coords: Optional[Coords] = None) -> str:
+        """
+        Graph key for a location name as the game, MapStitcher or graph spells it.
+
+        Areas split in the graph but stitched as one map (Route 104) are told apart
+        by which part's portals are nearest to `coords`. Locations missing from the
+        graph keep their normalized name, so observed warps can still route through them.
+        """
+        if name in self.graph:
+            return name
+        candidates = self._keys_by_name.get(_normalize(name))
+        if not candidates:
+            return _normalize(name)
+        if len(candidates) == 1 or coords is None:
+            return candidates[0]
+
+        def nearest_portal(key):
+            # Own exits, plus where portals from elsewhere drop you into this part
+            tiles = [info.get("exit_coords") for info in self.graph[key].get("portals", {}).values()]
+            tiles += [info.get("entry_coords") for data in self.graph.values()
+                      for to_key, info in data.get("portals", {}).items() if to_key == key]
+            return min((_manhattan(coords, t) for t in tiles if t), default=float("inf"))
+
+        return min(candidates, key=nearest_portal)
+
+    # ------------------------------------------------------------------
+    # Keeping areas up to date
+    # ------------------------------------------------------------------
+
+    def observe_area(self, location: str, grid: Mapping[Any, str],
+                     connections: Optional[Iterable] = None, coords: Optional[Coords] = None,
+                     version: Optional[int] = None):
+        """
+        Record the current grid of a location (agent side, from stitched_map_info).
+
+        Args:
+            location: Location name
+            grid: {(x, y): symbol} or the serialized {"x,y": symbol} form
+            connections: Optional [to_location, from_pos, to_pos] entries
+                (MapStitcher.get_location_connections format) or the
+                {"to", "from_pos", "to_pos"} dicts sent in stitched_map_info
+            coords: Player position, used to resolve split areas
+            version: Grid version from the sender (stitched_map_info 'grid_version'); an
+                unchanged version skips converting and comparing the grid
+        """
+        key = self.location_key(location, coords)
+        if not version or self._observed_versions.get(key) != version:
+            if grid and isinstance(next(iter(grid)), str):
+                grid = {tuple(map(int, k.split(","))): v for k, v in grid.items()}
+            else:
+                grid = dict(grid)
+            revision, previous = self._observed_grids.get(key, (0, None))
+            if previous != grid:
+                self._observed_grids[key] = (revision + 1, grid)
+            self._observed_versions[key] = version
+        for connection in connections or ():
+            if isinstance(connection, Mapping):
+                to_location, from_pos = connection.get("to"), connection.get("from_pos")
+            else:
+                to_location, from_pos = connection[0], connection[1]
+            if to_location and from_pos:
+                exits = self._observed_exits.setdefault(key, {})
+                to_key = self.location_key(to_location)
+                if exits.get(to_key) != tuple(from_pos):
+                    exits[to_key] = tuple(from_pos)
+                    self._portals_changed()
+
+    def _portals_changed(self):
+        self._portal_cache = {}
+        self._arrival_cache = {}
+
+    def _stitched_area(self, key: str):
+        if self.map_stitcher is None:
+            return None
+        map_id = self.graph.get(key, {}).get("map_id")
+        if map_id:
+            area = self.map_stitcher.map_areas.get(int(map_id, 16))
+            if area is not None:
+                return area
+        names = [key.replace("_", " ")]
+        if key in self.graph:
+            names.insert(0, re.sub(r"\s*\(.*?\)", "", self.graph[key].get("display_name", "")))
+        for name in names:
+            area = self.map_stitcher.find_area_by_name(name)
+            if area is not None:
+                return area
+        return None
+
+    def _grid_source(self, key: str) -> Tuple[Any, Any]:
+        """(token, loader) for the freshest grid of a location; token changes whenever the grid does"""
+        observed = self._observed_grids.get(key)
+        if observed is not None:
+            return ("observed", observed[0]), lambda: observed[1]
+        area = self._stitched_area(key)
+        if area is None or area.map_data is None:
+            return None, None
+        bounds = tuple(sorted(getattr(area, "explored_bounds", {}).items()))
+        token = ("stitched", area.map_id, id(area.map_data), area.map_data.version, bounds)
+        return token, lambda: self.map_stitcher.get_location_grid(area.location_name, simplified=True)
+
+    def _table(self, key: str) -> Optional[_AreaTable]:
+        token, load = self._grid_source(key)
+        if token is None:
+            self._tables.pop(key, None)
+            return None
+        goals = tuple(sorted({p.exit_coords for p in self._all_portals(key)}))
+        table = self._tables.get(key)
+        if table is None or table.token != token or table.goals != goals:
+            grid = load()
+            if not grid:
+                return None
+            table = _AreaTable(token=token, passability=PassabilityGrid(grid, self.rules), goals=goals)
+            self._tables[key] = table
+            # Precompute the portal-to-portal table: one field per arrival tile
+            for portal in self._incoming_arrivals(key):
+                table.field_from(portal)
+        return table
+
+    def _refresh_stitched_portals(self):
+        """Warps the MapStitcher has seen, as portals"""
+        stitcher = self.map_stitcher
+        if stitcher is None:
+            return
+        portals: Dict[str, Dict[str, Portal]] = {}
+        for conn in stitcher.warp_connections:
+            from_area = stitcher.map_areas.get(conn.from_map_id)
+            to_area = stitcher.map_areas.get(conn.to_map_id)
+            if not (from_area and to_area and from_area.location_name and to_area.location_name):
+                continue
+            from_key = self.location_key(from_area.location_name, tuple(conn.from_position))
+            to_key = self.location_key(to_area.location_name, tuple(conn.to_position))
+            if from_key == to_key:
+                continue
+            info = {
+                "type": "warp_tile" if conn.warp_type in ("door", "stairs") else "open_world",
+                "direction": conn.direction,
+                "entry_coords": tuple(conn.to_position),
+                "exit_coords": tuple(conn.from_position),
+                "description": f"Observed {conn.warp_type} to {to_area.location_name}",
+                "requirements": None,
+            }
+            portals.setdefault(from_key, {})[to_key] = Portal(
+                from_key, to_key, info["exit_coords"], info["entry_coords"], info, source="observed")
+        if portals != self._stitched_portals:
+            self._stitched_portals = portals
+            self._portals_changed()
+
+    # ------------------------------------------------------------------
+    # Portal graph
+    # ------------------------------------------------------------------
+
+    def _all_portals(self, key: str) -> List[Portal]:
+        """Graph portals, plus observed warps to locations the graph doesn't connect this one to"""
+        cached = self._portal_cache.get(key)
+        if cached is not None:
+            return cached
+        portals = []
+        graph_portals = self.graph.get(key, {}).get("portals", {})
+        for to_key, info in graph_portals.items():
+            if info.get("exit_coords"):
+                portals.append(Portal(key, to_key, tuple(info["exit_coords"]),
+                                      tuple(info["entry_coords"]) if info.get("entry_coords") else None, info))
+        for to_key, portal in self._stitched_portals.get(key, {}).items():
+            if to_key not in graph_portals:
+                portals.append(portal)
+        for to_key, exit_coords in self._observed_exits.get(key, {}).items():
+            if to_key not in graph_portals and to_key not in self._stitched_portals.get(key, {}):
+                # Arrival tile unknown until the reverse warp is seen
+                back = self._observed_exits.get(to_key, {}).get(key)
+                info = {"type": "warp_tile", "direction": "interact", "exit_coords": exit_coords,
+                        "entry_coords": back, "description": f"Observed exit to {to_key}",
+                        "requirements": None}
+                portals.append(Portal(key, to_key, exit_coords, back, info, source="observed"))
+        self._portal_cache[key] = portals
+        return portals
+
+    def _incoming_arrivals(self, key: str) -> List[Coords]:
+        cached = self._arrival_cache.get(key)
+        if cached is not None:
+            return cached
+        arrivals = set()
+        for other in set(self.graph) | set(self._stitched_portals) | set(self._observed_exits):
+            if other == key:
+                continue
+            for portal in self._all_portals(other):
+                if portal.to_location == key and portal.entry_coords is not None:
+                    arrivals.add(portal.entry_coords)
+        self._arrival_cache[key] = sorted(arrivals)
+        return self._arrival_cache[key]
+
+    def _leg(self, key: str, start: Optional[Coords], end: Optional[Coords]) -> Tuple[float, Optional[DistanceField]]:
+        """(cost, field to read the path from, or None if the cost is estimated)"""
+        if start is None or end is None:
+            return 0.0, None
+        if start == end:
+            return 0.0, None
+        table = self._table(key)
+        if table is not None:
+            field_ = table.field_from(start, end)
+            if field_ is not None:
+                dist = field_.distance(end)
+                if dist is not None:
+                    return dist, field_
+                if table.passability.index(end) is not None:
+                    # Both explored but not connected yet - a detour through unexplored tiles
+                    return _manhattan(start, end) * DETOUR_FACTOR, None
+        return float(_manhattan(start, end)), None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def portal_distances(self, location: str) -> Dict[Tuple[Coords, Coords], float]:
+        """Portal-to-portal table for one location: {(arrival tile, exit tile): path cost}"""
+        key = self.location_key(location)
+        distances = {}
+        with self._lock:
+            self._refresh_stitched_portals()
+            table = self._table(key)
+            if table is None:
+                return {}
+            for arrival in self._incoming_arrivals(key):
+                field_ = table.field_from(arrival)
+                if field_ is None:
+                    continue
+                for exit_coords in table.goals:
+                    dist = field_.distance(exit_coords)
+                    if dist is not None:
+                        distances[(arrival, exit_coords)] = dist
+        return distances
+
+    def plan(self, start_location: str, start_coords: Optional[Coords],
+             end_location: str, end_coords: Optional[Coords] = None,
+             requirements: Optional[Any] = None) -> Optional[WorldRoute]:
+        """
+        Cheapest route from a tile in one location to a tile (or anywhere) in another.
+
+        Args:
+            start_location: Current location name
+            start_coords: Current position (None: leg costs from it are estimated as 0)
+            end_location: Destination location name
+            end_coords: Destination tile, or None to stop on arrival
+            requirements: Player's items/badges, see location_graph.portal_requirements_met()
+
+        Returns:
+            WorldRoute, or None if the portal graph doesn't connect the two locations
+        """
+        start = self.location_key(start_location, start_coords)
+        end = self.location_key(end_location, end_coords)
+        with self._lock:
+            self._refresh_stitched_portals()
+            return self._search(start, start_coords, end, end_coords, requirements)
+
+    def _search(self, start, start_coords, end, end_coords, requirements) -> Optional[WorldRoute]:
+        goal = ("<goal>", None)
+        origin = (start, start_coords)
+        best = {origin: 0.0}
+        back: Dict[Tuple, Tuple[Tuple, Optional[Portal], float, Optional[DistanceField], Coords]] = {}
+        heap = [(0.0, 0, origin)]
+        counter = 1
+        while heap:
+            cost, _, node = heapq.heappop(heap)
+            if cost > best.get(node, float("inf")):
+                continue
+            if node == goal:
+                break
+            key, coords = node
+            edges = []
+            if key == end:
+                target = end_coords if end_coords is not None else coords
+                edges.append((goal, None, target))
+            for portal in self._all_portals(key):
+                if portal_requirements_met(portal.info, requirements):
+                    edges.append(((portal.to_location, portal.entry_coords), portal, portal.exit_coords))
+            for next_node, portal, target in edges:
+                leg_cost, field_ = self._leg(key, coords, target)
+                if portal is None:
+                    step = 0.0
+                elif portal.info.get("type") == "warp_tile":
+                    step = WARP_STEP_COST
+                else:
+                    step = PORTAL_STEP_COST
+                new_cost = cost + leg_cost + step
+                if new_cost < best.get(next_node, float("inf")):
+                    best[next_node] = new_cost
+                    back[next_node] = (node, portal, leg_cost, field_, target)
+                    heapq.heappush(heap, (new_cost, counter, next_node))
+                    counter += 1
+
+        if goal not in back:
+            logger.warning(f"No route found from '{start}' to '{end}'")
+            return None
+
+        legs = []
+        node = goal
+        while node != origin:
+            previous, portal, leg_cost, field_, target = back[node]
+            key, coords = previous
+            if field_ is not None:
+                path = field_.path_to(target)
+            elif coords is not None and coords == target:
+                path = [coords]
+            else:
+                path = None
+            legs.append(RouteLeg(key, coords, target, leg_cost, path, portal))
+            node = previous
+        legs.reverse()
+        return WorldRoute(cost=best[goal], legs=legs)
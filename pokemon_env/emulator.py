@@ -7,8 +7,9 @@ import json
 import os
 import shutil
 import hashlib
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, Union
 import numpy as np
 from PIL import Image
 
@@ -18,6 +19,7 @@ import mgba.image
 from mgba._pylib import ffi, lib
 
 from .memory_reader import PokemonEmeraldReader
+from .snapshots import SnapshotPool, StateSnapshot
 from utils.state_formatter import save_persistent_world_map, load_persistent_world_map
 
 logger = logging.getLogger(__name__)
@@ -359,6 +361,12 @@ class EmeraldEmulator:
         
         # Track currently loaded state file
         self._current_state_file = None
+        
+        # In-memory savestates for fork/rollback (created with the core)
+        self.snapshots = None
+        
+        # Held while stepping the core or reading/restoring its memory (server/app.py shares it)
+        self.memory_lock = threading.RLock()
 
         # Define key mapping for mgba
         self.KEY_MAP = {
@@ -416,33 +424,35 @@ class EmeraldEmulator:
                     
             self.memory_reader._emulator_cache_invalidator = invalidate_emulator_cache
             
-            # Set up frame callback to invalidate memory cache
-            self.core.add_frame_callback(self._invalidate_mem_cache)
+            # Region views belong to the core they were taken from
+            self._invalidate_mem_cache()
+            self.snapshots = SnapshotPool(self.core)
             
             logger.info(f"mgba initialized with ROM: {self.rom_path}")
         except Exception as e:
             raise RuntimeError(f"Failed to initialize mgba: {e}")
 
     def _invalidate_mem_cache(self):
-        """Invalidate memory cache when frame changes"""
+        """Drop cached region views (needed only when the core is replaced)"""
+        # Cached regions are live views of mGBA memory, so they never go stale per frame
         self._mem_cache = {}
 
     def _get_memory_region(self, region_id: int):
-        """Get memory region for efficient reading"""
+        """Get a zero-copy view of a memory region for efficient reading"""
         if region_id not in self._mem_cache:
             mem_core = self.core.memory.u8._core
             size = ffi.new("size_t *")
             ptr = ffi.cast("uint8_t *", mem_core.getMemoryBlock(mem_core, region_id, size))
-            self._mem_cache[region_id] = ffi.buffer(ptr, size[0])[:]
+            self._mem_cache[region_id] = memoryview(ffi.buffer(ptr, size[0]))
         return self._mem_cache[region_id]
 
-    def read_memory(self, address: int, size: int = 1):
-        """Read memory at given address"""
+    def read_memory(self, address: int, size: int = 1) -> bytes:
+        """Read memory at given address (copies only the requested bytes)"""
         region_id = address >> lib.BASE_OFFSET
         mem_region = self._get_memory_region(region_id)
         mask = len(mem_region) - 1
         address &= mask
-        return mem_region[address:address + size]
+        return bytes(mem_region[address:address + size])
 
     def read_u8(self, address: int):
         """Read unsigned 8-bit value"""
@@ -531,6 +541,62 @@ class EmeraldEmulator:
                 key_code = self.KEY_MAP[button.lower()]
                 self.core.clear_keys(key_code)
         
+        self._after_frames(buttons)
+
+    def run_schedule(self, schedule: List[Tuple[Union[str, List[str], None], int]]) -> int:
+        """
+        Run a button schedule in one tight loop.
+        
+        Each segment holds its buttons for frame_count frames, e.g. a 1-tile walk is
+        [(["up"], 12), ([], 24)]. The per-frame Python hooks of run_frame_with_buttons()
+        (dialog state check, dialogue cache clear, state cache reset) run once at the end.
+        
+        Args:
+            schedule: List of (buttons, frame_count) segments; buttons may be a list of
+                button names, a single name, or None/[] for no buttons
+        
+        Returns:
+            Number of frames run
+        """
+        if not self.core:
+            return 0
+        
+        # Resolve key codes up front so the frame loop is only run_frame() calls
+        segments = []
+        pressed = set()
+        for buttons, frame_count in schedule:
+            if frame_count < 0:
+                raise ValueError(f"Negative frame count in schedule: {frame_count}")
+            if isinstance(buttons, str):
+                buttons = [buttons]
+            key_codes = []
+            for button in buttons or []:
+                key = button.lower()
+                if key not in self.KEY_MAP:
+                    logger.warning(f"Unknown button: {button}")
+                    continue
+                key_codes.append(self.KEY_MAP[key])
+                pressed.add(key)
+            segments.append((key_codes, frame_count))
+        
+        run_frame = self.core.run_frame
+        total_frames = 0
+        for key_codes, frame_count in segments:
+            if key_codes:
+                self.core.add_keys(*key_codes)
+            try:
+                for _ in range(frame_count):
+                    run_frame()
+            finally:
+                if key_codes:
+                    self.core.clear_keys(*key_codes)
+            total_frames += frame_count
+        
+        self._after_frames(pressed)
+        return total_frames
+
+    def _after_frames(self, buttons):
+        """Hooks to run after advancing the emulator with the given buttons held"""
         # Update dialog state cache for FPS adjustment
         self._update_dialog_state_cache()
         
@@ -614,29 +680,30 @@ class EmeraldEmulator:
                 # Ensure state_bytes is actually bytes
                 if not isinstance(state_bytes, bytes):
                     state_bytes = bytes(state_bytes)
-                self.core.load_raw_state(state_bytes)
-                logger.info("State loaded.")
-                
-                # Reset dialog tracking and invalidate map cache when loading new state
+                # Land queued map stitcher updates before they can mix with the loaded state
                 if self.memory_reader:
-                    self.memory_reader.reset_dialog_tracking()
-                    # Don't clear buffer address on state load to avoid expensive rescans
-                    self.memory_reader.invalidate_map_cache(clear_buffer_address=False)
-                    
-                    # Persistent location maps will be loaded from the state file later
+                    self.memory_reader.flush_map_stitcher()
+                with self.memory_lock:
+                    self.core.load_raw_state(state_bytes)
+                    logger.info("State loaded.")
                     
-                    # Run a frame to ensure memory is properly loaded
-                    self.core.run_frame()
-                    
-                    # Only find map buffer addresses if we don't have them cached
-                    # This avoids expensive memory scanning on every state load
-                    if not self.memory_reader._map_buffer_addr:
-                        if not self.memory_reader._find_map_buffer_addresses():
+                    # Reset dialog tracking and invalidate map cache when loading new state
+                    if self.memory_reader:
+                        self.memory_reader.reset_dialog_tracking()
+                        # Don't clear buffer address on state load to avoid expensive rescans
+                        self.memory_reader.invalidate_map_cache(clear_buffer_address=False)
+                        
+                        # Persistent location maps will be loaded from the state file later
+                        
+                        # Run a frame to ensure memory is properly loaded
+                        self.core.run_frame()
+                        
+                        # Revalidate the cached map buffer header (the loaded state may be on a
+                        # different map); this only rescans IWRAM if the header is no longer valid
+                        if not self.memory_reader.revalidate_map_buffer():
                             logger.warning("Could not find map buffer addresses after state load")
                         else:
-                            logger.info(f"Map buffer found at 0x{self.memory_reader._map_buffer_addr:08X}")
-                    else:
-                        logger.debug(f"Using cached map buffer at 0x{self.memory_reader._map_buffer_addr:08X}")
+                            logger.debug(f"Map buffer at 0x{self.memory_reader._map_buffer_addr:08X}")
                 
                 # Set the current state file for both emulator and memory reader
                 self._current_state_file = path
@@ -667,6 +734,79 @@ class EmeraldEmulator:
         except Exception as e:
             logger.error(f"Failed to load state: {e}")
 
+    def snapshot(self, name: Optional[str] = None) -> Optional[StateSnapshot]:
+        """
+        Capture the emulator state in memory (no files, milestones or map persistence).
+        
+        Args:
+            name: Keep it in the named LRU so it can be restored by name later
+        
+        Returns:
+            StateSnapshot, or None if the emulator isn't initialized
+        """
+        if not self.snapshots:
+            return None
+        with self.memory_lock:
+            return self.snapshots.capture(name)
+
+    def restore_snapshot(self, snapshot: Union[StateSnapshot, str]):
+        """
+        Roll back to an in-memory snapshot from snapshot().
+        
+        Unlike load_state() this doesn't run a frame or touch milestone/stitcher files,
+        so replaying the same buttons after a restore is deterministic.
+        """
+        if not self.snapshots:
+            return
+        # Hold the memory lock so the game loop never steps or reads a half-restored core
+        with self.memory_lock:
+            if isinstance(snapshot, str):
+                name = snapshot
+                snapshot = self.snapshots.get(name)
+                if snapshot is None:
+                    raise KeyError(f"No snapshot named '{name}'")
+            
+            self.snapshots.restore(snapshot)
+            
+            if self.memory_reader:
+                self.memory_reader.reset_dialog_tracking()
+                self.memory_reader.invalidate_map_cache(clear_buffer_address=False)
+                self.memory_reader.revalidate_map_buffer()
+            if hasattr(self, '_cached_state'):
+                delattr(self, '_cached_state')
+            if hasattr(self, '_cached_state_time'):
+                delattr(self, '_cached_state_time')
+
+    def release_snapshot(self, snapshot: Union[StateSnapshot, str]):
+        """Free a snapshot's buffer for reuse"""
+        if not self.snapshots:
+            return
+        with self.memory_lock:
+            if isinstance(snapshot, str):
+                snapshot = self.snapshots.get(snapshot)
+            if snapshot is not None:
+                self.snapshots.release(snapshot)
+
+    @contextmanager
+    def fork(self):
+        """
+        Run speculative actions and roll back afterwards:
+        
+            with emulator.fork():
+                emulator.run_schedule([(["up"], 12), ([], 24)])
+                outcome = emulator.get_player_position()
+        
+        The memory lock is held for the whole block so the game loop can't step in between.
+        """
+        with self.memory_lock:
+            snapshot = self.snapshot()
+            try:
+                yield snapshot
+            finally:
+                if snapshot is not None:
+                    self.restore_snapshot(snapshot)
+                    self.release_snapshot(snapshot)
+
     def _save_persistent_grids_for_state(self, state_filename: str):
         """Save persistent location grids for a specific state file"""
         try:
@@ -684,6 +824,8 @@ class EmeraldEmulator:
             
             # Always update and save MapStitcher data
             if hasattr(self, 'memory_reader') and self.memory_reader:
+                # Include updates still queued on the map stitcher worker
+                self.memory_reader.flush_map_stitcher()
                 # For manual saves, copy the current map_stitcher.json
                 if base_name.startswith("manual_save"):
                     # Copy the current map_stitcher_data.json from cache to manual_save_map_stitcher.json
@@ -696,7 +838,12 @@ class EmeraldEmulator:
                     
                     target_stitcher_file = os.path.join(state_dir, f"{base_name}_map_stitcher.json")
                     
-                    if os.path.exists(current_stitcher_file):
+                    if self.memory_reader._map_stitcher:
+                        # The cache file may lag behind its journal; export the live data instead
+                        with self.memory_reader.map_stitcher_lock:
+                            self.memory_reader._map_stitcher.export_snapshot(target_stitcher_file)
+                        logger.info(f"Map stitcher data exported to {target_stitcher_file}")
+                    elif os.path.exists(current_stitcher_file):
                         shutil.copy2(current_stitcher_file, target_stitcher_file)
                         logger.info(f"Map stitcher data copied to {target_stitcher_file}")
                     
@@ -709,7 +856,8 @@ class EmeraldEmulator:
                     self.memory_reader.update_map_stitcher_save_file(state_filename)
                     # Force save the map stitcher data
                     if self.memory_reader._map_stitcher:
-                        self.memory_reader._map_stitcher.save_to_file()
+                        with self.memory_reader.map_stitcher_lock:
+                            self.memory_reader._map_stitcher.save_to_file()
             
         except Exception as e:
             logger.error(f"Error saving persistent grids for state: {e}")
@@ -837,8 +985,14 @@ class EmeraldEmulator:
         self.running = False
         if self.frame_thread and self.frame_thread.is_alive():
             self.frame_thread.join(timeout=1)
+        if self.memory_reader:
+            self.memory_reader.stop_map_stitcher_worker()
         if self.core:
+            self._invalidate_mem_cache()
             self.core = None
+        if self.snapshots:
+            self.snapshots.clear()
+            self.snapshots = None
         logger.info("Emulator stopped.")
 
     def get_info(self) -> Dict[str, Any]:
@@ -872,7 +1026,9 @@ class EmeraldEmulator:
         
         # Use the enhanced memory reader's comprehensive state method
         if self.memory_reader:
-            state = self.memory_reader.get_comprehensive_state(screenshot)
+            # One consistent copy per state build instead of one per emulated frame
+            with self.memory_reader.consistent_snapshot():
+                state = self.memory_reader.get_comprehensive_state(screenshot)
         else:
             # Fallback to basic state
             state = {
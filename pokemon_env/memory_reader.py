@@ -1,9 +1,13 @@
+from contextlib import contextmanager
 from dataclasses import dataclass
+import hashlib
 import struct
 from typing import Optional, Dict, Any, List, Tuple
 import logging
+import threading
 import time
 
+import numpy as np
 from mgba._pylib import ffi, lib
 
 from pokemon_env.emerald_utils import ADDRESSES, Pokemon_format, parse_pokemon, EmeraldCharmap
@@ -14,6 +18,13 @@ from utils import state_formatter
 
 logger = logging.getLogger(__name__)
 
+# Map buffer used by the direct emulator; preferred whenever the scan finds it
+PREFERRED_MAP_BUFFER = 0x02032318
+
+# Warm cache of IWRAM map buffer headers, keyed by (ROM hash, map ID) -> (header_addr, map_ptr).
+# Module-level so it survives state loads and emulator re-initialization.
+_MAP_BUFFER_CACHE: Dict[Tuple[str, int], Tuple[int, int]] = {}
+
 @dataclass
 class MemoryAddresses:
     """Centralized memory address definitions for Pokemon Emerald; many unconfirmed"""
@@ -193,8 +204,15 @@ class PokemonDataStructure:
 class PokemonEmeraldReader:
     """Systematic memory reader for Pokemon Emerald with proper data structures"""
 
-    def __init__(self, core):
-        """Initialize with a mGBA memory view object"""
+    def __init__(self, core, zero_copy: bool = True):
+        """
+        Initialize with a mGBA memory view object
+        
+        Args:
+            core: mGBA core
+            zero_copy: Read through live views of the mGBA memory blocks instead of
+                copying each whole region once per frame (see consistent_snapshot())
+        """
         self.core = core
         self.memory = core.memory
         self.addresses = MemoryAddresses()
@@ -208,6 +226,8 @@ class PokemonEmeraldReader:
         self._map_buffer_addr = None
         self._map_width = None
         self._map_height = None
+        self._map_buffer_header_addr = None  # IWRAM address of the (width, height, ptr) header
+        self._rom_key = None
         
         # Area transition tracking
         self._last_map_bank = None
@@ -217,8 +237,12 @@ class PokemonEmeraldReader:
         self.IN_BATTLE_BIT_ADDR = self.addresses.IN_BATTLE_BIT_ADDR
         self.IN_BATTLE_BITMASK = self.addresses.IN_BATTLE_BITMASK
         
-        self.core.add_frame_callback(self._invalidate_mem_cache)
         self._mem_cache = {}
+        self._zero_copy = zero_copy
+        if not zero_copy:
+            self.core.add_frame_callback(self._invalidate_mem_cache)
+        # Per-thread frozen region copies while inside consistent_snapshot()
+        self._snapshot_local = threading.local()
         
         # Dialog detection timeout for residual text
         self._dialog_text_start_time = None
@@ -230,6 +254,9 @@ class PokemonEmeraldReader:
         
         # Map stitching system (import on-demand to avoid circular import)
         self._map_stitcher = None
+        # Guards the map stitcher (also set as its .lock); the MapStitcherWorker thread holds it while stitching
+        self.map_stitcher_lock = threading.RLock()
+        self._map_stitcher_worker = None
         self._dialog_fps_duration = 5.0  # Run at 120 FPS for 5 seconds when dialog detected
         
         # Recent dialogue cache system to prevent residual text issues
@@ -255,7 +282,12 @@ class PokemonEmeraldReader:
         # Track A button presses to prevent dialogue cache repopulation
         self._a_button_pressed_time = 0.0
         
+        # Dirty-field state snapshots: section name -> (byte signature, computed value)
+        self._state_sections = {}
+        self.last_dirty_sections: List[str] = []  # Sections recomputed by the last get_comprehensive_state()
+        
     def _invalidate_mem_cache(self):
+        # Frame callback for copy mode only; live views always reflect the current frame
         self._mem_cache = {}
     
     def _rate_limited_warning(self, message, category="general"):
@@ -306,15 +338,89 @@ class PokemonEmeraldReader:
         return int.from_bytes(self.read_memory(address, 4), byteorder='little', signed=False)
 
     def _read_bytes(self, address: int, length: int) -> bytes:
-        """Read a sequence of bytes from memory"""
+        """Read a sequence of bytes from memory with one slice per region"""
         try:
-            result = bytearray()
-            for i in range(length):
-                result.append(self._read_u8(address + i))
+            data = self.read_memory(address, length)
+            if len(data) == length:
+                return data
+            
+            # Read ran past the end of the region: continue from the mirrored start,
+            # matching what per-byte masked reads would return
+            result = bytearray(data)
+            while len(result) < length:
+                chunk = self.read_memory(address + len(result), length - len(result))
+                if not chunk:
+                    result.extend(b'\x00' * (length - len(result)))
+                    break
+                result.extend(chunk)
             return bytes(result)
         except Exception as e:
             logger.warning(f"Failed to read {length} bytes at 0x{address:08X}: {e}")
             return b'\x00' * length
+    
+    def _read_array(self, address: int, count: int, dtype: str = '<u2') -> np.ndarray:
+        """
+        Read `count` little-endian values of `dtype` in one bulk read
+        
+        Returns:
+            Read-only NumPy array (zeros if the read failed)
+        """
+        dtype = np.dtype(dtype)
+        return np.frombuffer(self._read_bytes(address, count * dtype.itemsize), dtype=dtype)
+    
+    def _read_struct(self, address: int, fmt: str) -> tuple:
+        """Read and unpack a struct (e.g. '<HHB') in one bulk read"""
+        return struct.unpack(fmt, self._read_bytes(address, struct.calcsize(fmt)))
+    
+    def _read_pointed_bytes(self, pointer_addr: int, offset: int, length: int) -> bytes:
+        """Read a pointer and `length` bytes at pointer + offset (empty if the pointer is null)"""
+        pointer = self._read_u32(pointer_addr)
+        if pointer == 0:
+            return b''
+        return pointer.to_bytes(4, 'little') + self._read_bytes(pointer + offset, length)
+    
+    @staticmethod
+    def _section_signature(*parts) -> bytes:
+        """Hash the raw memory (and any other inputs) a state section is derived from"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            if not isinstance(part, (bytes, bytearray, memoryview)):
+                part = repr(part).encode()
+            digest.update(len(part).to_bytes(4, 'little'))
+            digest.update(part)
+        return digest.digest()
+    
+    def _cached_section(self, name: str, signature_fn, compute):
+        """
+        Return a state section, recomputing it only when its source bytes changed.
+        
+        Args:
+            name: Section name (e.g. "party", "bag")
+            signature_fn: Returns the signature of the memory the section is built from
+            compute: Builds the section; a None result is never cached
+        
+        Returned values are shared between snapshots and must be treated as read-only.
+        """
+        try:
+            signature = signature_fn()
+        except Exception as e:
+            logger.debug(f"Could not sign state section '{name}': {e}")
+            signature = None
+        
+        cached = self._state_sections.get(name)
+        if signature is not None and cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        value = compute()
+        if signature is not None and value is not None:
+            self._state_sections[name] = (signature, value)
+        else:
+            self._state_sections.pop(name, None)
+        return value
+    
+    def invalidate_state_sections(self):
+        """Drop all cached state sections so the next snapshot rebuilds everything"""
+        self._state_sections = {}
 
     def _get_security_key(self) -> int:
         """Get the security key for decrypting encrypted data"""
@@ -422,18 +528,63 @@ class PokemonEmeraldReader:
             return 0
         
     def _get_memory_region(self, region_id: int, force_refresh: bool = False):
+        frozen = getattr(self._snapshot_local, 'regions', None)
+        if frozen is not None:
+            if region_id not in frozen:
+                frozen[region_id] = bytes(self._get_live_region(region_id))
+            return frozen[region_id]
+        
         if force_refresh or region_id not in self._mem_cache:
-            mem_core = self.core.memory.u8._core
-            size = ffi.new("size_t *")
-            ptr = ffi.cast("uint8_t *", mem_core.getMemoryBlock(mem_core, region_id, size))
-            self._mem_cache[region_id] = ffi.buffer(ptr, size[0])[:]
+            if self._zero_copy:
+                self._mem_cache[region_id] = self._get_live_region(region_id)
+            else:
+                self._mem_cache[region_id] = self._get_live_region(region_id).tobytes()
         return self._mem_cache[region_id]
+    
+    def _get_live_region(self, region_id: int) -> memoryview:
+        """Zero-copy view of an mGBA memory block (EWRAM, IWRAM, OAM, ...)"""
+        mem_core = self.core.memory.u8._core
+        size = ffi.new("size_t *")
+        ptr = ffi.cast("uint8_t *", mem_core.getMemoryBlock(mem_core, region_id, size))
+        return memoryview(ffi.buffer(ptr, size[0]))
+    
+    @contextmanager
+    def consistent_snapshot(self):
+        """
+        Freeze memory for a multi-read operation on the calling thread.
         
-    def read_memory(self, address: int, size: int = 1):
+        Each region touched inside the block is copied once on first access and
+        reused until the block exits, so related reads can't straddle a frame
+        boundary. Hold the server's memory lock while entering if the reads must
+        all come from the same frame. Nested use reuses the outer snapshot.
+        """
+        if getattr(self._snapshot_local, 'regions', None) is not None:
+            yield self
+            return
+        
+        self._snapshot_local.regions = {}
+        try:
+            yield self
+        finally:
+            self._snapshot_local.regions = None
+        
+    def read_memory(self, address: int, size: int = 1) -> bytes:
         region_id = address >> lib.BASE_OFFSET
         mem_region = self._get_memory_region(region_id)
         mask = len(mem_region) - 1
         address &= mask
+        # Copy only the requested bytes out of the (possibly live) region
+        return bytes(mem_region[address:address + size])
+    
+    def read_memory_view(self, address: int, size: int = 1) -> memoryview:
+        """
+        Zero-copy view of memory. The contents track the emulator, so callers
+        must not hold on to the view across frames; use read_memory() for a copy.
+        """
+        region_id = address >> lib.BASE_OFFSET
+        mem_region = memoryview(self._get_memory_region(region_id))
+        mask = len(mem_region) - 1
+        address &= mask
         return mem_region[address:address + size]
 
     def read_party_pokemon(self) -> List[PokemonData]:
@@ -1139,10 +1290,10 @@ class PokemonEmeraldReader:
             item_count = self._read_u16(count_addr)
             items = []
             
-            for i in range(min(item_count, 30)):
-                item_id = self._read_u16(items_addr + i * 4)
-                quantity = self._read_u16(items_addr + i * 4 + 2)
-                
+            # Item slots are (u16 item_id, u16 quantity) pairs
+            slot_count = min(item_count, 30)
+            slots = self._read_bytes(items_addr, slot_count * 4)
+            for item_id, quantity in struct.iter_unpack('<HH', slots):
                 if item_id > 0:
                     item_name = f"Item_{item_id:03d}"
                     items.append((item_name, quantity))
@@ -1170,12 +1321,8 @@ class PokemonEmeraldReader:
             if caught_addr == 0:
                 return 0
             
-            caught_count = 0
-            for i in range(32):
-                flags = self._read_u8(caught_addr + i)
-                caught_count += bin(flags).count('1')
-            
-            return caught_count
+            flags = self._read_array(caught_addr, 32, np.uint8)
+            return int(np.unpackbits(flags).sum())
         except Exception as e:
             logger.warning(f"Failed to read Pokedex caught count: {e}")
             return 0
@@ -1187,12 +1334,8 @@ class PokemonEmeraldReader:
             if seen_addr == 0:
                 return 0
             
-            seen_count = 0
-            for i in range(32):
-                flags = self._read_u8(seen_addr + i)
-                seen_count += bin(flags).count('1')
-            
-            return seen_count
+            flags = self._read_array(seen_addr, 32, np.uint8)
+            return int(np.unpackbits(flags).sum())
         except Exception as e:
             logger.warning(f"Failed to read Pokedex seen count: {e}")
             return 0
@@ -1410,26 +1553,27 @@ class PokemonEmeraldReader:
                     opponent_battler_id = 1  # B_POSITION_OPPONENT_LEFT
                     opponent_base = g_battle_mons_base + (opponent_battler_id * battle_pokemon_struct_size)
                     
-                    # Read BattlePokemon struct fields directly (from ROM guide)
-                    species_id = self._read_u16(opponent_base + 0x00)  # u16 species
-                    attack = self._read_u16(opponent_base + 0x02)      # u16 attack
-                    defense = self._read_u16(opponent_base + 0x04)     # u16 defense
-                    speed = self._read_u16(opponent_base + 0x06)       # u16 speed
-                    sp_attack = self._read_u16(opponent_base + 0x08)   # u16 spAttack
-                    sp_defense = self._read_u16(opponent_base + 0x0A)  # u16 spDefense
-                    type1 = self._read_u8(opponent_base + 0x0C)        # u8 type1
-                    type2 = self._read_u8(opponent_base + 0x0D)        # u8 type2
-                    level = self._read_u8(opponent_base + 0x0E)        # u8 level
-                    current_hp = self._read_u8(opponent_base + 0x0F)   # u8 hp
-                    max_hp = self._read_u16(opponent_base + 0x10)      # u16 maxHP
+                    # Read BattlePokemon struct fields directly (from ROM guide) in one bulk read
+                    battle_mon = self._read_bytes(opponent_base, 0x20)
+                    (species_id,   # u16 species
+                     attack,       # u16 attack
+                     defense,      # u16 defense
+                     speed,        # u16 speed
+                     sp_attack,    # u16 spAttack
+                     sp_defense,   # u16 spDefense
+                     type1,        # u8 type1
+                     type2,        # u8 type2
+                     level,        # u8 level
+                     current_hp,   # u8 hp
+                     max_hp,       # u16 maxHP
+                     ) = struct.unpack_from('<6H4BH', battle_mon, 0x00)
+                    move_ids = struct.unpack_from('<4H', battle_mon, 0x12)  # u16 moves[4]
+                    move_pps = battle_mon[0x1A:0x1E]                        # u8 pp[4]
                     
                     # Read moves and PP
                     moves = []
                     move_pp = []
-                    for i in range(4):
-                        move_id = self._read_u16(opponent_base + 0x12 + (i * 2))  # u16 moves[4]
-                        pp = self._read_u8(opponent_base + 0x1A + i)              # u8 pp[4]
-                        
+                    for move_id, pp in zip(move_ids, move_pps):
                         if move_id > 0:
                             try:
                                 from pokemon_env.enums import Move
@@ -1443,7 +1587,7 @@ class PokemonEmeraldReader:
                         move_pp.append(pp)
                     
                     # Read status
-                    status1 = self._read_u8(opponent_base + 0x1F)  # u8 status1
+                    status1 = battle_mon[0x1F]  # u8 status1
                     
                     # Convert status to name
                     status_name = "Normal"
@@ -1565,8 +1709,19 @@ class PokemonEmeraldReader:
             player_species = player_party[0].species_name
             player_level = player_party[0].level
             
-            # Scan memory range for Pokemon patterns
-            for addr in range(0x02020000, 0x02030000, 0x4):
+            # Scan memory range for Pokemon patterns: filter every 4-byte-aligned
+            # candidate in one vectorized pass, then inspect only the plausible ones
+            scan_start, scan_end = 0x02020000, 0x02030000
+            block = np.frombuffer(self._read_bytes(scan_start, scan_end - scan_start + 0x12), dtype=np.uint8)
+            offsets = np.arange(0, scan_end - scan_start, 4)
+            species_ids = block[offsets].astype(np.uint16) | (block[offsets + 1].astype(np.uint16) << 8)
+            levels = block[offsets + 0x0E]
+            hps = block[offsets + 0x0F]
+            max_hps = block[offsets + 0x10].astype(np.uint16) | (block[offsets + 0x11].astype(np.uint16) << 8)
+            plausible = ((species_ids >= 1) & (species_ids <= 411) & (levels >= 1) & (levels <= 100) &
+                         (hps <= max_hps) & (max_hps >= 10) & (max_hps <= 999))
+            
+            for addr in (scan_start + offsets[plausible]).tolist():
                 try:
                     species_id = self._read_u16(addr)
                     level = self._read_u8(addr + 0x0E)
@@ -1849,18 +2004,11 @@ class PokemonEmeraldReader:
         try:
             # Only validate if we're looking for outdoor maps (they shouldn't have many 0x3FF tiles)
             # Indoor maps might legitimately have these tiles
-            corruption_count = 0
             sample_size = min(100, width * height)  # Sample first 100 tiles
+            tile_ids = self._read_array(buffer_addr, sample_size, '<u2') & 0x03FF
             
-            for i in range(sample_size):
-                tile_addr = buffer_addr + (i * 2)
-                tile_value = self._read_u16(tile_addr)
-                tile_id = tile_value & 0x03FF
-                
-                # Tile ID 1023 (0x3FF) is a corruption marker
-                if tile_id == 0x3FF:
-                    corruption_count += 1
-            
+            # Tile ID 1023 (0x3FF) is a corruption marker
+            corruption_count = int(np.count_nonzero(tile_ids == 0x3FF))
             corruption_ratio = corruption_count / sample_size
             
             # Be more lenient - only reject if more than 50% are corruption markers
@@ -1873,70 +2021,129 @@ class PokemonEmeraldReader:
         except Exception:
             return True  # If we can't validate, assume it's OK
     
-    def _find_map_buffer_addresses(self):
-        """Find map buffer addresses - SIMPLIFIED to avoid over-filtering"""
+    def _get_rom_key(self) -> str:
+        """Short hash of the cartridge header, used to key the map buffer cache"""
+        if self._rom_key is None:
+            header = self._read_bytes(0x08000000, 0xC0)  # Title, game code, maker, checksum
+            self._rom_key = hashlib.sha1(header).hexdigest()[:16]
+        return self._rom_key
+    
+    def _get_current_map_id(self) -> int:
+        return (self._read_u8(self.addresses.MAP_BANK) << 8) | self._read_u8(self.addresses.MAP_NUMBER)
+    
+    def _read_map_buffer_header(self, header_addr: int) -> Optional[Tuple[int, int, int]]:
+        """Read (width, height, map_ptr) at an IWRAM header address, or None if it doesn't look valid"""
+        width, height, map_ptr = self._read_struct(header_addr, '<III')
+        if 10 <= width <= 200 and 10 <= height <= 200 and 0x02000000 <= map_ptr <= 0x02040000:
+            return width, height, map_ptr
+        return None
+    
+    def _scan_map_buffer_headers(self, start_offset: int, end_offset: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Find every plausible map buffer header in IWRAM in one vectorized pass.
+        
+        Checks each 4-byte-aligned offset in [start_offset, end_offset - 12) for a
+        (u32 width, u32 height, u32 map_ptr) triple with sane dimensions and an
+        EWRAM pointer.
+        
+        Returns:
+            List of (header_addr, width, height, map_ptr) in address order
+        """
+        count = len(range(start_offset, end_offset - 12, 4))
+        if count <= 0:
+            return []
+        
+        words = self._read_array(0x03000000 + start_offset, count + 2, '<u4')
+        widths, heights, ptrs = words[:count], words[1:count + 1], words[2:count + 2]
+        plausible = ((widths >= 10) & (widths <= 200) & (heights >= 10) & (heights <= 200) &
+                     (ptrs >= 0x02000000) & (ptrs <= 0x02040000))
+        
+        return [
+            (0x03000000 + start_offset + 4 * i, int(widths[i]), int(heights[i]), int(ptrs[i]))
+            for i in np.nonzero(plausible)[0].tolist()
+        ]
+    
+    def _set_map_buffer(self, header_addr: int, map_ptr: int, width: int, height: int):
+        """Adopt a map buffer and remember its header in the warm cache"""
+        self._map_buffer_addr = map_ptr
+        self._map_width = width
+        self._map_height = height
+        self._map_buffer_header_addr = header_addr
+        try:
+            _MAP_BUFFER_CACHE[(self._get_rom_key(), self._get_current_map_id())] = (header_addr, map_ptr)
+        except Exception as e:
+            logger.debug(f"Could not cache map buffer header: {e}")
+    
+    def revalidate_map_buffer(self) -> bool:
+        """
+        Refresh the map buffer from its known header (e.g. after a state load).
+        
+        Re-reads width/height/pointer at the cached IWRAM header address, which is
+        a few bytes instead of a scan; falls back to _find_map_buffer_addresses()
+        only if the header no longer looks valid.
+        """
+        if self._map_buffer_header_addr is not None:
+            header = self._read_map_buffer_header(self._map_buffer_header_addr)
+            if header:
+                width, height, map_ptr = header
+                self._set_map_buffer(self._map_buffer_header_addr, map_ptr, width, height)
+                return True
+        return self._find_map_buffer_addresses()
+    
+    def _find_map_buffer_addresses(self, use_cache: bool = True):
+        """
+        Find map buffer addresses - SIMPLIFIED to avoid over-filtering
+        
+        Args:
+            use_cache: Try the warm header cache (this map, then the last header used)
+                before scanning IWRAM. Pass False to force a fresh scan.
+        """
         # First, try to invalidate any existing cache if we're having issues
         if self._map_buffer_addr and (self._map_width is None or self._map_height is None):
             logger.warning("Invalid map cache detected, clearing...")
             self.invalidate_map_cache()
         
-        # SIMPLE APPROACH: Take the first valid buffer found (like original code)
-        for offset in range(0, 0x8000 - 12, 4):
+        if use_cache:
             try:
-                width = self._read_u32(0x03000000 + offset)
-                height = self._read_u32(0x03000000 + offset + 4)
-                
-                # More strict validation for reasonable map dimensions
-                if 10 <= width <= 200 and 10 <= height <= 200:
-                    map_ptr = self._read_u32(0x03000000 + offset + 8)
-                    
-                    # Validate map pointer is in valid EWRAM range
-                    if 0x02000000 <= map_ptr <= 0x02040000:
-                        # Additional validation: check if the map pointer points to valid memory
-                        try:
-                            # Try to read a small amount of data from the map pointer
-                            test_data = self._read_bytes(map_ptr, 4)
-                            if len(test_data) == 4:
-                                # Only validate non-preferred buffers
-                                # The preferred buffer (0x02032318) should always be used if found
-                                if map_ptr != 0x02032318:
-                                    # Validate buffer doesn't have too many corruption markers
-                                    if not self._validate_buffer_data(map_ptr, width, height):
-                                        logger.debug(f"Buffer at 0x{map_ptr:08X} failed validation, skipping")
-                                        continue
-                                
-                                # FORCE CONSISTENT BUFFER: Use specific buffer address that direct emulator uses
-                                # If we find the known good buffer (0x02032318), use it preferentially
-                                if map_ptr == 0x02032318:
-                                    logger.info(f"Found preferred buffer at 0x{map_ptr:08X} with size {width}x{height}")
-                                    self._map_buffer_addr = map_ptr
-                                    self._map_width = width
-                                    self._map_height = height
-                                    return True
-                                # Store this as a fallback
-                                elif not hasattr(self, '_fallback_buffer'):
-                                    self._fallback_buffer = (map_ptr, width, height)
-                                    continue
-                        except Exception as e:
-                            logger.debug(f"Map pointer validation failed at 0x{map_ptr:08X}: {e}")
-                            continue
-                        except Exception as e:
-                            logger.debug(f"Map pointer validation failed at 0x{map_ptr:08X}: {e}")
-                            continue
-            except Exception as e:
-                # Log only if this is a recurring issue
-                if offset % 1000 == 0:
-                    logger.debug(f"Error scanning map buffer at offset {offset}: {e}")
-                continue
+                cached = _MAP_BUFFER_CACHE.get((self._get_rom_key(), self._get_current_map_id()))
+            except Exception:
+                cached = None
+            header_addrs = []
+            if cached:
+                header_addrs.append(cached[0])
+            if self._map_buffer_header_addr is not None:
+                header_addrs.append(self._map_buffer_header_addr)
+            
+            for header_addr in header_addrs:
+                header = self._read_map_buffer_header(header_addr)
+                if header:
+                    width, height, map_ptr = header
+                    logger.debug(f"Map buffer cache hit: header 0x{header_addr:08X} -> 0x{map_ptr:08X} ({width}x{height})")
+                    self._set_map_buffer(header_addr, map_ptr, width, height)
+                    return True
+        
+        # SIMPLE APPROACH: Take the preferred buffer if present, else the first valid one
+        fallback = None
+        for header_addr, width, height, map_ptr in self._scan_map_buffer_headers(0, 0x8000):
+            # FORCE CONSISTENT BUFFER: Use specific buffer address that direct emulator uses
+            # If we find the known good buffer (0x02032318), use it preferentially
+            if map_ptr == PREFERRED_MAP_BUFFER:
+                logger.info(f"Found preferred buffer at 0x{map_ptr:08X} with size {width}x{height}")
+                self._set_map_buffer(header_addr, map_ptr, width, height)
+                return True
+            
+            # Only validate non-preferred buffers; keep the first good one as a fallback
+            if fallback is None:
+                if not self._validate_buffer_data(map_ptr, width, height):
+                    logger.debug(f"Buffer at 0x{map_ptr:08X} failed validation, skipping")
+                    continue
+                fallback = (header_addr, width, height, map_ptr)
         
         # If preferred buffer not found, use fallback
-        if hasattr(self, '_fallback_buffer'):
-            map_ptr, width, height = self._fallback_buffer
+        if fallback:
+            header_addr, width, height, map_ptr = fallback
             logger.info(f"Using fallback buffer at 0x{map_ptr:08X} with size {width}x{height}")
-            self._map_buffer_addr = map_ptr
-            self._map_width = width
-            self._map_height = height
-            delattr(self, '_fallback_buffer')
+            self._set_map_buffer(header_addr, map_ptr, width, height)
             return True
         
         self._rate_limited_warning("Could not find valid map buffer addresses", "map_buffer")
@@ -1947,54 +2154,21 @@ class PokemonEmeraldReader:
         logger.info("Searching for alternative map buffer...")
         
         # Method 1: Scan a wider memory range
-        for offset in range(0x8000, 0x10000 - 12, 4):
-            try:
-                width = self._read_u32(0x03000000 + offset)
-                height = self._read_u32(0x03000000 + offset + 4)
-                
-                if 10 <= width <= 200 and 10 <= height <= 200:
-                    map_ptr = self._read_u32(0x03000000 + offset + 8)
-                    
-                    if 0x02000000 <= map_ptr <= 0x02040000:
-                        try:
-                            test_data = self._read_bytes(map_ptr, 4)
-                            if len(test_data) == 4:
-                                is_current = self._validate_buffer_currency(map_ptr, width, height)
-                                if is_current:
-                                    self._map_buffer_addr = map_ptr
-                                    self._map_width = width
-                                    self._map_height = height
-                                    logger.info(f"Found alternative buffer at 0x{map_ptr:08X} ({width}x{height})")
-                                    return True
-                        except Exception:
-                            continue
-            except Exception:
-                continue
+        for header_addr, width, height, map_ptr in self._scan_map_buffer_headers(0x8000, 0x10000):
+            if self._validate_buffer_currency(map_ptr, width, height):
+                self._set_map_buffer(header_addr, map_ptr, width, height)
+                logger.info(f"Found alternative buffer at 0x{map_ptr:08X} ({width}x{height})")
+                return True
         
         # Method 2: Accept any buffer with lower corruption threshold
         logger.info("No clean buffer found, looking for least corrupted...")
-        for offset in range(0, 0x8000 - 12, 4):
-            try:
-                width = self._read_u32(0x03000000 + offset)
-                height = self._read_u32(0x03000000 + offset + 4)
-                
-                if 10 <= width <= 200 and 10 <= height <= 200:
-                    map_ptr = self._read_u32(0x03000000 + offset + 8)
-                    
-                    if 0x02000000 <= map_ptr <= 0x02040000:
-                        try:
-                            test_data = self._read_bytes(map_ptr, 4)
-                            if len(test_data) == 4:
-                                # Accept any buffer - we'll use the first valid one found
-                                self._map_buffer_addr = map_ptr
-                                self._map_width = width
-                                self._map_height = height
-                                logger.warning(f"Using potentially corrupted buffer at 0x{map_ptr:08X} ({width}x{height}) as fallback")
-                                return True
-                        except Exception:
-                            continue
-            except Exception:
-                continue
+        candidates = self._scan_map_buffer_headers(0, 0x8000)
+        if candidates:
+            # Accept any buffer - we'll use the first valid one found
+            header_addr, width, height, map_ptr = candidates[0]
+            self._set_map_buffer(header_addr, map_ptr, width, height)
+            logger.warning(f"Using potentially corrupted buffer at 0x{map_ptr:08X} ({width}x{height}) as fallback")
+            return True
         
         logger.error("No alternative buffer found")
         return False
@@ -2004,31 +2178,24 @@ class PokemonEmeraldReader:
         try:
             # Sample more tiles and check for corruption patterns
             sample_size = min(50, width * height)
-            corrupted_count = 0
-            total_sampled = 0
-            tile_frequency = {}
+            if sample_size <= 0:
+                return False
             
-            for i in range(0, sample_size, 1):  # Sample every tile, not every 4th
-                try:
-                    tile_data = self._read_u16(buffer_addr + i * 2)
-                    total_sampled += 1
-                    
-                    # Track tile frequency for repetition detection
-                    tile_frequency[tile_data] = tile_frequency.get(tile_data, 0) + 1
-                    
-                    # Check for corruption patterns
-                    if (tile_data == 0xFFFF or tile_data == 0x3FF or  # 1023 pattern
-                        tile_data == 0x0000 or tile_data == 0x1FF):   # Other corruption patterns
-                        corrupted_count += 1
-                except Exception:
-                    corrupted_count += 1
+            tiles = self._read_array(buffer_addr, sample_size, '<u2')  # Sample every tile, not every 4th
+            total_sampled = len(tiles)
             
-            if total_sampled == 0:
-                return False
+            # Check for corruption patterns
+            corrupted_count = int(np.count_nonzero(
+                (tiles == 0xFFFF) | (tiles == 0x3FF) |  # 1023 pattern
+                (tiles == 0x0000) | (tiles == 0x1FF)    # Other corruption patterns
+            ))
+            
+            # Track tile frequency for repetition detection
+            unique_tiles, counts = np.unique(tiles, return_counts=True)
             
             # Check for excessive repetition (sign of corruption)
-            max_frequency = max(tile_frequency.values()) if tile_frequency else 0
-            repetition_ratio = max_frequency / total_sampled if total_sampled > 0 else 0
+            max_frequency = int(counts.max()) if len(counts) else 0
+            repetition_ratio = max_frequency / total_sampled
             
             corruption_ratio = corrupted_count / total_sampled
             
@@ -2038,10 +2205,8 @@ class PokemonEmeraldReader:
             logger.debug(f"Buffer 0x{buffer_addr:08X}: {corruption_ratio:.1%} corrupted, {repetition_ratio:.1%} repetition ({corrupted_count}/{total_sampled}) - current: {is_current}")
             
             # Show most common tiles for debugging
-            if tile_frequency:
-                sorted_tiles = sorted(tile_frequency.items(), key=lambda x: x[1], reverse=True)
-                top_tiles = sorted_tiles[:3]
-                logger.debug(f"  Top tiles: {[(hex(tile), count) for tile, count in top_tiles]}")
+            top = np.argsort(counts)[::-1][:3]
+            logger.debug(f"  Top tiles: {[(hex(int(unique_tiles[i])), int(counts[i])) for i in top]}")
             
             return is_current
             
@@ -2131,7 +2296,7 @@ class PokemonEmeraldReader:
                 if unknown_ratio > 0.5:
                     logger.info(f"Outdoor map has {unknown_ratio:.1%} unknown tiles, retrying with cache invalidation")
                     self.invalidate_map_cache()
-                    if self._find_map_buffer_addresses():
+                    if self._find_map_buffer_addresses(use_cache=False):
                         map_data = self._read_map_data_internal(radius)
             else:
                 logger.debug(f"Skipping validation for indoor area: {location_name}")
@@ -2263,41 +2428,24 @@ class PokemonEmeraldReader:
         height = min(height, self._map_height - y_start)
         
         # Additional validation
-        if width <= 0 or height <= 0:
+        if width <= 0 or height <= 0 or x_start < 0 or y_start < 0:
             logger.warning(f"Invalid reading area: {width}x{height} at ({x_start}, {y_start})")
             return []
         
         try:
             metatiles = []
             for y in range(y_start, y_start + height):
+                # x_start >= 0 and width <= map_width - x_start keep the row inside the buffer
+                row_addr = self._map_buffer_addr + (x_start + y * self._map_width) * 2
+                values = self._read_array(row_addr, width, '<u2')
+                metatile_ids = (values & 0x03FF).tolist()
+                collisions = ((values & 0x0C00) >> 10).tolist()
+                elevations = ((values & 0xF000) >> 12).tolist()
+                
                 row = []
-                for x in range(x_start, x_start + width):
-                    try:
-                        index = x + y * self._map_width
-                        metatile_addr = self._map_buffer_addr + (index * 2)
-                        
-                        # Validate address before reading
-                        if metatile_addr < self._map_buffer_addr or metatile_addr >= self._map_buffer_addr + (self._map_width * self._map_height * 2):
-                            logger.debug(f"Invalid metatile address: 0x{metatile_addr:08X}")
-                            row.append((0, MetatileBehavior.NORMAL, 0, 0))
-                            continue
-                        
-                        metatile_value = self._read_u16(metatile_addr)
-                        
-                        metatile_id = metatile_value & 0x03FF
-                        collision = (metatile_value & 0x0C00) >> 10
-                        elevation = (metatile_value & 0xF000) >> 12
-                        
-                        # Validate metatile ID
-                        if metatile_id > 0x3FF:
-                            logger.debug(f"Invalid metatile ID: {metatile_id}")
-                            metatile_id = 0
-                        
-                        behavior = self.get_exact_behavior_from_id(metatile_id)
-                        row.append((metatile_id, behavior, collision, elevation))
-                    except Exception as e:
-                        logger.debug(f"Error reading metatile at ({x}, {y}): {e}")
-                        row.append((0, MetatileBehavior.NORMAL, 0, 0))
+                for metatile_id, collision, elevation in zip(metatile_ids, collisions, elevations):
+                    behavior = self.get_exact_behavior_from_id(metatile_id)
+                    row.append((metatile_id, behavior, collision, elevation))
                 metatiles.append(row)
             
             return metatiles
@@ -2337,22 +2485,12 @@ class PokemonEmeraldReader:
             if not attributes_ptr:
                 return []
 
-            bytes_to_read = num_metatiles * 2
-            attribute_bytes = self._read_bytes(attributes_ptr, bytes_to_read)
-
-            if len(attribute_bytes) != bytes_to_read:
+            # Attributes are u16 per metatile; the behavior is the low byte
+            attributes = self._read_array(attributes_ptr, num_metatiles, '<u2')
+            if len(attributes) != num_metatiles:
                 return []
 
-            behaviors = []
-            for i in range(num_metatiles):
-                byte_offset = i * 2
-                byte1 = attribute_bytes[byte_offset]
-                byte2 = attribute_bytes[byte_offset + 1]
-                attribute_value = (byte2 << 8) | byte1
-                behavior = attribute_value & 0x00FF
-                behaviors.append(behavior)
-
-            return behaviors
+            return (attributes & 0x00FF).tolist()
 
         except Exception as e:
             logger.warning(f"Failed to read metatile behaviors: {e}")
@@ -2411,9 +2549,76 @@ class PokemonEmeraldReader:
             logger.warning(f"Failed to get exact behavior for metatile {metatile_id}: {e}")
             return MetatileBehavior.NORMAL
 
+    def _player_name_signature(self) -> bytes:
+        return self._section_signature(self._read_pointed_bytes(self.addresses.SAVE_BLOCK2_PTR, 0, 8))
+    
+    def _party_signature(self) -> bytes:
+        party_bytes = self._read_bytes(ADDRESSES["gPlayerParty"], 6 * self.addresses.PARTY_POKEMON_SIZE)
+        return self._section_signature(self._read_u8(self.addresses.PARTY_COUNT), party_bytes)
+    
+    def _bag_signature(self) -> bytes:
+        return self._section_signature(
+            self._read_pointed_bytes(self.addresses.SAVESTATE_OBJECT_POINTER, self.addresses.SAVESTATE_MONEY_OFFSET, 4),
+            self._read_pointed_bytes(self.addresses.SECURITY_KEY_POINTER, self.addresses.SECURITY_KEY_OFFSET, 4),
+            self._read_pointed_bytes(self.addresses.BAG_ITEMS, 0, 30 * 4),
+            self._read_pointed_bytes(self.addresses.BAG_ITEMS_COUNT, 0, 2),
+        )
+    
+    def _progress_signature(self) -> bytes:
+        return self._section_signature(
+            self._read_u8(self.addresses.PLAYER_BADGES),
+            self._read_pointed_bytes(self.addresses.POKEDEX_CAUGHT, 0, 32),
+            self._read_pointed_bytes(self.addresses.POKEDEX_SEEN, 0, 32),
+            self._read_pointed_bytes(self.addresses.SAVE_BLOCK1_PTR, self.addresses.SAVE_BLOCK1_FLAGS_OFFSET, 300),
+            self._party_signature(),  # Progress context includes party levels/species
+        )
+    
+    def _read_party_section(self) -> Dict[str, Any]:
+        """Party as PokemonData objects plus the serialized form used in the state"""
+        logger.info("About to read party Pokemon")
+        party = self.read_party_pokemon()
+        logger.info(f"Read party: {len(party) if party else 0} Pokemon")
+        serialized = [
+            {
+                "species_name": pokemon.species_name,
+                "level": pokemon.level,
+                "current_hp": pokemon.current_hp,
+                "max_hp": pokemon.max_hp,
+                "status": pokemon.status.get_status_name() if pokemon.status else "OK",
+                "types": [t.name for t in [pokemon.type1, pokemon.type2] if t],
+                "moves": pokemon.moves,
+                "move_pp": pokemon.move_pp,
+                "nickname": pokemon.nickname
+            }
+            for pokemon in party
+        ]
+        return {"pokemon": party, "serialized": serialized}
+    
+    def _read_bag_section(self) -> Dict[str, Any]:
+        return {
+            "money": self.read_money(),
+            "items": self.read_items(),
+            "item_count": self.read_item_count(),
+        }
+    
+    def _read_progress_section(self) -> Dict[str, Any]:
+        return {
+            "badges": self.read_badges(),
+            "pokedex_caught": self.read_pokedex_caught_count(),
+            "pokedex_seen": self.read_pokedex_seen_count(),
+            "progress_context": self.get_game_progress_context(),
+        }
+    
     def get_comprehensive_state(self, screenshot=None) -> Dict[str, Any]:
-        """Get comprehensive game state with optional screenshot for OCR fallback"""
+        """
+        Get comprehensive game state with optional screenshot for OCR fallback
+        
+        Memory-backed sections (map tiles, party, bag, progress flags, player name,
+        dialog text buffers) are only rebuilt when the bytes they come from change;
+        the names of the rebuilt sections are left in last_dirty_sections.
+        """
         logger.info("Starting comprehensive state reading")
+        previous_signatures = {name: entry[0] for name, entry in self._state_sections.items()}
         state = {
             "visual": {"screenshot": None, "resolution": [240, 160]},
             "player": {"position": None, "location": None, "name": None},
@@ -2457,7 +2662,7 @@ class PokemonEmeraldReader:
                 # print(f"DEBUG: Exception reading location: {e}")
                 state["player"]["location"] = "Unknown"
             
-            player_name = self.read_player_name()
+            player_name = self._cached_section("player_name", self._player_name_signature, self.read_player_name)
             if player_name:
                 state["player"]["name"] = player_name
             
@@ -2480,6 +2685,9 @@ class PokemonEmeraldReader:
             # Movement is blocked by dialogue, menus, cutscenes
             movement_enabled = overworld_visible and not is_in_dialog and not is_in_menu
             
+            bag = self._cached_section("bag", self._bag_signature, self._read_bag_section)
+            progress = self._cached_section("progress", self._progress_signature, self._read_progress_section)
+            
             state["game"].update({
                 # Multi-flag state system (can overlap)
                 "overworld_visible": overworld_visible,
@@ -2496,13 +2704,13 @@ class PokemonEmeraldReader:
                 "game_state": self._get_primary_game_state(is_at_title, is_in_battle, is_in_dialog, is_in_menu),
                 
                 # Other game data
-                "money": self.read_money(),
+                "money": bag["money"],
                 "time": self.read_game_time(),
-                "badges": self.read_badges(),
-                "items": self.read_items(),
-                "item_count": self.read_item_count(),
-                "pokedex_caught": self.read_pokedex_caught_count(),
-                "pokedex_seen": self.read_pokedex_seen_count()
+                "badges": progress["badges"],
+                "items": bag["items"],
+                "item_count": bag["item_count"],
+                "pokedex_caught": progress["pokedex_caught"],
+                "pokedex_seen": progress["pokedex_seen"]
             })
             
             # Battle details - use comprehensive battle info
@@ -2543,32 +2751,15 @@ class PokemonEmeraldReader:
                 }
             
             # Game progress context
-            progress_context = self.get_game_progress_context()
+            progress_context = progress["progress_context"]
             if progress_context:
                 state["game"]["progress_context"] = progress_context
             
             # Party Pokemon
-            logger.info("About to read party Pokemon")
-            party = self.read_party_pokemon()
-            logger.info(f"Read party: {len(party) if party else 0} Pokemon")
-            if party:
-                logger.info(f"Party data: {party}")
-                state["player"]["party"] = [
-                    {
-                        "species_name": pokemon.species_name,
-                        "level": pokemon.level,
-                        "current_hp": pokemon.current_hp,
-                        "max_hp": pokemon.max_hp,
-                        "status": pokemon.status.get_status_name() if pokemon.status else "OK",
-                        "types": [t.name for t in [pokemon.type1, pokemon.type2] if t],
-                        "moves": pokemon.moves,
-                        "move_pp": pokemon.move_pp,
-                        "nickname": pokemon.nickname
-                    }
-                    for pokemon in party
-                ]
-                logger.info(f"Added {len(state['player']['party'])} Pokemon to state")
-                logger.info(f"Final state party: {state['player']['party']}")
+            party = self._cached_section("party", self._party_signature, self._read_party_section)
+            if party["pokemon"]:
+                state["player"]["party"] = party["serialized"]
+                logger.debug(f"Added {len(state['player']['party'])} Pokemon to state")
             else:
                 self._rate_limited_warning("No Pokemon found in party", "party_empty")
         
@@ -2582,86 +2773,116 @@ class PokemonEmeraldReader:
         if screenshot is not None:
             state["visual"]["screenshot"] = screenshot
         
+        self.last_dirty_sections = [
+            name for name, entry in self._state_sections.items()
+            if previous_signatures.get(name) != entry[0]
+        ]
+        
         return state
     
-    def read_map(self, state): 
+    def _map_section_signature(self) -> bytes:
+        """Map tiles depend on the map, player position, map header and the whole map buffer"""
+        map_bytes = b''
+        if self._map_buffer_addr and self._map_width and self._map_height:
+            map_bytes = self._read_bytes(self._map_buffer_addr, self._map_width * self._map_height * 2)
+        return self._section_signature(
+            self._read_u8(self.addresses.MAP_BANK),
+            self._read_u8(self.addresses.MAP_NUMBER),
+            self.read_coordinates(),
+            self._read_bytes(self.addresses.MAP_HEADER, 0x20),
+            (self._map_buffer_addr, self._map_width, self._map_height),
+            map_bytes,
+        )
+    
+    def _read_map_fields(self) -> Optional[Dict[str, Any]]:
+        """Read the 15x15 tile window around the player and derive the per-tile state fields"""
         tiles = self.read_map_around_player(radius=7)  # 15x15 grid for better context
-        if tiles:
-            # DEBUG: Print tile data before processing for HTTP API
-            total_tiles = sum(len(row) for row in tiles)
-            unknown_count = 0
-            corruption_count = 0
-            for row in tiles:
-                for tile in row:
-                    if len(tile) >= 2:
-                        behavior = tile[1]
-                        if isinstance(behavior, int):
-                            if behavior == 0:
-                                unknown_count += 1
-                            elif behavior == 134:  # Indoor element corruption
-                                corruption_count += 1
-            
-            unknown_ratio = unknown_count / total_tiles if total_tiles > 0 else 0
-            logger.info(f"📊 PRE-PROCESSING TILES: {unknown_ratio:.1%} unknown ({unknown_count}/{total_tiles}), {corruption_count} corrupted")
-            
-            state["map"]["tiles"] = tiles
-            
-            # Process tiles for enhanced information (keep minimal processing here)
-            tile_names = []
-            metatile_behaviors = []
-            metatile_info = []
-            
-            for row in tiles:
-                row_names = []
-                row_behaviors = []
-                row_info = []
+        if not tiles:
+            return None
+        
+        # DEBUG: Print tile data before processing for HTTP API
+        total_tiles = sum(len(row) for row in tiles)
+        unknown_count = 0
+        corruption_count = 0
+        for row in tiles:
+            for tile in row:
+                if len(tile) >= 2:
+                    behavior = tile[1]
+                    if isinstance(behavior, int):
+                        if behavior == 0:
+                            unknown_count += 1
+                        elif behavior == 134:  # Indoor element corruption
+                            corruption_count += 1
+        
+        unknown_ratio = unknown_count / total_tiles if total_tiles > 0 else 0
+        logger.info(f"📊 PRE-PROCESSING TILES: {unknown_ratio:.1%} unknown ({unknown_count}/{total_tiles}), {corruption_count} corrupted")
+        
+        # Process tiles for enhanced information (keep minimal processing here)
+        tile_names = []
+        metatile_behaviors = []
+        metatile_info = []
+        
+        for row in tiles:
+            row_names = []
+            row_behaviors = []
+            row_info = []
+            
+            for tile_data in row:
+                if len(tile_data) >= 4:
+                    tile_id, behavior, collision, elevation = tile_data
+                elif len(tile_data) >= 2:
+                    tile_id, behavior = tile_data[:2]
+                    collision = 0
+                    elevation = 0
+                else:
+                    tile_id = tile_data[0] if tile_data else 0
+                    behavior = None
+                    collision = 0
+                    elevation = 0
                 
-                for tile_data in row:
-                    if len(tile_data) >= 4:
-                        tile_id, behavior, collision, elevation = tile_data
-                    elif len(tile_data) >= 2:
-                        tile_id, behavior = tile_data[:2]
-                        collision = 0
-                        elevation = 0
-                    else:
-                        tile_id = tile_data[0] if tile_data else 0
-                        behavior = None
-                        collision = 0
-                        elevation = 0
-                    
-                    # Tile name
-                    tile_name = f"Tile_{tile_id:04X}"
-                    if behavior is not None and hasattr(behavior, 'name'):
-                        tile_name += f"({behavior.name})"
-                    row_names.append(tile_name)
-                    
-                    # Behavior name
-                    behavior_name = behavior.name if behavior is not None and hasattr(behavior, 'name') else "UNKNOWN"
-                    row_behaviors.append(behavior_name)
-                    
-                    # Detailed tile info
-                    tile_info = {
-                        "id": tile_id,
-                        "behavior": behavior_name,
-                        "collision": collision,
-                        "elevation": elevation,
-                        "passable": collision == 0,
-                        "encounter_possible": self._is_encounter_tile(behavior),
-                        "surfable": self._is_surfable_tile(behavior)
-                    }
-                    row_info.append(tile_info)
-                    
-                    # No traversability processing - handled by state_formatter
+                # Tile name
+                tile_name = f"Tile_{tile_id:04X}"
+                if behavior is not None and hasattr(behavior, 'name'):
+                    tile_name += f"({behavior.name})"
+                row_names.append(tile_name)
                 
-                tile_names.append(row_names)
-                metatile_behaviors.append(row_behaviors)
-                metatile_info.append(row_info)
-            
-            state["map"]["tile_names"] = tile_names
-            state["map"]["metatile_behaviors"] = metatile_behaviors
-            state["map"]["metatile_info"] = metatile_info
-            # traversability now generated by state_formatter from raw tiles
-            
+                # Behavior name
+                behavior_name = behavior.name if behavior is not None and hasattr(behavior, 'name') else "UNKNOWN"
+                row_behaviors.append(behavior_name)
+                
+                # Detailed tile info
+                tile_info = {
+                    "id": tile_id,
+                    "behavior": behavior_name,
+                    "collision": collision,
+                    "elevation": elevation,
+                    "passable": collision == 0,
+                    "encounter_possible": self._is_encounter_tile(behavior),
+                    "surfable": self._is_surfable_tile(behavior)
+                }
+                row_info.append(tile_info)
+                
+                # No traversability processing - handled by state_formatter
+            
+            tile_names.append(row_names)
+            metatile_behaviors.append(row_behaviors)
+            metatile_info.append(row_info)
+        
+        # traversability now generated by state_formatter from raw tiles
+        return {
+            "tiles": tiles,
+            "tile_names": tile_names,
+            "metatile_behaviors": metatile_behaviors,
+            "metatile_info": metatile_info,
+        }
+    
+    def read_map(self, state): 
+        # Tiles are only re-read and re-processed when the map buffer or position changed
+        map_fields = self._cached_section("map", self._map_section_signature, self._read_map_fields)
+        tiles = map_fields["tiles"] if map_fields else None
+        if map_fields:
+            state["map"].update(map_fields)
+        
         # Add object events (NPCs/trainers)
         object_events = self.read_object_events()
         if object_events:
@@ -2704,46 +2925,48 @@ class PokemonEmeraldReader:
                 else:
                     logger.debug(f"⏭️ Skipping map stitcher update - player hasn't moved from {player_coords}")
         
-        # Add stitched map information to state
-        stitched_info = self.get_stitched_map_info()
-        state["map"]["stitched_map_info"] = stitched_info
-        
-        # Generate map visualization directly for the LLM
-        # This ensures the map is available even when passed through JSON
-        if self._map_stitcher and state.get("player"):
-            location = state["player"].get("location", "Unknown")
-            coords = state["player"].get("position")
-            player_pos = (coords.get("x"), coords.get("y")) if coords else None
-            
-            # Always try to generate visual map if we have valid data, even if it was None before
-            # This handles cases where early calls failed but later calls have valid data
-            if location and location not in [None, "None", "Unknown"] and coords:
-                # Get connections with coordinates for this location
-                connections_with_coords = []
-                if location and self._map_stitcher:
-                    try:
-                        location_connections = self._map_stitcher.get_location_connections(location)
-                        for conn in location_connections:
-                            if len(conn) >= 3:
-                                other_loc, my_coords, their_coords = conn[0], conn[1], conn[2]
-                                connections_with_coords.append({
-                                    "to": other_loc,
-                                    "from_pos": list(my_coords) if my_coords else [],
-                                    "to_pos": list(their_coords) if their_coords else []
-                                })
-                    except Exception as e:
-                        logger.debug(f"Error getting location connections: {e}")
+        # The MapStitcherWorker thread merges into the stitcher under map_stitcher_lock
+        with self.map_stitcher_lock:
+            # Add stitched map information to state
+            stitched_info = self.get_stitched_map_info()
+            state["map"]["stitched_map_info"] = stitched_info
+        
+            # Generate map visualization directly for the LLM
+            # This ensures the map is available even when passed through JSON
+            if self._map_stitcher and state.get("player"):
+                location = state["player"].get("location", "Unknown")
+                coords = state["player"].get("position")
+                player_pos = (coords.get("x"), coords.get("y")) if coords else None
+            
+                # Always try to generate visual map if we have valid data, even if it was None before
+                # This handles cases where early calls failed but later calls have valid data
+                if location and location not in [None, "None", "Unknown"] and coords:
+                    # Get connections with coordinates for this location
+                    connections_with_coords = []
+                    if location and self._map_stitcher:
+                        try:
+                            location_connections = self._map_stitcher.get_location_connections(location)
+                            for conn in location_connections:
+                                if len(conn) >= 3:
+                                    other_loc, my_coords, their_coords = conn[0], conn[1], conn[2]
+                                    connections_with_coords.append({
+                                        "to": other_loc,
+                                        "from_pos": list(my_coords) if my_coords else [],
+                                        "to_pos": list(their_coords) if their_coords else []
+                                    })
+                        except Exception as e:
+                            logger.debug(f"Error getting location connections: {e}")
                 
-                # Generate the map display lines using stored map data, focused on 15x15 agent view
-                map_lines = self._map_stitcher.generate_location_map_display(
-                    location_name=location,
-                    player_pos=player_pos,
-                    npcs=state["map"].get("object_events", []),
-                    connections=connections_with_coords
-                )
+                    # Generate the map display lines using stored map data, focused on 15x15 agent view
+                    map_lines = self._map_stitcher.generate_location_map_display(
+                        location_name=location,
+                        player_pos=player_pos,
+                        npcs=state["map"].get("object_events", []),
+                        connections=connections_with_coords
+                    )
                 
-                # Store as formatted text for direct use
-                state["map"]["visual_map"] = "\n".join(map_lines) if map_lines else None
+                    # Store as formatted text for direct use
+                    state["map"]["visual_map"] = "\n".join(map_lines) if map_lines else None
         
         # Pass the MapStitcher instance for state_formatter to use
         # This ensures the same instance with all the data is used
@@ -2751,102 +2974,189 @@ class PokemonEmeraldReader:
             
         return state
     
-    def _update_map_stitcher(self, tiles, state):
-        """Update the map stitcher with current map data"""
+    def _ensure_map_stitcher(self):
+        """Attach the shared MapStitcher instance on first use"""
+        if self._map_stitcher is None:
+            from utils import map_stitcher_singleton
+            self._map_stitcher = map_stitcher_singleton.get_instance()
+            self._map_stitcher.lock = self.map_stitcher_lock
+            logger.info(f"Using shared MapStitcher instance with {len(self._map_stitcher.map_areas)} areas")
+            # Set up callback to save location connections when they change
+            self._setup_location_connections_callback()
+        return self._map_stitcher
+
+    def capture_map_snapshot(self, tiles, state=None):
+        """Read everything a map stitcher update needs from emulator memory
+        
+        Args:
+            tiles: Tile block from read_map_around_player()
+            state: Optional state dict; its player location is preferred as the area name
+        
+        Returns:
+            MapSnapshot, or None if the player coordinates can't be read
+        """
+        from utils.map_stitcher_worker import MapSnapshot
+        
+        # Get current map identifiers
+        map_bank = self._read_u8(self.addresses.MAP_BANK)
+        map_number = self._read_u8(self.addresses.MAP_NUMBER)
+        
+        # Get location name from player location, with fallback to map ID resolution
+        location_name = (state or {}).get("player", {}).get("location")
+        if not location_name or location_name == "Unknown":
+            # Try to resolve from map ID directly
+            try:
+                map_id = (map_bank << 8) | map_number
+                map_enum = MapLocation(map_id)
+                location_name = map_enum.name.replace('_', ' ').title()
+                logger.info(f"Resolved location name from map ID {map_id:04X}: {location_name}")
+            except ValueError:
+                location_name = f"Map_{map_bank:02X}_{map_number:02X}"
+                logger.debug(f"Unknown map ID, using fallback: {location_name}")
+        
+        if not location_name:
+            location_name = "Unknown"
+        
+        # Get player coordinates
+        player_coords = self.read_coordinates()
+        if not player_coords:
+            return None
+        
         try:
-            # Get the global shared MapStitcher instance
-            if self._map_stitcher is None:
-                from utils import map_stitcher_singleton
-                self._map_stitcher = map_stitcher_singleton.get_instance()
-                logger.info(f"Using shared MapStitcher instance with {len(self._map_stitcher.map_areas)} areas")
-                # Set up callback to save location connections when they change
-                self._setup_location_connections_callback()
-            
-            # Get current map identifiers
-            map_bank = self._read_u8(self.addresses.MAP_BANK)
-            map_number = self._read_u8(self.addresses.MAP_NUMBER)
-            
-            # Get location name from player location, with fallback to map ID resolution
-            location_name = state.get("player", {}).get("location")
-            if not location_name or location_name == "Unknown":
-                # Try to resolve from map ID directly
-                try:
-                    map_id = self._map_stitcher.get_map_id(map_bank, map_number)
-                    map_enum = MapLocation(map_id)
-                    location_name = map_enum.name.replace('_', ' ').title()
-                    logger.info(f"Resolved location name from map ID {map_id:04X}: {location_name}")
-                except ValueError:
-                    location_name = f"Map_{map_bank:02X}_{map_number:02X}"
-                    logger.debug(f"Unknown map ID, using fallback: {location_name}")
-            
-            if not location_name:
-                location_name = "Unknown"
-            
-            # Get player coordinates
-            player_coords = self.read_coordinates()
-            if not player_coords:
-                return
-            
-            # Use the ACTUAL player coordinates, not the local grid center
-            # The (5,5) logic was wrong - it should use real world coordinates
-            map_height = len(tiles) if tiles else 11
-            map_width = len(tiles[0]) if tiles and tiles[0] else 11
-            
-            # Use the real player coordinates from the game world
-            actual_player_coords = player_coords  # This is the real position, not (5,5)
-            
-            # Get overworld coordinates for this map
-            overworld_coords = self._get_overworld_coordinates(map_bank, map_number, location_name)
-            
-            # Debug logging
-            logger.info(f"🗺️ Map stitcher update: Bank {map_bank}, Map {map_number}, Location: {location_name}")
-            logger.info(f"🎯 Overworld coordinates: {overworld_coords}")
+            current_location = self.read_location()
+        except Exception:
+            current_location = None
+        
+        return MapSnapshot(
+            map_bank=map_bank,
+            map_number=map_number,
+            coords=player_coords,
+            tiles=tiles,
+            location_name=location_name,
+            current_location=current_location,
+        )
+    
+    def apply_map_snapshot(self, snapshot, finalize=True):
+        """Stitch a captured snapshot into the map stitcher
+        
+        Doesn't read emulator memory, so it is safe to call from the map stitcher worker.
+        Callers hold map_stitcher_lock.
+        
+        Args:
+            snapshot: MapSnapshot from capture_map_snapshot()
+            finalize: Rebuild location connections and do the periodic save afterwards
+                (the worker only finalizes the last snapshot of a burst)
+        """
+        self._ensure_map_stitcher()
+        map_bank = snapshot.map_bank
+        map_number = snapshot.map_number
+        location_name = snapshot.location_name
+        tiles = snapshot.tiles
+        
+        # Use the real player coordinates from the game world, not the local grid center
+        actual_player_coords = snapshot.coords
+        
+        # Get overworld coordinates for this map
+        overworld_coords = self._get_overworld_coordinates(map_bank, map_number, location_name)
+        
+        # Debug logging
+        logger.info(f"🗺️ Map stitcher update: Bank {map_bank}, Map {map_number}, Location: {location_name}")
+        logger.info(f"🎯 Overworld coordinates: {overworld_coords}")
+            
+        # Update the stitcher
+        timestamp = snapshot.timestamp
+        current_map_id = self._map_stitcher.get_map_id(map_bank, map_number)
+        
+        # Try to update location name for existing areas if we have a better name
+        if location_name and location_name.strip() and location_name != "Unknown":
+            if self._map_stitcher.update_location_name(current_map_id, location_name):
+                # Location name was updated, save the changes and resync connections
+                self._map_stitcher.save_to_file()
+                # Skip sync - preserve existing location_connections data
+                # self._sync_warp_connections_to_state_formatter(force_rebuild=True)  # DISABLED - causes overwrites
                 
-            # Update the stitcher
-            timestamp = time.time()
-            current_map_id = self._map_stitcher.get_map_id(map_bank, map_number)
-            
-            # Try to update location name for existing areas if we have a better name
-            if location_name and location_name.strip() and location_name != "Unknown":
-                if self._map_stitcher.update_location_name(current_map_id, location_name):
-                    # Location name was updated, save the changes and resync connections
-                    self._map_stitcher.save_to_file()
-                    # Skip sync - preserve existing location_connections data
-                    # self._sync_warp_connections_to_state_formatter(force_rebuild=True)  # DISABLED - causes overwrites
-                    
-                # Also try to resolve other unknown names using current memory reader state
-                if self._map_stitcher.resolve_unknown_location_names(memory_reader=self):
-                    logger.info("Resolved additional unknown location names using memory reader")
-                    self._map_stitcher.save_to_file()
-            
-            self._map_stitcher.update_map_area(
-                map_bank=map_bank,
-                map_number=map_number,
-                location_name=location_name,
-                map_data=tiles,
-                player_pos=actual_player_coords,
-                timestamp=timestamp,
-                overworld_coords=overworld_coords
-            )
-            
-            # Build location_connections directly from map areas after any updates
-            self._build_location_connections_from_map_areas()
-            
-            # Save more frequently to preserve accumulated map data
-            if hasattr(self, '_last_stitcher_save'):
-                if timestamp - self._last_stitcher_save > 3.0:  # Save every 3 seconds
-                    self._map_stitcher.save_to_file()
-                    self._last_stitcher_save = timestamp
-            else:
-                self._last_stitcher_save = timestamp
-                # Also save immediately on first update
+            # Also try to resolve other unknown names using the location read with the snapshot
+            if self._map_stitcher.resolve_unknown_location_names(current=(current_map_id, snapshot.current_location)):
+                logger.info("Resolved additional unknown location names using memory reader")
                 self._map_stitcher.save_to_file()
+        
+        self._map_stitcher.update_map_area(
+            map_bank=map_bank,
+            map_number=map_number,
+            location_name=location_name,
+            map_data=tiles,
+            player_pos=actual_player_coords,
+            timestamp=timestamp,
+            overworld_coords=overworld_coords
+        )
+        
+        if not finalize:
+            return
+        
+        # Build location_connections directly from map areas after any updates
+        self._build_location_connections_from_map_areas()
+        
+        # Save more frequently to preserve accumulated map data
+        if hasattr(self, '_last_stitcher_save'):
+            if timestamp - self._last_stitcher_save > 3.0:  # Save every 3 seconds
+                self._map_stitcher.save_to_file()
+                self._last_stitcher_save = timestamp
+        else:
+            self._last_stitcher_save = timestamp
+            # Also save immediately on first update
+            self._map_stitcher.save_to_file()
+    
+    @property
+    def map_stitcher_worker(self):
+        """Background MapStitcherWorker for this reader (started on first use)"""
+        if self._map_stitcher_worker is None:
+            from utils.map_stitcher_worker import MapStitcherWorker
+            self._map_stitcher_worker = MapStitcherWorker(self)
+        if not self._map_stitcher_worker.running:
+            self._map_stitcher_worker.start()
+        return self._map_stitcher_worker
+    
+    def queue_map_stitcher_update(self, tiles, state=None) -> bool:
+        """Snapshot the map around the player and stitch it on the worker thread
+        
+        Returns:
+            True if a snapshot was queued
+        """
+        try:
+            snapshot = self.capture_map_snapshot(tiles, state)
+        except Exception as e:
+            logger.debug(f"Failed to capture map snapshot: {e}")
+            return False
+        if snapshot is None:
+            return False
+        self.map_stitcher_worker.submit(snapshot)
+        return True
+    
+    def flush_map_stitcher(self, timeout: float = 5.0) -> bool:
+        """Wait for queued map stitcher updates to be applied (e.g. before saving)"""
+        if self._map_stitcher_worker is None:
+            return True
+        return self._map_stitcher_worker.flush(timeout)
+    
+    def stop_map_stitcher_worker(self):
+        """Apply what is still queued, then stop the map stitcher worker"""
+        if self._map_stitcher_worker is not None:
+            self._map_stitcher_worker.flush(timeout=1.0)
+            self._map_stitcher_worker.stop()
+            self._map_stitcher_worker = None
+    
+    def _update_map_stitcher(self, tiles, state):
+        """Update the map stitcher with current map data (synchronously, on the calling thread)"""
+        try:
+            snapshot = self.capture_map_snapshot(tiles, state)
+            if snapshot is None:
+                return
+            with self.map_stitcher_lock:
+                self.apply_map_snapshot(snapshot)
                 
         except Exception as e:
             # print( Failed to update map stitcher: {e}")
             logger.debug(f"Failed to update map stitcher: {e}")
-            import traceback
-            # print( Traceback: {traceback.format_exc()}")
     
     def _get_overworld_coordinates(self, map_bank: int, map_number: int, location_name: Optional[str]) -> Optional[Tuple[int, int]]:
         """Get overworld coordinates for a given map bank/number combination"""
@@ -3012,7 +3322,7 @@ class PokemonEmeraldReader:
                         "id": f"{area_id:04X}",
                         "name": area.location_name or "Unknown",
                         "overworld_coords": area.overworld_coords,
-                        "map_data": area.map_data,
+                        "map_data": area.map_data.to_rows(),
                         "player_pos": area.player_last_position
                     })
             
@@ -3076,6 +3386,7 @@ class PokemonEmeraldReader:
             from utils.map_stitcher import MapStitcher
             # print( Initializing MapStitcher with cache file: {map_stitcher_filename}")
             self._map_stitcher = MapStitcher(save_file=map_stitcher_filename)
+            self._map_stitcher.lock = self.map_stitcher_lock
             # print( MapStitcher initialized, syncing connections...")
             # Skip sync - let loaded location_connections be preserved
             # self._sync_warp_connections_to_state_formatter(force_rebuild=True)  # DISABLED - causes overwrites
@@ -3309,30 +3620,39 @@ class PokemonEmeraldReader:
         
         return diagnostics
 
+    def _dialog_text_buffers(self) -> List[Tuple[int, int]]:
+        """(address, size) of every text buffer read_dialog() scans"""
+        # Text buffer addresses from Pokemon Emerald decompilation symbols
+        # https://raw.githubusercontent.com/pret/pokeemerald/symbols/pokeemerald.sym
+        # Order by size (largest first) to prioritize longer dialog text
+        return [
+            (self.addresses.G_STRING_VAR4, 1000),  # Main string variable 4 (largest) - PRIORITY
+            (self.addresses.G_DISPLAYED_STRING_BATTLE, 300),  # Battle dialog text
+            (self.addresses.G_STRING_VAR1, 256),   # Main string variable 1
+            (self.addresses.G_STRING_VAR2, 256),   # Main string variable 2
+            (self.addresses.G_STRING_VAR3, 256),   # Main string variable 3
+            (self.addresses.G_BATTLE_TEXT_BUFF1, 16),  # Battle text buffer 1
+            (self.addresses.G_BATTLE_TEXT_BUFF2, 16),  # Battle text buffer 2
+            (self.addresses.G_BATTLE_TEXT_BUFF3, 16),  # Battle text buffer 3
+            # Legacy addresses (keeping for compatibility)
+            (self.addresses.TEXT_BUFFER_1, 200),
+            (self.addresses.TEXT_BUFFER_2, 200),
+            (self.addresses.TEXT_BUFFER_3, 200),
+            (self.addresses.TEXT_BUFFER_4, 200),
+        ]
+    
+    def _dialog_signature(self) -> bytes:
+        return self._section_signature(*(
+            self._read_bytes(buffer_addr, buffer_size)
+            for buffer_addr, buffer_size in self._dialog_text_buffers()
+        ))
+    
     def read_dialog(self) -> str:
         """Read any dialog text currently on screen by scanning text buffers"""
         try:
             # Always try to read dialog text, regardless of game state
             # The game state detection might not be reliable for dialog
-            
-            # Text buffer addresses from Pokemon Emerald decompilation symbols
-            # https://raw.githubusercontent.com/pret/pokeemerald/symbols/pokeemerald.sym
-            # Order by size (largest first) to prioritize longer dialog text
-            text_buffers = [
-                (self.addresses.G_STRING_VAR4, 1000),  # Main string variable 4 (largest) - PRIORITY
-                (self.addresses.G_DISPLAYED_STRING_BATTLE, 300),  # Battle dialog text
-                (self.addresses.G_STRING_VAR1, 256),   # Main string variable 1
-                (self.addresses.G_STRING_VAR2, 256),   # Main string variable 2
-                (self.addresses.G_STRING_VAR3, 256),   # Main string variable 3
-                (self.addresses.G_BATTLE_TEXT_BUFF1, 16),  # Battle text buffer 1
-                (self.addresses.G_BATTLE_TEXT_BUFF2, 16),  # Battle text buffer 2
-                (self.addresses.G_BATTLE_TEXT_BUFF3, 16),  # Battle text buffer 3
-                # Legacy addresses (keeping for compatibility)
-                (self.addresses.TEXT_BUFFER_1, 200),
-                (self.addresses.TEXT_BUFFER_2, 200),
-                (self.addresses.TEXT_BUFFER_3, 200),
-                (self.addresses.TEXT_BUFFER_4, 200),
-            ]
+            text_buffers = self._dialog_text_buffers()
             
             dialog_text = ""
             
@@ -3425,7 +3745,8 @@ class PokemonEmeraldReader:
             Dialog text using smart preference logic
         """
         # First try memory-based detection with enhanced filtering
-        raw_memory_text = self.read_dialog()
+        # (the text buffer decode is only redone when the buffers change)
+        raw_memory_text = self._cached_section("dialog_text", self._dialog_signature, self.read_dialog)
         
         # Apply residual text filtering like the enhanced dialogue detection does
         memory_text = ""
@@ -3975,13 +4296,14 @@ class PokemonEmeraldReader:
             max_sprites = 128
             sprite_size = 64
             
+            sprite_table = self._read_bytes(gsprites_addr, max_sprites * sprite_size)
+            
             for sprite_idx in range(max_sprites):
                 sprite_addr = gsprites_addr + (sprite_idx * sprite_size)
                 
                 try:
                     # Read sprite screen coordinates
-                    screen_x = self._read_s16(sprite_addr + 0)
-                    screen_y = self._read_s16(sprite_addr + 2)
+                    screen_x, screen_y = struct.unpack_from('<hh', sprite_table, sprite_idx * sprite_size)
                     
                     # Validate screen coordinates
                     if screen_x < 50 or screen_x > 200 or screen_y < 50 or screen_y > 150:
@@ -4048,12 +4370,16 @@ class PokemonEmeraldReader:
             gobject_events_addr = 0x02037230
             max_npcs = 16
             
+            # One bulk read of the whole gObjectEvents table
+            event_table = self._read_bytes(gobject_events_addr, max_npcs * 68)
+            
             for i in range(max_npcs):
                 try:
                     event_addr = gobject_events_addr + (i * 68)
+                    event = event_table[i * 68:(i + 1) * 68]
                     
                     # Read active flag first - but be more lenient with what we consider active
-                    active = self._read_u8(event_addr + 0x00)
+                    active = event[0x00]
                     
                     # In save states, active flag might be different values
                     # Be very permissive with active flags to catch all possible NPCs
@@ -4061,8 +4387,8 @@ class PokemonEmeraldReader:
                         continue
                     
                     # Read current runtime position (currentCoords at offset 0x10)
-                    current_x = self._read_s16(event_addr + 0x10)
-                    current_y = self._read_s16(event_addr + 0x12)
+                    current_x = struct.unpack_from('<h', event, 0x10)[0]
+                    current_y = struct.unpack_from('<h', event, 0x12)[0]
                     
                     # Skip if coordinates are obviously invalid
                     if current_x < -50 or current_x > 200 or current_y < -50 or current_y > 200:
@@ -4082,9 +4408,9 @@ class PokemonEmeraldReader:
                         continue
                     
                     # Read additional NPC properties
-                    graphics_id = self._read_u8(event_addr + 0x03)
-                    movement_type = self._read_u8(event_addr + 0x04)
-                    trainer_type = self._read_u8(event_addr + 0x05)
+                    graphics_id = event[0x03]
+                    movement_type = event[0x04]
+                    trainer_type = event[0x05]
                     
                     # Skip if all properties are clearly invalid
                     if graphics_id == 255 and movement_type == 255:
@@ -4092,14 +4418,14 @@ class PokemonEmeraldReader:
                     
                     object_event = {
                         'id': i,
-                        'obj_event_id': self._read_u8(event_addr + 0x01),
-                        'local_id': self._read_u8(event_addr + 0x02),
+                        'obj_event_id': event[0x01],
+                        'local_id': event[0x02],
                         'graphics_id': graphics_id,
                         'movement_type': movement_type,
                         'current_x': current_x,
                         'current_y': current_y,
-                        'initial_x': self._read_s16(event_addr + 0x10),
-                        'initial_y': self._read_s16(event_addr + 0x12),
+                        'initial_x': struct.unpack_from('<h', event, 0x10)[0],
+                        'initial_y': struct.unpack_from('<h', event, 0x12)[0],
                         'elevation': 0,
                         'trainer_type': trainer_type,
                         'active': 1,
@@ -4269,21 +4595,25 @@ class PokemonEmeraldReader:
             max_object_events = 16
             object_event_size = 68  # Size of ObjectEvent struct
             
+            # One bulk read of the whole gObjectEvents table
+            event_table = self._read_bytes(gobject_events_addr, max_object_events * object_event_size)
+            
             for i in range(max_object_events):
                 try:
                     event_addr = gobject_events_addr + (i * object_event_size)
+                    event = event_table[i * object_event_size:(i + 1) * object_event_size]
                     
                     # Read ObjectEvent structure according to pokeemerald decompilation
                     # Check if object is active
-                    active_flags = self._read_u32(event_addr + 0x00)
+                    active_flags = struct.unpack_from('<I', event, 0x00)[0]
                     active = active_flags & 0x1
                     
                     if not active:
                         continue
                     
                     # Read currentCoords (the walking position) - offset 0x10 based on structure
-                    current_x = self._read_s16(event_addr + 0x10)  # currentCoords.x
-                    current_y = self._read_s16(event_addr + 0x12)  # currentCoords.y
+                    current_x = struct.unpack_from('<h', event, 0x10)[0]  # currentCoords.x
+                    current_y = struct.unpack_from('<h', event, 0x12)[0]  # currentCoords.y
                     
                     # Validate coordinates are reasonable
                     if current_x < -50 or current_x > 200 or current_y < -50 or current_y > 200:
@@ -4297,19 +4627,19 @@ class PokemonEmeraldReader:
                         continue
                     
                     # Read additional ObjectEvent properties
-                    local_id = self._read_u8(event_addr + 0x02)
-                    graphics_id = self._read_u8(event_addr + 0x03)
-                    movement_type = self._read_u8(event_addr + 0x04)
-                    trainer_type = self._read_u8(event_addr + 0x05)
+                    local_id = event[0x02]
+                    graphics_id = event[0x03]
+                    movement_type = event[0x04]
+                    trainer_type = event[0x05]
                     
                     # Read initial coordinates for comparison
-                    initial_x = self._read_s16(event_addr + 0x14)  # initialCoords.x  
-                    initial_y = self._read_s16(event_addr + 0x16)  # initialCoords.y
+                    initial_x = struct.unpack_from('<h', event, 0x14)[0]  # initialCoords.x  
+                    initial_y = struct.unpack_from('<h', event, 0x16)[0]  # initialCoords.y
                     
                     # Create NPC object with walking position
                     object_event = {
                         'id': i,
-                        'obj_event_id': self._read_u8(event_addr + 0x01),
+                        'obj_event_id': event[0x01],
                         'local_id': local_id,
                         'graphics_id': graphics_id,
                         'movement_type': movement_type,
@@ -4354,14 +4684,15 @@ class PokemonEmeraldReader:
         MAX_SPRITES = 128
         
         try:
+            # OAM entries are 4 x u16 (attr0, attr1, attr2, affine); read them all at once
+            oam_attrs = self._read_array(OAM_BASE, MAX_SPRITES * 4, '<u2').reshape(MAX_SPRITES, 4).tolist()
+            
             for i in range(MAX_SPRITES):
                 oam_addr = OAM_BASE + (i * 8)
                 
                 try:
                     # Read OAM attributes
-                    attr0 = self._read_u16(oam_addr)
-                    attr1 = self._read_u16(oam_addr + 2)
-                    attr2 = self._read_u16(oam_addr + 4)
+                    attr0, attr1, attr2, _ = oam_attrs[i]
                     
                     # Skip empty sprites
                     if attr0 == 0 and attr1 == 0 and attr2 == 0:
@@ -4463,13 +4794,14 @@ class PokemonEmeraldReader:
         MAX_SPRITES = 128
         
         try:
+            # OAM entries are 4 x u16 (attr0, attr1, attr2, affine); read them all at once
+            oam_attrs = self._read_array(OAM_BASE, MAX_SPRITES * 4, '<u2').reshape(MAX_SPRITES, 4).tolist()
+            
             for i in range(MAX_SPRITES):
                 oam_addr = OAM_BASE + (i * 8)
                 
                 try:
-                    attr0 = self._read_u16(oam_addr)
-                    attr1 = self._read_u16(oam_addr + 2)
-                    attr2 = self._read_u16(oam_addr + 4)
+                    attr0, attr1, attr2, _ = oam_attrs[i]
                     
                     # Skip empty/hidden sprites
                     if attr0 == 0 and attr1 == 0 and attr2 == 0:
@@ -4656,21 +4988,25 @@ class PokemonEmeraldReader:
             max_object_events = 16
             object_event_size = 68  # Size of ObjectEvent struct
             
+            # One bulk read of the whole gObjectEvents table
+            event_table = self._read_bytes(gobject_events_addr, max_object_events * object_event_size)
+            
             for i in range(max_object_events):
                 try:
                     event_addr = gobject_events_addr + (i * object_event_size)
+                    event = event_table[i * object_event_size:(i + 1) * object_event_size]
                     
                     # Read ObjectEvent structure according to pokeemerald
                     # u32 active:1 bitfield at offset 0x00
-                    active_flags = self._read_u32(event_addr + 0x00)
+                    active_flags = struct.unpack_from('<I', event, 0x00)[0]
                     active = active_flags & 0x1
                     
                     if not active:
                         continue
                     
                     # Read coordinates from currentCoords at offset 0x10
-                    current_x = self._read_s16(event_addr + 0x10)
-                    current_y = self._read_s16(event_addr + 0x12)
+                    current_x = struct.unpack_from('<h', event, 0x10)[0]
+                    current_y = struct.unpack_from('<h', event, 0x12)[0]
                     
                     # Validate coordinates
                     if current_x < -50 or current_x > 200 or current_y < -50 or current_y > 200:
@@ -4686,14 +5022,14 @@ class PokemonEmeraldReader:
                         continue
                     
                     # Read NPC properties
-                    graphics_id = self._read_u8(event_addr + 0x03)
-                    movement_type = self._read_u8(event_addr + 0x04)
-                    trainer_type = self._read_u8(event_addr + 0x05)
-                    local_id = self._read_u8(event_addr + 0x02)
+                    graphics_id = event[0x03]
+                    movement_type = event[0x04]
+                    trainer_type = event[0x05]
+                    local_id = event[0x02]
                     
                     object_event = {
                         'id': i,
-                        'obj_event_id': self._read_u8(event_addr + 0x01),
+                        'obj_event_id': event[0x01],
                         'local_id': local_id,
                         'graphics_id': graphics_id,
                         'movement_type': movement_type,
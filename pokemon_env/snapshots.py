@@ -0,0 +1,122 @@
+"""
+In-memory savestate snapshots for fast fork/rollback.
+
+Snapshots are raw mGBA savestates held in pooled ffi buffers, so capturing and
+restoring is a single memcpy inside the core with no file I/O and none of the
+milestone / map stitcher persistence that EmeraldEmulator.save_state() and
+load_state() do. Named snapshots are kept in a small LRU; released and evicted
+buffers go back to the pool for reuse.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from mgba._pylib import ffi
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StateSnapshot:
+    """A captured emulator state (valid until released)"""
+    buffer: Any
+    name: Optional[str] = None
+    frame: Optional[int] = None
+    created: float = field(default_factory=time.time)
+
+    @property
+    def released(self) -> bool:
+        return self.buffer is None
+
+    def to_bytes(self) -> bytes:
+        """Copy out the raw state, e.g. for EmeraldEmulator.load_state(state_bytes=...)"""
+        if self.buffer is None:
+            raise ValueError("Snapshot has been released")
+        return bytes(ffi.buffer(self.buffer))
+
+
+class SnapshotPool:
+    """Pooled savestate buffers plus an LRU of named snapshots for one mGBA core"""
+
+    def __init__(self, core, max_named: int = 32, max_free: int = 8):
+        """
+        Args:
+            core: mgba.core.Core the snapshots belong to
+            max_named: Named snapshots kept before the least recently used is evicted
+            max_free: Released buffers kept for reuse
+        """
+        self.core = core
+        self.max_named = max_named
+        self.max_free = max_free
+        self._native = core._core
+        self.state_size = self._native.stateSize(self._native)
+        self._free: List[Any] = []
+        self._named: "OrderedDict[str, StateSnapshot]" = OrderedDict()
+
+    def _acquire_buffer(self):
+        if self._free:
+            return self._free.pop()
+        return ffi.new(f"unsigned char[{self.state_size}]")
+
+    def capture(self, name: Optional[str] = None) -> StateSnapshot:
+        """
+        Capture the current core state.
+
+        Args:
+            name: Keep the snapshot in the named LRU (replacing any previous one)
+
+        Returns:
+            StateSnapshot
+        """
+        buffer = self._acquire_buffer()
+        if not self._native.saveState(self._native, buffer):
+            self._free.append(buffer)
+            raise RuntimeError("mGBA failed to save state")
+
+        snapshot = StateSnapshot(buffer=buffer, name=name, frame=getattr(self.core, "frame_counter", None))
+        if name is not None:
+            previous = self._named.pop(name, None)
+            if previous is not None:
+                self.release(previous)
+            self._named[name] = snapshot
+            while len(self._named) > self.max_named:
+                _, evicted = self._named.popitem(last=False)
+                logger.debug(f"Evicting snapshot '{evicted.name}'")
+                self.release(evicted)
+        return snapshot
+
+    def get(self, name: str) -> Optional[StateSnapshot]:
+        """Look up a named snapshot (marks it most recently used)"""
+        snapshot = self._named.get(name)
+        if snapshot is not None:
+            self._named.move_to_end(name)
+        return snapshot
+
+    def restore(self, snapshot: StateSnapshot):
+        """Load a snapshot back into the core"""
+        if snapshot.released:
+            raise ValueError(f"Snapshot {snapshot.name or ''} has been released")
+        if not self._native.loadState(self._native, snapshot.buffer):
+            raise RuntimeError("mGBA failed to load state")
+
+    def release(self, snapshot: StateSnapshot):
+        """Return a snapshot's buffer to the pool; the snapshot can't be restored afterwards"""
+        if snapshot.released:
+            return
+        if snapshot.name is not None and self._named.get(snapshot.name) is snapshot:
+            del self._named[snapshot.name]
+        if len(self._free) < self.max_free:
+            self._free.append(snapshot.buffer)
+        snapshot.buffer = None
+
+    def names(self) -> List[str]:
+        """Named snapshots, least recently used first"""
+        return list(self._named)
+
+    def clear(self):
+        """Release every named snapshot"""
+        for snapshot in list(self._named.values()):
+            self.release(snapshot)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Button queue for POST /action (server/app.py), with checked movement batches.
+
+A client that has planned a path can send the whole segment as one request,
+together with the tile each button should leave the player on. Before the game
+loop presses the next button of such a batch it reads the player position; if
+the previous step didn't land where planned (NPC in the way, wild encounter,
+dialogue, unexpected warp) the rest of that batch is dropped so the client can
+re-plan from where the player actually is. Buttons queued without expected
+positions behave exactly as before.
+"""
+
+import itertools
+import logging
+import threading
+from collections import deque
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Coords = Tuple[int, int]
+
+
+class ActionQueue:
+    """FIFO of button names; movement batches carry one expected position per button.
+
+    Filled from the API thread and drained by the game loop, so the parallel
+    button/check deques are only touched under a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buttons = deque()
+        self._checks = deque()  # (batch_id, expected (x, y)) or None, parallel to _buttons
+        self._batch_ids = itertools.count(1)
+        self._pending: Optional[Tuple[int, Coords]] = None  # Last popped batch step, not yet confirmed
+        self.batches_aborted = 0
+
+    def __len__(self) -> int:
+        return len(self._buttons)
+
+    def __bool__(self) -> bool:
+        return bool(self._buttons)
+
+    def __iter__(self):
+        return iter(list(self._buttons))
+
+    def __repr__(self) -> str:
+        return repr(list(self._buttons))
+
+    def extend(self, buttons: Iterable[str], expected_positions: Optional[Sequence[Sequence[int]]] = None) -> bool:
+        """
+        Queue buttons.
+
+        Args:
+            buttons: Button names
+            expected_positions: Optional (x, y) the player should be on after each button;
+                ignored unless there is exactly one per button
+
+        Returns:
+            True if the buttons were queued as a checked movement batch
+        """
+        buttons = list(buttons)
+        checked = expected_positions is not None and len(expected_positions) == len(buttons) and len(buttons) > 1
+        if expected_positions is not None and not checked:
+            logger.debug(f"Ignoring {len(expected_positions)} expected positions for {len(buttons)} buttons")
+        checks = [None] * len(buttons)
+        with self._lock:
+            if checked:
+                batch_id = next(self._batch_ids)
+                checks = [(batch_id, (int(x), int(y))) for x, y in expected_positions]
+            self._buttons.extend(buttons)
+            self._checks.extend(checks)
+        return checked
+
+    def clear(self):
+        with self._lock:
+            self._buttons.clear()
+            self._checks.clear()
+            self._pending = None
+
+    def pop(self, read_position: Optional[Callable[[], Coords]] = None) -> Optional[str]:
+        """
+        Next button to press, or None if the queue is (or became) empty.
+
+        If the previous button belonged to the same movement batch as the next one,
+        read_position() is compared with where that step should have landed first; on
+        a mismatch the rest of the batch is dropped.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is not None and self._checks and self._checks[0] is not None \
+                    and self._checks[0][0] == pending[0] and read_position is not None:
+                batch_id, expected = pending
+                actual = tuple(read_position())
+                if actual != expected:
+                    dropped = self._drop_batch(batch_id)
+                    self.batches_aborted += 1
+                    logger.info(f"Movement batch {batch_id} deviated: at {actual}, expected {expected}; "
+                                f"dropped {dropped} remaining steps")
+                    print(f"🛑 [BATCH] Step landed on {actual} instead of {expected} - dropped {dropped} queued steps")
+            if not self._buttons:
+                return None
+            self._pending = self._checks.popleft()
+            return self._buttons.popleft()
+
+    def _drop_batch(self, batch_id: int) -> int:
+        dropped = 0
+        while self._checks and self._checks[0] is not None and self._checks[0][0] == batch_id:
+            self._checks.popleft()
+            self._buttons.popleft()
+            dropped += 1
+        return dropped
+
+    def expected_positions(self) -> List[Optional[Coords]]:
+        """Expected position of each queued button (None where unchecked), for status endpoints"""
+        with self._lock:
+            return [check[1] if check is not None else None for check in self._checks]
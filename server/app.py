@@ -15,14 +15,16 @@ import signal
 import sys
 import threading
 import time
+from typing import Optional
 
 # Third-party imports
 import cv2
 import numpy as np
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from PIL import Image
 from pydantic import BaseModel
 
@@ -31,6 +33,13 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Local application imports
 from pokemon_env.emulator import EmeraldEmulator
+from server.frame_codec import (
+    DEFAULT_FRAME_ENCODING, FRAME_MEDIA_TYPES, FrameEncodeCache, encode_frame, frame_headers, negotiate_encoding,
+    resolve_encoding
+)
+from server.action_queue import ActionQueue
+from server.frame_ring import FrameRing
+from server.state_delta import StateBroadcast
 from utils.anticheat import AntiCheatTracker
 
 # Set up logging - reduced verbosity for multiprocess mode
@@ -46,12 +55,14 @@ running = True
 step_count = 0
 agent_step_count = 0  # Track agent steps separately from frame steps
 current_obs = None
+current_obs_counter = 0  # Bumped whenever current_obs is replaced; keys frame_encode_cache
 fps = 80
 
 # Performance monitoring
 last_fps_log = time.time()
 frame_count_since_log = 0
-action_queue = []  # Queue for multi-action sequences
+action_queue = ActionQueue()  # Queue for multi-action sequences (checked movement batches, see server/action_queue.py)
+action_seq = 0  # Bumped by every /action that queues buttons; echoed in /state so clients can spot stale state
 current_action = None  # Current action being held
 action_frames_remaining = 0  # Frames left to hold current action
 release_frames_remaining = 0  # Frames left to wait after release
@@ -60,6 +71,12 @@ release_frames_remaining = 0  # Frames left to wait after release
 ACTION_HOLD_FRAMES = 12   # Hold each action for 12 frames 
 ACTION_RELEASE_DELAY = 24   # Delay between actions for processing
 
+# Turbo mode: run hold/release frames uncapped while actions are pending.
+# Frame counts are unchanged, only wall-clock pacing and intermediate screenshots are skipped.
+turbo_mode = False
+TURBO_CAPTURE_INTERVAL = 1.0 / 30  # Still publish a frame for viewers this often in turbo
+last_capture_time = 0.0
+
 # Video recording state
 video_writer = None
 video_recording = False
@@ -67,19 +84,26 @@ video_filename = ""
 video_frame_counter = 0
 video_frame_skip = 4  # Record every 4th frame (120/4 = 30 FPS)
 
-# Frame cache for separate frame server
-# Use cache directory instead of /tmp
+# Shared-memory frame ring for the separate frame server (see server/frame_ring.py)
 CACHE_DIR = ".pokeagent_cache"
 os.makedirs(CACHE_DIR, exist_ok=True)
-FRAME_CACHE_FILE = os.path.join(CACHE_DIR, "frame_cache.json")
-frame_cache_counter = 0
+frame_ring = None
+
+# Polling interval for the /state_stream push channel (seconds); requests are rounded to
+# the nearest of STATE_STREAM_INTERVALS so clients can't create unbounded builders
+STATE_STREAM_INTERVAL = 0.1
+STATE_STREAM_INTERVALS = (0.05, 0.1, 0.25, 0.5, 1.0)
+state_streams = {}  # (screenshot, screenshot_format, interval) -> StateBroadcast, while it has subscribers
+state_build_lock = threading.Lock()  # Serializes state builds from worker threads
+
+# Encoded frames shared by /screenshot, /api/frame and /state (see server/frame_codec.py)
+frame_encode_cache = FrameEncodeCache()
 
 # Server runs headless - display handled by client
 
 # Threading locks for thread safety
 obs_lock = threading.Lock()
 step_lock = threading.Lock()
-memory_lock = threading.Lock()  # New lock for memory operations to prevent race conditions
 
 # Background milestone processing
 state_update_thread = None
@@ -121,56 +145,73 @@ def init_video_recording(record_enabled=False):
         video_writer = None
 
 def update_frame_cache(screenshot):
-    """Update the frame cache file for the separate frame server"""
-    global frame_cache_counter, FRAME_CACHE_FILE
+    """Publish the raw frame to the shared-memory ring read by the frame server"""
+    global frame_ring
     
     if screenshot is None:
         return
         
     try:
-        # Convert screenshot to base64
-        if hasattr(screenshot, 'save'):  # PIL image
-            buffer = io.BytesIO()
-            screenshot.save(buffer, format='PNG')
-            img_str = base64.b64encode(buffer.getvalue()).decode()
-        elif isinstance(screenshot, np.ndarray):  # Numpy array
-            pil_image = Image.fromarray(screenshot)
-            buffer = io.BytesIO()
-            pil_image.save(buffer, format='PNG')
-            img_str = base64.b64encode(buffer.getvalue()).decode()
-        else:
-            return
-            
-        frame_cache_counter += 1
-        
-        # Write to cache file atomically
-        cache_data = {
-            "frame_data": img_str,
-            "frame_counter": frame_cache_counter,
-            "timestamp": time.time()
-        }
-        
-        # Write to temporary file first, then move (atomic operation)
-        temp_file = FRAME_CACHE_FILE + ".tmp"
-        with open(temp_file, 'w') as f:
-            json.dump(cache_data, f)
-        os.rename(temp_file, FRAME_CACHE_FILE)
-        
+        if frame_ring is None:
+            frame_ring = FrameRing.create()
+        frame_ring.write(screenshot)
     except Exception as e:
-        pass  # Silently handle cache write errors
+        logger.debug(f"Frame ring write error: {e}")
 
-def record_frame(screenshot):
-    """Record frame to video if recording is enabled with frame skipping"""
-    global video_writer, video_recording, video_frame_counter, video_frame_skip
+def set_current_obs(obs):
+    """Replace the latest observation and advance the frame counter"""
+    global current_obs, current_obs_counter
     
-    if not video_recording or video_writer is None or screenshot is None:
-        return
+    with obs_lock:
+        current_obs = obs
+        current_obs_counter += 1
+
+def get_current_obs():
+    """Copy of the latest observation and its frame counter"""
+    with obs_lock:
+        obs_copy = current_obs.copy() if current_obs is not None else None
+        return obs_copy, current_obs_counter
+
+def binary_frame_response(obs, counter, encoding):
+    """Binary frame response for clients that negotiated a frame encoding"""
+    encoding = resolve_encoding(encoding, obs)
+    return Response(
+        content=frame_encode_cache.get(counter, obs, encoding),
+        media_type=FRAME_MEDIA_TYPES[encoding],
+        headers=frame_headers(obs, counter)
+    )
+
+def negotiate_frame_encoding(request: Request, format: Optional[str]) -> Optional[str]:
+    try:
+        return negotiate_encoding(format, request.headers.get("accept"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def cleanup_frame_ring():
+    """Release the shared-memory frame ring"""
+    global frame_ring
+    
+    if frame_ring is not None:
+        frame_ring.close()
+        frame_ring = None
+
+def video_frame_due(frames=1):
+    """Advance the video frame counter by the frames just emulated; True if one should be recorded"""
+    global video_frame_counter
     
-    # Increment frame counter
-    video_frame_counter += 1
+    if not video_recording or video_writer is None:
+        return False
     
-    # Only record every Nth frame based on frame skip
-    if video_frame_counter % video_frame_skip != 0:
+    # Record every Nth frame based on frame skip; a turbo batch may cross several at once
+    previous = video_frame_counter
+    video_frame_counter += frames
+    return video_frame_counter // video_frame_skip != previous // video_frame_skip
+
+def record_frame(screenshot):
+    """Record frame to video if recording is enabled"""
+    global video_writer, video_recording
+    
+    if not video_recording or video_writer is None or screenshot is None:
         return
         
     try:
@@ -229,6 +270,7 @@ app.add_middleware(
 # Models for API requests and responses
 class ActionRequest(BaseModel):
     buttons: list = []  # List of button names: A, B, SELECT, START, UP, DOWN, LEFT, RIGHT
+    expected_positions: Optional[list] = None  # [x, y] after each button; a deviation drops the rest of the batch
     source: str = "local_agent"  # Source of action: "local_agent" for local AI, "manual" for keyboard
 
 class GameStateResponse(BaseModel):
@@ -248,6 +290,7 @@ class ComprehensiveStateResponse(BaseModel):
     status: str
     action_queue_length: int = 0
     recent_actions: list = []  # Add recent actions list
+    action_seq: int = 0  # Last /action included in this state (read before the memory reads)
 
 def periodic_milestone_updater():
     """Lightweight background thread that only updates milestones occasionally"""
@@ -300,6 +343,7 @@ def signal_handler(signum, frame):
     running = False
     state_update_running = False
     cleanup_video_recording()
+    cleanup_frame_ring()
     if env:
         env.stop()
     sys.exit(0)
@@ -353,11 +397,9 @@ def setup_environment(skip_initial_state=False):
         
         screenshot = env.get_screenshot()
         if screenshot:
-            with obs_lock:
-                current_obs = np.array(screenshot)
+            set_current_obs(np.array(screenshot))
         else:
-            with obs_lock:
-                current_obs = np.zeros((env.height, env.width, 3), dtype=np.uint8)
+            set_current_obs(np.zeros((env.height, env.width, 3), dtype=np.uint8))
 
         print("Emulator initialized successfully!")
         return True
@@ -371,18 +413,30 @@ def handle_input(manual_mode=False):
     # Server always runs headless - input handled by client via HTTP API
     return True, []
 
-def step_environment(actions_pressed):
-    """Take a step in the environment with optimized locking for better performance"""
-    global current_obs
+def step_environment(actions_pressed, capture=True, schedule=None):
+    """Take a step in the environment with optimized locking for better performance
+    
+    Args:
+        actions_pressed: Buttons held for this frame
+        capture: Grab the screenshot and update the map stitcher after the frame
+            (turbo mode skips this on intermediate frames)
+        schedule: Optional (buttons, frame_count) segments to run in one batch with
+            env.run_schedule() instead of a single frame
+    """
+    global current_obs, last_capture_time
     
     # Debug: print what actions are being sent to emulator
     # if actions_pressed:
             # print( Stepping emulator with actions: {actions_pressed}")
     
     
-    # Only use memory_lock for the essential emulator step
-    with memory_lock:
-        env.run_frame_with_buttons(actions_pressed)
+    # Only hold the emulator's memory lock for the essential emulator step
+    # (the same lock guards snapshot restores)
+    with env.memory_lock:
+        if schedule:
+            env.run_schedule(schedule)
+        else:
+            env.run_frame_with_buttons(actions_pressed)
         
         # Do lightweight area transition detection inside the lock
         if hasattr(env, 'memory_reader') and env.memory_reader:
@@ -400,14 +454,22 @@ def step_environment(actions_pressed):
             except Exception as e:
                 logger.warning(f"Area transition check failed: {e}")
     
+    record = video_frame_due(sum(frames for _, frames in schedule) if schedule else 1)
+    if not capture:
+        if record:
+            # Turbo skips the full capture, but the recording still gets every Nth frame
+            record_frame(env.get_screenshot())
+        return
+    last_capture_time = time.time()
+    
     # Update screenshot outside the memory lock to reduce contention
     try:
         screenshot = env.get_screenshot()
         if screenshot:
-            record_frame(screenshot)
+            if record:
+                record_frame(screenshot)
             update_frame_cache(screenshot)  # Update frame cache for separate frame server
-            with obs_lock:
-                current_obs = np.array(screenshot)
+            set_current_obs(np.array(screenshot))
                 
             # Update map stitcher on position changes (lightweight approach)
             # This ensures map data stays current as player moves
@@ -441,18 +503,14 @@ def step_environment(actions_pressed):
                         env.memory_reader._area_transition_detected = False  # Reset flag
                         logger.debug("Map stitcher update triggered by area transition")
                     
-                    # Update map stitcher directly when position changes
+                    # Hand the tiles to the map stitcher worker when position changes;
+                    # stitching, connection rebuilding and saving happen off the game loop
                     if should_update:
                         # @TODO should do location change warps here too
-                        print(f"🗺️ Triggering map stitcher update for position change")
-                        # Call map stitcher update directly without full map reading
                         tiles = env.memory_reader.read_map_around_player(radius=7)
                         if tiles:
-                            print(f"🗺️ Got {len(tiles)} tiles, updating map stitcher")
-                            state = {"map": {}}  # Basic state for stitcher
-                            env.memory_reader._update_map_stitcher(tiles, state)
-                            logger.debug("Map stitcher updated for position change")
-                            print(f"✅ Map stitcher update completed")
+                            if env.memory_reader.queue_map_stitcher_update(tiles):
+                                logger.debug(f"Queued map stitcher update with {len(tiles)} tile rows")
                         else:
                             print(f"❌ No tiles found for map stitcher update")
                         
@@ -497,6 +555,10 @@ def reset_game():
         step_count = 0
     print("Game and milestone reset complete")
 
+def actions_pending():
+    """True while an action is held, releasing, or queued"""
+    return bool(current_action or action_frames_remaining > 0 or release_frames_remaining > 0 or action_queue)
+
 def game_loop(manual_mode=False):
     """Main game loop - runs in main thread, always headless"""
     global running, step_count
@@ -511,6 +573,7 @@ def game_loop(manual_mode=False):
             
         # In server mode, handle action queue with proper button hold timing
         action_completed = False
+        schedule = None
         if not manual_mode:
             global current_action, action_frames_remaining, release_frames_remaining
             
@@ -529,21 +592,38 @@ def game_loop(manual_mode=False):
                 actions_pressed = []
                 release_frames_remaining -= 1
             elif action_queue:
-                # Start a new action from the queue
-                current_action = action_queue.pop(0)
-                action_frames_remaining = ACTION_HOLD_FRAMES
-                actions_pressed = [current_action]
-                queue_len = len(action_queue)
-                # Get current FPS for estimation
-                current_fps_for_calc = env.get_current_fps(fps) if env else fps
-                estimated_time = queue_len * (ACTION_HOLD_FRAMES + ACTION_RELEASE_DELAY) / current_fps_for_calc
-                print(f"🎮 Server processing action: {current_action}, Queue remaining: {queue_len} actions (~{estimated_time:.1f}s)")
+                # Start a new action from the queue. For a checked movement batch this first
+                # confirms the previous step landed; None means the rest of the batch was dropped
+                current_action = action_queue.pop(read_position=env.memory_reader.read_coordinates
+                                                   if env and env.memory_reader else None)
+                actions_pressed = [current_action] if current_action else []
+                if current_action:
+                    action_frames_remaining = ACTION_HOLD_FRAMES
+                    queue_len = len(action_queue)
+                    # Get current FPS for estimation
+                    current_fps_for_calc = env.get_current_fps(fps) if env else fps
+                    estimated_time = queue_len * (ACTION_HOLD_FRAMES + ACTION_RELEASE_DELAY) / current_fps_for_calc
+                    print(f"🎮 Server processing action: {current_action}, Queue remaining: {queue_len} actions (~{estimated_time:.1f}s)")
+                    
+                    if turbo_mode:
+                        # Hold and release frames in one batched call
+                        schedule = [([current_action], ACTION_HOLD_FRAMES), ([], ACTION_RELEASE_DELAY)]
+                        current_action = None
+                        action_frames_remaining = 0
+                        release_frames_remaining = 0
+                        action_completed = True
             else:
                 # No action to process
                 actions_pressed = []
             
         # Step environment
-        step_environment(actions_pressed)
+        # In turbo mode, frames with actions still pending run uncapped and only capture a
+        # screenshot periodically; the frame that completes or drains the queue always captures
+        turbo_active = turbo_mode and not manual_mode and actions_pending()
+        capture = (not turbo_active or action_completed or
+                   time.time() - last_capture_time >= TURBO_CAPTURE_INTERVAL)
+        step_environment(actions_pressed, capture=capture, schedule=schedule)
+        turbo_active = turbo_active and actions_pending()
         
         # Milestones are now updated in background thread
         
@@ -558,15 +638,18 @@ def game_loop(manual_mode=False):
         
         # Performance monitoring - log actual FPS every 5 seconds
         global last_fps_log, frame_count_since_log
-        frame_count_since_log += 1
+        frame_count_since_log += sum(frames for _, frames in schedule) if schedule else 1
         current_time = time.time()
         if current_time - last_fps_log >= 5.0:  # Log every 5 seconds
             actual_fps = frame_count_since_log / (current_time - last_fps_log)
             queue_len = len(action_queue)
-            print(f"📊 Server FPS: {actual_fps:.1f} (target: {fps}), Queue: {queue_len} actions")
+            print(f"📊 Server FPS: {actual_fps:.1f} (target: {'turbo' if turbo_mode else fps}), Queue: {queue_len} actions")
             last_fps_log = current_time
             frame_count_since_log = 0
         
+        if turbo_active:
+            continue  # Uncapped while actions are pending
+        
         # Use dynamic FPS - 2x speed during dialog
         current_fps = env.get_current_fps(fps) if env else fps
         # Server runs headless - always use sleep for timing
@@ -618,31 +701,43 @@ async def get_status():
         "base_fps": fps,
         "current_fps": current_fps,
         "is_dialog": is_dialog,
-        "fps_multiplier": 2 if is_dialog else 1
+        "fps_multiplier": 2 if is_dialog else 1,
+        "turbo": turbo_mode
     }
 
+@app.post("/turbo")
+async def set_turbo(enabled: bool = True):
+    """Enable or disable turbo mode (uncapped emulation while actions are pending)"""
+    global turbo_mode
+    
+    turbo_mode = enabled
+    print(f"⚡ Turbo mode {'enabled' if enabled else 'disabled'}")
+    return {"status": "success", "turbo": turbo_mode}
+
 @app.get("/screenshot")
-async def get_screenshot():
-    """Get current screenshot"""
-    global current_obs, step_count
+async def get_screenshot(request: Request, format: Optional[str] = None):
+    """
+    Get current screenshot
+    
+    Returns JSON with a base64 PNG by default. Pass format=raw|qoi|webp|jpeg|png (or an
+    Accept header naming one of their media types) to get the encoded frame as the body.
+    """
+    global step_count
     
     if env is None:
         raise HTTPException(status_code=400, detail="Emulator not initialized")
     
-    with obs_lock:
-        obs_copy = current_obs.copy() if current_obs is not None else None
+    encoding = negotiate_frame_encoding(request, format)
+    obs_copy, counter = get_current_obs()
     
     if obs_copy is None:
         raise HTTPException(status_code=500, detail="No screenshot available")
     
     try:
-        # Convert numpy array to PIL image
-        pil_image = Image.fromarray(obs_copy)
+        if encoding:
+            return binary_frame_response(obs_copy, counter, encoding)
         
-        # Convert to base64
-        buffer = io.BytesIO()
-        pil_image.save(buffer, format='PNG')
-        img_str = base64.b64encode(buffer.getvalue()).decode()
+        img_str = frame_encode_cache.get_base64(counter, obs_copy)
         
         with step_lock:
             current_step = step_count
@@ -659,12 +754,12 @@ async def get_screenshot():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/frame")
-async def get_latest_frame():
-    """Get latest game frame in same format as single-process mode"""
-    global current_obs, env
+async def get_latest_frame(request: Request, format: Optional[str] = None):
+    """Get latest game frame in same format as single-process mode (or binary, see /screenshot)"""
+    global env
     
-    with obs_lock:
-        obs_copy = current_obs.copy() if current_obs is not None else None
+    encoding = negotiate_frame_encoding(request, format)
+    obs_copy, counter = get_current_obs()
     
     # If current_obs is None (e.g., after server restart), try to get a fresh screenshot
     if obs_copy is None and env:
@@ -673,21 +768,22 @@ async def get_latest_frame():
             if screenshot:
                 obs_copy = np.array(screenshot)
                 # Update current_obs for future requests
-                with obs_lock:
-                    current_obs = obs_copy.copy()
+                set_current_obs(obs_copy.copy())
+                obs_copy, counter = get_current_obs()
                 logger.debug("Frame endpoint: Retrieved fresh screenshot after restart")
         except Exception as e:
             logger.warning(f"Frame endpoint: Failed to get fresh screenshot: {e}")
     
     if obs_copy is None:
+        if encoding:
+            raise HTTPException(status_code=503, detail="No frame available")
         return {"frame": ""}
     
     try:
-        # Convert to base64
-        pil_image = Image.fromarray(obs_copy)
-        buffer = io.BytesIO()
-        pil_image.save(buffer, format='PNG')
-        img_str = base64.b64encode(buffer.getvalue()).decode()
+        if encoding:
+            return binary_frame_response(obs_copy, counter, encoding)
+        
+        img_str = frame_encode_cache.get_base64(counter, obs_copy)
         
         return {"frame": img_str}
     except Exception as e:
@@ -697,7 +793,7 @@ async def get_latest_frame():
 @app.post("/action")
 async def take_action(request: ActionRequest):
     """Take an action"""
-    global current_obs, step_count, recent_button_presses, action_queue, anticheat_tracker, step_counter, last_action_time
+    global current_obs, step_count, recent_button_presses, action_queue, anticheat_tracker, step_counter, last_action_time, action_seq
     
             # print( Action endpoint called with request: {request}")
             # print( Request buttons: {request.buttons}")
@@ -712,8 +808,10 @@ async def take_action(request: ActionRequest):
             # Add ALL actions to the queue - let the game loop handle execution
             print(f"📡 Server received actions: {request.buttons}")
             print(f"📋 Action queue before extend: {action_queue}")
-            action_queue.extend(request.buttons)
+            if action_queue.extend(request.buttons, request.expected_positions):
+                logger.debug(f"Checked movement batch: {len(request.buttons)} steps to {request.expected_positions[-1]}")
             print(f"📋 Action queue after extend: {action_queue}")
+            action_seq += 1
             
             # Track button presses for recent actions display
             current_time = time.time()
@@ -755,6 +853,7 @@ async def take_action(request: ActionRequest):
         
         # Return immediate success - avoid all locks to prevent deadlocks
         actions_added = len(request.buttons) if request.buttons else 0
+        posted_seq = action_seq  # The logging below awaits; other actions may bump action_seq meanwhile
         
             # print( Returning success, actions_added: {actions_added}, queue_length: {len(action_queue)}")
         
@@ -769,8 +868,20 @@ async def take_action(request: ActionRequest):
                     decision_time = 0.0  # First action
                 last_action_time = current_time
                 
-                # Get current game state for logging
-                game_state = env.get_comprehensive_state()
+                # Get current game state for logging (off the event loop, and under the
+                # lock the /state and /state_stream builds hold)
+                def read_state_and_milestones():
+                    with state_build_lock:
+                        state = env.get_comprehensive_state()
+                        if hasattr(env, 'milestone_tracker'):
+                            try:
+                                # Force an immediate milestone check before logging
+                                env.check_and_update_milestones(state)
+                            except Exception as e:
+                                logger.debug(f"Error during immediate milestone check: {e}")
+                        return state
+                
+                game_state = await run_in_threadpool(read_state_and_milestones)
                 action_taken = request.buttons[0] if request.buttons else "NONE"  # Log first action
                 
                 # Create simple state hash
@@ -786,12 +897,6 @@ async def take_action(request: ActionRequest):
                 # First, trigger an immediate milestone check to ensure current state is detected
                 latest_milestone = "NONE"
                 if env and hasattr(env, 'milestone_tracker'):
-                    try:
-                        # Force an immediate milestone check before logging
-                        env.check_and_update_milestones(game_state)
-                    except Exception as e:
-                        logger.debug(f"Error during immediate milestone check: {e}")
-                    
                     milestone_name, split_time, total_time = env.milestone_tracker.get_latest_milestone_info()
                     latest_milestone = milestone_name if milestone_name != "NONE" else "NONE"
                 
@@ -814,7 +919,8 @@ async def take_action(request: ActionRequest):
         return {
             "status": "success", 
             "actions_queued": actions_added,
-            "queue_length": len(action_queue),  # action_queue access is atomic for lists
+            "queue_length": len(action_queue),
+            "action_seq": posted_seq,
             "message": f"Added {actions_added} actions to queue"
         }
             
@@ -839,321 +945,439 @@ async def get_queue_status():
         "queue_length": len(action_queue),
         "current_action": current_action,
         "action_frames_remaining": action_frames_remaining,
-        "release_frames_remaining": release_frames_remaining
+        "release_frames_remaining": release_frames_remaining,
+        "expected_positions": action_queue.expected_positions(),
+        "movement_batches_aborted": action_queue.batches_aborted
     }
 
-@app.get("/state")
-async def get_comprehensive_state():
-    """Get comprehensive game state including visual and memory data"""
-    if env is None:
-        raise HTTPException(status_code=400, detail="Emulator not initialized")
-    
-    try:
-        # Use the emulator's built-in caching (100ms cache)
-        # This avoids expensive operations on rapid requests
-        state = env.get_comprehensive_state()
-        
-        # CRITICAL FIX: Check milestones immediately before returning state
-        # The background milestone updater only runs every 5 seconds, which can cause
-        # milestones to be missed when the agent queries state right after triggering one.
-        # This ensures the agent always sees up-to-date milestone status.
-        if env.milestone_tracker:
-            try:
-                env.check_and_update_milestones(state)
-                logger.debug("Immediate milestone check completed in /state endpoint")
-            except Exception as e:
-                logger.debug(f"Milestone check in /state failed: {e}")
-        
-        # CORRECTED: Trust the memory reader's dialogue detection
-        # The memory reader CORRECTLY detects dialogue by reading game memory
-        # Don't override with broken OCR or stale caches
-        # The get_comprehensive_state() already includes proper game_state from memory
-        
-        # Only force game_state if it's completely missing (shouldn't happen)
-        if "game" not in state:
-            state["game"] = {}
-        if "game_state" not in state.get("game", {}):
-            # Fallback: check memory reader NOW for current state
-            if env.memory_reader:
-                is_in_battle = env.memory_reader.is_in_battle()
-                is_in_dialog = env.memory_reader.is_in_dialog()
+def add_map_stitcher_state(state, map_stitcher, current_location, player_coords):
+    """Add the visual map, stitched map info and location connections to a state dict
+    
+    Callers hold env.memory_reader.map_stitcher_lock.
+    """
+    # Check if visual_map was already generated by memory_reader
+    # If so, preserve it as it has the proper accumulated map data
+    visual_map_from_memory_reader = state.get("map", {}).get("visual_map")
+    if visual_map_from_memory_reader:
+        logger.debug("Using visual_map generated by memory_reader")
+        # Keep the visual_map as-is
+    elif map_stitcher:
+        # Generate visual map if not already present
+        try:
+            # Get NPCs from state if available
+            npcs = state.get("map", {}).get("object_events", [])
+            
+            # Get connections for this location
+            connections_with_coords = []
+            if current_location and current_location != "Unknown":
+                location_connections = map_stitcher.get_location_connections(current_location)
+                for conn in location_connections:
+                    if len(conn) >= 3:
+                        other_loc, my_coords, their_coords = conn[0], conn[1], conn[2]
+                        connections_with_coords.append({
+                            "to": other_loc,
+                            "from_pos": list(my_coords) if my_coords else [],
+                            "to_pos": list(their_coords) if their_coords else []
+                        })
+            
+            # Generate the map display
+            map_lines = map_stitcher.generate_location_map_display(
+                location_name=current_location,
+                player_pos=player_coords,
+                npcs=npcs,
+                connections=connections_with_coords
+            )
+            
+            # Store as formatted text
+            if map_lines:
+                state["map"]["visual_map"] = "\n".join(map_lines)
+                logger.debug(f"Generated visual_map with {len(map_lines)} lines")
+        except Exception as e:
+            logger.error(f"Failed to generate visual_map: {e}")
+    
+    # Add stitched map info for the client/frontend
+    if map_stitcher:
+        # Get the location grid and connections
+        if current_location and current_location != "Unknown":
+            # Prefer the grid the map stitcher worker published for this position over
+            # reading the live stitcher while the worker may be writing to it
+            published = None
+            if env.memory_reader._map_stitcher_worker is not None:
+                published = env.memory_reader._map_stitcher_worker.latest()
+            if (published is not None and player_coords is not None
+                    and tuple(published.coords) == player_coords
+                    and published.location_name.lower() == current_location.lower()):
+                location_grid = published.grid
+                grid_version = published.grid_revision
+            else:
+                location_grid = map_stitcher.get_location_grid(current_location, simplified=True)
+                grid_version = map_stitcher.location_grid_revision(current_location)
+            connections = []
+            
+            # Get connections for this location
+            for other_loc, my_coords, their_coords in map_stitcher.get_location_connections(current_location):
+                connections.append({
+                    "to": other_loc,
+                    "from_pos": list(my_coords),
+                    "to_pos": list(their_coords)
+                })
+            
+            # Convert location_grid to JSON-serializable format
+            # location_grid is Dict[Tuple[int, int], str] - convert tuples to strings
+            grid_serializable = {}
+            if location_grid:
+                for (x, y), tile in location_grid.items():
+                    grid_serializable[f"{x},{y}"] = tile
+            
+            # Get explored bounds and origin offset for coordinate conversion
+            # CRITICAL: Match by current map ID, not just location name!
+            # Multiple areas can have the same name - we need the CURRENT one
+            bounds = None
+            origin_offset = None
+            player_grid_pos = None
+            matching_area = None
+            
+            # Get current map ID to ensure we match the right area
+            current_map_bank = env.memory_reader._read_u8(env.memory_reader.addresses.MAP_BANK)
+            current_map_number = env.memory_reader._read_u8(env.memory_reader.addresses.MAP_NUMBER)
+            current_map_id = (current_map_bank << 8) | current_map_number
+            
+            # print(f"🗺️ [SERVER A* BOUNDS] Looking for area with map_id={current_map_id:04X} ({current_location})")
+            # print(f"🗺️ [SERVER A* BOUNDS] Map stitcher has {len(map_stitcher.map_areas)} areas")
+            # print(f"🗺️ [SERVER A* BOUNDS] Available map IDs: {[f'{mid:04X}' for mid in sorted(map_stitcher.map_areas.keys())]}")
+            logger.info(f"🗺️ [SERVER A*] Looking for area with map_id={current_map_id:04X} ({current_location})")
+            
+            # First try to match by map ID (most reliable)
+            if current_map_id in map_stitcher.map_areas:
+                matching_area = map_stitcher.map_areas[current_map_id]
+                # print(f"✅ [SERVER A* BOUNDS] Found area by map ID {current_map_id:04X}: {matching_area.location_name}")
+                logger.info(f"✅ [SERVER A*] Found area by map ID {current_map_id:04X}: {matching_area.location_name}")
                 
-                if is_in_battle:
-                    state["game"]["game_state"] = "battle"
-                elif is_in_dialog:
-                    state["game"]["game_state"] = "dialog"
+                if hasattr(matching_area, 'explored_bounds'):
+                    bounds = matching_area.explored_bounds
+                    # print(f"✅ [SERVER A* BOUNDS] Area has explored_bounds: {bounds}")
+                    logger.info(f"🗺️ [SERVER A*] Found bounds: {bounds}")
                 else:
-                    state["game"]["game_state"] = "overworld"
+                    # print(f"⚠️ [SERVER A* BOUNDS] Area has NO explored_bounds attribute!")
+                    logger.warning(f"⚠️ [SERVER A*] Area has no explored_bounds")
+                
+                # Get origin offset for coordinate translation
+                if hasattr(matching_area, 'origin_offset'):
+                    origin_offset = matching_area.origin_offset
+                    # Calculate player's grid position
+                    if player_coords:
+                        player_grid_pos = (
+                            player_coords[0] + origin_offset['x'],
+                            player_coords[1] + origin_offset['y']
+                        )
+                        logger.info(f"🗺️ [SERVER A*] Origin offset: {origin_offset}")
+                        logger.info(f"🗺️ [SERVER A*] Player local pos: {player_coords}")
+                        logger.info(f"🗺️ [SERVER A*] Player grid pos: {player_grid_pos}")
             else:
-                state["game"]["game_state"] = "unknown"
-        
-        # Include milestones for storyline objective auto-completion
-        if env.milestone_tracker:
-            state["milestones"] = env.milestone_tracker.milestones
-        
-        # Get map stitcher data for enhanced map display
-        # Use the memory_reader's MapStitcher instance which has the accumulated data
-        map_stitcher = None
-        if env and env.memory_reader and hasattr(env.memory_reader, '_map_stitcher'):
-            map_stitcher = env.memory_reader._map_stitcher
-            num_areas = len(map_stitcher.map_areas) if map_stitcher and hasattr(map_stitcher, 'map_areas') else 0
-            logger.debug(f"Using memory_reader's MapStitcher with {num_areas} areas")
+                # Fallback: match by location name (less reliable but better than nothing)
+                logger.warning(f"⚠️ [SERVER A*] Map ID {current_map_id:04X} not in map_areas, falling back to name match")
+                area = map_stitcher.find_area_by_name(current_location)
+                if area:
+                    matching_area = area
+                    if hasattr(area, 'explored_bounds'):
+                        bounds = area.explored_bounds
+                        logger.info(f"🗺️ [SERVER A*] Found bounds by name for {current_location}: {bounds}")
+            
+            if bounds is None:
+                print(f"❌ [SERVER A* BOUNDS] No bounds found for {current_location} (map_id={current_map_id:04X})")
+                logger.warning(f"⚠️ [SERVER A*] No matching area found for {current_location}")
+            else:
+                print(f"✅ [SERVER A* BOUNDS] Final bounds for {current_location}: {bounds}")
+            
+            logger.info(f"🗺️ [SERVER A*] Sending grid with {len(grid_serializable)} tiles, bounds={bounds}")
+            
+            state["map"]["stitched_map_info"] = {
+                "available": True,
+                "current_area": {
+                    "name": current_location,
+                    "connections": connections,
+                    "player_pos": player_coords,
+                    "grid": grid_serializable,  # Add the grid data!
+                    "grid_version": grid_version,  # Changes whenever grid does (0 = unknown); keys agent path caches
+                    "map_id": current_map_id,
+                    "bounds": bounds,  # Add bounds for coordinate conversion
+                    "origin_offset": origin_offset,  # ← NEW: For coordinate translation
+                    "player_grid_pos": player_grid_pos  # ← NEW: Translated position
+                },
+                "player_local_pos": player_coords
+            }
         else:
-            logger.debug("No MapStitcher available from memory_reader")
+            state["map"]["stitched_map_info"] = {
+                "available": False,
+                "reason": "Unknown location"
+            }
         
-        # Get current location name
-        current_location = state.get("player", {}).get("location", "Unknown")
-        player_pos = state.get("player", {}).get("position")
-        if player_pos:
-            player_coords = (player_pos.get("x", 0), player_pos.get("y", 0))
-        else:
-            player_coords = None
-        
-        # Add stitched map info to the map section
-        if not "map" in state:
-            state["map"] = {}
-        
-        # Check if visual_map was already generated by memory_reader
-        # If so, preserve it as it has the proper accumulated map data
-        visual_map_from_memory_reader = state.get("map", {}).get("visual_map")
-        if visual_map_from_memory_reader:
-            logger.debug("Using visual_map generated by memory_reader")
-            # Keep the visual_map as-is
-        elif map_stitcher:
-            # Generate visual map if not already present
-            try:
-                # Get NPCs from state if available
-                npcs = state.get("map", {}).get("object_events", [])
-                
-                # Get connections for this location
-                connections_with_coords = []
-                if current_location and current_location != "Unknown":
-                    location_connections = map_stitcher.get_location_connections(current_location)
-                    for conn in location_connections:
-                        if len(conn) >= 3:
-                            other_loc, my_coords, their_coords = conn[0], conn[1], conn[2]
-                            connections_with_coords.append({
-                                "to": other_loc,
-                                "from_pos": list(my_coords) if my_coords else [],
-                                "to_pos": list(their_coords) if their_coords else []
+        # Also include location connections directly for backward compatibility
+        try:
+            cache_file = ".pokeagent_cache/map_stitcher_data.json"
+            live_connections = map_stitcher.get_location_connections() if map_stitcher else None
+            if live_connections:
+                # The live stitcher is current; the file only catches up when its journal is compacted
+                state["location_connections"] = live_connections
+            elif os.path.exists(cache_file):
+                with open(cache_file, 'r') as f:
+                    map_data = json.load(f)
+                    if 'location_connections' in map_data and map_data['location_connections']:
+                        location_connections = map_data['location_connections']
+                        state["location_connections"] = location_connections
+                        logger.debug(f"Loaded location connections for {len(location_connections) if location_connections else 0} locations")
+                    elif 'warp_connections' in map_data and map_data['warp_connections']:
+                        # Convert warp_connections to portal_connections format for LLM display
+                        map_id_connections = {}
+                        for conn in map_data['warp_connections']:
+                            from_map = conn['from_map_id']
+                            if from_map not in map_id_connections:
+                                map_id_connections[from_map] = []
+                            
+                            # Find the location name for the destination map
+                            to_map_name = "Unknown Location"
+                            if str(conn['to_map_id']) in map_data.get('map_areas', {}):
+                                to_map_name = map_data['map_areas'][str(conn['to_map_id'])]['location_name']
+                            
+                            map_id_connections[from_map].append({
+                                'to_name': to_map_name,
+                                'from_pos': conn['from_position'],  # Keep as list for JSON serialization
+                                'to_pos': conn['to_position']       # Keep as list for JSON serialization
                             })
-                
-                # Generate the map display
-                map_lines = map_stitcher.generate_location_map_display(
-                    location_name=current_location,
-                    player_pos=player_coords,
-                    npcs=npcs,
-                    connections=connections_with_coords
-                )
-                
-                # Store as formatted text
-                if map_lines:
-                    state["map"]["visual_map"] = "\n".join(map_lines)
-                    logger.debug(f"Generated visual_map with {len(map_lines)} lines")
-            except Exception as e:
-                logger.error(f"Failed to generate visual_map: {e}")
-        
-        # Add stitched map info for the client/frontend
-        if map_stitcher:
-            # Get the location grid and connections
-            if current_location and current_location != "Unknown":
-                location_grid = map_stitcher.get_location_grid(current_location, simplified=True)
-                connections = []
-                
-                # Get connections for this location
-                for other_loc, my_coords, their_coords in map_stitcher.get_location_connections(current_location):
-                    connections.append({
-                        "to": other_loc,
-                        "from_pos": list(my_coords),
-                        "to_pos": list(their_coords)
-                    })
-                
-                # Convert location_grid to JSON-serializable format
-                # location_grid is Dict[Tuple[int, int], str] - convert tuples to strings
-                grid_serializable = {}
-                if location_grid:
-                    for (x, y), tile in location_grid.items():
-                        grid_serializable[f"{x},{y}"] = tile
-                
-                # Get explored bounds and origin offset for coordinate conversion
-                # CRITICAL: Match by current map ID, not just location name!
-                # Multiple areas can have the same name - we need the CURRENT one
-                bounds = None
-                origin_offset = None
-                player_grid_pos = None
-                matching_area = None
-                
-                # Get current map ID to ensure we match the right area
-                current_map_bank = env.memory_reader._read_u8(env.memory_reader.addresses.MAP_BANK)
-                current_map_number = env.memory_reader._read_u8(env.memory_reader.addresses.MAP_NUMBER)
-                current_map_id = (current_map_bank << 8) | current_map_number
-                
-                # print(f"🗺️ [SERVER A* BOUNDS] Looking for area with map_id={current_map_id:04X} ({current_location})")
-                # print(f"🗺️ [SERVER A* BOUNDS] Map stitcher has {len(map_stitcher.map_areas)} areas")
-                # print(f"🗺️ [SERVER A* BOUNDS] Available map IDs: {[f'{mid:04X}' for mid in sorted(map_stitcher.map_areas.keys())]}")
-                logger.info(f"🗺️ [SERVER A*] Looking for area with map_id={current_map_id:04X} ({current_location})")
-                
-                # First try to match by map ID (most reliable)
-                if current_map_id in map_stitcher.map_areas:
-                    matching_area = map_stitcher.map_areas[current_map_id]
-                    # print(f"✅ [SERVER A* BOUNDS] Found area by map ID {current_map_id:04X}: {matching_area.location_name}")
-                    logger.info(f"✅ [SERVER A*] Found area by map ID {current_map_id:04X}: {matching_area.location_name}")
-                    
-                    if hasattr(matching_area, 'explored_bounds'):
-                        bounds = matching_area.explored_bounds
-                        # print(f"✅ [SERVER A* BOUNDS] Area has explored_bounds: {bounds}")
-                        logger.info(f"🗺️ [SERVER A*] Found bounds: {bounds}")
+                        
+                        state["portal_connections"] = map_id_connections
+                        print(f"🗺️ SERVER: Added portal connections to state: {map_id_connections}")
+                        print(f"🗺️ SERVER: State now has keys: {list(state.keys())}")
+                        logger.debug(f"Loaded portal connections for {len(map_id_connections) if map_id_connections else 0} maps from persistent storage")
                     else:
-                        # print(f"⚠️ [SERVER A* BOUNDS] Area has NO explored_bounds attribute!")
-                        logger.warning(f"⚠️ [SERVER A*] Area has no explored_bounds")
-                    
-                    # Get origin offset for coordinate translation
-                    if hasattr(matching_area, 'origin_offset'):
-                        origin_offset = matching_area.origin_offset
-                        # Calculate player's grid position
-                        if player_coords:
-                            player_grid_pos = (
-                                player_coords[0] + origin_offset['x'],
-                                player_coords[1] + origin_offset['y']
-                            )
-                            logger.info(f"🗺️ [SERVER A*] Origin offset: {origin_offset}")
-                            logger.info(f"🗺️ [SERVER A*] Player local pos: {player_coords}")
-                            logger.info(f"🗺️ [SERVER A*] Player grid pos: {player_grid_pos}")
-                else:
-                    # Fallback: match by location name (less reliable but better than nothing)
-                    logger.warning(f"⚠️ [SERVER A*] Map ID {current_map_id:04X} not in map_areas, falling back to name match")
-                    for area in map_stitcher.map_areas.values():
-                        if area.location_name and area.location_name.lower() == current_location.lower():
-                            matching_area = area
-                            if hasattr(area, 'explored_bounds'):
-                                bounds = area.explored_bounds
-                                logger.info(f"🗺️ [SERVER A*] Found bounds by name for {current_location}: {bounds}")
-                            break
-                
-                if bounds is None:
-                    print(f"❌ [SERVER A* BOUNDS] No bounds found for {current_location} (map_id={current_map_id:04X})")
-                    logger.warning(f"⚠️ [SERVER A*] No matching area found for {current_location}")
-                else:
-                    print(f"✅ [SERVER A* BOUNDS] Final bounds for {current_location}: {bounds}")
-                
-                logger.info(f"🗺️ [SERVER A*] Sending grid with {len(grid_serializable)} tiles, bounds={bounds}")
-                
-                state["map"]["stitched_map_info"] = {
-                    "available": True,
-                    "current_area": {
-                        "name": current_location,
-                        "connections": connections,
-                        "player_pos": player_coords,
-                        "grid": grid_serializable,  # Add the grid data!
-                        "bounds": bounds,  # Add bounds for coordinate conversion
-                        "origin_offset": origin_offset,  # ← NEW: For coordinate translation
-                        "player_grid_pos": player_grid_pos  # ← NEW: Translated position
-                    },
-                    "player_local_pos": player_coords
-                }
+                        print(f"🗺️ SERVER: No warp connections found in map data")
+                        logger.debug("No warp connections found in map stitcher data")
             else:
-                state["map"]["stitched_map_info"] = {
-                    "available": False,
-                    "reason": "Unknown location"
-                }
+                print(f"🗺️ SERVER: Cache file not found at {cache_file}")
+                logger.debug(f"Map stitcher cache file not found: {cache_file}")
+        except Exception as e:
+            import traceback
+            print(f"🗺️ SERVER: Error loading portal connections: {e}")
+            print(f"🗺️ SERVER: Full traceback: {traceback.format_exc()}")
+            logger.debug(f"Could not load portal connections from persistent storage: {e}")
+
+
+def build_comprehensive_state(include_screenshot: bool = True,
+                              screenshot_format: str = DEFAULT_FRAME_ENCODING) -> ComprehensiveStateResponse:
+    """
+    Build the /state document (shared by GET /state and the /state_stream push channel)
+    
+    Args:
+        include_screenshot: Include visual.screenshot_base64
+        screenshot_format: Encoding of screenshot_base64 (see server/frame_codec.py)
+    """
+    # Read before the state: anything queued after this may not be reflected yet
+    state_action_seq = action_seq
+    
+    # Use the emulator's built-in caching (100ms cache)
+    # This avoids expensive operations on rapid requests
+    state = env.get_comprehensive_state()
+    
+    # CRITICAL FIX: Check milestones immediately before returning state
+    # The background milestone updater only runs every 5 seconds, which can cause
+    # milestones to be missed when the agent queries state right after triggering one.
+    # This ensures the agent always sees up-to-date milestone status.
+    if env.milestone_tracker:
+        try:
+            env.check_and_update_milestones(state)
+            logger.debug("Immediate milestone check completed in /state endpoint")
+        except Exception as e:
+            logger.debug(f"Milestone check in /state failed: {e}")
+    
+    # CORRECTED: Trust the memory reader's dialogue detection
+    # The memory reader CORRECTLY detects dialogue by reading game memory
+    # Don't override with broken OCR or stale caches
+    # The get_comprehensive_state() already includes proper game_state from memory
+    
+    # Only force game_state if it's completely missing (shouldn't happen)
+    if "game" not in state:
+        state["game"] = {}
+    if "game_state" not in state.get("game", {}):
+        # Fallback: check memory reader NOW for current state
+        if env.memory_reader:
+            is_in_battle = env.memory_reader.is_in_battle()
+            is_in_dialog = env.memory_reader.is_in_dialog()
             
-            # Also include location connections directly for backward compatibility
-            try:
-                cache_file = ".pokeagent_cache/map_stitcher_data.json"
-                if os.path.exists(cache_file):
-                    with open(cache_file, 'r') as f:
-                        map_data = json.load(f)
-                        if 'location_connections' in map_data and map_data['location_connections']:
-                            location_connections = map_data['location_connections']
-                            state["location_connections"] = location_connections
-                            logger.debug(f"Loaded location connections for {len(location_connections) if location_connections else 0} locations")
-                        elif 'warp_connections' in map_data and map_data['warp_connections']:
-                            # Convert warp_connections to portal_connections format for LLM display
-                            map_id_connections = {}
-                            for conn in map_data['warp_connections']:
-                                from_map = conn['from_map_id']
-                                if from_map not in map_id_connections:
-                                    map_id_connections[from_map] = []
-                                
-                                # Find the location name for the destination map
-                                to_map_name = "Unknown Location"
-                                if str(conn['to_map_id']) in map_data.get('map_areas', {}):
-                                    to_map_name = map_data['map_areas'][str(conn['to_map_id'])]['location_name']
-                                
-                                map_id_connections[from_map].append({
-                                    'to_name': to_map_name,
-                                    'from_pos': conn['from_position'],  # Keep as list for JSON serialization
-                                    'to_pos': conn['to_position']       # Keep as list for JSON serialization
-                                })
-                            
-                            state["portal_connections"] = map_id_connections
-                            print(f"🗺️ SERVER: Added portal connections to state: {map_id_connections}")
-                            print(f"🗺️ SERVER: State now has keys: {list(state.keys())}")
-                            logger.debug(f"Loaded portal connections for {len(map_id_connections) if map_id_connections else 0} maps from persistent storage")
-                        else:
-                            print(f"🗺️ SERVER: No warp connections found in map data")
-                            logger.debug("No warp connections found in map stitcher data")
-                else:
-                    print(f"🗺️ SERVER: Cache file not found at {cache_file}")
-                    logger.debug(f"Map stitcher cache file not found: {cache_file}")
-            except Exception as e:
-                import traceback
-                print(f"🗺️ SERVER: Error loading portal connections: {e}")
-                print(f"🗺️ SERVER: Full traceback: {traceback.format_exc()}")
-                logger.debug(f"Could not load portal connections from persistent storage: {e}")
-        
-        # The battle information already contains all necessary data
-        # No additional analysis needed - keep it clean
-        
-        # Remove MapStitcher instance to avoid serialization issues
-        # The instance is only for internal use by state_formatter
-        # The client will reconstruct its own map stitcher from the map data
-        if "_map_stitcher_instance" in state.get("map", {}):
-            del state["map"]["_map_stitcher_instance"]
-        
-        # Convert screenshot to base64 if available
-        if state["visual"]["screenshot"]:
-            buffer = io.BytesIO()
-            state["visual"]["screenshot"].save(buffer, format='PNG')
-            img_str = base64.b64encode(buffer.getvalue()).decode()
-            state["visual"]["screenshot_base64"] = img_str
-            # Remove the PIL image object to avoid serialization issues
-            del state["visual"]["screenshot"]
-        
-        with step_lock:
-            current_step = step_count
-        
-        # Include action queue info for multiprocess coordination
-        queue_length = len(action_queue)  # Action queue access is atomic for len()
-        
-        # Get recent actions for agent context
-        global recent_button_presses
-        recent_action_strings = []
-        if recent_button_presses:
-            # Convert recent button press objects to simple action strings
-            for btn_press in recent_button_presses[-25:]:  # Last 25 actions for better VLM context
-                if isinstance(btn_press, dict) and 'button' in btn_press:
-                    recent_action_strings.append(btn_press['button'])
-                elif isinstance(btn_press, str):
-                    recent_action_strings.append(btn_press)
-        
-        return ComprehensiveStateResponse(
-            visual=state["visual"],
-            player=state["player"],
-            game=state["game"],
-            map=state["map"],
-            milestones=state.get("milestones", {}),
-            location_connections=state.get("location_connections", {}),
-            step_number=current_step,
-            status="running",
-            action_queue_length=queue_length,
-            recent_actions=recent_action_strings
-        )
-        
+            if is_in_battle:
+                state["game"]["game_state"] = "battle"
+            elif is_in_dialog:
+                state["game"]["game_state"] = "dialog"
+            else:
+                state["game"]["game_state"] = "overworld"
+        else:
+            state["game"]["game_state"] = "unknown"
+    
+    # Include milestones for storyline objective auto-completion
+    if env.milestone_tracker:
+        state["milestones"] = env.milestone_tracker.milestones
+    
+    # Get map stitcher data for enhanced map display
+    # Use the memory_reader's MapStitcher instance which has the accumulated data
+    map_stitcher = None
+    if env and env.memory_reader and hasattr(env.memory_reader, '_map_stitcher'):
+        map_stitcher = env.memory_reader._map_stitcher
+        num_areas = len(map_stitcher.map_areas) if map_stitcher and hasattr(map_stitcher, 'map_areas') else 0
+        logger.debug(f"Using memory_reader's MapStitcher with {num_areas} areas")
+    else:
+        logger.debug("No MapStitcher available from memory_reader")
+    
+    # Get current location name
+    current_location = state.get("player", {}).get("location", "Unknown")
+    player_pos = state.get("player", {}).get("position")
+    if player_pos:
+        player_coords = (player_pos.get("x", 0), player_pos.get("y", 0))
+    else:
+        player_coords = None
+    
+    # Add stitched map info to the map section
+    if not "map" in state:
+        state["map"] = {}
+    
+    if map_stitcher:
+        # The map stitcher worker merges under map_stitcher_lock; reading (and filling the
+        # location grid cache) without it could pair a new grid version with old cells
+        with env.memory_reader.map_stitcher_lock:
+            add_map_stitcher_state(state, map_stitcher, current_location, player_coords)
+    
+    # The battle information already contains all necessary data
+    # No additional analysis needed - keep it clean
+    
+    # Remove MapStitcher instance to avoid serialization issues
+    # The instance is only for internal use by state_formatter
+    # The client will reconstruct its own map stitcher from the map data
+    if "_map_stitcher_instance" in state.get("map", {}):
+        del state["map"]["_map_stitcher_instance"]
+    
+    # Convert screenshot to base64 if available
+    # The latest frame is encoded once per frame counter and shared with /screenshot
+    screenshot = state["visual"].pop("screenshot", None)  # Remove the PIL image object to avoid serialization issues
+    with obs_lock:
+        state["visual"]["frame_counter"] = current_obs_counter
+    if include_screenshot:
+        obs_copy, counter = get_current_obs()
+        if obs_copy is not None:
+            encoding = resolve_encoding(screenshot_format, obs_copy)
+            state["visual"]["screenshot_base64"] = frame_encode_cache.get_base64(counter, obs_copy, encoding)
+            state["visual"]["screenshot_format"] = encoding
+        elif screenshot is not None:
+            pixels = np.array(screenshot)
+            encoding = resolve_encoding(screenshot_format, pixels)
+            state["visual"]["screenshot_base64"] = base64.b64encode(encode_frame(pixels, encoding)).decode()
+            state["visual"]["screenshot_format"] = encoding
+    
+    with step_lock:
+        current_step = step_count
+    
+    # Include action queue info for multiprocess coordination
+    queue_length = len(action_queue)  # Action queue access is atomic for len()
+    
+    # Get recent actions for agent context
+    global recent_button_presses
+    recent_action_strings = []
+    if recent_button_presses:
+        # Convert recent button press objects to simple action strings
+        for btn_press in recent_button_presses[-25:]:  # Last 25 actions for better VLM context
+            if isinstance(btn_press, dict) and 'button' in btn_press:
+                recent_action_strings.append(btn_press['button'])
+            elif isinstance(btn_press, str):
+                recent_action_strings.append(btn_press)
+    
+    return ComprehensiveStateResponse(
+        visual=state["visual"],
+        player=state["player"],
+        game=state["game"],
+        map=state["map"],
+        milestones=state.get("milestones", {}),
+        location_connections=state.get("location_connections", {}),
+        step_number=current_step,
+        status="running",
+        action_queue_length=queue_length,
+        recent_actions=recent_action_strings,
+        action_seq=state_action_seq
+    )
+
+
+@app.get("/state")
+async def get_comprehensive_state(screenshot_format: str = DEFAULT_FRAME_ENCODING):
+    """
+    Get comprehensive game state including visual and memory data
+    
+    screenshot_format selects the encoding inside visual.screenshot_base64
+    (png, raw, qoi, webp or jpeg; empty means png). The encoding actually used is
+    echoed back as visual.screenshot_format.
+    """
+    if env is None:
+        raise HTTPException(status_code=400, detail="Emulator not initialized")
+    
+    try:
+        screenshot_format = negotiate_encoding(screenshot_format) or DEFAULT_FRAME_ENCODING
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def build():
+        with state_build_lock:
+            return build_comprehensive_state(screenshot_format=screenshot_format)
+    
+    try:
+        return await run_in_threadpool(build)
     except Exception as e:
         logger.error(f"Error getting comprehensive state: {e}")
         raise HTTPException(status_code=500, detail=str(e)) 
 
+@app.get("/state_stream")
+async def stream_comprehensive_state(screenshot: bool = False, interval: float = STATE_STREAM_INTERVAL,
+                                     screenshot_format: str = DEFAULT_FRAME_ENCODING):
+    """
+    Push the /state document using Server-Sent Events.
+    
+    The first event is {"type": "snapshot", "seq": 0, "state": {...}}; after that an event
+    {"type": "delta", "seq": n, "ops": [...]} is sent only when the state changed, with
+    JSON-patch style ops against the previous event (see server/state_delta.py).
+    
+    The state is built once per tick in a worker thread and shared by every client
+    with the same parameters. Screenshots are left out unless screenshot=true;
+    clients normally fetch frames from /screenshot or /frame instead.
+    """
+    from fastapi.responses import StreamingResponse
+    from fastapi.encoders import jsonable_encoder
+    
+    if env is None:
+        raise HTTPException(status_code=400, detail="Emulator not initialized")
+    
+    try:
+        screenshot_format = negotiate_encoding(screenshot_format) or DEFAULT_FRAME_ENCODING
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    interval = min(STATE_STREAM_INTERVALS, key=lambda choice: abs(choice - interval))
+    
+    # One builder per distinct stream configuration, shared by all of its subscribers
+    # and dropped when the last one disconnects
+    key = (screenshot, screenshot_format, interval)
+    broadcast = state_streams.get(key)
+    if broadcast is None:
+        def build():
+            with state_build_lock:
+                return jsonable_encoder(build_comprehensive_state(include_screenshot=screenshot,
+                                                                  screenshot_format=screenshot_format))
+        
+        def forget(idle):
+            if state_streams.get(key) is idle:
+                del state_streams[key]
+        
+        broadcast = state_streams[key] = StateBroadcast(build, interval=interval, on_idle=forget)
+    
+    async def event_stream():
+        async for message in broadcast.subscribe():
+            yield f"data: {message}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "Connection": "keep-alive"})
+
 @app.get("/debug/memory")
 async def debug_memory():
     """Debug memory reading (basic version)"""
@@ -1992,8 +2216,9 @@ def main():
     parser.add_argument("--port", type=int, default=8000, help="Port for FastAPI server")
     parser.add_argument("--manual", action="store_true", help="Enable manual mode with keyboard input and overlay")
     parser.add_argument("--load-state", type=str, help="Load a saved state file on startup")
-    parser.add_argument("--record", action="store_true", help="Record video of the gameplay")
+    parser.add_argument("--record", action="store_true", help="Record video of the gameplay (turbo batches each action's frames, so turbo recordings keep one frame per action)")
     parser.add_argument("--no-ocr", action="store_true", help="Disable OCR dialogue detection")
+    parser.add_argument("--turbo", action="store_true", help="Run queued actions as fast as the CPU allows instead of at the display FPS")
     # Server always runs headless - display handled by client
     
     args = parser.parse_args()
@@ -2050,6 +2275,10 @@ def main():
         print("🔄 Checkpoint loading enabled by default - will restore LLM metrics from checkpoint_llm.txt if available")
     
     print("Starting Fixed Simple Pokemon Emerald Server")
+    if args.turbo:
+        global turbo_mode
+        turbo_mode = True
+        print("⚡ Turbo mode enabled - queued actions run uncapped")
     # Initialize video recording if requested
     init_video_recording(args.record)
     print("Server mode - headless operation, display handled by client")
@@ -2188,6 +2417,7 @@ def main():
         global running
         running = False
         state_update_running = False
+        cleanup_frame_ring()
         if env:
             env.stop()
         print("Server stopped")
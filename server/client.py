@@ -23,6 +23,7 @@ except ImportError:
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agent import Agent
+from server.state_delta import StateMirror
 from utils.state_formatter import format_state_for_llm
 
 
@@ -57,6 +58,51 @@ def update_display_with_status(screen, font, mode, step_count, additional_info="
     pygame.display.flip()
 
 
+def post_action(server_url, payload, state_mirror=None, timeout=5):
+    """
+    POST /action and tell the state mirror which action_seq the next state must include.
+    
+    Returns:
+        requests.Response
+    """
+    response = requests.post(f"{server_url}/action", json=payload, timeout=timeout)
+    if state_mirror is not None and response.status_code == 200:
+        state_mirror.action_posted(response.json().get("action_seq"))
+    return response
+
+
+def fetch_state(server_url, state_mirror=None):
+    """
+    Get the latest state, preferring the locally mirrored /state_stream copy.
+    
+    Falls back to GET /state when the mirror is not connected, was built before the
+    last action posted with post_action(), or still shows queued actions. The mirror
+    carries no screenshot; its state reuses the last frame fetched from GET /screenshot
+    unless visual.frame_counter shows the server has captured a newer one.
+    
+    Returns:
+        dict: State document, or None if the server returned an error
+    """
+    if state_mirror is not None:
+        state_data = state_mirror.get_state()
+        if state_data is not None and state_data.get('action_queue_length', 0) == 0:
+            frame = state_mirror.frame
+            frame_counter = state_data.get("visual", {}).get("frame_counter")
+            if frame is None or frame_counter is None or frame[0] < frame_counter:
+                response = requests.get(f"{server_url}/screenshot", params={"format": "png"}, timeout=5)
+                if response.status_code == 200 and response.content:
+                    frame = (int(response.headers.get("X-Frame-Counter", 0)), base64.b64encode(response.content).decode())
+                    state_mirror.frame = frame
+            if frame is not None:
+                state_data.setdefault("visual", {}).update(screenshot_base64=frame[1], screenshot_format="png")
+                return state_data
+    
+    response = requests.get(f"{server_url}/state", timeout=5)
+    if response.status_code == 200:
+        return response.json()
+    return None
+
+
 def run_multiprocess_client(server_port=8000, args=None):
     """
     Simple client that gets state from server, processes with agent, sends action back.
@@ -76,6 +122,10 @@ def run_multiprocess_client(server_port=8000, args=None):
     print(f"✅ Agent initialized")
     print(f"🎮 Client connected to server at {server_url}")
     
+    # Pushed state deltas instead of a full /state download every step
+    state_mirror = StateMirror(server_url)
+    state_mirror.start()
+    
     # Display setup
     headless = args and args.headless
     screen = None
@@ -160,9 +210,8 @@ def run_multiprocess_client(server_port=8000, args=None):
                         # Manual agent step
                         elif event.key == pygame.K_SPACE and mode in ("AGENT", "AUTO"):
                             # Force an agent step
-                            response = requests.get(f"{server_url}/state", timeout=5)
-                            if response.status_code == 200:
-                                state_data = response.json()
+                            state_data = fetch_state(server_url, state_mirror)
+                            if state_data is not None:
                                 screenshot_base64 = state_data.get("visual", {}).get("screenshot_base64", "")
                                 if screenshot_base64:
                                     img_data = base64.b64decode(screenshot_base64)
@@ -194,10 +243,11 @@ def run_multiprocess_client(server_port=8000, args=None):
                                             buttons = [btn.strip() for btn in buttons]
                                         
                                         try:
-                                            response = requests.post(
-                                                f"{server_url}/action",
-                                                json={"buttons": buttons, "source": "local_agent"},
-                                                timeout=5
+                                            response = post_action(
+                                                server_url,
+                                                {"buttons": buttons, "source": "local_agent",
+                                                 "expected_positions": result.get('expected_positions')},
+                                                state_mirror
                                             )
                                             if response.status_code == 200:
                                                 print(f"🎮 Agent: {action} (sent successfully)")
@@ -310,9 +360,10 @@ def run_multiprocess_client(server_port=8000, args=None):
                             if action:
                                 # Send manual action to server using the same endpoint as agent actions
                                 try:
-                                    response = requests.post(
-                                        f"{server_url}/action",
-                                        json={"buttons": [action], "source": "manual"},
+                                    response = post_action(
+                                        server_url,
+                                        {"buttons": [action], "source": "manual"},
+                                        state_mirror,
                                         timeout=2
                                     )
                                     if response.status_code == 200:
@@ -353,9 +404,8 @@ def run_multiprocess_client(server_port=8000, args=None):
                             queue_status = queue_response.json()
                             if queue_status.get("queue_empty", False):
                                 # Get state and process
-                                response = requests.get(f"{server_url}/state", timeout=5)
-                                if response.status_code == 200:
-                                    state_data = response.json()
+                                state_data = fetch_state(server_url, state_mirror)
+                                if state_data is not None:
                                     screenshot_base64 = state_data.get("visual", {}).get("screenshot_base64", "")
                                     if screenshot_base64:
                                         img_data = base64.b64decode(screenshot_base64)
@@ -386,10 +436,11 @@ def run_multiprocess_client(server_port=8000, args=None):
                                                 buttons = [btn.strip() for btn in buttons]
                                             
                                             try:
-                                                response = requests.post(
-                                                    f"{server_url}/action",
-                                                    json={"buttons": buttons},
-                                                    timeout=5
+                                                response = post_action(
+                                                    server_url,
+                                                    {"buttons": buttons,
+                                                     "expected_positions": result.get('expected_positions')},
+                                                    state_mirror
                                                 )
                                                 if response.status_code == 200:
                                                     step_count += 1
@@ -456,6 +507,7 @@ def run_multiprocess_client(server_port=8000, args=None):
             time.sleep(2)
     
     # Cleanup
+    state_mirror.stop()
     if not headless and PYGAME_AVAILABLE:
         pygame.quit()
     
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Frame encodings for the frame endpoints (/screenshot, /api/frame, /state, frame server /frame).
+
+Clients pick an encoding with a `format` query parameter or an Accept header:
+
+    raw   application/octet-stream   H*W*3 RGB bytes, shape in the X-Frame-Shape header
+    qoi   image/qoi                  lossless, very cheap to encode (served as png for full
+                                     frames unless the native qoi package is installed)
+    webp  image/webp                 lossless WebP
+    jpeg  image/jpeg                 lossy, smallest
+    png   image/png                  default, kept for backward compatibility
+
+FrameEncodeCache keeps each encoding of the last few frames keyed by frame counter,
+so concurrent viewers polling the same frame share one encode.
+"""
+
+import base64
+import io
+import struct
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Optional fast QOI encoder (pip install qoi); falls back to the pure-Python one below
+try:
+    import qoi as _qoi_lib
+    QOI_LIB_AVAILABLE = True
+except ImportError:
+    _qoi_lib = None
+    QOI_LIB_AVAILABLE = False
+
+FRAME_MEDIA_TYPES = {
+    "png": "image/png",
+    "raw": "application/octet-stream",
+    "qoi": "image/qoi",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+DEFAULT_FRAME_ENCODING = "png"
+
+# The pure-Python QOI encoder takes tens of ms on a 240x160 frame; above this it serves PNG
+QOI_FALLBACK_MAX_PIXELS = 64 * 64
+
+PNG_COMPRESS_LEVEL = 1  # zlib level 6 (PIL default) is ~5x slower for a few % smaller frames
+JPEG_QUALITY = 90
+
+_MEDIA_TYPE_ENCODINGS = {media_type: name for name, media_type in FRAME_MEDIA_TYPES.items()}
+_MEDIA_TYPE_ENCODINGS["image/jpg"] = "jpeg"
+
+
+def negotiate_encoding(format_param: Optional[str] = None, accept: Optional[str] = None) -> Optional[str]:
+    """
+    Pick a frame encoding from an explicit `format` parameter or an Accept header.
+
+    Args:
+        format_param: Encoding name (png/raw/qoi/webp/jpeg); takes precedence
+        accept: HTTP Accept header value
+
+    Returns:
+        Encoding name, or None if the client didn't ask for a binary frame
+        (the endpoint should keep its JSON/base64 response). An empty
+        format_param counts as not given.
+
+    Raises:
+        ValueError: If format_param names an unknown encoding
+    """
+    if format_param and format_param.strip():
+        encoding = format_param.strip().lower()
+        if encoding == "jpg":
+            encoding = "jpeg"
+        if encoding not in FRAME_MEDIA_TYPES:
+            raise ValueError(f"Unknown frame format '{format_param}', expected one of {sorted(FRAME_MEDIA_TYPES)}")
+        return encoding
+
+    if not accept:
+        return None
+
+    # Highest q-value wins; ties keep header order. */* and JSON mean "no preference".
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        fields = part.strip().split(";")
+        media_type = fields[0].strip().lower()
+        q = 1.0
+        for param in fields[1:]:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encoding = _MEDIA_TYPE_ENCODINGS.get(media_type)
+        if encoding and q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def resolve_encoding(encoding: str, pixels: np.ndarray) -> str:
+    """
+    Encoding actually served for a frame.
+
+    QOI without the native qoi package falls back to PNG for frames larger than
+    QOI_FALLBACK_MAX_PIXELS; every other encoding is returned unchanged.
+    """
+    if encoding == "qoi" and not QOI_LIB_AVAILABLE and pixels.shape[0] * pixels.shape[1] > QOI_FALLBACK_MAX_PIXELS:
+        return "png"
+    return encoding
+
+
+def _encode_qoi(pixels: np.ndarray) -> bytes:
+    """Encode an RGB frame as QOI (https://qoiformat.org/qoi-specification.pdf)"""
+    height, width, _ = pixels.shape
+    out = bytearray(b"qoif")
+    out += struct.pack(">IIBB", width, height, 3, 0)
+
+    index = [(0, 0, 0, 0)] * 64
+    prev = (0, 0, 0, 255)
+    run = 0
+    flat = pixels.reshape(-1, 3).tolist()
+    last = len(flat) - 1
+
+    for i, (r, g, b) in enumerate(flat):
+        px = (r, g, b, 255)
+        if px == prev:
+            run += 1
+            if run == 62 or i == last:
+                out.append(0xC0 | (run - 1))
+                run = 0
+            continue
+
+        if run:
+            out.append(0xC0 | (run - 1))
+            run = 0
+
+        slot = (r * 3 + g * 5 + b * 7 + 255 * 11) % 64
+        if index[slot] == px:
+            out.append(slot)
+        else:
+            index[slot] = px
+            dr = ((r - prev[0] + 128) & 0xFF) - 128
+            dg = ((g - prev[1] + 128) & 0xFF) - 128
+            db = ((b - prev[2] + 128) & 0xFF) - 128
+            if -2 <= dr <= 1 and -2 <= dg <= 1 and -2 <= db <= 1:
+                out.append(0x40 | ((dr + 2) << 4) | ((dg + 2) << 2) | (db + 2))
+            else:
+                dr_dg = dr - dg
+                db_dg = db - dg
+                if -32 <= dg <= 31 and -8 <= dr_dg <= 7 and -8 <= db_dg <= 7:
+                    out.append(0x80 | (dg + 32))
+                    out.append(((dr_dg + 8) << 4) | (db_dg + 8))
+                else:
+                    out += bytes((0xFE, r, g, b))
+        prev = px
+
+    out += b"\x00" * 7 + b"\x01"
+    return bytes(out)
+
+
+def encode_frame(pixels: np.ndarray, encoding: str = DEFAULT_FRAME_ENCODING) -> bytes:
+    """
+    Encode an RGB frame.
+
+    Args:
+        pixels: (H, W, 3) uint8 array
+        encoding: One of FRAME_MEDIA_TYPES
+
+    Returns:
+        Encoded bytes
+    """
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+
+    if encoding == "raw":
+        return pixels.tobytes()
+    if encoding == "qoi":
+        if QOI_LIB_AVAILABLE:
+            return _qoi_lib.encode(pixels)
+        return _encode_qoi(pixels)
+
+    buffer = io.BytesIO()
+    image = Image.fromarray(pixels)
+    if encoding == "png":
+        image.save(buffer, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+    elif encoding == "webp":
+        image.save(buffer, format="WEBP", lossless=True, method=0)
+    elif encoding == "jpeg":
+        image.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+    else:
+        raise ValueError(f"Unknown frame encoding '{encoding}'")
+    return buffer.getvalue()
+
+
+def frame_headers(pixels: np.ndarray, counter: int) -> dict:
+    """Response headers describing a binary frame"""
+    return {
+        "X-Frame-Shape": ",".join(str(dim) for dim in pixels.shape),
+        "X-Frame-Counter": str(counter),
+        "Cache-Control": "no-cache",
+    }
+
+
+class FrameEncodeCache:
+    """Encoded frames keyed by (frame counter, encoding), shared across requests"""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], bytes]" = OrderedDict()
+        self._base64: "OrderedDict[Tuple[int, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, table: OrderedDict, key, value):
+        table[key] = value
+        table.move_to_end(key)
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+
+    def get(self, counter: int, pixels: np.ndarray, encoding: str = DEFAULT_FRAME_ENCODING) -> bytes:
+        """Encoded frame, encoding it only the first time this (counter, encoding) is requested"""
+        key = (counter, encoding)
+        with self._lock:
+            data = self._entries.get(key)
+        if data is None:
+            data = encode_frame(pixels, encoding)
+            with self._lock:
+                self._store(self._entries, key, data)
+        return data
+
+    def get_base64(self, counter: int, pixels: np.ndarray, encoding: str = DEFAULT_FRAME_ENCODING) -> str:
+        """Base64 text of get(), for the JSON endpoints"""
+        key = (counter, encoding)
+        with self._lock:
+            text = self._base64.get(key)
+        if text is None:
+            text = base64.b64encode(self.get(counter, pixels, encoding)).decode()
+            with self._lock:
+                self._store(self._base64, key, text)
+        return text
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Shared-memory frame ring buffer between the game server and the frame server.
+
+The game loop writes raw RGB frames into a fixed ring of slots with no encoding.
+Readers (server/frame_server.py) attach to the same block by name and copy out
+the newest complete frame, encoding it only when they actually serve it.
+
+Each slot is guarded by a seqlock-style version counter: the writer bumps it to
+an odd value before copying pixels and back to an even value afterwards. A
+reader that sees an odd version, or a version that changed while it was copying,
+retries instead of returning a torn frame.
+
+Layout of the shared block (all little-endian):
+
+    header:  magic u32 | version u32 | slots u32 | height u32 | width u32 |
+             channels u32 | head u64 (monotonic frame counter of newest slot)
+    slots:   [seq u64 | frame_counter u64 | timestamp f64 | pixels ...] * slots
+"""
+
+import logging
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAME_RING_NAME = "pokeagent_frame_ring"
+FRAME_RING_MAGIC = 0x504B4652  # "PKFR"
+FRAME_RING_VERSION = 1
+
+DEFAULT_SLOTS = 4
+DEFAULT_HEIGHT = 160
+DEFAULT_WIDTH = 240
+DEFAULT_CHANNELS = 3
+
+_HEADER = struct.Struct("<IIIIIIQ")
+_SLOT_HEADER = struct.Struct("<QQd")
+_HEAD_OFFSET = 24  # Offset of the head counter inside the header
+_READ_RETRIES = 8
+
+
+class FrameRing:
+    """Fixed-size ring of raw RGB frames in a named shared-memory block"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+
+        magic, version, slots, height, width, channels, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != FRAME_RING_MAGIC or version != FRAME_RING_VERSION:
+            raise ValueError(f"Shared memory block '{shm.name}' is not a frame ring")
+
+        self.slots = slots
+        self.shape = (height, width, channels)
+        self.frame_bytes = height * width * channels
+        self.slot_stride = _SLOT_HEADER.size + self.frame_bytes
+
+        # One numpy view per slot so writes are a single memcpy
+        self._pixels = []
+        for i in range(slots):
+            offset = _HEADER.size + i * self.slot_stride + _SLOT_HEADER.size
+            view = np.ndarray(self.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+            self._pixels.append(view)
+
+        self._frame_counter = self.head
+
+    @staticmethod
+    def _block_size(slots: int, height: int, width: int, channels: int) -> int:
+        return _HEADER.size + slots * (_SLOT_HEADER.size + height * width * channels)
+
+    @classmethod
+    def create(cls, name: str = FRAME_RING_NAME, slots: int = DEFAULT_SLOTS,
+               height: int = DEFAULT_HEIGHT, width: int = DEFAULT_WIDTH,
+               channels: int = DEFAULT_CHANNELS) -> "FrameRing":
+        """
+        Create the ring as its writer, replacing any stale block left by a crashed run.
+
+        Args:
+            name: Shared memory block name
+            slots: Number of frame slots in the ring
+            height, width, channels: Frame geometry
+
+        Returns:
+            FrameRing that owns (and will unlink) the block
+        """
+        size = cls._block_size(slots, height, width, channels)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        shm.buf[:size] = bytes(size)
+        _HEADER.pack_into(shm.buf, 0, FRAME_RING_MAGIC, FRAME_RING_VERSION,
+                          slots, height, width, channels, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = FRAME_RING_NAME) -> Optional["FrameRing"]:
+        """
+        Attach to an existing ring as a reader.
+
+        Returns:
+            FrameRing, or None if the writer has not created the block yet
+        """
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            return None
+
+        # Readers must not unlink the block when they exit (Python < 3.13 registers
+        # every attached block with the resource tracker)
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+
+        try:
+            return cls(shm, owner=False)
+        except ValueError:
+            shm.close()
+            return None
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def head(self) -> int:
+        """Frame counter of the newest fully written frame (0 if none yet)"""
+        return struct.unpack_from("<Q", self._shm.buf, _HEAD_OFFSET)[0]
+
+    def _slot_offset(self, index: int) -> int:
+        return _HEADER.size + index * self.slot_stride
+
+    def write(self, frame) -> int:
+        """
+        Copy a frame into the next slot.
+
+        Args:
+            frame: PIL image or numpy array matching the ring geometry
+
+        Returns:
+            The frame counter assigned to this frame
+        """
+        pixels = np.asarray(frame, dtype=np.uint8)
+        if pixels.shape != self.shape:
+            raise ValueError(f"Frame shape {pixels.shape} does not match ring shape {self.shape}")
+
+        self._frame_counter += 1
+        index = self._frame_counter % self.slots
+        offset = self._slot_offset(index)
+        buf = self._shm.buf
+
+        seq = struct.unpack_from("<Q", buf, offset)[0]
+        struct.pack_into("<Q", buf, offset, seq + 1)  # odd: write in progress
+        self._pixels[index][...] = pixels
+        _SLOT_HEADER.pack_into(buf, offset, seq + 2, self._frame_counter, time.time())
+        struct.pack_into("<Q", buf, _HEAD_OFFSET, self._frame_counter)
+        return self._frame_counter
+
+    def read_latest(self, newer_than: int = 0) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Copy out the newest complete frame.
+
+        Args:
+            newer_than: Only return a frame whose counter is greater than this
+
+        Returns:
+            (frame_counter, timestamp, frame array) or None if no newer frame is available
+        """
+        buf = self._shm.buf
+        for _ in range(_READ_RETRIES):
+            head = self.head
+            if head == 0 or head <= newer_than:
+                return None
+
+            index = head % self.slots
+            offset = self._slot_offset(index)
+            seq_before, counter, timestamp = _SLOT_HEADER.unpack_from(buf, offset)
+            if seq_before & 1 or counter != head:
+                continue
+
+            frame = self._pixels[index].copy()
+
+            seq_after = struct.unpack_from("<Q", buf, offset)[0]
+            if seq_after == seq_before:
+                return counter, timestamp, frame
+
+        logger.debug("Frame ring read gave up after repeated writer contention")
+        return None
+
+    def close(self):
+        """Detach from the block; the writer also unlinks it"""
+        self._pixels = []
+        try:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"Frame ring close error: {e}")
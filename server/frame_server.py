@@ -4,7 +4,6 @@ Lightweight frame server for stream.html
 Serves only screenshot frames, separate from main game server
 """
 
-import os
 import sys
 import time
 import json
@@ -14,18 +13,24 @@ from pathlib import Path
 from PIL import Image
 import numpy as np
 import argparse
+from typing import Optional
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 try:
-    from fastapi import FastAPI, Response
+    from fastapi import FastAPI, HTTPException, Request, Response
     from fastapi.middleware.cors import CORSMiddleware
     import uvicorn
 except ImportError:
     print("❌ FastAPI not available. Install with: pip install fastapi uvicorn")
     sys.exit(1)
 
+from server.frame_codec import (
+    FRAME_MEDIA_TYPES, FrameEncodeCache, encode_frame, frame_headers, negotiate_encoding, resolve_encoding
+)
+from server.frame_ring import FrameRing, FRAME_RING_NAME
+
 app = FastAPI(title="Pokemon Frame Server")
 
 # Add CORS middleware
@@ -38,43 +43,79 @@ app.add_middleware(
 )
 
 # Global state
-current_frame = None
+current_frame = None  # Base64 PNG of the last frame actually served
 frame_lock = threading.Lock()
 frame_counter = 0
 last_update = time.time()
 
-# Frame cache for shared memory communication
-# Use cache directory instead of /tmp
-CACHE_DIR = ".pokeagent_cache"
-os.makedirs(CACHE_DIR, exist_ok=True)
-FRAME_CACHE_FILE = os.path.join(CACHE_DIR, "frame_cache.json")
+# Shared-memory frame ring written by server/app.py
+frame_ring = None
+ring_lock = threading.Lock()  # Serializes attach/read/close of frame_ring between the updater thread and requests
+latest_frame = None  # (counter, raw RGB pixels) of the newest frame, always replaced as one tuple
+encoded_counter = 0
 FRAME_UPDATE_INTERVAL = 0.025  # 40 FPS
+RING_STALE_SECONDS = 2.0  # Reattach if no new frame arrives for this long
+frame_encode_cache = FrameEncodeCache()  # Binary encodings, shared by concurrent viewers
 
-def load_frame_from_cache():
-    """Load the latest frame from shared cache file"""
-    global current_frame, frame_counter, last_update
+def load_frame_from_ring():
+    """Pull the newest raw frame from the shared-memory ring (no encoding)"""
+    global frame_ring, latest_frame, last_update
     
-    try:
-        if os.path.exists(FRAME_CACHE_FILE):
-            with open(FRAME_CACHE_FILE, 'r') as f:
-                data = json.load(f)
-                
-            # Check if frame is newer
-            cache_counter = data.get('frame_counter', 0)
-            if cache_counter > frame_counter:
+    with ring_lock:
+        try:
+            if frame_ring is None:
+                frame_ring = FrameRing.attach()
+                if frame_ring is None:
+                    return
+            
+            latest = latest_frame
+            result = frame_ring.read_latest(newer_than=latest[0] if latest else 0)
+            if result:
+                counter, timestamp, pixels = result
                 with frame_lock:
-                    current_frame = data.get('frame_data')
-                    frame_counter = cache_counter
-                    last_update = time.time()
+                    latest_frame = (counter, pixels)
+                    last_update = timestamp
+            elif time.time() - last_update > RING_STALE_SECONDS:
+                # Game server may have restarted with a fresh ring - reattach
+                reset_frame_ring()
                     
-    except Exception as e:
-        pass  # Silently handle cache read errors
+        except Exception as e:
+            reset_frame_ring()
+
+def reset_frame_ring():
+    """Drop the current ring attachment so the next poll reattaches from scratch (caller holds ring_lock)"""
+    global frame_ring, latest_frame, encoded_counter, last_update
+    
+    if frame_ring is not None:
+        frame_ring.close()
+    frame_ring = None
+    with frame_lock:
+        latest_frame = None
+        encoded_counter = 0
+        last_update = time.time()
+
+def encode_latest_frame():
+    """PNG/base64-encode the latest raw frame, only if it changed since the last request"""
+    global current_frame, frame_counter, encoded_counter
+    
+    with frame_lock:
+        latest = latest_frame
+        if latest is None or latest[0] == encoded_counter:
+            return
+    counter, pixels = latest
+    
+    img_str = base64.b64encode(encode_frame(pixels, "png")).decode()
+    
+    with frame_lock:
+        current_frame = img_str
+        frame_counter = counter
+        encoded_counter = counter
 
 def frame_updater():
     """Background thread to periodically check for new frames"""
     while True:
         try:
-            load_frame_from_cache()
+            load_frame_from_ring()
             time.sleep(FRAME_UPDATE_INTERVAL)
         except Exception:
             time.sleep(0.1)
@@ -85,12 +126,36 @@ async def health_check():
     return {"status": "ok", "server": "frame_server"}
 
 @app.get("/frame")
-async def get_frame():
-    """Get the current game frame"""
+async def get_frame(request: Request, format: Optional[str] = None):
+    """
+    Get the current game frame
+    
+    Returns JSON with a base64 PNG by default; format=raw|qoi|webp|jpeg|png (or a matching
+    Accept header) returns the encoded frame as the response body instead.
+    """
     global current_frame, frame_counter, last_update
     
     try:
-        load_frame_from_cache()  # Try to get latest frame
+        encoding = negotiate_encoding(format, request.headers.get("accept"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        load_frame_from_ring()  # Try to get latest frame
+        
+        if encoding:
+            latest = latest_frame
+            if latest is None:
+                return Response(status_code=204)
+            counter, pixels = latest
+            encoding = resolve_encoding(encoding, pixels)
+            return Response(
+                content=frame_encode_cache.get(counter, pixels, encoding),
+                media_type=FRAME_MEDIA_TYPES[encoding],
+                headers=frame_headers(pixels, counter)
+            )
+        
+        encode_latest_frame()
         
         with frame_lock:
             if current_frame:
@@ -133,8 +198,8 @@ async def get_status():
     return {
         "frame_count": frame_counter,
         "last_update": last_update,
-        "cache_file": FRAME_CACHE_FILE,
-        "cache_exists": os.path.exists(FRAME_CACHE_FILE)
+        "ring_name": FRAME_RING_NAME,
+        "ring_attached": frame_ring is not None
     }
 
 if __name__ == "__main__":
@@ -145,7 +210,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     print(f"🖼️ Starting Pokemon Frame Server on {args.host}:{args.port}")
-    print(f"📁 Frame cache: {FRAME_CACHE_FILE}")
+    print(f"📁 Frame ring: {FRAME_RING_NAME}")
     
     # Start background frame updater
     frame_thread = threading.Thread(target=frame_updater, daemon=True)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Delta encoding for the pushed state stream (GET /state_stream in server/app.py).
+
+The server sends one full snapshot and then JSON-patch style operations
+(RFC 6902 "add" / "remove" / "replace" with RFC 6901 paths) against the
+previous snapshot. StateBroadcast is the server side: it builds and diffs the
+state once per tick off the event loop and fans the messages out to every
+connected client. StateMirror is the client side: it follows the stream in a
+background thread and applies each delta to a local copy of the state.
+
+Lists of equal length are diffed element by element; lists that change length
+are replaced whole, which keeps the ops simple and is what the state mostly
+contains (fixed-size tile grids, small party/item lists).
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(token) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[Dict[str, Any]]):
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                _diff(old[key], value, child, ops)
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            _diff(old_item, new_item, f"{path}/{index}", ops)
+    elif type(old) is not type(new) or old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def diff_states(old: Any, new: Any) -> List[Dict[str, Any]]:
+    """
+    Compute the operations that turn `old` into `new`.
+
+    Args:
+        old, new: JSON-compatible documents (dicts, lists, scalars)
+
+    Returns:
+        List of {"op", "path"[, "value"]} operations; empty if nothing changed
+    """
+    ops: List[Dict[str, Any]] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def apply_delta(document: Any, ops: List[Dict[str, Any]]) -> Any:
+    """
+    Apply operations from diff_states() to a document in place.
+
+    Returns:
+        The updated document (a new object only if the root itself was replaced)
+    """
+    for op in ops:
+        path = op["path"]
+        if path == "":
+            document = op["value"]
+            continue
+
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+
+        last = tokens[-1]
+        if isinstance(parent, list):
+            last = int(last)
+
+        if op["op"] == "remove":
+            del parent[last]
+        elif op["op"] in ("add", "replace"):
+            parent[last] = op["value"]
+        else:
+            raise ValueError(f"Unsupported delta op: {op['op']}")
+
+    return document
+
+
+class StateBroadcast:
+    """
+    One state builder shared by every /state_stream subscriber.
+
+    While anyone is subscribed, a single task calls `build` every `interval` seconds in a
+    worker thread (so memory reads and encoding never block the event loop), diffs the
+    result against the previous tick there too, and publishes the snapshot/delta message
+    text to all subscribers. A subscriber that falls further behind than `history`
+    deltas gets a fresh snapshot instead.
+    """
+
+    def __init__(self, build: Callable[[], Dict[str, Any]], interval: float = 0.1,
+                 history: int = 64, heartbeat: float = 1.0,
+                 on_idle: Optional[Callable[["StateBroadcast"], None]] = None):
+        """
+        Args:
+            build: Returns the current JSON-compatible state document; runs in a worker thread
+            interval: Seconds between builds
+            history: Recent delta messages kept for subscribers that are a few ticks behind
+            heartbeat: Seconds without a change before a subscriber gets a heartbeat
+            on_idle: Called with this broadcast when its last subscriber leaves
+        """
+        self.build = build
+        self.on_idle = on_idle
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.subscribers = 0
+        self._document = None
+        self._seq = 0
+        self._snapshot = None  # (seq, message text), encoded on first request
+        self._deltas: "deque" = deque(maxlen=history)  # (seq, message text)
+        self._published = asyncio.Event()
+        self._task = None
+
+    def _tick(self, previous, seq: int):
+        """
+        Build and diff one state (worker thread).
+
+        Returns:
+            (document, delta message text for `seq`); the text is None for the first
+            document and "" if nothing changed
+        """
+        current = self.build()
+        if previous is None:
+            return current, None
+        ops = diff_states(previous, current)
+        return current, (json.dumps({"type": "delta", "seq": seq, "ops": ops}) if ops else "")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self.subscribers:
+                try:
+                    current, delta = await loop.run_in_executor(None, self._tick, self._document, self._seq + 1)
+                    if delta is None or delta:
+                        if delta:
+                            self._seq += 1
+                            self._deltas.append((self._seq, delta))
+                        self._document = current
+                        self._snapshot = None
+                        published, self._published = self._published, asyncio.Event()
+                        published.set()
+                except Exception as e:
+                    logger.error(f"State stream error: {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            self._task = None
+            self._document = None
+            self._snapshot = None
+            self._deltas.clear()
+
+    def _snapshot_message(self) -> str:
+        if self._snapshot is None or self._snapshot[0] != self._seq:
+            self._snapshot = (self._seq, json.dumps({"type": "snapshot", "seq": self._seq, "state": self._document}))
+        return self._snapshot[1]
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Message texts for one subscriber: a snapshot, then deltas and heartbeats"""
+        self.subscribers += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        try:
+            while self._document is None:
+                await self._published.wait()
+            seq = self._seq
+            yield self._snapshot_message()
+
+            while True:
+                published = self._published
+                if self._seq == seq:
+                    try:
+                        await asyncio.wait_for(published.wait(), timeout=self.heartbeat)
+                    except asyncio.TimeoutError:
+                        # Heartbeat so clients can tell an idle game from a dead connection
+                        yield json.dumps({"type": "heartbeat", "seq": seq, "timestamp": time.time()})
+                        continue
+                if self._document is None:
+                    await self._published.wait()  # builder restarted; wait for its first state
+                    continue
+                pending = [(delta_seq, text) for delta_seq, text in self._deltas if delta_seq > seq]
+                if pending and pending[0][0] == seq + 1:
+                    for delta_seq, text in pending:
+                        yield text
+                        seq = delta_seq
+                elif self._seq != seq:
+                    # Too far behind (or the builder restarted) - start over from a snapshot
+                    seq = self._seq
+                    yield self._snapshot_message()
+        finally:
+            self.subscribers -= 1
+            if not self.subscribers and self.on_idle is not None:
+                self.on_idle(self)
+
+
+class StateMirror:
+    """
+    Local copy of the server state kept current by GET /state_stream.
+
+    Usage:
+        mirror = StateMirror("http://localhost:8000")
+        mirror.start()
+        state = mirror.get_state()  # None until the first snapshot arrives
+
+        response = requests.post(f"{server_url}/action", json={"buttons": ["A"]})
+        mirror.action_posted(response.json()["action_seq"])
+        mirror.get_state()  # None until the mirror has seen that action
+    """
+
+    def __init__(self, server_url: str, include_screenshot: bool = False, max_age: float = 2.0):
+        """
+        Args:
+            server_url: Base URL of server/app.py
+            include_screenshot: Ask the server to include visual.screenshot_base64
+                (off by default; frames are cheaper to fetch separately)
+            max_age: Seconds without a message (deltas or heartbeats) before the
+                mirror is considered stale and get_state() returns None
+        """
+        self.server_url = server_url.rstrip("/")
+        self.include_screenshot = include_screenshot
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._state = None
+        self._seq = -1
+        self._min_action_seq = 0
+        self._last_message_time = 0.0
+        self._running = False
+        self._thread = None
+        self.frame = None  # (frame counter, base64 PNG) last fetched by server/client.py fetch_state
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="StateMirror")
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    @property
+    def connected(self) -> bool:
+        return self._state is not None and time.time() - self._last_message_time < self.max_age
+
+    def action_posted(self, action_seq: Optional[int]):
+        """Record the action_seq returned by POST /action; older mirrored state is then stale"""
+        if action_seq is None:
+            return
+        with self._lock:
+            self._min_action_seq = max(self._min_action_seq, action_seq)
+
+    def get_state(self) -> Optional[Dict[str, Any]]:
+        """
+        Deep copy of the latest mirrored state, or None if not connected or the
+        state was built before the last posted action
+        """
+        with self._lock:
+            if not self.connected or self._state.get("action_seq", 0) < self._min_action_seq:
+                return None
+            return copy.deepcopy(self._state)
+
+    def _handle_message(self, message: Dict[str, Any]):
+        with self._lock:
+            self._last_message_time = time.time()
+            kind = message.get("type")
+            if kind == "snapshot":
+                self._state = message["state"]
+                self._seq = message["seq"]
+            elif kind == "delta":
+                if self._state is None or message["seq"] != self._seq + 1:
+                    # Missed a message; drop the mirror until the next reconnect snapshot
+                    logger.warning(f"State stream out of sync (have {self._seq}, got {message['seq']})")
+                    self._state = None
+                    raise ConnectionError("state stream out of sync")
+                self._state = apply_delta(self._state, message["ops"])
+                self._seq = message["seq"]
+
+    def _run(self):
+        import requests
+
+        params = {"screenshot": str(self.include_screenshot).lower()}
+        while self._running:
+            try:
+                with requests.get(f"{self.server_url}/state_stream", params=params,
+                                  stream=True, timeout=(5, 30)) as response:
+                    response.raise_for_status()
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not self._running:
+                            break
+                        if line and line.startswith("data: "):
+                            self._handle_message(json.loads(line[6:]))
+            except Exception as e:
+                logger.debug(f"State stream disconnected: {e}")
+                with self._lock:
+                    self._state = None
+                if self._running:
+                    time.sleep(1.0)
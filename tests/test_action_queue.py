@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test the server button queue and its checked movement batches (server/action_queue.py)
+"""
+
+from server.action_queue import ActionQueue
+
+
+def _drain(queue, positions):
+    """Pop everything, reporting positions[i] as the player position before the i-th pop"""
+    pressed = []
+    for position in positions:
+        button = queue.pop(read_position=lambda: position)
+        if button is None:
+            break
+        pressed.append(button)
+    return pressed
+
+
+def test_unchecked_buttons_are_plain_fifo():
+    queue = ActionQueue()
+    assert not queue.extend(["A", "B"])
+    assert not queue.extend(["UP", "UP"], expected_positions=[(0, 1)])  # Wrong length is ignored
+    assert len(queue) == 4 and list(queue) == ["A", "B", "UP", "UP"]
+    assert _drain(queue, [(9, 9)] * 5) == ["A", "B", "UP", "UP"]
+    assert queue.pop() is None
+
+
+def test_batch_runs_while_steps_land():
+    queue = ActionQueue()
+    assert queue.extend(["UP", "UP", "RIGHT"], expected_positions=[[5, 4], [5, 3], [6, 3]])
+    assert queue.expected_positions() == [(5, 4), (5, 3), (6, 3)]
+    # The first press is never checked; each later one checks where the previous step landed
+    assert _drain(queue, [(5, 5), (5, 4), (5, 3)]) == ["UP", "UP", "RIGHT"]
+    assert queue.batches_aborted == 0
+
+
+def test_deviation_drops_rest_of_batch_only():
+    queue = ActionQueue()
+    queue.extend(["UP", "UP", "UP"], expected_positions=[(5, 4), (5, 3), (5, 2)])
+    queue.extend(["A"])
+    # Blocked after the first step: the player is still on (5, 5)
+    assert _drain(queue, [(5, 5), (5, 5), (5, 5)]) == ["UP", "A"]
+    assert queue.batches_aborted == 1 and len(queue) == 0
+
+
+def test_consecutive_batches_are_checked_separately():
+    queue = ActionQueue()
+    queue.extend(["LEFT", "LEFT"], expected_positions=[(4, 5), (3, 5)])
+    queue.extend(["DOWN", "DOWN"], expected_positions=[(3, 6), (3, 7)])
+    # The last step of the first batch isn't checked against the second batch's first press
+    assert _drain(queue, [(5, 5), (4, 5), (0, 0), (3, 6)]) == ["LEFT", "LEFT", "DOWN", "DOWN"]
+    queue.clear()
+    assert queue.pop() is None
+
+
+def test_path_segments_stop_at_risky_tiles():
+    from agent.action import _movement_segment, take_planned_positions
+
+    grid = {(x, y): '.' for x in range(8) for y in range(3)}
+    grid[(5, 0)] = '~'
+    grid[(3, 2)] = 'N'
+    path = [(x, 0) for x in range(8)]
+    # Stops on the grass tile: an encounter there would swallow the remaining presses
+    assert _movement_segment(path, grid, "TEST") == ['RIGHT'] * 5
+    assert take_planned_positions(['RIGHT'] * 5) == [(1, 0), (2, 0), (3, 0), (4, 0), (5, 0)]
+    assert take_planned_positions(['RIGHT'] * 5) is None
+
+    # Stops on the first tile next to the NPC at (3, 2)
+    path = [(x, 1) for x in range(8)]
+    assert _movement_segment(path, grid, "TEST") == ['RIGHT'] * 3
+    assert take_planned_positions(['UP']) is None
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test frame encoding negotiation and the per-frame encode cache (server/frame_codec.py)
+"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from server import frame_codec
+from server.frame_codec import FrameEncodeCache, encode_frame, negotiate_encoding, resolve_encoding
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    tiles = rng.integers(0, 255, (20, 30, 3), dtype=np.uint8)
+    return np.repeat(np.repeat(tiles, 8, axis=0), 8, axis=1)  # 160x240 blocky "game" frame
+
+
+def test_negotiation():
+    assert negotiate_encoding() is None
+    assert negotiate_encoding(accept="application/json") is None
+    assert negotiate_encoding(accept="*/*") is None
+    assert negotiate_encoding("WebP") == "webp"
+    assert negotiate_encoding("jpg") == "jpeg"
+    assert negotiate_encoding(accept="image/png;q=0.5, application/octet-stream") == "raw"
+    assert negotiate_encoding("qoi", accept="image/png") == "qoi", "format parameter wins over Accept"
+    assert negotiate_encoding("") is None, "Empty format means no preference"
+    assert negotiate_encoding("  ", accept="image/webp") == "webp"
+    with pytest.raises(ValueError):
+        negotiate_encoding("gif")
+
+
+def test_lossless_encodings_roundtrip():
+    frame = _frame()
+    assert encode_frame(frame, "raw") == frame.tobytes()
+    for encoding in ("png", "webp", "qoi"):
+        decoded = np.array(Image.open(io.BytesIO(encode_frame(frame, encoding))).convert("RGB"))
+        assert np.array_equal(decoded, frame), f"{encoding} should be lossless"
+
+
+def test_cache_encodes_once_per_counter():
+    frame = _frame()
+    cache = FrameEncodeCache(max_entries=2)
+    first = cache.get(1, frame, "webp")
+    assert cache.get(1, np.zeros_like(frame), "webp") is first, "Same counter must reuse the encode"
+    assert cache.get(2, np.zeros_like(frame), "webp") is not first
+    assert cache.get_base64(2, frame, "webp") == cache.get_base64(2, frame, "webp")
+
+
+def test_pure_python_qoi_limited_to_small_frames(monkeypatch):
+    monkeypatch.setattr(frame_codec, "QOI_LIB_AVAILABLE", False)
+    assert resolve_encoding("qoi", _frame()) == "png", "Full frames skip the slow pure-Python QOI encoder"
+    assert resolve_encoding("qoi", np.zeros((16, 16, 3), dtype=np.uint8)) == "qoi"
+    assert resolve_encoding("webp", _frame()) == "webp"
+
+    monkeypatch.setattr(frame_codec, "QOI_LIB_AVAILABLE", True)
+    assert resolve_encoding("qoi", _frame()) == "qoi"
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the shared-memory frame ring used between server/app.py and server/frame_server.py
+"""
+
+import uuid
+
+import numpy as np
+import pytest
+
+from server.frame_ring import FrameRing
+
+
+def _ring_name():
+    return f"pokeagent_test_ring_{uuid.uuid4().hex[:8]}"
+
+
+def test_write_and_read_latest():
+    """Reader attached by name sees the newest frame written by the owner"""
+    name = _ring_name()
+    writer = FrameRing.create(name=name, slots=3)
+    reader = FrameRing.attach(name=name)
+    try:
+        assert reader is not None
+        assert reader.read_latest() is None, "Empty ring should have no frame"
+
+        for value in range(1, 6):
+            frame = np.full((160, 240, 3), value, dtype=np.uint8)
+            counter = writer.write(frame)
+
+        assert counter == 5
+        result = reader.read_latest()
+        assert result is not None
+        read_counter, timestamp, pixels = result
+        assert read_counter == 5
+        assert timestamp > 0
+        assert pixels.shape == (160, 240, 3)
+        assert np.all(pixels == 5)
+
+        # Nothing newer than what we already have
+        assert reader.read_latest(newer_than=5) is None
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_attach_missing_ring_returns_none():
+    """Attaching before the writer exists is not an error"""
+    assert FrameRing.attach(name=_ring_name()) is None
+
+
+def test_rejects_wrong_shape():
+    """Frames that don't match the ring geometry are refused"""
+    writer = FrameRing.create(name=_ring_name(), slots=2)
+    try:
+        with pytest.raises(ValueError):
+            writer.write(np.zeros((10, 10, 3), dtype=np.uint8))
+    finally:
+        writer.close()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test that the incrementally patched location grid matches a full rebuild
+"""
+
+from pokemon_env.enums import MetatileBehavior
+from utils.map_stitcher import MapStitcher
+
+BEHAVIORS = [MetatileBehavior.NORMAL, MetatileBehavior.TALL_GRASS, MetatileBehavior.NORMAL,
+             MetatileBehavior.DEEP_WATER]
+
+
+def _view(px, py, seed=0, size=7):
+    """Mixed walls/grass/water, so frontier '?' cells appear and flip as tiles get rewritten"""
+    half = size // 2
+    rows = []
+    for dy in range(-half, half + 1):
+        row = []
+        for dx in range(-half, half + 1):
+            x, y = px + dx, py + dy
+            mix = (x * 5 + y * 3 + seed) % 7
+            row.append(((x * 7 + y * 3) & 0x3FF, BEHAVIORS[mix % len(BEHAVIORS)], 1 if mix == 0 else 0, 3))
+        rows.append(row)
+    return rows
+
+
+def _full_rebuild(stitcher, simplified):
+    cached = stitcher._location_grid_cache
+    stitcher._location_grid_cache = {}
+    try:
+        return stitcher.get_location_grid("Route 101", simplified)
+    finally:
+        stitcher._location_grid_cache = cached
+
+
+def test_incremental_grid_matches_full_rebuild(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stitcher = MapStitcher(save_file=str(tmp_path / "map.json"))
+
+    # Walk out in every direction (growing the explored bounds), then revisit
+    # cells with different tiles so symbols and frontier cells change in place
+    steps = [(10, 10, 0), (11, 10, 0), (14, 10, 0), (14, 7, 0), (14, 13, 0), (8, 13, 0),
+             (6, 6, 0), (11, 10, 3), (10, 10, 5), (14, 7, 1), (6, 6, 6), (7, 9, 2)]
+
+    entry = None
+    for i, (x, y, seed) in enumerate(steps):
+        stitcher.update_map_area(0, 1, "Route 101", _view(x, y, seed), (x, y), float(i))
+        revision = stitcher.location_grid_revision("Route 101")
+
+        incremental = stitcher.get_location_grid("Route 101")
+        assert incremental == _full_rebuild(stitcher, True), f"Simplified grid diverged after step {i}"
+        assert stitcher.get_location_grid("Route 101", simplified=False) == _full_rebuild(stitcher, False), \
+            f"Raw grid diverged after step {i}"
+        assert stitcher.location_grid_revision("Route 101") != revision, "Every update here changes the grid"
+
+        current = stitcher._location_grid_cache[(1, True)]
+        if entry is not None:
+            assert current is entry, "The cached grid should be patched, not rebuilt"
+        entry = current
+
+    assert "?" in incremental.values()
+    assert "#" in incremental.values()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test MapStitcher's journal + snapshot persistence
+"""
+
+import json
+import shutil
+
+from pokemon_env.enums import MetatileBehavior
+from utils.map_stitcher import MapStitcher
+
+
+def _view(px, py, size=15):
+    half = size // 2
+    return [[((px + dx) * 7 + (py + dy) * 3 & 0x3FF, MetatileBehavior.NORMAL, (px + dx + py + dy) % 2, 3)
+             for dx in range(-half, half + 1)] for dy in range(-half, half + 1)]
+
+
+def _walk(stitcher, positions, map_number=1):
+    for i, (x, y) in enumerate(positions):
+        stitcher.update_map_area(0, map_number, "Route 101", _view(x, y), (x, y), float(i))
+
+
+def test_incremental_saves_append_and_replay(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    save_file = tmp_path / "map.json"
+    stitcher = MapStitcher(save_file=str(save_file))
+
+    _walk(stitcher, [(10, 10), (11, 10)])
+    stitcher.save_to_file()  # first save writes the snapshot
+    snapshot = save_file.read_bytes()
+
+    _walk(stitcher, [(12 + step, 10) for step in range(10)])
+    stitcher.save_to_file()
+    assert save_file.read_bytes() == snapshot, "Incremental save should not rewrite the snapshot"
+    records = [json.loads(line) for line in stitcher.journal_file.read_text().splitlines()]
+    assert records[0]["op"] == "header"
+    assert any(record["op"] == "tiles" for record in records[1:])
+
+    reloaded = MapStitcher(save_file=str(save_file))
+    assert reloaded.get_location_grid("Route 101") == stitcher.get_location_grid("Route 101")
+    assert reloaded.map_areas[1].explored_bounds == stitcher.map_areas[1].explored_bounds
+    assert reloaded.map_areas[1].player_last_position == (21, 10)
+
+
+def test_exported_snapshot_does_not_replay_later_journal(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    save_file = tmp_path / "map.json"
+    exported = tmp_path / "manual_save_map_stitcher.json"
+    stitcher = MapStitcher(save_file=str(save_file))
+    _walk(stitcher, [(10, 10)])
+    stitcher.save_to_file()
+    stitcher.export_snapshot(str(exported))
+
+    _walk(stitcher, [(30, 10)])
+    stitcher.save_to_file()
+    assert stitcher.map_areas[1].explored_bounds["max_x"] == 37
+
+    # Restoring the saved state copies its snapshot over the cache file; the journal is stale now
+    shutil.copy2(exported, save_file)
+    reloaded = MapStitcher(save_file=str(save_file))
+    assert reloaded.map_areas[1].explored_bounds["max_x"] == 17
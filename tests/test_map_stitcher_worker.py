@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test the background map stitcher worker
+"""
+
+import threading
+
+from pokemon_env.enums import MetatileBehavior
+from utils.map_stitcher import MapStitcher
+from utils.map_stitcher_worker import MapSnapshot, MapStitcherWorker, coalesce_snapshots
+
+
+def _view(px, py, size=15):
+    half = size // 2
+    return [[((px + dx) * 7 + (py + dy) * 3 & 0x3FF, MetatileBehavior.NORMAL, 0, 3)
+             for dx in range(-half, half + 1)] for dy in range(-half, half + 1)]
+
+
+def _snapshot(x, y, map_number=1):
+    return MapSnapshot(map_bank=0, map_number=map_number, coords=(x, y), tiles=_view(x, y),
+                       location_name="Route 101", current_location="Route 101")
+
+
+class _Reader:
+    """Just what the worker needs from PokemonEmeraldReader"""
+
+    def __init__(self, stitcher):
+        self._map_stitcher = stitcher
+        self.map_stitcher_lock = threading.RLock()
+        self.applied = []
+
+    def apply_map_snapshot(self, snapshot, finalize=True):
+        self.applied.append((snapshot.coords, finalize))
+        self._map_stitcher.update_map_area(snapshot.map_bank, snapshot.map_number, snapshot.location_name,
+                                           snapshot.tiles, snapshot.coords, snapshot.timestamp)
+
+
+def test_coalesce_keeps_every_distinct_position():
+    snapshots = [_snapshot(10, 10), _snapshot(10, 10), _snapshot(11, 10), _snapshot(10, 10)]
+    coalesced = coalesce_snapshots(snapshots)
+    assert [s.coords for s in coalesced] == [(10, 10), (11, 10), (10, 10)]
+    assert coalesced[0] is snapshots[1]
+
+
+def test_burst_is_stitched_and_published(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reader = _Reader(MapStitcher(save_file=str(tmp_path / "map.json")))
+    worker = MapStitcherWorker(reader)
+
+    version = worker.process([_snapshot(10, 10), _snapshot(11, 10), _snapshot(11, 10)])
+    assert reader.applied == [((10, 10), False), ((11, 10), True)]
+    assert version.version == 1 and version.coords == (11, 10)
+    assert version.grid == reader._map_stitcher.get_location_grid("Route 101")
+    try:
+        version.grid[(0, 0)] = "#"
+        assert False, "Published grids should be read-only"
+    except TypeError:
+        pass
+
+
+def test_worker_thread_drains_queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reader = _Reader(MapStitcher(save_file=str(tmp_path / "map.json")))
+    worker = MapStitcherWorker(reader)
+    worker.start()
+    try:
+        for x in range(10, 15):
+            worker.submit(_snapshot(x, 10))
+        assert worker.flush(timeout=5.0)
+        assert worker.latest().coords == (14, 10)
+        assert [coords for coords, _ in reader.applied] == [(x, 10) for x in range(10, 15)]
+    finally:
+        worker.stop()
+
+
+def test_full_queue_drops_oldest():
+    worker = MapStitcherWorker(_Reader(None), max_pending=2)
+    assert worker.submit(_snapshot(1, 1))
+    assert worker.submit(_snapshot(2, 1))
+    assert not worker.submit(_snapshot(3, 1))
+    assert worker.dropped == 1
+    assert [s.coords for s in worker._drain(worker._queue.get_nowait())] == [(2, 1), (3, 1)]
+
+
+def test_grid_revision_only_changes_with_the_grid(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reader = _Reader(MapStitcher(save_file=str(tmp_path / "map.json")))
+    worker = MapStitcherWorker(reader)
+
+    first = worker.process([_snapshot(10, 10)])
+    # Same view stitched again: tiles are rewritten but the grid is the same
+    again = worker.process([_snapshot(10, 10)])
+    assert first.grid_revision > 0 and again.grid_revision == first.grid_revision
+    moved = worker.process([_snapshot(13, 10)])
+    assert moved.grid_revision != first.grid_revision
+    assert reader._map_stitcher.location_grid_revision("Route 101") == moved.grid_revision
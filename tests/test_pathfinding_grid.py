@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test the grid-array A* engine in utils/pathfinding.py
+"""
+
+from utils.pathfinding import (
+    STITCHED_RULES,
+    STITCHED_RULES_WITH_WARPS,
+    PassabilityCache,
+    PassabilityGrid,
+    PathCache,
+    PathRules,
+    astar,
+    distance_field,
+    grid_astar,
+    path_to_directions,
+    step_allowed,
+)
+
+
+def _grid(rows):
+    return {(x, y): symbol for y, row in enumerate(rows) for x, symbol in enumerate(row) if symbol != ' '}
+
+
+def test_finds_shortest_path_around_walls():
+    grid = _grid([
+        "....",
+        ".##.",
+        ".#..",
+        "....",
+    ])
+    path = astar((0, 0), (2, 2), grid)
+    assert path[0] == (0, 0) and path[-1] == (2, 2)
+    assert len(path) == 7
+    assert astar((0, 0), (1, 1), grid) is None
+
+
+def test_ledges_are_one_way():
+    grid = _grid([
+        "...",
+        "↓↓↓",
+        "...",
+    ])
+    assert path_to_directions(astar((1, 0), (1, 2), grid)) == ['DOWN', 'DOWN']
+    assert astar((1, 2), (1, 0), grid) is None
+    # Can't turn around or sidestep while standing on a ledge
+    assert astar((0, 1), (2, 1), grid) is None
+
+
+def test_warp_goal_is_reachable_but_not_passed_through():
+    grid = _grid([
+        ".D.",
+        "...",
+    ])
+    assert astar((0, 1), (1, 0), grid, avoid_warps=True)[-1] == (1, 0)
+    path = astar((0, 0), (2, 0), grid, avoid_warps=True)
+    assert (1, 0) not in path
+    assert len(astar((0, 0), (2, 0), grid, avoid_warps=False)) == 3
+
+
+def test_costs_blocked_cells_and_multiple_targets():
+    rules = PathRules(walkable=frozenset('.~'), costs={'~': 5.0})
+    grid = _grid([
+        ".~.",
+        "...",
+    ])
+    passability = PassabilityGrid(grid, rules)
+    result = grid_astar(passability, (0, 0), [(2, 0)], heuristic_target=(2, 0))
+    assert (1, 0) not in result.path and result.cost == 4.0
+
+    blocked = PassabilityGrid(grid, rules, blocked=[(1, 1)])
+    assert grid_astar(blocked, (0, 0), [(2, 0)]).path == [(0, 0), (1, 0), (2, 0)]
+
+    # Nearest of several targets wins; searches reuse the same buffers
+    result = grid_astar(passability, (0, 0), [(2, 1), (0, 1)], collect_reached=True)
+    assert result.path == [(0, 0), (0, 1)]
+    assert (0, 0) in result.reached
+
+
+def test_open_cells_are_restored_after_search():
+    grid = _grid(["..#.."])
+    passability = PassabilityGrid(grid, STITCHED_RULES)
+    assert grid_astar(passability, (0, 0), [(2, 0)], open_cells=[(2, 0)]).path[-1] == (2, 0)
+    assert grid_astar(passability, (0, 0), [(2, 0)]).path is None
+    assert grid_astar(passability, (0, 0), [(4, 0)]).path is None
+
+
+def test_passability_cache_reuses_compiled_grids():
+    grid = _grid(["...", ".#.", "..."])
+    cache = PassabilityCache(max_entries=2)
+
+    first = cache.get(("Route 101", 1, 0), grid, STITCHED_RULES)
+    assert cache.get(("Route 101", 1, 0), grid, STITCHED_RULES) is first
+    assert cache.hits == 1 and cache.misses == 1
+
+    # Rules are part of the key, and a new grid version compiles again
+    assert cache.get(("Route 101", 1, 0), grid, STITCHED_RULES_WITH_WARPS) is not first
+    assert cache.get(("Route 101", 2, 0), grid, STITCHED_RULES) is not first
+    assert len(cache) == 2, "Least recently used grid is evicted"
+    assert cache.get(("Route 101", 1, 0), grid, STITCHED_RULES) is not first
+
+    # No key: always compiled, never stored
+    assert cache.get(None, grid, STITCHED_RULES) is not cache.get(None, grid, STITCHED_RULES)
+    assert len(cache) == 2
+
+    # A cached grid stays usable across searches with different open cells
+    shared = cache.get("doors", _grid(["..#.."]), STITCHED_RULES)
+    assert grid_astar(shared, (0, 0), [(2, 0)], open_cells=[(2, 0)]).path[-1] == (2, 0)
+    assert grid_astar(cache.get("doors", {}, STITCHED_RULES), (0, 0), [(2, 0)]).path is None
+
+
+def test_distance_field_matches_per_target_searches():
+    rules = PathRules(walkable=frozenset('.~↓'), costs={'~': 3.0}, exit={'↓': 2})
+    grid = _grid([
+        "..~...",
+        ".##.#.",
+        ".~..#?",
+        "↓↓....",
+        "......",
+    ])
+    passability = PassabilityGrid(grid, rules)
+    field = distance_field(passability, (0, 0), goal_cells=[(5, 2)])
+    for pos in grid:
+        result = grid_astar(passability, (0, 0), [pos], open_cells=[(5, 2)] if pos == (5, 2) else ())
+        if result.path is None:
+            assert pos not in field and field.distance(pos) is None
+            continue
+        assert field.distance(pos) == result.cost
+        path = field.path_to(pos)
+        assert path[0] == (0, 0) and path[-1] == pos
+        if len(path) > 1:
+            assert field.first_step(pos) == path_to_directions(path)[0]
+    # Goal cells are reachable but not walked through
+    assert field.distance((5, 2)) is not None
+    assert field.nearest([(5, 0), (0, 4)]) == (0, 4)
+    assert field.nearest([(5, 0), (0, 4)], key=lambda pos, dist: pos[1] * 10 + dist) == (5, 0)
+    assert field.nearest([(1, 1)]) is None
+    assert distance_field(passability, (9, 9)) is None
+
+
+def test_path_cache_returns_suffix_and_repairs_one_tile_deviation():
+    rules = PathRules(walkable=frozenset('.↓'), exit={'↓': 2})
+    grid = _grid([
+        "....",
+        "..↓.",
+        "....",
+    ])
+    cache = PathCache(max_entries=2)
+    path = [(0, 0), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2)]
+    cache.put("goal", path)
+    assert cache.get("goal", (2, 0)) == path[2:]
+    assert cache.get("other", (2, 0)) is None
+
+    def can_step(source, target):
+        return step_allowed(grid, rules, source, target)
+
+    # One tile below the path rejoins at the furthest adjacent path tile
+    assert cache.get("goal", (2, 1)) is None
+    assert cache.get("goal", (1, 1), can_step) == [(1, 1), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2)]
+    assert cache.get("goal", (1, 1)) == [(1, 1), (1, 0), (2, 0), (3, 0), (3, 1), (3, 2)]
+    # A ledge can only be left downwards, so (2, 1) can't step back up onto the path
+    assert cache.get("goal", (2, 1), can_step) is None
+    assert (cache.hits, cache.repairs) == (2, 1)
+
+    cache.put("b", [(0, 0)])
+    cache.put("c", [(0, 0)])
+    assert len(cache) == 2 and cache.get("goal", (2, 0)) is None
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the two-level RoutePlanner (portal distance tables + world-level search)
+"""
+
+from agent.location_graph import find_shortest_path, portal_requirements_met
+from agent.route_planner import FIELD_CACHE_SIZE, RoutePlanner
+
+
+def _grid(rows):
+    return {(x, y): symbol for y, row in enumerate(rows) for x, symbol in enumerate(row)}
+
+
+def _portal(exit_coords, entry_coords, requirements=None, portal_type="open_world"):
+    return {"type": portal_type, "direction": "north", "exit_coords": exit_coords,
+            "entry_coords": entry_coords, "description": "", "requirements": requirements}
+
+
+# TOWN has two ways to ROUTE: the open north edge, and a gatehouse door right next to the start
+GRAPH = {
+    "TOWN": {"display_name": "Test Town", "portals": {
+        "ROUTE": _portal((4, 0), (4, 6)),
+        "GATEHOUSE": _portal((1, 5), (1, 1), portal_type="warp_tile"),
+    }},
+    "GATEHOUSE": {"display_name": "Gatehouse", "portals": {
+        "TOWN": _portal((1, 2), (1, 4), portal_type="warp_tile"),
+        "ROUTE": _portal((1, 0), (0, 6), requirements={"badges": ["STONE_BADGE"]}),
+    }},
+    "ROUTE": {"display_name": "Route 1 (South)", "portals": {
+        "TOWN": _portal((4, 6), (4, 0)),
+    }},
+}
+
+TOWN = _grid([
+    "....#",
+    ".####",
+    ".....",
+    ".....",
+    ".....",
+    ".D...",
+])
+GATEHOUSE = _grid([
+    "...",
+    "...",
+    "...",
+])
+ROUTE = _grid([
+    ".....",
+    ".....",
+    ".....",
+    ".....",
+    ".....",
+    ".....",
+    ".....",
+])
+
+
+def _planner():
+    planner = RoutePlanner(graph=GRAPH)
+    planner.observe_area("TOWN", TOWN)
+    planner.observe_area("Gatehouse", {f"{x},{y}": s for (x, y), s in GATEHOUSE.items()})
+    planner.observe_area("ROUTE 1", ROUTE)
+    return planner
+
+
+def test_weighted_route_takes_cheaper_portal_with_tile_paths():
+    planner = _planner()
+    route = planner.plan("TOWN", (2, 5), "ROUTE", (0, 4), requirements={"badges": ["STONE_BADGE"]})
+    assert [hop[:2] for hop in route.hops] == [("TOWN", "GATEHOUSE"), ("GATEHOUSE", "ROUTE")]
+    assert not route.estimated
+    first, second, last = route.legs
+    assert first.path == [(2, 5), (1, 5)]
+    assert second.start == (1, 1) and second.path[-1] == (1, 0)
+    assert last.start == (0, 6) and last.path[-1] == (0, 4)
+    assert route.cost == sum(leg.cost for leg in route.legs) + 8 + 1  # Door warp, then the open edge
+
+
+def test_requirements_and_map_updates_change_the_route():
+    planner = _planner()
+    # Without the badge the gatehouse is a dead end: walk the long way to the north edge
+    route = planner.plan("TOWN", (2, 5), "ROUTE", (4, 2), requirements={"badges": []})
+    assert [hop[:2] for hop in route.hops] == [("TOWN", "ROUTE")]
+    long_way = route.legs[0].cost
+    assert route.legs[0].path[-1] == (4, 0)
+
+    # Exploring a gap in the wall shortens the town leg
+    opened = dict(TOWN)
+    opened[(4, 1)] = "."
+    planner.observe_area("TOWN", opened)
+    route = planner.plan("TOWN", (2, 5), "ROUTE", (4, 2), requirements={"badges": []})
+    assert (long_way, route.legs[0].cost) == (11.0, 7.0)
+
+
+def test_unexplored_areas_are_estimated_and_names_resolve():
+    planner = RoutePlanner(graph=GRAPH)
+    route = planner.plan("Test Town", (2, 5), "ROUTE 1", None)
+    assert route is not None and route.estimated
+    assert planner.location_key("Route 1") == "ROUTE"
+    assert planner.plan("TOWN", (2, 5), "NOWHERE") is None
+
+
+def test_portal_distance_table():
+    planner = _planner()
+    table = planner.portal_distances("TOWN")
+    # Arrival from the gatehouse (1, 4) is one step from its door (1, 5)
+    assert table[((1, 4), (1, 5))] == 1.0
+    # Arrival from the route (4, 0) has to go round the wall
+    assert table[((4, 0), (1, 5))] == 10.0
+
+
+def test_distance_fields_are_lru_bounded():
+    planner = _planner()
+    # Every new player position adds a field; the oldest ones are evicted
+    positions = sorted(ROUTE)
+    assert len(positions) > FIELD_CACHE_SIZE
+    for position in positions:
+        planner.plan("ROUTE", position, "TOWN", (2, 5), requirements={"badges": []})
+    assert len(planner._tables["ROUTE"].fields) == FIELD_CACHE_SIZE
+    assert planner.portal_distances("TOWN")[((4, 0), (1, 5))] == 10.0
+
+
+def test_location_graph_requirements():
+    assert portal_requirements_met({"requirements": None}, {"badges": []})
+    assert portal_requirements_met({"requirements": ["CUT"]}, None)
+    assert not portal_requirements_met({"requirements": ["CUT"]}, {"hms": ["SURF"]})
+    assert portal_requirements_met({"requirements": {"hms": ["cut"]}}, {"CUT": True})
+    path = find_shortest_path("LITTLEROOT_TOWN", "ROUTE_103")
+    assert [hop[1] for hop in path] == ["ROUTE_101", "OLDALE_TOWN", "ROUTE_103"]
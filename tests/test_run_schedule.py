@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test batched frame stepping with EmeraldEmulator.run_schedule
+"""
+
+import pytest
+
+from pokemon_env.emulator import EmeraldEmulator
+
+
+class _Core:
+    """Records which keys are held on every frame"""
+
+    def __init__(self, fail_on_frame=None):
+        self.held = set()
+        self.frames = []
+        self.fail_on_frame = fail_on_frame
+
+    def add_keys(self, *keys):
+        self.held.update(keys)
+
+    def clear_keys(self, *keys):
+        self.held.difference_update(keys)
+
+    def run_frame(self):
+        if self.fail_on_frame is not None and len(self.frames) == self.fail_on_frame:
+            raise RuntimeError("core crashed")
+        self.frames.append(frozenset(self.held))
+
+
+class _Reader:
+    def __init__(self):
+        self.dialog_checks = 0
+        self.dialogue_cache_clears = 0
+
+    def is_in_dialog(self):
+        self.dialog_checks += 1
+        return False
+
+    def clear_dialogue_cache_on_button_press(self):
+        self.dialogue_cache_clears += 1
+
+
+@pytest.fixture
+def emulator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the constructor creates .pokeagent_cache in the cwd
+    emulator = EmeraldEmulator(rom_path="unused.gba")
+    emulator.core = _Core()
+    emulator.memory_reader = _Reader()
+    return emulator
+
+
+def test_schedule_holds_each_segment_and_runs_hooks_once(emulator):
+    up, a = emulator.KEY_MAP["up"], emulator.KEY_MAP["a"]
+    emulator._cached_state = {"stale": True}
+
+    frames = emulator.run_schedule([(["up"], 3), ([], 2), ("A", 1), (None, 1)])
+
+    assert frames == 7
+    assert emulator.core.frames == [{up}] * 3 + [frozenset()] * 2 + [{a}] + [frozenset()]
+    assert not emulator.core.held, "Keys must be released after the schedule"
+    assert emulator.memory_reader.dialog_checks == 1
+    assert emulator.memory_reader.dialogue_cache_clears == 1, "A was pressed once in the schedule"
+    assert not hasattr(emulator, "_cached_state")
+
+
+def test_schedule_edge_cases(emulator):
+    assert emulator.run_schedule([]) == 0
+    assert emulator.run_schedule([(["up"], 0)]) == 0
+    assert emulator.core.frames == []
+
+    # Unknown buttons are skipped, the rest of the segment still runs
+    assert emulator.run_schedule([(["up", "turbo"], 2)]) == 2
+    assert emulator.core.frames == [{emulator.KEY_MAP["up"]}] * 2
+
+    # A bad segment anywhere rejects the whole schedule before any frame runs
+    with pytest.raises(ValueError):
+        emulator.run_schedule([(["up"], 2), ([], -1)])
+    assert len(emulator.core.frames) == 2
+
+    emulator.core = None
+    assert emulator.run_schedule([(["up"], 5)]) == 0
+
+
+def test_schedule_releases_keys_when_a_frame_fails(emulator):
+    emulator.core = _Core(fail_on_frame=1)
+
+    with pytest.raises(RuntimeError):
+        emulator.run_schedule([(["left", "b"], 4)])
+
+    assert len(emulator.core.frames) == 1
+    assert not emulator.core.held
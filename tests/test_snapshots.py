@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test in-memory savestate snapshots (pokemon_env/snapshots.py) and EmeraldEmulator restores
+"""
+
+import threading
+
+import pytest
+from mgba._pylib import ffi
+
+from pokemon_env.emulator import EmeraldEmulator
+from pokemon_env.snapshots import SnapshotPool
+
+
+class _Native:
+    """Stand-in for the mCore struct: the whole machine state is a few bytes"""
+
+    def __init__(self, state=b"\x00" * 8):
+        self.state = bytearray(state)
+
+    def stateSize(self, native):
+        return len(self.state)
+
+    def saveState(self, native, buffer):
+        buffer[0:len(self.state)] = list(self.state)
+        return True
+
+    def loadState(self, native, buffer):
+        self.state = bytearray(ffi.buffer(buffer))
+        return True
+
+
+class _Core:
+    def __init__(self):
+        self._core = _Native()
+        self.frame_counter = 0
+
+
+class _Reader:
+    def __init__(self):
+        self.resets = []
+
+    def reset_dialog_tracking(self):
+        self.resets.append("dialog")
+
+    def invalidate_map_cache(self, clear_buffer_address=True):
+        self.resets.append(("map", clear_buffer_address))
+
+    def revalidate_map_buffer(self):
+        self.resets.append("revalidate")
+        return True
+
+
+@pytest.fixture
+def emulator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the constructor creates .pokeagent_cache in the cwd
+    emulator = EmeraldEmulator(rom_path="unused.gba")
+    emulator.core = _Core()
+    emulator.snapshots = SnapshotPool(emulator.core, max_named=2)
+    emulator.memory_reader = _Reader()
+    return emulator
+
+
+def test_pool_roundtrip_and_named_lru():
+    core = _Core()
+    pool = SnapshotPool(core, max_named=2)
+
+    core._core.state[:] = b"before!!"
+    snapshot = pool.capture()
+    core._core.state[:] = b"after..."
+    pool.restore(snapshot)
+    assert bytes(core._core.state) == b"before!!"
+    assert snapshot.to_bytes() == b"before!!"
+
+    pool.release(snapshot)
+    with pytest.raises(ValueError):
+        pool.restore(snapshot)
+
+    for name in ("a", "b", "c"):
+        pool.capture(name)
+    assert pool.names() == ["b", "c"], "Least recently used snapshot is evicted"
+    assert pool.get("a") is None
+
+
+def test_restore_waits_for_memory_lock(emulator):
+    emulator.core._core.state[:] = b"saved..."
+    emulator.snapshot("checkpoint")
+    emulator.core._core.state[:] = b"current."
+    emulator._cached_state = {"stale": True}
+
+    restored = threading.Event()
+
+    def restore():
+        emulator.restore_snapshot("checkpoint")
+        restored.set()
+
+    with emulator.memory_lock:  # what the server game loop holds while stepping
+        worker = threading.Thread(target=restore)
+        worker.start()
+        assert not restored.wait(0.2), "Restore must not run while the game loop holds the memory lock"
+        assert bytes(emulator.core._core.state) == b"current."
+
+    worker.join(timeout=2)
+    assert restored.is_set()
+    assert bytes(emulator.core._core.state) == b"saved..."
+    assert emulator.memory_reader.resets == ["dialog", ("map", False), "revalidate"]
+    assert not hasattr(emulator, "_cached_state")
+
+    with pytest.raises(KeyError):
+        emulator.restore_snapshot("missing")
+
+
+def test_fork_rolls_back(emulator):
+    emulator.core._core.state[:] = b"origin.."
+
+    with emulator.fork():
+        emulator.core._core.state[:] = b"explored"
+
+    assert bytes(emulator.core._core.state) == b"origin.."
+    assert emulator.snapshots.names() == [], "Anonymous fork snapshots are released"
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test the delta encoding used by the /state_stream push channel
+"""
+
+import asyncio
+import copy
+import json
+import threading
+
+from server.state_delta import StateBroadcast, StateMirror, apply_delta, diff_states
+
+
+def _sample_state():
+    return {
+        "player": {"position": {"x": 5, "y": 7}, "location": "LITTLEROOT TOWN", "party": [
+            {"species_name": "TREECKO", "level": 5, "current_hp": 20, "max_hp": 20},
+        ]},
+        "game": {"money": 3000, "in_battle": False, "items": [["Item_013", 1]]},
+        "map": {"tiles": [[[1, 2, 0, 3], [4, 5, 0, 3]], [[6, 7, 1, 3], [8, 9, 0, 3]]],
+                "grid": {"1,2": ".", "3,4": "#"}},
+        "visual": {"screenshot_base64": "AAAA"},
+    }
+
+
+def test_identical_states_have_no_ops():
+    state = _sample_state()
+    assert diff_states(state, copy.deepcopy(state)) == []
+
+
+def test_roundtrip_small_changes():
+    """Applying the delta to the old state reproduces the new one with few ops"""
+    old = _sample_state()
+    new = copy.deepcopy(old)
+    new["player"]["position"]["x"] = 6
+    new["game"]["in_battle"] = True
+    new["map"]["tiles"][1][0][2] = 0
+    new["map"]["grid"]["5,6"] = "~"
+    del new["map"]["grid"]["1,2"]
+    new["game"]["items"].append(["Item_004", 3])
+
+    ops = diff_states(old, new)
+    assert len(ops) == 6
+    assert {"op": "replace", "path": "/player/position/x", "value": 6} in ops
+    assert apply_delta(copy.deepcopy(old), ops) == new
+
+
+def test_type_changes_and_escaped_keys():
+    old = {"a/b": 1, "c~d": {"x": 1}, "flag": 1}
+    new = {"a/b": 2, "c~d": None, "flag": True}
+    ops = diff_states(old, new)
+    assert {"op": "replace", "path": "/a~1b", "value": 2} in ops
+    assert apply_delta(copy.deepcopy(old), ops) == new
+    assert apply_delta(copy.deepcopy(old), ops)["flag"] is True
+
+
+def test_mirror_applies_snapshot_then_deltas():
+    old = _sample_state()
+    new = copy.deepcopy(old)
+    new["game"]["money"] = 2500
+
+    mirror = StateMirror("http://localhost:0")
+    mirror._handle_message({"type": "snapshot", "seq": 0, "state": copy.deepcopy(old)})
+    mirror._handle_message({"type": "delta", "seq": 1, "ops": diff_states(old, new)})
+    assert mirror.get_state() == new
+
+    # A gap in sequence numbers drops the mirror instead of applying a bad delta
+    try:
+        mirror._handle_message({"type": "delta", "seq": 5, "ops": []})
+        assert False, "Expected the mirror to reject an out-of-order delta"
+    except ConnectionError:
+        pass
+    assert mirror.get_state() is None
+
+
+def test_mirror_state_older_than_last_action_is_stale():
+    state = dict(_sample_state(), action_seq=3)
+    mirror = StateMirror("http://localhost:0")
+    assert mirror.include_screenshot is False
+    mirror._handle_message({"type": "snapshot", "seq": 0, "state": copy.deepcopy(state)})
+    assert mirror.get_state() == state
+
+    mirror.action_posted(4)
+    assert mirror.get_state() is None, "State built before the posted action must not be used"
+
+    mirror._handle_message({"type": "delta", "seq": 1, "ops": [{"op": "replace", "path": "/action_seq", "value": 4}]})
+    assert mirror.get_state()["action_seq"] == 4
+
+    mirror.action_posted(None)  # a failed post response keeps the previous requirement
+    mirror.action_posted(2)
+    assert mirror.get_state() is not None
+
+
+def test_broadcast_builds_once_for_all_subscribers():
+    builds = []
+    threads = set()
+    idle = []
+
+    def build():
+        threads.add(threading.get_ident())
+        builds.append(len(builds))
+        return {"tick": len(builds) // 2, "static": "x" * 10}
+
+    async def follow(broadcast, count):
+        messages = []
+        stream = broadcast.subscribe()
+        async for text in stream:
+            messages.append(json.loads(text))
+            if len(messages) == count:
+                break
+        await stream.aclose()
+        return messages
+
+    async def main():
+        broadcast = StateBroadcast(build, interval=0.01, heartbeat=5.0, on_idle=idle.append)
+        first, second = await asyncio.gather(follow(broadcast, 4), follow(broadcast, 4))
+        await asyncio.sleep(0.05)  # builder stops once nobody is subscribed
+        return broadcast, first, second
+
+    broadcast, first, second = asyncio.run(main())
+
+    assert threading.get_ident() not in threads, "Builds run off the event loop"
+    assert broadcast.subscribers == 0 and broadcast._task is None
+    assert idle == [broadcast], "The last subscriber leaving reports the broadcast idle once"
+    for messages in (first, second):
+        assert messages[0]["type"] == "snapshot"
+        state = messages[0]["state"]
+        seq = messages[0]["seq"]
+        for message in messages[1:]:
+            assert message == {"type": "delta", "seq": seq + 1, "ops": message["ops"]}
+            state = apply_delta(state, message["ops"])
+            seq = message["seq"]
+        assert state["tick"] == seq
+    # Both subscribers shared the same ticks instead of building their own
+    assert len(builds) <= 2 * (max(first[-1]["seq"], second[-1]["seq"]) + 2)
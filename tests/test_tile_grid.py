@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the packed tile planes behind MapArea.map_data
+"""
+
+from pokemon_env.enums import MetatileBehavior
+from utils.map_stitcher import TileGrid
+
+
+def _view(value, size=3):
+    return [[(value + y * size + x, MetatileBehavior.TALL_GRASS, 0, 3) for x in range(size)] for y in range(size)]
+
+
+def test_merge_roundtrips_tiles():
+    grid = TileGrid(10, 10)
+    extent = grid.merge(_view(100), top=2, left=4)
+
+    assert extent == (2, 4, 4, 6)
+    assert grid.tile_at(2, 4) == (100, MetatileBehavior.TALL_GRASS, 0, 3)
+    assert grid.tile_at(4, 6) == (108, MetatileBehavior.TALL_GRASS, 0, 3)
+    assert grid.tile_at(0, 0) is None
+    assert grid.explored_extent() == (2, 4, 4, 6)
+    assert len(grid.explored_cells()) == 9
+
+
+def test_merge_clips_and_grows():
+    """Negative corners are clipped, and the planes grow up to MAX_SIZE but never past it"""
+    grid = TileGrid(10, 10)
+    assert grid.merge(_view(0), top=-1, left=-1) == (0, 1, 0, 1)
+    assert grid.tile_at(0, 0)[0] == 4
+
+    grid.merge(_view(0), top=20, left=TileGrid.MAX_SIZE - 2)
+    assert grid.shape == (23, TileGrid.MAX_SIZE)
+    assert grid.tile_at(22, TileGrid.MAX_SIZE - 1)[0] == 7
+    assert grid.merge(_view(0), top=TileGrid.MAX_SIZE, left=0) is None
+
+
+def test_missing_tiles_keep_previous_data():
+    grid = TileGrid(5, 5)
+    grid.merge(_view(0), top=0, left=0)
+    grid.merge([[None, (50, 0, 1, 0)], [(), (51, 0, 1)]], top=0, left=0)
+
+    assert grid.tile_at(0, 0)[0] == 0
+    assert grid.tile_at(0, 1) == (50, MetatileBehavior.NORMAL, 1, 0)
+    assert grid.tile_at(1, 0)[0] == 3
+    assert grid.tile_at(1, 1) == (51, MetatileBehavior.NORMAL, 1, 0)
+
+
+def test_from_rows_matches_to_rows():
+    rows = [[None, (1, 2, 0, 3)], [(4, 16, 1, 0), None]]
+    grid = TileGrid.from_rows(rows)
+    assert grid.to_rows() == rows
+    assert bool(TileGrid(4, 4)) is False
+
+
+def test_changes_since_tracks_written_extents():
+    grid = TileGrid(10, 10)
+    start = grid.version
+    grid.merge(_view(0), top=0, left=0)
+    grid.merge(_view(0), top=5, left=5)
+
+    assert grid.changes_since(start) == [(0, 2, 0, 2), (5, 7, 5, 7)]
+    assert grid.changes_since(grid.version) == []
+
+    # Once the log no longer reaches back, callers have to rebuild
+    for _ in range(TileGrid.DIRTY_LOG_SIZE):
+        grid.merge(_view(0), top=0, left=0)
+    assert grid.changes_since(start) is None
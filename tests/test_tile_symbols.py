@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Test the compiled tile symbol tables in utils/tile_symbols.py
+"""
+
+import numpy as np
+
+from pokemon_env.enums import MetatileBehavior
+from utils.tile_symbols import (LOCATION_SYMBOL_LUT, VIEW_SYMBOL_LUT, location_symbol,
+                                symbol_planes, view_symbol)
+
+
+def test_single_tile_lookups():
+    assert location_symbol(5, MetatileBehavior.TALL_GRASS, 1) == '~'
+    assert location_symbol(5, MetatileBehavior.NON_ANIMATED_DOOR, 1) == 'D'
+    assert location_symbol(5, 0, 0) == '.'
+    assert location_symbol(5, 0, 1) == '#'
+    assert location_symbol(1023, 0, 0) == '#'
+
+    assert view_symbol(5, MetatileBehavior.NORMAL, 0) == '.'
+    assert view_symbol(5, MetatileBehavior.TALL_GRASS, 0) == '~'
+    assert view_symbol(1023, MetatileBehavior.NORMAL, 0) == '#'
+
+
+def test_planes_match_single_tile_lookups():
+    rng = np.random.default_rng(0)
+    tile_id = rng.integers(1000, 1024, size=(20, 20)).astype(np.uint16)
+    behavior = rng.integers(0, 256, size=(20, 20)).astype(np.uint8)
+    collision = rng.integers(0, 4, size=(20, 20)).astype(np.uint8)
+
+    for lut, lookup in ((LOCATION_SYMBOL_LUT, location_symbol), (VIEW_SYMBOL_LUT, view_symbol)):
+        symbols = symbol_planes(lut, tile_id, behavior, collision)
+        assert symbols.shape == (20, 20)
+        for y in range(20):
+            for x in range(20):
+                expected = lookup(int(tile_id[y, x]), int(behavior[y, x]), int(collision[y, x]))
+                assert symbols[y, x] == expected
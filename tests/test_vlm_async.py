@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test the async request layer of the remote VLM backends (utils/vlm_async.py)
+"""
+
+import asyncio
+import base64
+import functools
+import time
+
+import numpy as np
+import pytest
+
+import utils.vlm_async as vlm_async
+from utils.vlm_async import AsyncRequestRunner, LatencyTracker, encode_image, hedged
+
+
+def test_encoded_frames_are_memoized_by_content():
+    frame = np.zeros((160, 240, 3), dtype=np.uint8)
+    encoded = encode_image(frame)
+    assert encoded.data.startswith(b"\x89PNG") and base64.b64decode(encoded.base64) == encoded.data
+    assert encoded.data_url.startswith("data:image/png;base64,")
+    # Same pixels (even a different array object) reuse the encoding; changed pixels don't
+    assert encode_image(frame.copy()) is encoded
+    frame[0, 0] = 255
+    assert encode_image(frame) is not encoded
+    with pytest.raises(ValueError):
+        encode_image("frame.png")
+
+
+def test_hedge_delay_follows_p95_once_warmed_up():
+    tracker = LatencyTracker()
+    for _ in range(19):
+        tracker.record(2.0)
+    assert tracker.hedge_delay() is None
+    for seconds in [2.0] * 80 + [9.0] * 5:
+        tracker.record(seconds)
+    assert tracker.hedge_delay() == 2.0
+    for _ in range(10):
+        tracker.record(0.1)
+    assert tracker.percentile(0.05) == 0.1
+
+
+def test_slow_call_is_hedged_and_first_answer_wins():
+    attempts = []
+    cancelled = []
+
+    async def call():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        try:
+            await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return f"answer {attempt}"
+
+    assert asyncio.run(hedged(call, hedge_delay=0.05)) == "answer 1"
+    assert cancelled == [0]
+
+    attempts.clear()
+    assert asyncio.run(hedged(call, hedge_delay=None)) == "answer 0" and attempts == [0]
+
+
+def test_hedge_survives_one_failed_attempt():
+    attempts = []
+
+    async def call():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            await asyncio.sleep(0.1)
+            raise ConnectionError("reset by peer")
+        await asyncio.sleep(0.2)
+        return "late but fine"
+
+    assert asyncio.run(hedged(call, hedge_delay=0.01)) == "late but fine"
+
+
+def test_runner_runs_coroutines_for_sync_callers():
+    runner = AsyncRequestRunner("test")
+    try:
+        async def call():
+            await asyncio.sleep(0)
+            return 42
+
+        assert runner.run(call) == 42
+        assert len(runner.latency) == 1
+    finally:
+        runner.close()
+
+
+def test_runner_hedges_each_attempt_but_not_the_backoff(monkeypatch):
+    monkeypatch.setattr(vlm_async, "HEDGE_MIN_DELAY", 0.05)
+    monkeypatch.setattr(vlm_async, "retry_with_exponential_backoff_async",
+                        functools.partial(vlm_async.retry_with_exponential_backoff_async, initial_delay=0.1))
+    runner = AsyncRequestRunner("test")
+    for _ in range(vlm_async.HEDGE_MIN_SAMPLES):
+        runner.latency.record(0.01)
+    try:
+        started = []
+
+        async def fails_fast_then_answers():
+            started.append(time.monotonic())
+            if len(started) == 1:
+                raise ConnectionError("reset by peer")
+            return "retried"
+
+        # The backoff (>= 0.2s) outlasts the hedge delay, but no duplicate is sent during it
+        assert runner.run(fails_fast_then_answers) == "retried"
+        assert len(started) == 2 and started[1] - started[0] >= 0.2
+
+        attempts = []
+
+        async def fails_then_stalls():
+            attempt = len(attempts)
+            attempts.append(attempt)
+            if attempt == 0:
+                raise ConnectionError("reset by peer")
+            await asyncio.sleep(1.0 if attempt == 1 else 0.01)
+            return f"attempt {attempt}"
+
+        # The retry itself is slow, so it gets hedged
+        assert runner.run(fails_then_stalls) == "attempt 2"
+        assert attempts == [0, 1, 2]
+    finally:
+        runner.close()
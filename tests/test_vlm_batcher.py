@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test the batching front end of VLM (VLM.submit_query / submit_text_query, utils/vlm_batcher.py)
+"""
+
+import threading
+import time
+
+import pytest
+
+from utils.vlm import VLM, VLMBackend
+
+
+class BatchingBackend(VLMBackend):
+    def __init__(self, model_name, **kwargs):
+        self.batches = []
+
+    def get_query(self, img, text, module_name="Unknown"):
+        return self.get_batch([(img, text, module_name)])[0]
+
+    def get_text_query(self, text, module_name="Unknown"):
+        return self.get_batch([(None, text, module_name)])[0]
+
+    def get_batch(self, requests):
+        self.batches.append([module_name for _, _, module_name in requests])
+        if any(text == "boom" for _, text, _ in requests):
+            raise RuntimeError("out of memory")
+        return [f"{text}:{'image' if img is not None else 'text'}" for img, text, _ in requests]
+
+
+class SlowApiBackend(VLMBackend):
+    def __init__(self, model_name, **kwargs):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_query(self, img, text, module_name="Unknown"):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return text.upper()
+
+    def get_text_query(self, text, module_name="Unknown"):
+        return self.get_query(None, text, module_name)
+
+
+def test_requests_within_window_share_one_batch(monkeypatch):
+    monkeypatch.setitem(VLM.BACKENDS, "batching", BatchingBackend)
+    vlm = VLM("test-model", backend="batching")
+    futures = [vlm.submit_query("frame.png", "extract", "PERCEPTION-EXTRACT"),
+               vlm.submit_query("frame.png", "dialogue?", "DIALOGUE_CHECK"),
+               vlm.submit_text_query("plan", "PLANNING")]
+    assert [future.result(timeout=5) for future in futures] == ["extract:image", "dialogue?:image", "plan:text"]
+    assert vlm.backend.batches == [["PERCEPTION-EXTRACT", "DIALOGUE_CHECK", "PLANNING"]]
+
+
+def test_failed_batches_are_retried_individually_and_cache_is_consulted(monkeypatch, tmp_path):
+    monkeypatch.setitem(VLM.BACKENDS, "batching", BatchingBackend)
+    vlm = VLM("test-model", backend="batching", cache_modules={"TITLE_SCREEN_RETRY"},
+              cache_path=str(tmp_path / "cache.sqlite"))
+    assert vlm.get_text_query("Answer: A", "TITLE_SCREEN_RETRY", validate=bool) == "Answer: A:text"
+
+    futures = [vlm.submit_text_query("Answer: A", "TITLE_SCREEN_RETRY"),
+               vlm.submit_text_query("boom", "PLANNING"),
+               vlm.submit_text_query("fine", "PLANNING")]
+    with pytest.raises(RuntimeError, match="out of memory"):
+        futures[1].result(timeout=5)
+    assert futures[0].result(timeout=5) == "Answer: A:text"
+    assert futures[2].result(timeout=5) == "fine:text"
+    # The cached request never reached the backend; the failed batch was retried one by one
+    assert vlm.backend.batches[1:] == [["PLANNING", "PLANNING"], ["PLANNING"], ["PLANNING"]]
+
+
+def test_api_backends_answer_concurrently(monkeypatch):
+    monkeypatch.setitem(VLM.BACKENDS, "slow", SlowApiBackend)
+    vlm = VLM("test-model", backend="slow")
+    futures = [vlm.submit_text_query(f"q{i}", "PERCEPTION") for i in range(3)]
+    assert [future.result(timeout=5) for future in futures] == ["Q0", "Q1", "Q2"]
+    assert vlm.backend.peak > 1
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the persistent VLM response cache (utils/vlm_cache.py) and its opt-in use in VLM
+"""
+
+import time
+
+import numpy as np
+from PIL import Image
+
+from utils.vlm import VLM, VLMBackend, parse_choice
+from utils.vlm_cache import VLMResponseCache, cache_key, image_hash
+
+
+class CountingBackend(VLMBackend):
+    def __init__(self, model_name, **kwargs):
+        self.calls = 0
+
+    def get_query(self, img, text, module_name="Unknown"):
+        self.calls += 1
+        return f"A ({self.calls})"
+
+    def get_text_query(self, text, module_name="Unknown"):
+        self.calls += 1
+        return f"A ({self.calls})"
+
+
+def test_key_normalizes_prompt_and_hashes_images_perceptually():
+    assert cache_key("gemini", "m", "Press A.\n   Answer: A") == cache_key("gemini", "m", "Press A. Answer: A")
+    assert cache_key("gemini", "m", "x") != cache_key("openai", "m", "x")
+
+    frame = np.tile(np.arange(240, dtype=np.uint8), (160, 1))
+    noisy = frame.copy()
+    noisy[10, 10] += 3
+    assert image_hash(frame) == image_hash(Image.fromarray(noisy))
+    assert image_hash(frame) != image_hash(frame[:, ::-1].copy())
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = VLMResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"  # Touch a so b is the least recently used
+    time.sleep(0.01)
+    cache.put("c", "C")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("A", None, "C")
+    assert len(cache) == 2
+
+    cache.ttl_seconds = 1e-9
+    time.sleep(0.01)
+    assert cache.get("a") is None and len(cache) == 1
+
+
+def names_a(response):
+    return parse_choice(response, ["A"]) is not None
+
+
+def test_vlm_serves_opted_in_modules_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setitem(VLM.BACKENDS, "counting", CountingBackend)
+    logged = []
+    monkeypatch.setattr("utils.vlm.log_llm_interaction", lambda **record: logged.append(record))
+    path = str(tmp_path / "cache.sqlite")
+    vlm = VLM("test-model", backend="counting", cache_modules={"TITLE_SCREEN_RETRY"}, cache_path=path)
+
+    assert vlm.get_text_query("What button? Answer: A", "TITLE_SCREEN_RETRY", validate=names_a) == "A (1)"
+    assert vlm.get_text_query("What button?  Answer: A", "TITLE_SCREEN_RETRY", validate=names_a) == "A (1)"
+    assert vlm.get_text_query("What button? Answer: A", "DIRECTIVE_EXECUTOR", validate=names_a) == "A (2)"
+    assert vlm.get_text_query("What button? Answer: A", "DIRECTIVE_EXECUTOR", validate=names_a) == "A (3)"
+    assert vlm.backend.calls == 3
+
+    # Cache hits still produce an LLM log record, marked as cached
+    assert len(logged) == 1
+    assert logged[0]["interaction_type"] == "counting_TITLE_SCREEN_RETRY"
+    assert logged[0]["response"] == "A (1)"
+    assert logged[0]["metadata"]["cached"] is True
+
+    # Persists across instances
+    vlm = VLM("test-model", backend="counting", cache_modules={"TITLE_SCREEN_RETRY"}, cache_path=path)
+    assert vlm.get_text_query("What button? Answer: A", "TITLE_SCREEN_RETRY") == "A (1)"
+    assert vlm.backend.calls == 0
+
+
+class ChattyBackend(CountingBackend):
+    def get_text_query(self, text, module_name="Unknown"):
+        self.calls += 1
+        return "I'm not sure what to do here" if self.calls == 1 else "START"
+
+
+def test_only_validated_responses_are_cached(tmp_path, monkeypatch):
+    monkeypatch.setitem(VLM.BACKENDS, "chatty", ChattyBackend)
+    vlm = VLM("test-model", backend="chatty", cache_modules={"OPENER_EXECUTOR_RETRY", "TITLE_SCREEN_RETRY"},
+              cache_path=str(tmp_path / "cache.sqlite"))
+    buttons = ["A", "B", "START"]
+
+    # An unparseable reply is not replayed on the next attempt
+    assert vlm.get_choice(None, "Which button?", buttons, "OPENER_EXECUTOR_RETRY") == (None, 0.0)
+    assert vlm.get_choice(None, "Which button?", buttons, "OPENER_EXECUTOR_RETRY") == ("START", 1.0)
+    assert vlm.get_choice(None, "Which button?", buttons, "OPENER_EXECUTOR_RETRY") == ("START", 1.0)
+    assert vlm.backend.calls == 2
+
+    # Replies the validator rejects, or calls without one, are never cached
+    assert vlm.get_text_query("Answer: A", "TITLE_SCREEN_RETRY", validate=names_a) == "START"
+    assert vlm.get_text_query("Answer: A", "TITLE_SCREEN_RETRY") == "START"
+    assert vlm.backend.calls == 4
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test button-choice queries (VLM.get_choice and LocalHuggingFaceBackend constrained decoding)
+"""
+
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from utils.vlm import VLM, VLMBackend, LocalHuggingFaceBackend, parse_choice
+
+BUTTONS = ['A', 'B', 'START', 'SELECT', 'UP', 'DOWN', 'LEFT', 'RIGHT', 'L', 'R']
+
+
+class ChattyBackend(VLMBackend):
+    def __init__(self, model_name, **kwargs):
+        self.replies = []
+
+    def get_query(self, img, text, module_name="Unknown"):
+        return self.replies.pop(0)
+
+    def get_text_query(self, text, module_name="Unknown"):
+        return self.replies.pop(0)
+
+
+def test_parse_choice_matches_whole_words():
+    assert parse_choice("START", BUTTONS) == "START"
+    assert parse_choice("I'd press UP here", BUTTONS) == "UP"
+    assert parse_choice("**right**.", BUTTONS) == "RIGHT"
+    assert parse_choice("LEFT, not L", BUTTONS) == "LEFT"
+    assert parse_choice("None of these", BUTTONS) is None
+
+
+def test_api_backends_answer_then_parse(monkeypatch):
+    monkeypatch.setitem(VLM.BACKENDS, "chatty", ChattyBackend)
+    vlm = VLM("test-model", backend="chatty")
+    vlm.backend.replies = ["The opener bot recommends it, so: START", "Not sure."]
+    assert vlm.get_choice(None, "What button?", BUTTONS, "OPENER_EXECUTOR") == ("START", 1.0)
+    assert vlm.get_choice(None, "What button?", BUTTONS, "OPENER_EXECUTOR") == (None, 0.0)
+
+
+def _bare_local_backend(torch, model, processor, prefix_cache_size=8):
+    backend = object.__new__(LocalHuggingFaceBackend)
+    backend.torch, backend.model, backend.processor, backend.model_name = torch, model, processor, "tiny"
+    backend._registered_prefixes, backend._prefix_cache = set(), OrderedDict()
+    backend.prefix_cache_size, backend.prefix_cache_hits, backend.prefix_cache_misses = prefix_cache_size, 0, 0
+    backend._model_lock = threading.RLock()
+    return backend
+
+
+def test_local_backend_scores_whole_choices_with_stop_token():
+    torch = pytest.importorskip("torch")
+
+    # "L" and "LEFT" share the first token 1; token 4 ends the reply
+    vocab = {'A': [0], 'L': [1], 'LEFT': [1, 2], 'UP': [3]}
+    calls = []
+    after_l = {}
+
+    def model(input_ids, attention_mask=None):
+        calls.append(input_ids.shape[1])
+        logits = torch.full((1, input_ids.shape[1], 8), -10.0)
+        last = input_ids[0, -1].item()
+        if last == 1:
+            logits[0, -1, list(after_l)] = torch.tensor(list(after_l.values()))
+        elif last in (0, 2, 3):
+            logits[0, -1, 4] = 5.0  # A complete choice is followed by the stop token
+        else:
+            logits[0, -1, 1] = 3.0
+            logits[0, -1, 0] = 1.0
+        return SimpleNamespace(logits=logits)
+
+    def processor(text=None, return_tensors=None):
+        return {"input_ids": torch.tensor([[7, 7, 7]]), "attention_mask": torch.ones(1, 3, dtype=torch.long)}
+
+    processor.apply_chat_template = lambda messages, tokenize, add_generation_prompt: messages[0]["content"]
+    processor.tokenizer = SimpleNamespace(encode=lambda text, add_special_tokens: vocab[text], eos_token_id=4)
+
+    backend = _bare_local_backend(torch, model, processor)
+    backend._model_device = lambda: "cpu"
+
+    # After "L", "EFT" is very likely: the longer choice wins despite the shared prefix
+    after_l.update({2: 5.0, 4: 1.0})
+    choice, probability = backend.get_choice(None, "Which way?", ['A', 'UP', 'L', 'LEFT'])
+    assert choice == "LEFT" and 0.5 < probability < 1.0
+    assert calls == [3, 4, 5]
+
+    # ...and "L" wins only when the model would stop there
+    calls.clear()
+    after_l.update({2: 1.0, 4: 5.0})
+    choice, _ = backend.get_choice(None, "Which way?", ['A', 'UP', 'L', 'LEFT'])
+    assert choice == "L" and calls == [3, 4]
+
+    calls.clear()
+    choice, _ = backend.get_choice(None, "Which way?", ['A', 'UP'])
+    assert choice == "A" and calls == [3, 4]
+
+
+def test_local_backend_reuses_prefilled_prompt_prefix():
+    torch = pytest.importorskip("torch")
+
+    prefills = []
+
+    def model(input_ids, use_cache=False):
+        prefills.append(input_ids.shape[1])
+        return SimpleNamespace(past_key_values={"tokens": input_ids.shape[1]})
+
+    def processor(text=None, images=None, return_tensors=None):
+        # One token per character keeps prefix lengths easy to read
+        ids = torch.tensor([[ord(c) for c in text]])
+        return {"input_ids": ids, "attention_mask": torch.ones_like(ids)}
+
+    header = "<|user|> chat template\n"
+    prefix_tokens = len(header) + len("SYSTEM PROMPT. ")
+    processor.apply_chat_template = lambda messages, tokenize, add_generation_prompt: header + messages[0]["content"]
+
+    backend = _bare_local_backend(torch, model, processor, prefix_cache_size=1)
+    backend.register_prefix("SYSTEM PROMPT. ")
+
+    def past_for(text):
+        inputs, prompt = backend._text_inputs(text)
+        return backend._prefix_past(inputs, prompt, text, "cpu")
+
+    first = past_for("SYSTEM PROMPT. Which button?")
+    assert first == {"tokens": prefix_tokens} and prefills == [prefix_tokens]
+    first["tokens"] = -1  # Requests get a copy, the cached entry is untouched
+    assert past_for("SYSTEM PROMPT. Something else?") == {"tokens": prefix_tokens} and len(prefills) == 1
+
+    # Unregistered text still shares the template header; the LRU holds one entry
+    assert past_for("Where now?") == {"tokens": len(header)}
+    assert past_for("SYSTEM PROMPT. Again?") == {"tokens": prefix_tokens}
+    assert prefills == [prefix_tokens, len(header), prefix_tokens]
+    assert (backend.prefix_cache_hits, backend.prefix_cache_misses) == (1, 3)
+
+    image_inputs = dict(processor(text=header + "SYSTEM PROMPT. Look"), pixel_values=torch.zeros(1))
+    assert backend._prefix_past(image_inputs, header + "SYSTEM PROMPT. Look", "SYSTEM PROMPT. Look", "cpu") is None
@@ -6,6 +6,7 @@ Single source of truth for all map formatting across the codebase.
 """
 
 from pokemon_env.enums import MetatileBehavior
+from utils.tile_symbols import view_symbol
 
 
 def format_tile_to_symbol(tile):
@@ -28,86 +29,8 @@ def format_tile_to_symbol(tile):
         behavior = MetatileBehavior.NORMAL
         collision = 0
     
-    # Convert behavior to symbol using unified logic
-    if hasattr(behavior, 'name'):
-        behavior_name = behavior.name
-    elif isinstance(behavior, int):
-        try:
-            behavior_enum = MetatileBehavior(behavior)
-            behavior_name = behavior_enum.name
-        except ValueError:
-            behavior_name = "UNKNOWN"
-    else:
-        behavior_name = "UNKNOWN"
-    
-    # Map to symbol - SINGLE SOURCE OF TRUTH
-    # tile_id 1023 (0x3FF) is ALWAYS invalid/out-of-bounds
-    if tile_id == 1023:
-        return "#"  # Always show as blocked/wall
-    elif behavior_name == "NORMAL":
-        return "." if collision == 0 else "#"
-    elif "DOOR" in behavior_name:
-        return "D"
-    elif "STAIRS" in behavior_name or "WARP" in behavior_name:
-        return "S"
-    elif "WATER" in behavior_name:
-        return "W"
-    elif "TALL_GRASS" in behavior_name:
-        return "~"
-    elif "COMPUTER" in behavior_name or "PC" in behavior_name:
-        return "PC"  # PC/Computer
-    elif "TELEVISION" in behavior_name or "TV" in behavior_name:
-        return "T"  # Television
-    elif "BOOKSHELF" in behavior_name or "SHELF" in behavior_name:
-        return "B"  # Bookshelf
-    elif "SIGN" in behavior_name or "SIGNPOST" in behavior_name:
-        return "?"  # Sign/Information
-    elif "FLOWER" in behavior_name or "PLANT" in behavior_name:
-        return "F"  # Flowers/Plants
-    elif "COUNTER" in behavior_name or "DESK" in behavior_name:
-        return "C"  # Counter/Desk
-    elif "BED" in behavior_name or "SLEEP" in behavior_name:
-        return "="  # Bed
-    elif "TABLE" in behavior_name or "CHAIR" in behavior_name:
-        return "t"  # Table/Chair
-    elif "CLOCK" in behavior_name:
-        return "O"  # Clock (O for clock face)
-    elif "PICTURE" in behavior_name or "PAINTING" in behavior_name:
-        return "^"  # Picture/Painting on wall
-    elif "TRASH" in behavior_name or "BIN" in behavior_name:
-        return "U"  # Trash can/bin
-    elif "POT" in behavior_name or "VASE" in behavior_name:
-        return "V"  # Pot/Vase
-    elif "MACHINE" in behavior_name or "DEVICE" in behavior_name:
-        return "M"  # Machine/Device
-    elif "JUMP" in behavior_name:
-        if "SOUTH" in behavior_name:
-            return "↓"
-        elif "EAST" in behavior_name:
-            return "→"
-        elif "WEST" in behavior_name:
-            return "←"
-        elif "NORTH" in behavior_name:
-            return "↑"
-        elif "NORTHEAST" in behavior_name:
-            return "↗"
-        elif "NORTHWEST" in behavior_name:
-            return "↖"
-        elif "SOUTHEAST" in behavior_name:
-            return "↘"
-        elif "SOUTHWEST" in behavior_name:
-            return "↙"
-        else:
-            return "J"
-    elif "IMPASSABLE" in behavior_name or "SEALED" in behavior_name:
-        return "#"  # Blocked
-    elif "INDOOR" in behavior_name:
-        return "."  # Indoor tiles are walkable
-    elif "DECORATION" in behavior_name or "HOLDS" in behavior_name:
-        return "."  # Decorations are walkable
-    else:
-        # For unknown behavior, mark as blocked for safety
-        return "#"
+    # Symbol semantics live in utils/tile_symbols.py - SINGLE SOURCE OF TRUTH
+    return view_symbol(tile_id, behavior, collision)
 
 
 def format_map_grid(raw_tiles, player_facing="South", npcs=None, player_coords=None, trim_padding=True):
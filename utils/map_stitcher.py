@@ -6,17 +6,30 @@ Connects previously seen map areas with warps and transitions to create
 a unified world map showing connections between routes, towns, and buildings.
 """
 
+import base64
+import itertools
 import json
 import logging
 import os
+import threading
+import uuid
+from collections import deque
 from typing import Dict, List, Tuple, Optional, Set, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
+
+import numpy as np
+
 from pokemon_env.enums import MapLocation, MetatileBehavior
 from utils import state_formatter
+from utils.tile_symbols import LOCATION_SYMBOL_LUT, location_symbol, symbol_planes
 
 logger = logging.getLogger(__name__)
 
+# Walkable symbols (terrain and ledges); unexplored cells next to one of these are shown as '?'
+FRONTIER_SOURCE_SYMBOLS = frozenset(['.', 'D', 'S', '^', '~', 's', 'I',
+                                     '→', '←', '↑', '↓', '↗', '↖', '↘', '↙'])
+
 @dataclass
 class WarpConnection:
     """Represents a connection between two map areas"""
@@ -43,12 +56,268 @@ class WarpConnection:
             direction=reverse_dirs.get(self.direction, "unknown")
         )
 
+# Behavior byte -> MetatileBehavior, so tiles read back from the planes match what memory_reader returns
+_BEHAVIOR_BY_VALUE = tuple(
+    MetatileBehavior(value) if value in MetatileBehavior._value2member_map_ else value
+    for value in range(256)
+)
+
+
+class TileGrid:
+    """Accumulated tiles of one map area, stored as packed NumPy planes.
+
+    Each cell holds (tile_id, behavior, collision, elevation) split across a
+    uint16 plane and three uint8 planes, plus an `explored` mask marking cells
+    that have been seen. Indexing is in GRID coordinates (world + origin_offset).
+
+    `version` bumps on every write, and the extents of recent writes are kept
+    so cached views (MapStitcher.get_location_grid) can update incrementally.
+    """
+
+    INITIAL_SIZE = 100
+    MAX_SIZE = 200  # Maximum reasonable size for a single map area
+    DIRTY_LOG_SIZE = 64
+    PLANES = ('tile_id', 'behavior', 'collision', 'elevation', 'explored')
+
+    def __init__(self, height: int = INITIAL_SIZE, width: int = INITIAL_SIZE):
+        self.tile_id = np.zeros((height, width), dtype=np.uint16)
+        self.behavior = np.zeros((height, width), dtype=np.uint8)
+        self.collision = np.zeros((height, width), dtype=np.uint8)
+        self.elevation = np.zeros((height, width), dtype=np.uint8)
+        self.explored = np.zeros((height, width), dtype=bool)
+        self.version = 0
+        self._dirty_log = deque(maxlen=self.DIRTY_LOG_SIZE)
+
+    @classmethod
+    def from_rows(cls, rows: List[List[Optional[Tuple]]]) -> 'TileGrid':
+        """Build a grid from the legacy list-of-rows format (None = unexplored)"""
+        height = len(rows)
+        width = max((len(row) for row in rows if row), default=0)
+        grid = cls(height, width)
+        for y, row in enumerate(rows):
+            for x, tile in enumerate(row or []):
+                if tile:
+                    grid.set_tile(y, x, tile)
+        return grid
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.explored.shape
+
+    @property
+    def height(self) -> int:
+        return self.explored.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.explored.shape[1]
+
+    def __bool__(self) -> bool:
+        return bool(self.explored.any())
+
+    def __len__(self) -> int:
+        return self.height
+
+    def in_bounds(self, y: int, x: int) -> bool:
+        return 0 <= y < self.height and 0 <= x < self.width
+
+    def _mark_dirty(self, extent: Tuple[int, int, int, int]):
+        self.version += 1
+        self._dirty_log.append((self.version, extent))
+
+    def changes_since(self, version: int) -> Optional[List[Tuple[int, int, int, int]]]:
+        """(min_y, max_y, min_x, max_x) extents written after `version`, or None if the log no longer reaches back that far"""
+        if version == self.version:
+            return []
+        if version > self.version or not self._dirty_log or self._dirty_log[0][0] > version + 1:
+            return None
+        return [extent for changed, extent in self._dirty_log if changed > version]
+
+    def ensure_size(self, height: int, width: int):
+        """Grow the planes (never beyond MAX_SIZE) so they are at least height x width"""
+        height = min(max(height, self.height), max(self.MAX_SIZE, self.height))
+        width = min(max(width, self.width), max(self.MAX_SIZE, self.width))
+        if (height, width) == self.shape:
+            return
+        for name in self.PLANES:
+            plane = getattr(self, name)
+            grown = np.zeros((height, width), dtype=plane.dtype)
+            grown[:plane.shape[0], :plane.shape[1]] = plane
+            setattr(self, name, grown)
+
+    def region(self, extent: Tuple[int, int, int, int]) -> Dict[str, np.ndarray]:
+        """Copies of every plane for a (min_y, max_y, min_x, max_x) extent"""
+        min_y, max_y, min_x, max_x = extent
+        return {name: getattr(self, name)[min_y:max_y + 1, min_x:max_x + 1].copy() for name in self.PLANES}
+
+    def write_region(self, top: int, left: int, planes: Dict[str, np.ndarray]):
+        """Overwrite a block of cells with planes from region()"""
+        height, width = planes['explored'].shape
+        self.ensure_size(top + height, left + width)
+        for name in self.PLANES:
+            getattr(self, name)[top:top + height, left:left + width] = planes[name]
+        self._mark_dirty((top, top + height - 1, left, left + width - 1))
+
+    def set_tile(self, y: int, x: int, tile):
+        """Store one (tile_id, behavior, collision[, elevation]) tile"""
+        self.tile_id[y, x] = tile[0]
+        self.behavior[y, x] = tile[1] if len(tile) > 1 else 0
+        self.collision[y, x] = tile[2] if len(tile) > 2 else 0
+        self.elevation[y, x] = tile[3] if len(tile) > 3 else 0
+        self.explored[y, x] = True
+        self._mark_dirty((y, y, x, x))
+
+    def tile_at(self, y: int, x: int) -> Optional[Tuple]:
+        """Tile tuple at a grid position, or None if unexplored / outside the grid"""
+        if not self.in_bounds(y, x) or not self.explored[y, x]:
+            return None
+        return (int(self.tile_id[y, x]), _BEHAVIOR_BY_VALUE[self.behavior[y, x]],
+                int(self.collision[y, x]), int(self.elevation[y, x]))
+
+    def _explored_indices(self, y0: int, y1: Optional[int], x0: int, x1: Optional[int]):
+        y0, x0 = max(y0, 0), max(x0, 0)
+        y1 = self.height if y1 is None else min(y1, self.height)
+        x1 = self.width if x1 is None else min(x1, self.width)
+        if y0 >= y1 or x0 >= x1:
+            return None, None
+
+        ys, xs = np.nonzero(self.explored[y0:y1, x0:x1])
+        ys += y0
+        xs += x0
+        return ys, xs
+
+    def explored_cells(self, y0: int = 0, y1: Optional[int] = None,
+                       x0: int = 0, x1: Optional[int] = None) -> List[Tuple[int, int, Tuple]]:
+        """(grid_y, grid_x, tile) for every explored cell in [y0, y1) x [x0, x1)"""
+        ys, xs = self._explored_indices(y0, y1, x0, x1)
+        if ys is None:
+            return []
+        tile_ids = self.tile_id[ys, xs].tolist()
+        behaviors = self.behavior[ys, xs].tolist()
+        collisions = self.collision[ys, xs].tolist()
+        elevations = self.elevation[ys, xs].tolist()
+        return [
+            (y, x, (tile_id, _BEHAVIOR_BY_VALUE[behavior], collision, elevation))
+            for y, x, tile_id, behavior, collision, elevation
+            in zip(ys.tolist(), xs.tolist(), tile_ids, behaviors, collisions, elevations)
+        ]
+
+    def explored_symbols(self, lut: np.ndarray, y0: int = 0, y1: Optional[int] = None,
+                         x0: int = 0, x1: Optional[int] = None) -> List[Tuple[int, int, str]]:
+        """(grid_y, grid_x, symbol) for every explored cell, symbols from a utils.tile_symbols LUT"""
+        ys, xs = self._explored_indices(y0, y1, x0, x1)
+        if ys is None:
+            return []
+        symbols = symbol_planes(lut, self.tile_id[ys, xs], self.behavior[ys, xs], self.collision[ys, xs])
+        return list(zip(ys.tolist(), xs.tolist(), symbols.tolist()))
+
+    def explored_extent(self) -> Optional[Tuple[int, int, int, int]]:
+        """(min_y, max_y, min_x, max_x) of explored cells in grid coordinates, or None"""
+        rows = np.flatnonzero(self.explored.any(axis=1))
+        if rows.size == 0:
+            return None
+        cols = np.flatnonzero(self.explored.any(axis=0))
+        return int(rows[0]), int(rows[-1]), int(cols[0]), int(cols[-1])
+
+    def merge(self, tiles: List[List[Tuple]], top: int, left: int) -> Optional[Tuple[int, int, int, int]]:
+        """Write a block of tiles with its top-left corner at grid (top, left).
+
+        Cells outside 0..MAX_SIZE are dropped, the planes grow to fit the rest,
+        and empty / None tiles leave the existing cell untouched.
+
+        Returns:
+            (min_y, max_y, min_x, max_x) grid extent of the cells written, or None
+        """
+        packed, valid = _pack_tiles(tiles)
+        if packed is None:
+            return None
+
+        height, width = valid.shape
+        y0, x0 = max(top, 0), max(left, 0)
+        y1, x1 = min(top + height, self.MAX_SIZE), min(left + width, self.MAX_SIZE)
+        if y0 >= y1 or x0 >= x1:
+            return None
+
+        self.ensure_size(y1, x1)
+        y1, x1 = min(y1, self.height), min(x1, self.width)
+        src = (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+        dst = (slice(y0, y1), slice(x0, x1))
+        valid = valid[src]
+        if not valid.any():
+            return None
+
+        block = packed[src]
+        if valid.all():
+            self.tile_id[dst] = block[..., 0]
+            self.behavior[dst] = block[..., 1]
+            self.collision[dst] = block[..., 2]
+            self.elevation[dst] = block[..., 3]
+            self.explored[dst] = True
+            extent = (y0, y1 - 1, x0, x1 - 1)
+            self._mark_dirty(extent)
+            return extent
+
+        for index, name in enumerate(('tile_id', 'behavior', 'collision', 'elevation')):
+            plane = getattr(self, name)[dst]
+            plane[valid] = block[..., index][valid]
+        self.explored[dst] |= valid
+        rows = np.flatnonzero(valid.any(axis=1))
+        cols = np.flatnonzero(valid.any(axis=0))
+        extent = (y0 + int(rows[0]), y0 + int(rows[-1]), x0 + int(cols[0]), x0 + int(cols[-1]))
+        self._mark_dirty(extent)
+        return extent
+
+    def to_rows(self) -> List[List[Optional[Tuple]]]:
+        """Legacy list-of-rows view (None = unexplored)"""
+        rows = [[None] * self.width for _ in range(self.height)]
+        for y, x, tile in self.explored_cells():
+            rows[y][x] = tile
+        return rows
+
+
+def _pack_tiles(tiles: List[List[Tuple]]) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Convert a block of tile tuples to an (H, W, 4) int array plus a mask of non-empty tiles"""
+    if not tiles or not tiles[0]:
+        return None, None
+    try:
+        packed = np.asarray(tiles, dtype=np.int64)
+        if packed.ndim == 3 and packed.shape[2] == 4:
+            return packed, np.ones(packed.shape[:2], dtype=bool)
+    except (TypeError, ValueError):
+        pass
+
+    # Ragged rows, missing tiles or short tuples - pack tile by tile
+    height = len(tiles)
+    width = max(len(row) for row in tiles if row is not None)
+    packed = np.zeros((height, width, 4), dtype=np.int64)
+    valid = np.zeros((height, width), dtype=bool)
+    for y, row in enumerate(tiles):
+        for x, tile in enumerate(row or []):
+            if tile:
+                values = list(tile[:4])
+                packed[y, x, :len(values)] = values
+                valid[y, x] = True
+    return packed, valid
+
+
+def _coalesce_extents(extents: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """Merge overlapping (min_y, max_y, min_x, max_x) extents into their bounding box when that isn't much bigger"""
+    extents = list(dict.fromkeys(extents))
+    if len(extents) <= 1:
+        return extents
+    box = (min(e[0] for e in extents), max(e[1] for e in extents),
+           min(e[2] for e in extents), max(e[3] for e in extents))
+    box_area = (box[1] - box[0] + 1) * (box[3] - box[2] + 1)
+    total_area = sum((e[1] - e[0] + 1) * (e[3] - e[2] + 1) for e in extents)
+    return [box] if box_area <= 2 * total_area else extents
+
+
 @dataclass
 class MapArea:
     """Represents a single map area with its data"""
     map_id: int  # (map_bank << 8) | map_number
     location_name: str
-    map_data: List[List[Tuple]]  # Raw tile data from memory
+    map_data: Optional[TileGrid]  # Accumulated tiles (legacy list-of-rows input is converted)
     player_last_position: Tuple[int, int]  # Last known player position
     warp_tiles: List[Tuple[int, int, str]]  # (x, y, warp_type) positions
     boundaries: Dict[str, int]  # north, south, east, west limits
@@ -57,10 +326,15 @@ class MapArea:
     last_seen: float   # timestamp
     overworld_coords: Optional[Tuple[int, int]] = None  # (X, Y) in overworld coordinate system
     
+    def __post_init__(self):
+        if isinstance(self.map_data, list):
+            self.map_data = TileGrid.from_rows(self.map_data) if self.map_data else None
+    
     def get_map_bounds(self) -> Tuple[int, int, int, int]:
         """Return (min_x, min_y, max_x, max_y) for this map"""
-        height = len(self.map_data)
-        width = len(self.map_data[0]) if height > 0 else 0
+        if self.map_data is None:
+            return (0, 0, -1, -1)
+        height, width = self.map_data.shape
         return (0, 0, width - 1, height - 1)
     
     def has_warp_at(self, x: int, y: int) -> Optional[str]:
@@ -70,6 +344,19 @@ class MapArea:
                 return warp_type
         return None
 
+@dataclass
+class _LocationGridEntry:
+    """Memoized get_location_grid() result for one area, patched from TileGrid.changes_since()"""
+    tiles: TileGrid
+    offset: Tuple[int, int]  # origin_offset (x, y)
+    bounds: Tuple[int, int, int, int]  # explored_bounds as (min_y, max_y, min_x, max_x), world coords
+    version: int
+    revision: int = 0  # Changes whenever `grid` does, unique across entries (see location_grid_revision)
+    cells: Dict[Tuple[int, int], Any] = field(default_factory=dict)  # explored cells only
+    frontier: Set[Tuple[int, int]] = field(default_factory=set)  # '?' cells
+    grid: Dict[Tuple[int, int], Any] = field(default_factory=dict)  # cells + frontier, what callers get
+
+
 class MapStitcher:
     """Main class for managing map stitching and connections"""
     
@@ -87,6 +374,13 @@ class MapStitcher:
         self.pending_warps: List[Dict] = []  # Track potential warps
         self.last_map_id: Optional[int] = None
         self.last_position: Optional[Tuple[int, int]] = None
+        self._area_name_index: Dict[str, int] = {}  # lowercased location name -> map_id
+        self._location_grid_cache: Dict[Tuple[int, bool], _LocationGridEntry] = {}
+        self._grid_revisions = itertools.count(1)
+        # Hold around reads from other threads while a MapStitcherWorker may be merging;
+        # the PokemonEmeraldReader that owns this stitcher shares its map_stitcher_lock here
+        self.lock = threading.RLock()
+        self._reset_journal_state()
         
         # Load existing data
         self.load_from_file()
@@ -114,14 +408,8 @@ class MapStitcher:
         
         # If this is the first data for this area, initialize with a large empty grid
         if area.map_data is None or not area.map_data:
-            # Create a 100x100 grid initially (can expand as needed)
-            # Use None to indicate unexplored tiles
-            area.map_data = [[None for _ in range(100)] for _ in range(100)]
-            # Track the actual bounds of explored area
-            area.explored_bounds = {
-                'min_x': 50, 'max_x': 50,
-                'min_y': 50, 'max_y': 50
-            }
+            # Create a 100x100 grid initially (grows up to TileGrid.MAX_SIZE as needed)
+            area.map_data = TileGrid()
             # Place player at center of our coordinate system initially
             area.origin_offset = {'x': 50 - player_pos[0], 'y': 50 - player_pos[1]}
             
@@ -138,7 +426,7 @@ class MapStitcher:
         grid_center_x = player_pos[0] + offset_x
         grid_center_y = player_pos[1] + offset_y
         
-        MAX_REASONABLE_SIZE = 200  # Maximum reasonable size for a single map area
+        MAX_REASONABLE_SIZE = TileGrid.MAX_SIZE
         
         # Check if this would cause unreasonable expansion
         if (grid_center_x < -50 or grid_center_x > MAX_REASONABLE_SIZE + 50 or
@@ -149,72 +437,37 @@ class MapStitcher:
                          f"Resetting origin offset for this area.")
             
             # Reset the map data for this area to prevent corruption
-            area.map_data = [[None for _ in range(100)] for _ in range(100)]
-            area.explored_bounds = {
-                'min_x': 50, 'max_x': 50,
-                'min_y': 50, 'max_y': 50
-            }
+            area.map_data = TileGrid()
+            if hasattr(area, 'explored_bounds'):
+                del area.explored_bounds
             area.origin_offset = {'x': 50 - player_pos[0], 'y': 50 - player_pos[1]}
             offset_x = area.origin_offset['x']
             offset_y = area.origin_offset['y']
         
-        # Merge the new tiles into the existing map
-        for dy in range(new_height):
-            for dx in range(new_width):
-                # Calculate the world position of this tile
-                world_x = player_pos[0] - center_x + dx
-                world_y = player_pos[1] - center_y + dy
-                
-                # Calculate the position in our stored grid
-                grid_x = world_x + offset_x
-                grid_y = world_y + offset_y
-                
-                # Sanity check to prevent excessive memory usage
-                if grid_x < 0 or grid_y < 0 or grid_x >= MAX_REASONABLE_SIZE or grid_y >= MAX_REASONABLE_SIZE:
-                    logger.debug(f"Skipping tile at grid position ({grid_x}, {grid_y}) - out of reasonable bounds")
-                    continue
-                
-                # Expand grid if necessary (but within reasonable limits)
-                if grid_y >= len(area.map_data) and grid_y < MAX_REASONABLE_SIZE:
-                    # Expand vertically
-                    expansion_needed = min(grid_y - len(area.map_data) + 1, 
-                                         MAX_REASONABLE_SIZE - len(area.map_data))
-                    for _ in range(expansion_needed):
-                        area.map_data.append([None] * len(area.map_data[0]))
-                
-                if grid_x >= len(area.map_data[0]) and grid_x < MAX_REASONABLE_SIZE:
-                    # Expand horizontally
-                    new_width_needed = min(grid_x + 1, MAX_REASONABLE_SIZE)
-                    for row in area.map_data:
-                        expansion = new_width_needed - len(row)
-                        if expansion > 0:
-                            row.extend([None] * expansion)
-                
-                # Store the tile (always update with latest data)
-                if 0 <= grid_x < len(area.map_data[0]) and 0 <= grid_y < len(area.map_data):
-                    tile = new_tiles[dy][dx]
-                    # Store all tiles including 1023 (which represents walls/boundaries)
-                    # The display logic will handle showing them correctly
-                    if tile:
-                        area.map_data[grid_y][grid_x] = tile
-                        
-                        # Update explored bounds for all tiles including boundaries
-                        # CRITICAL: Store bounds in WORLD coordinates, not GRID coordinates!
-                        # This ensures A* pathfinding can correctly check if player position is in bounds
-                        tile_id = tile[0] if tile and len(tile) > 0 else None
-                        if tile_id is not None:  # Include all tiles, even 1023
-                            if not hasattr(area, 'explored_bounds'):
-                                # Initialize bounds with WORLD coordinates
-                                area.explored_bounds = {
-                                    'min_x': world_x, 'max_x': world_x,
-                                    'min_y': world_y, 'max_y': world_y
-                                }
-                            else:
-                                # Expand bounds using WORLD coordinates
-                                area.explored_bounds['min_x'] = min(area.explored_bounds['min_x'], world_x)
-                                area.explored_bounds['max_x'] = max(area.explored_bounds['max_x'], world_x)
-                                area.explored_bounds['min_y'] = min(area.explored_bounds['min_y'], world_y)
-                                area.explored_bounds['max_y'] = max(area.explored_bounds['max_y'], world_y)
+        # Merge the whole view in one slice assignment; tiles outside the grid are dropped.
+        # Store all tiles including 1023 (which represents walls/boundaries) - the display
+        # logic will handle showing them correctly
+        top = player_pos[1] - center_y + offset_y
+        left = player_pos[0] - center_x + offset_x
+        extent = area.map_data.merge(new_tiles, top, left)
+        if extent is None:
+            logger.debug(f"No tiles merged for map {area.map_id:04X} - view at grid ({left}, {top}) is out of reasonable bounds")
+            return
+        
+        # Update explored bounds for all tiles including boundaries
+        # CRITICAL: Store bounds in WORLD coordinates, not GRID coordinates!
+        # This ensures A* pathfinding can correctly check if player position is in bounds
+        min_y, max_y, min_x, max_x = extent
+        min_x, max_x = min_x - offset_x, max_x - offset_x
+        min_y, max_y = min_y - offset_y, max_y - offset_y
+        bounds = getattr(area, 'explored_bounds', None)
+        if not bounds:
+            area.explored_bounds = {'min_x': min_x, 'max_x': max_x, 'min_y': min_y, 'max_y': max_y}
+        else:
+            bounds['min_x'] = min(bounds['min_x'], min_x)
+            bounds['max_x'] = max(bounds['max_x'], max_x)
+            bounds['min_y'] = min(bounds['min_y'], min_y)
+            bounds['max_y'] = max(bounds['max_y'], max_y)
     
     def get_map_id(self, map_bank: int, map_number: int) -> int:
         """Convert map bank/number to unique ID"""
@@ -231,6 +484,9 @@ class MapStitcher:
         self.map_areas = {}
         self.warp_connections = []
         self.pending_warps = []
+        self._area_name_index = {}
+        self._location_grid_cache = {}
+        self._reset_journal_state()
         self.load_from_file()
     
     def update_map_area(self, map_bank: int, map_number: int, location_name: str,
@@ -528,29 +784,37 @@ class MapStitcher:
                 return True
         return False
     
-    def resolve_unknown_location_names(self, memory_reader=None):
-        """Try to resolve 'Unknown' location names using the memory reader if available"""
+    def resolve_unknown_location_names(self, memory_reader=None, current=None):
+        """Try to resolve 'Unknown' location names using the memory reader if available
+        
+        Args:
+            memory_reader: Reader to get the current map ID and location name from
+            current: (map_id, location_name) already read by the caller, used instead
+                of memory_reader (e.g. by the map stitcher worker, which can't read memory)
+        """
         resolved_count = 0
         
         # If we have a memory reader, we can potentially resolve current location
-        if memory_reader is not None:
+        if current is None and memory_reader is not None:
             try:
                 current_location = memory_reader.read_location()
                 current_map_bank = memory_reader._read_u8(memory_reader.addresses.MAP_BANK)
                 current_map_number = memory_reader._read_u8(memory_reader.addresses.MAP_NUMBER)
-                current_map_id = (current_map_bank << 8) | current_map_number
-                
-                # Update current map if it's unknown
-                if current_map_id in self.map_areas:
-                    area = self.map_areas[current_map_id]
-                    if area.location_name == "Unknown" and current_location and current_location.strip() and current_location != "Unknown":
-                        old_name = area.location_name
-                        area.location_name = current_location
-                        logger.info(f"Resolved current location name for map {current_map_id:04X}: '{old_name}' -> '{area.location_name}'")
-                        resolved_count += 1
+                current = ((current_map_bank << 8) | current_map_number, current_location)
             except Exception as e:
                 logger.debug(f"Could not resolve current location: {e}")
         
+        if current is not None:
+            current_map_id, current_location = current
+            # Update current map if it's unknown
+            if current_map_id in self.map_areas:
+                area = self.map_areas[current_map_id]
+                if area.location_name == "Unknown" and current_location and current_location.strip() and current_location != "Unknown":
+                    old_name = area.location_name
+                    area.location_name = current_location
+                    logger.info(f"Resolved current location name for map {current_map_id:04X}: '{old_name}' -> '{area.location_name}'")
+                    resolved_count += 1
+        
         if resolved_count > 0:
             logger.info(f"Resolved {resolved_count} unknown location names")
             return True
@@ -608,14 +872,12 @@ class MapStitcher:
             Tuple of (x, y) coordinates or None if not found or invalid
         """
         # Find the map area with this location name
-        for area in self.map_areas.values():
-            if area.location_name and location_name and area.location_name.lower() == location_name.lower():
-                if hasattr(area, 'player_last_position') and area.player_last_position:
-                    px, py = area.player_last_position
-                    # Validate the position
-                    if px >= 0 and px < 1000 and py >= 0 and py < 1000 and px != 0xFFFF and py != 0xFFFF:
-                        return (px, py)
-                break
+        area = self.find_area_by_name(location_name)
+        if area and hasattr(area, 'player_last_position') and area.player_last_position:
+            px, py = area.player_last_position
+            # Validate the position
+            if px >= 0 and px < 1000 and py >= 0 and py < 1000 and px != 0xFFFF and py != 0xFFFF:
+                return (px, py)
         return None
     
     def get_location_connections(self, location_name=None):
@@ -673,6 +935,112 @@ class MapStitcher:
         
         return location_connections
     
+    def find_area_by_name(self, location_name: str) -> Optional[MapArea]:
+        """Find the map area for a location name (case-insensitive)"""
+        if not location_name:
+            return None
+        key = location_name.lower()
+        area = self.map_areas.get(self._area_name_index.get(key))
+        if area is None or not area.location_name or area.location_name.lower() != key:
+            # Areas get added and renamed in place all over, so rebuild the index on a miss
+            self._area_name_index = {}
+            for map_id, candidate in self.map_areas.items():
+                if candidate.location_name:
+                    self._area_name_index.setdefault(candidate.location_name.lower(), map_id)
+            area = self.map_areas.get(self._area_name_index.get(key))
+        return area
+    
+    def _cached_location_grid(self, area: MapArea, simplified: bool) -> _LocationGridEntry:
+        """Explored-bounds grid for an area, rebuilt only from the cells written since the last call"""
+        tiles = area.map_data
+        offset = (area.origin_offset.get('x', 0), area.origin_offset.get('y', 0))
+        explored = area.explored_bounds
+        bounds = (explored['min_y'], explored['max_y'], explored['min_x'], explored['max_x'])
+        key = (area.map_id, simplified)
+        
+        entry = self._location_grid_cache.get(key)
+        changes = None
+        if (entry is not None and entry.tiles is tiles and entry.offset == offset and
+                bounds[0] <= entry.bounds[0] and bounds[1] >= entry.bounds[1] and
+                bounds[2] <= entry.bounds[2] and bounds[3] >= entry.bounds[3]):
+            changes = tiles.changes_since(entry.version)
+        
+        offset_x, offset_y = offset
+        if changes is None:
+            entry = _LocationGridEntry(tiles=tiles, offset=offset, bounds=bounds, version=tiles.version)
+            self._location_grid_cache[key] = entry
+            rects = [(bounds[0] + offset_y, bounds[1] + offset_y, bounds[2] + offset_x, bounds[3] + offset_x)]
+        else:
+            if not changes and bounds == entry.bounds:
+                return entry
+            # Cells written since last time, plus any strips the explored bounds grew by
+            rects = list(changes)
+            old_min_y, old_max_y, old_min_x, old_max_x = entry.bounds
+            min_y, max_y, min_x, max_x = bounds
+            strips = [(min_y, old_min_y - 1, min_x, max_x), (old_max_y + 1, max_y, min_x, max_x),
+                      (old_min_y, old_max_y, min_x, old_min_x - 1), (old_min_y, old_max_y, old_max_x + 1, max_x)]
+            rects.extend((y0 + offset_y, y1 + offset_y, x0 + offset_x, x1 + offset_x) for y0, y1, x0, x1 in strips)
+            entry.version = tiles.version
+            entry.bounds = bounds
+        
+        # Only cells inside the explored bounds are shown
+        grid_bounds = (bounds[0] + offset_y, bounds[1] + offset_y, bounds[2] + offset_x, bounds[3] + offset_x)
+        changed = []
+        modified = changes is None
+        for y0, y1, x0, x1 in rects:
+            y0, y1 = max(y0, grid_bounds[0]), min(y1, grid_bounds[1])
+            x0, x1 = max(x0, grid_bounds[2]), min(x1, grid_bounds[3])
+            if y0 > y1 or x0 > x1:
+                continue
+            if simplified:
+                # One LUT lookup over the whole rectangle instead of _tile_to_symbol per tile
+                values = tiles.explored_symbols(LOCATION_SYMBOL_LUT, y0, y1 + 1, x0, x1 + 1)
+            else:
+                values = tiles.explored_cells(y0, y1 + 1, x0, x1 + 1)
+            for grid_y, grid_x, value in values:
+                # Use WORLD coordinates as keys (not relative)
+                pos = (grid_x - offset_x, grid_y - offset_y)
+                if entry.grid.get(pos) != value:
+                    modified = True
+                entry.cells[pos] = value
+                entry.grid[pos] = value
+                changed.append(pos)
+        
+        if simplified:
+            # '?' for unexplored cells next to walkable tiles; only cells touching a change can flip
+            candidates = set(changed)
+            for x, y in changed:
+                candidates.update(((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)))
+            for pos in candidates:
+                if pos in entry.cells:
+                    entry.frontier.discard(pos)
+                    continue
+                x, y = pos
+                if any(entry.cells.get(adj) in FRONTIER_SOURCE_SYMBOLS
+                       for adj in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y))):
+                    modified = modified or pos not in entry.frontier
+                    entry.frontier.add(pos)
+                    entry.grid[pos] = '?'
+                elif pos in entry.frontier:
+                    modified = True
+                    entry.frontier.discard(pos)
+                    entry.grid.pop(pos, None)
+        if modified:
+            entry.revision = next(self._grid_revisions)
+        return entry
+    
+    def location_grid_revision(self, location_name: str, simplified: bool = True) -> int:
+        """Revision of the last get_location_grid() result for a location (0 if not cached).
+        
+        Revisions never repeat, so pathfinding callers can key caches on them instead of
+        comparing grids.
+        """
+        map_area = self.find_area_by_name(location_name)
+        if map_area is None:
+            return 0
+        entry = self._location_grid_cache.get((map_area.map_id, simplified))
+        return entry.revision if entry is not None and entry.tiles is map_area.map_data else 0
+    
     def get_location_grid(self, location_name: str, simplified: bool = True) -> Dict[Tuple[int, int], str]:
         """Get a simplified grid representation of a location for display.
         
@@ -684,11 +1052,7 @@ class MapStitcher:
             Dictionary mapping (x, y) coordinates to tile symbols
         """
         # Find the map area with this location name (case-insensitive)
-        map_area = None
-        for area in self.map_areas.values():
-            if area.location_name and location_name and area.location_name.lower() == location_name.lower():
-                map_area = area
-                break
+        map_area = self.find_area_by_name(location_name)
         
         if not map_area:
             # Debug: print available locations
@@ -704,8 +1068,6 @@ class MapStitcher:
         
         # If we have explored bounds, use them to extract only the explored portion
         if hasattr(map_area, 'explored_bounds'):
-            bounds = map_area.explored_bounds
-            
             # CRITICAL: Use the stored origin_offset to convert from world coords to grid coords
             # The explored_bounds are in WORLD coordinates, but map_data is indexed by GRID coordinates
             # The transformation is: grid_x = world_x + offset_x, grid_y = world_y + offset_y
@@ -715,47 +1077,9 @@ class MapStitcher:
                 logger.warning(f"Map area {location_name} missing origin_offset - cannot convert coordinates")
                 return {}
             
-            offset_x = map_area.origin_offset.get('x', 0)
-            offset_y = map_area.origin_offset.get('y', 0)
-            
-            # Now iterate through world coordinates and convert to grid coordinates
-            for world_y in range(bounds['min_y'], bounds['max_y'] + 1):
-                for world_x in range(bounds['min_x'], bounds['max_x'] + 1):
-                    # Convert world coords to grid coords
-                    grid_x = world_x + offset_x
-                    grid_y = world_y + offset_y
-                    
-                    if grid_y < len(map_area.map_data) and grid_x < len(map_area.map_data[0]):
-                        tile = map_area.map_data[grid_y][grid_x]
-                        if tile is not None:  # Only include explored tiles
-                            if simplified:
-                                # Convert to simplified symbol
-                                symbol = self._tile_to_symbol(tile)
-                                if symbol is not None:  # Only add if it's a valid tile
-                                    # Use WORLD coordinates as keys (not relative)
-                                    grid[(world_x, world_y)] = symbol
-                            else:
-                                grid[(world_x, world_y)] = tile
-            
-            # Add '?' for unexplored but adjacent tiles
-            if simplified:
-                # Find all positions adjacent to explored walkable tiles
-                to_check = set()
-                for (world_x, world_y), symbol in list(grid.items()):
-                    # Only add ? next to truly walkable tiles, not walls
-                    if symbol in ['.', 'D', 'S', '^', '~', 's', 'I',  # Walkable terrain
-                                  '→', '←', '↑', '↓', '↗', '↖', '↘', '↙']:  # Ledges
-                        # Check all 4 adjacent positions (not diagonal)
-                        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                            adj_pos = (world_x + dx, world_y + dy)
-                            if adj_pos not in grid:
-                                to_check.add(adj_pos)
-                
-                # Add '?' for these unexplored adjacent positions
-                for pos in to_check:
-                    grid[pos] = '?'
-            
-            return grid
+            # Symbols and the '?' frontier are memoized per area and patched from the
+            # cells merged since the last call; copy so callers can't corrupt the cache
+            return dict(self._cached_location_grid(map_area, simplified).grid)
         
         # Fallback: old logic for non-accumulated maps
         # Check if we should extract a focused area from the stored map
@@ -763,39 +1087,25 @@ class MapStitcher:
         if extract_bounds:
             extract_start_x, extract_start_y, display_size = extract_bounds
             # Extract only the specified area
-            for y in range(display_size):
-                for x in range(display_size):
-                    stored_y = extract_start_y + y
-                    stored_x = extract_start_x + x
-                    if (stored_y < len(map_area.map_data) and 
-                        stored_x < len(map_area.map_data[stored_y])):
-                        tile = map_area.map_data[stored_y][stored_x]
-                        if tile and len(tile) >= 3:
-                            tile_id, behavior, collision = tile[:3]
-                            
-                            if simplified:
-                                # Use the centralized tile_to_symbol function
-                                symbol = self._tile_to_symbol(tile)
-                                if symbol is not None:  # Only add if it's a valid tile
-                                    grid[(x, y)] = symbol
-                            else:
-                                # Return raw tile data
-                                grid[(x, y)] = tile
+            cells = map_area.map_data.explored_cells(
+                extract_start_y, extract_start_y + display_size,
+                extract_start_x, extract_start_x + display_size)
         else:
             # Use full stored map (fallback for old behavior)
-            for y, row in enumerate(map_area.map_data):
-                for x, tile in enumerate(row):
-                    if tile and len(tile) >= 3:
-                        tile_id, behavior, collision = tile[:3]
-                        
-                        if simplified:
-                            # Use the centralized tile_to_symbol function
-                            symbol = self._tile_to_symbol(tile)
-                            if symbol is not None:  # Only add if it's a valid tile
-                                grid[(x, y)] = symbol
-                        else:
-                            # Return raw tile data
-                            grid[(x, y)] = tile
+            extract_start_x, extract_start_y = 0, 0
+            cells = map_area.map_data.explored_cells()
+        
+        for stored_y, stored_x, tile in cells:
+            x = stored_x - extract_start_x
+            y = stored_y - extract_start_y
+            if simplified:
+                # Use the centralized tile_to_symbol function
+                symbol = self._tile_to_symbol(tile)
+                if symbol is not None:  # Only add if it's a valid tile
+                    grid[(x, y)] = symbol
+            else:
+                # Return raw tile data
+                grid[(x, y)] = tile
         
         return grid
     
@@ -811,54 +1121,281 @@ class MapStitcher:
                 all_grids[area.location_name] = self.get_location_grid(area.location_name, simplified)
         return all_grids
     
-    def save_to_file(self):
-        """Save stitching data to JSON file"""
+    # Journal grows with new exploration; past this size save_to_file() rewrites the JSON snapshot
+    JOURNAL_COMPACT_BYTES = 2 * 1024 * 1024
+    
+    @property
+    def journal_file(self) -> Path:
+        """Append-only journal of changes since the JSON snapshot in save_file"""
+        return self.save_file.with_suffix('.journal')
+    
+    def _reset_journal_state(self):
+        self._journal_id: Optional[str] = None  # Ties the journal to the snapshot it extends
+        self._journal_state: Dict[int, Tuple[Optional[TileGrid], int, Tuple]] = {}  # map_id -> (tiles, version, meta)
+        self._journal_connection_keys: Optional[Set[Tuple[str, str]]] = None
+        self._snapshot_stat: Optional[Tuple[int, int]] = None
+    
+    @staticmethod
+    def _connection_keys(location_connections: Dict[str, List]) -> Set[Tuple[str, str]]:
+        return {(from_location, conn[0]) for from_location, conns in location_connections.items() for conn in conns}
+    
+    @staticmethod
+    def _journal_meta(area: MapArea) -> Tuple:
+        """Area fields the journal records, in a comparable form"""
+        bounds = getattr(area, 'explored_bounds', None)
+        offset = getattr(area, 'origin_offset', None)
+        return (
+            area.location_name,
+            tuple(area.player_last_position) if area.player_last_position else None,
+            tuple(sorted(bounds.items())) if bounds else None,
+            tuple(sorted(offset.items())) if offset else None,
+            area.map_data.shape if area.map_data is not None else None,
+        )
+    
+    def _snapshot_file_stat(self) -> Optional[Tuple[int, int]]:
         try:
-            data = {
-                "map_areas": {},
-                "location_connections": {}
+            stat = self.save_file.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _needs_compaction(self, location_connections: Dict[str, List]) -> bool:
+        """Whether the next save has to rewrite the snapshot instead of appending to the journal"""
+        if self._journal_id is None:
+            return True
+        # Areas can't be removed through the journal
+        if any(map_id not in self.map_areas for map_id in self._journal_state):
+            return True
+        # Readers of the snapshot (server, state formatter) rely on its connection list
+        if self._connection_keys(location_connections) != self._journal_connection_keys:
+            return True
+        # Snapshot replaced underneath us (copied in from a saved state)
+        if self._snapshot_file_stat() != self._snapshot_stat:
+            return True
+        try:
+            return self.journal_file.stat().st_size > self.JOURNAL_COMPACT_BYTES
+        except OSError:
+            return True
+    
+    def save_to_file(self, compact: bool = False):
+        """Save stitching data.
+        
+        Tiles merged and area fields changed since the last save are appended to
+        journal_file. The JSON snapshot in save_file is only rewritten (and the
+        journal truncated) when `compact` is set, the journal outgrows
+        JOURNAL_COMPACT_BYTES, or something the journal can't express changed.
+        Copy save_file elsewhere only right after a compacting save.
+        """
+        try:
+            location_connections = self.get_location_connections()
+            if compact or self._needs_compaction(location_connections):
+                self._write_snapshot(location_connections)
+            else:
+                self._append_journal()
+        except Exception as e:
+            logger.error(f"Failed to save map stitching data: {e}")
+    
+    def _snapshot_data(self, location_connections: Dict[str, List]) -> Dict[str, Any]:
+        """Full JSON-serializable stitching data"""
+        data = {
+            "map_areas": {},
+            "location_connections": {}
+        }
+        
+        # Convert map areas to serializable format
+        for map_id, area in self.map_areas.items():
+            # Trim null rows from map_data before saving
+            if area.map_data:
+                trimmed_map_data, trim_offsets = self._trim_null_rows(area.map_data)
+            else:
+                trimmed_map_data, trim_offsets = [], {}
+            
+            # Save only essential data
+            area_data = {
+                "map_id": area.map_id,
+                "location_name": area.location_name,
+                "map_data": trimmed_map_data,
+                "player_last_position": area.player_last_position
             }
             
-            # Convert map areas to serializable format
-            for map_id, area in self.map_areas.items():
-                # Trim null rows from map_data before saving
-                if area.map_data:
-                    trimmed_map_data, trim_offsets = self._trim_null_rows(area.map_data)
-                else:
-                    trimmed_map_data, trim_offsets = [], {}
-                
-                # Save only essential data
-                area_data = {
+            # Save trim offsets if we trimmed the data
+            if trim_offsets:
+                area_data["trim_offsets"] = trim_offsets
+            
+            # Save additional attributes for map stitching
+            if hasattr(area, 'explored_bounds'):
+                area_data["explored_bounds"] = area.explored_bounds
+            if hasattr(area, 'origin_offset'):
+                area_data["origin_offset"] = area.origin_offset
+            data["map_areas"][str(map_id)] = area_data
+        
+        # Generate location_connections from warp_connections
+        # MapStitcher is the single source of truth for connections
+        data["location_connections"] = location_connections
+        logger.debug(f"Saved {len(data['location_connections'])} location connections from {len(self.warp_connections)} warp connections")
+        return data
+    
+    @staticmethod
+    def _write_json_atomic(path: Path, data: Dict[str, Any]):
+        # Write to a temp file and swap it in so readers never see a half-written snapshot
+        temp_file = path.with_name(path.name + '.tmp')
+        with open(temp_file, 'w') as f:
+            # Save in minified format to reduce file size
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_file, path)
+    
+    def export_snapshot(self, target_file: str):
+        """Write the complete current data as a standalone JSON file (e.g. next to a saved state).
+        
+        The export has no journal id, so whichever journal sits next to it when it is
+        copied back and loaded is ignored.
+        """
+        self._write_json_atomic(Path(target_file), self._snapshot_data(self.get_location_connections()))
+    
+    def _write_snapshot(self, location_connections: Dict[str, List]):
+        """Rewrite the full JSON snapshot and start a fresh journal for it"""
+        data = self._snapshot_data(location_connections)
+        data["journal_id"] = uuid.uuid4().hex
+        self._write_json_atomic(self.save_file, data)
+        
+        with open(self.journal_file, 'w') as f:
+            f.write(json.dumps({"op": "header", "journal_id": data["journal_id"]}) + "\n")
+        
+        self._mark_journal_synced(data["journal_id"], location_connections)
+        logger.debug(f"Saved map stitching data to {self.save_file}")
+    
+    def _mark_journal_synced(self, journal_id: Optional[str], location_connections: Dict[str, List]):
+        """Record that save_file + journal_file now match memory"""
+        self._journal_id = journal_id
+        self._journal_connection_keys = self._connection_keys(location_connections)
+        self._snapshot_stat = self._snapshot_file_stat()
+        self._journal_state = {
+            map_id: (area.map_data, area.map_data.version if area.map_data is not None else 0, self._journal_meta(area))
+            for map_id, area in self.map_areas.items()
+        }
+    
+    def _append_journal(self):
+        """Append the areas and tile rectangles that changed since the last save"""
+        records = []
+        new_state = {}
+        for map_id, area in self.map_areas.items():
+            tiles = area.map_data
+            saved = self._journal_state.get(map_id)
+            meta = self._journal_meta(area)
+            reset = saved is None or saved[0] is not tiles
+            
+            if reset or meta != saved[2]:
+                records.append({
+                    "op": "area",
                     "map_id": area.map_id,
+                    "reset": reset,
                     "location_name": area.location_name,
-                    "map_data": trimmed_map_data,
-                    "player_last_position": area.player_last_position
-                }
-                
-                # Save trim offsets if we trimmed the data
-                if trim_offsets:
-                    area_data["trim_offsets"] = trim_offsets
-                
-                # Save additional attributes for map stitching
-                if hasattr(area, 'explored_bounds'):
-                    area_data["explored_bounds"] = area.explored_bounds
-                if hasattr(area, 'origin_offset'):
-                    area_data["origin_offset"] = area.origin_offset
-                data["map_areas"][str(map_id)] = area_data
+                    "player_last_position": list(area.player_last_position) if area.player_last_position else None,
+                    "explored_bounds": getattr(area, 'explored_bounds', None),
+                    "origin_offset": getattr(area, 'origin_offset', None),
+                    "shape": list(tiles.shape) if tiles is not None else None,
+                })
             
-            # Generate location_connections from warp_connections
-            # MapStitcher is the single source of truth for connections
-            data["location_connections"] = self.get_location_connections()
-            logger.debug(f"Saved {len(data['location_connections'])} location connections from {len(self.warp_connections)} warp connections")
+            if tiles is not None:
+                extents = None if reset else tiles.changes_since(saved[1])
+                if extents is None:
+                    # New grid, or more merges than the dirty log keeps - write everything explored
+                    extent = tiles.explored_extent()
+                    extents = [extent] if extent else []
+                for extent in _coalesce_extents(extents):
+                    planes = tiles.region(extent)
+                    record = {"op": "tiles", "map_id": area.map_id, "top": extent[0], "left": extent[2],
+                              "shape": list(planes['explored'].shape)}
+                    for name, plane in planes.items():
+                        record[name] = base64.b64encode(plane.tobytes()).decode('ascii')
+                    records.append(record)
             
-            with open(self.save_file, 'w') as f:
-                # Save in minified format to reduce file size
-                json.dump(data, f, separators=(',', ':'))
+            new_state[map_id] = (tiles, tiles.version if tiles is not None else 0, meta)
+        
+        if records:
+            with open(self.journal_file, 'a') as f:
+                f.write(''.join(json.dumps(record, separators=(',', ':')) + "\n" for record in records))
+            logger.debug(f"Appended {len(records)} records to {self.journal_file}")
+        self._journal_state = new_state
+    
+    def _replay_journal(self, journal_id: Optional[str]):
+        """Apply journal records written after the snapshot with this journal_id"""
+        if not journal_id or not self.journal_file.exists():
+            return False
+        
+        applied = 0
+        intact = True
+        with open(self.journal_file, 'r') as f:
+            header = f.readline()
+            try:
+                header_ok = json.loads(header).get("journal_id") == journal_id
+            except ValueError:
+                header_ok = False
+            if not header_ok:
+                # Journal of an older snapshot (e.g. the JSON was copied in from a saved state)
+                logger.info(f"Ignoring {self.journal_file}: it does not belong to {self.save_file}")
+                return False
             
-            logger.debug(f"Saved map stitching data to {self.save_file}")
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write at the end of the journal; keep what was applied and compact on next save
+                    logger.warning(f"Stopping replay of {self.journal_file} at a corrupt record")
+                    intact = False
+                    break
+                self._apply_journal_record(record)
+                applied += 1
+        
+        logger.info(f"Replayed {applied} map journal records from {self.journal_file}")
+        return intact
+    
+    def _apply_journal_record(self, record: Dict[str, Any]):
+        map_id = record["map_id"]
+        area = self.map_areas.get(map_id)
+        
+        if record["op"] == "area":
+            if area is None:
+                area = MapArea(
+                    map_id=map_id,
+                    location_name=record["location_name"],
+                    map_data=None,
+                    player_last_position=(0, 0),
+                    warp_tiles=[],  # Deprecated - not needed
+                    boundaries={"north": 0, "south": 10, "west": 0, "east": 10},  # Default boundaries
+                    visited_count=1,  # Default
+                    first_seen=0,  # Default
+                    last_seen=0,  # Default
+                    overworld_coords=None  # Not needed
+                )
+                self.map_areas[map_id] = area
+            area.location_name = record["location_name"]
+            if record["player_last_position"]:
+                area.player_last_position = tuple(record["player_last_position"])
+            for name in ("explored_bounds", "origin_offset"):
+                if record[name] is not None:
+                    setattr(area, name, record[name])
+                elif hasattr(area, name):
+                    delattr(area, name)
             
-        except Exception as e:
-            logger.error(f"Failed to save map stitching data: {e}")
+            shape = record["shape"]
+            if shape is None:
+                area.map_data = None
+            elif record["reset"] or area.map_data is None:
+                area.map_data = TileGrid(*shape)
+            else:
+                area.map_data.ensure_size(*shape)
+        
+        elif record["op"] == "tiles":
+            if area is None or area.map_data is None:
+                return
+            height, width = record["shape"]
+            planes = {
+                name: np.frombuffer(base64.b64decode(record[name]),
+                                    dtype=getattr(area.map_data, name).dtype).reshape(height, width)
+                for name in TileGrid.PLANES
+            }
+            area.map_data.write_region(record["top"], record["left"], planes)
     
     def load_from_file(self):
         """Load stitching data from JSON file"""
@@ -908,27 +1445,25 @@ class MapStitcher:
                     original_height = trim_offsets.get('original_height', 100)
                     original_width = trim_offsets.get('original_width', 100)
                     
-                    # Create full-sized map data array
-                    full_map_data = [[None for _ in range(original_width)] for _ in range(original_height)]
+                    # Create full-sized tile grid
+                    full_map_data = TileGrid(original_height, original_width)
                     
                     # Restore tiles from compacted format
                     if isinstance(trimmed_data, list):
                         # New list format: [[rel_row, rel_col, tile], ...]
-                        for item in trimmed_data:
-                            if len(item) >= 3:
-                                rel_row, rel_col, tile = item[0], item[1], item[2]
-                                actual_row = row_offset + rel_row
-                                actual_col = col_offset + rel_col
-                                if actual_row < original_height and actual_col < original_width:
-                                    full_map_data[actual_row][actual_col] = tile
+                        placed = ((item[0], item[1], item[2]) for item in trimmed_data if len(item) >= 3)
                     elif isinstance(trimmed_data, dict) and 'tiles' in trimmed_data:
                         # Old dict format (backward compatibility)
-                        for pos_key, tile in trimmed_data['tiles'].items():
-                            rel_row, rel_col = map(int, pos_key.split(','))
-                            actual_row = row_offset + rel_row
-                            actual_col = col_offset + rel_col
-                            if actual_row < original_height and actual_col < original_width:
-                                full_map_data[actual_row][actual_col] = tile
+                        placed = ((*map(int, pos_key.split(',')), tile)
+                                  for pos_key, tile in trimmed_data['tiles'].items())
+                    else:
+                        placed = ()
+                    
+                    for rel_row, rel_col, tile in placed:
+                        actual_row = row_offset + rel_row
+                        actual_col = col_offset + rel_col
+                        if tile and full_map_data.in_bounds(actual_row, actual_col):
+                            full_map_data.set_tile(actual_row, actual_col, tile)
                     
                     map_data = full_map_data
                 elif trimmed_data and trim_offsets:
@@ -977,32 +1512,17 @@ class MapStitcher:
                 )
                 # Restore additional stitching attributes if present
                 if "explored_bounds" in area_data:
+                    # Keep the existing explored_bounds as they track the original coordinate space
                     area.explored_bounds = area_data["explored_bounds"]
-                    # When loading trimmed data, adjust explored_bounds to match
-                    # Since we trimmed null rows/columns, the bounds are now relative to the trimmed data
-                    if area.map_data:
-                        # The trimmed data starts at (0,0), so adjust bounds accordingly
-                        actual_height = len(area.map_data)
-                        actual_width = max(len(row) for row in area.map_data) if area.map_data else 0
-                        # Keep the existing explored_bounds as they track the original coordinate space
-                        # The map_data is now compact but explored_bounds maintains the relationship
                 else:
                     # Initialize explored bounds from map data if not present
-                    if area.map_data:
-                        min_x, max_x = 100, 0
-                        min_y, max_y = 100, 0
-                        for y, row in enumerate(area.map_data):
-                            for x, tile in enumerate(row):
-                                if tile is not None:
-                                    min_x = min(min_x, x)
-                                    max_x = max(max_x, x)
-                                    min_y = min(min_y, y)
-                                    max_y = max(max_y, y)
-                        if min_x <= max_x:
-                            area.explored_bounds = {
-                                'min_x': min_x, 'max_x': max_x,
-                                'min_y': min_y, 'max_y': max_y
-                            }
+                    extent = area.map_data.explored_extent() if area.map_data is not None else None
+                    if extent is not None:
+                        min_y, max_y, min_x, max_x = extent
+                        area.explored_bounds = {
+                            'min_x': min_x, 'max_x': max_x,
+                            'min_y': min_y, 'max_y': max_y
+                        }
                 
                 if "origin_offset" in area_data:
                     area.origin_offset = area_data["origin_offset"]
@@ -1015,7 +1535,10 @@ class MapStitcher:
                 self.map_areas[map_id] = area
                 # Debug: log if map_data was loaded
                 if area.map_data:
-                    logger.debug(f"Loaded map_data for {location_name}: {len(area.map_data)}x{len(area.map_data[0]) if area.map_data else 0}")
+                    logger.debug(f"Loaded map_data for {location_name}: {area.map_data.height}x{area.map_data.width}")
+            
+            # Apply exploration journaled since this snapshot was written
+            journal_intact = self._replay_journal(data.get("journal_id"))
             
             # Reconstruct warp_connections from location_connections
             location_connections = data.get("location_connections", {})
@@ -1065,6 +1588,10 @@ class MapStitcher:
             
             logger.info(f"Loaded {len(self.map_areas)} areas and {len(self.warp_connections)} connections")
             
+            # Keep appending to the existing journal; otherwise the next save compacts
+            if journal_intact:
+                self._mark_journal_synced(data["journal_id"], location_connections)
+            
             # Try to resolve any "Unknown" location names
             if self.resolve_unknown_location_names():
                 # Save the updated names
@@ -1179,65 +1706,34 @@ class MapStitcher:
         # Trim if it's all walls or mostly walls with no content
         return non_wall_count == 0
     
-    def _trim_null_rows(self, map_data: List[List]) -> Tuple[List[List], Dict[str, int]]:
-        """Trim rows that are entirely null/None from map data to reduce file size.
+    def _trim_null_rows(self, map_data: TileGrid) -> Tuple[List[List], Dict[str, int]]:
+        """Compact map data to its explored tiles to reduce file size.
         
         Returns a tuple of (trimmed_data, trim_offsets) where trim_offsets contains
         the offsets needed to reconstruct original positions.
         """
-        if not map_data:
+        if map_data is None:
             return [], {}
         
         # Find bounds of actual data
-        start_row = None
-        end_row = None
-        start_col = None
-        end_col = None
-        
-        # Find row bounds
-        for i, row in enumerate(map_data):
-            if row and any(tile is not None for tile in row):
-                if start_row is None:
-                    start_row = i
-                end_row = i
-        
-        if start_row is None:
+        extent = map_data.explored_extent()
+        if extent is None:
             # All data is null
             return [], {}
+        start_row, _, start_col, _ = extent
         
-        # Find column bounds across all rows
-        for row in map_data[start_row:end_row + 1]:
-            if row:
-                for j, tile in enumerate(row):
-                    if tile is not None:
-                        if start_col is None or j < start_col:
-                            start_col = j
-                        if end_col is None or j > end_col:
-                            end_col = j
-        
-        if start_col is None:
-            return [], {}
-        
-        # Create compacted data - use a list of [row, col, tile] to save space
-        # This eliminates ALL null-only rows while preserving position information
-        tiles_list = []
-        
-        # Store only non-null tiles with their positions
-        for i in range(start_row, end_row + 1):
-            if map_data[i]:
-                for j in range(start_col, end_col + 1):
-                    if j < len(map_data[i]) and map_data[i][j] is not None:
-                        # Store as [relative_row, relative_col, tile_data]
-                        # This is more compact than dict with string keys
-                        rel_row = i - start_row
-                        rel_col = j - start_col
-                        tiles_list.append([rel_row, rel_col, map_data[i][j]])
+        # Store only non-null tiles as [relative_row, relative_col, tile_data]
+        # This is more compact than dict with string keys
+        tiles_list = [
+            [i - start_row, j - start_col, list(tile)]
+            for i, j, tile in map_data.explored_cells()
+        ]
         
         trim_offsets = {
             'row_offset': start_row,
             'col_offset': start_col,
-            'original_height': len(map_data),
-            'original_width': max(len(row) for row in map_data) if map_data else 0,
+            'original_height': map_data.height,
+            'original_width': map_data.width,
             'compacted': True  # Flag to indicate new format
         }
         
@@ -1299,11 +1795,7 @@ class MapStitcher:
             px, py = player_pos
             if px >= 0 and px < 1000 and py >= 0 and py < 1000 and px != 0xFFFF and py != 0xFFFF:
                 # Find the stored map area to get coordinate conversion info
-                map_area = None
-                for area in self.map_areas.values():
-                    if area.location_name and location_name and area.location_name.lower() == location_name.lower():
-                        map_area = area
-                        break
+                map_area = self.find_area_by_name(location_name)
                 
                 if map_area:
                     # Use the stored player position from the map area if available
@@ -1538,90 +2030,7 @@ class MapStitcher:
             return None  # Invalid tile - unexplored
         
         tile_id, behavior, collision = tile[:3]
-        
-        # tile_id 1023 (0x3FF) means out-of-bounds/unloaded area
-        # These are trees/boundaries at the edge of maps - show as walls
-        if tile_id == 1023:
-            return '#'  # Display as wall/blocked
-        
-        # Get behavior value
-        if hasattr(behavior, 'value'):
-            behavior_val = behavior.value
-        else:
-            behavior_val = behavior
-        
-        # Check behavior first for special terrain (even if impassable)
-        # Grass types (from MetatileBehavior enum)
-        if behavior_val == 2:  # TALL_GRASS
-            return '~'  # Tall grass (encounters)
-        elif behavior_val == 3:  # LONG_GRASS
-            return '^'  # Long grass
-        elif behavior_val == 7:  # SHORT_GRASS
-            return '^'  # Short grass
-        elif behavior_val == 36:  # ASHGRASS
-            return '^'  # Ash grass
-        
-        # Water types
-        elif behavior_val in [16, 17, 18, 19, 20, 21, 22, 23, 24, 26]:  # Various water types
-            return 'W'  # Water
-        
-        # Ice
-        elif behavior_val in [32, 38, 39]:  # ICE, THIN_ICE, CRACKED_ICE
-            return 'I'  # Ice
-        
-        # Sand
-        elif behavior_val in [6, 33]:  # DEEP_SAND, SAND
-            return 's'  # Sand
-        
-        # Doors and warps
-        # CRITICAL: Door tiles (behavior 96, 105) are WALKABLE even with collision=1
-        # You walk INTO them to trigger warps, they act as goal tiles
-        elif behavior_val == 96:  # NON_ANIMATED_DOOR
-            return 'D'  # Door (walkable goal)
-        elif behavior_val == 105:  # ANIMATED_DOOR
-            return 'D'  # Door (walkable goal)
-        elif behavior_val in [98, 99, 100, 101]:  # Arrow warps
-            return 'D'  # Warp/Door
-        elif behavior_val == 97:  # LADDER
-            return 'S'  # Stairs/Ladder
-        elif behavior_val in [106, 107]:  # Escalators
-            return 'S'  # Stairs
-        
-        # PC and other interactables
-        elif behavior_val in [131, 197]:  # PC, PLAYER_ROOM_PC_ON
-            return 'C'  # Computer/PC (changed from 'P' to avoid conflict with Player)
-        elif behavior_val == 134:  # TELEVISION
-            return 'T'  # TV
-        
-        # Ledges/Jumps with directional arrows
-        elif behavior_val == 56:  # JUMP_EAST
-            return '→'  # Ledge east
-        elif behavior_val == 57:  # JUMP_WEST
-            return '←'  # Ledge west
-        elif behavior_val == 58:  # JUMP_NORTH
-            return '↑'  # Ledge north
-        elif behavior_val == 59:  # JUMP_SOUTH
-            return '↓'  # Ledge south
-        elif behavior_val == 60:  # JUMP_NORTHEAST
-            return '↗'  # Ledge northeast
-        elif behavior_val == 61:  # JUMP_NORTHWEST
-            return '↖'  # Ledge northwest
-        elif behavior_val == 62:  # JUMP_SOUTHEAST
-            return '↘'  # Ledge southeast
-        elif behavior_val == 63:  # JUMP_SOUTHWEST
-            return '↙'  # Ledge southwest
-        
-        # Now check collision for basic terrain
-        elif collision == 1:  # Impassable
-            return '#'  # Wall
-        elif collision == 0:  # Walkable
-            return '.'  # Floor
-        elif collision == 3:  # Ledge/special
-            return 'L'  # Ledge
-        elif collision == 4:  # Water/surf
-            return 'W'  # Water
-        else:
-            return '?'  # Unknown
+        return location_symbol(tile_id, behavior, collision)
     
     def _is_explorable_edge(self, x: int, y: int, location_grid: Dict[Tuple[int, int], str]) -> bool:
         """Check if an unexplored coordinate is worth exploring (adjacent to walkable tiles)."""
@@ -1632,8 +2041,7 @@ class MapStitcher:
                 tile = location_grid[(adj_x, adj_y)]
                 # If adjacent to walkable tile, this is explorable
                 # Include all walkable terrain types and ledges
-                if tile in ['.', 'D', 'S', '^', '~', 's', 'I',  # Floor, doors, stairs, grass, sand, ice
-                           '→', '←', '↑', '↓', '↗', '↖', '↘', '↙']:  # Ledges in all directions
+                if tile in FRONTIER_SOURCE_SYMBOLS:
                     return True
         return False
     
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Background map stitching, off the emulator game loop.
+
+The game loop only reads what has to come from emulator memory (the tile block
+around the player, map bank/number, coordinates and location name) into a
+MapSnapshot and hands it to MapStitcherWorker.submit(). A single worker thread
+stitches snapshots into the shared MapStitcher: location name resolution,
+update_map_area(), location connection rebuilding and the periodic save all
+happen there, under the memory reader's map_stitcher_lock.
+
+Bursts are coalesced: every distinct position in a burst is merged (each step
+reveals new tiles), but connections are rebuilt and the save is considered once
+per burst. After each burst the worker publishes an immutable
+StitchedMapVersion, so readers can use the current location grid without
+touching the live stitcher while it is being written.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MapSnapshot:
+    """Everything a stitcher update needs, read from emulator memory on the game thread"""
+    map_bank: int
+    map_number: int
+    coords: Tuple[int, int]
+    tiles: List[List[Tuple]]
+    location_name: str
+    current_location: Optional[str] = None  # read_location(), used to resolve "Unknown" area names
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def map_id(self) -> int:
+        return (self.map_bank << 8) | self.map_number
+
+
+@dataclass(frozen=True)
+class StitchedMapVersion:
+    """A published, read-only view of the stitcher after a burst of updates"""
+    version: int
+    map_id: int
+    coords: Tuple[int, int]
+    location_name: str
+    grid: Mapping[Tuple[int, int], str]  # get_location_grid(location_name) at publish time
+    timestamp: float
+    grid_revision: int = 0  # MapStitcher.location_grid_revision() of `grid`
+
+
+def coalesce_snapshots(snapshots: List[MapSnapshot]) -> List[MapSnapshot]:
+    """Drop consecutive snapshots of the same position, keeping the newest of each run"""
+    coalesced: List[MapSnapshot] = []
+    for snapshot in snapshots:
+        if coalesced and (coalesced[-1].map_id, coalesced[-1].coords) == (snapshot.map_id, snapshot.coords):
+            coalesced[-1] = snapshot
+        else:
+            coalesced.append(snapshot)
+    return coalesced
+
+
+class MapStitcherWorker:
+    """Single consumer thread that stitches MapSnapshots for one memory reader"""
+
+    def __init__(self, memory_reader, max_pending: int = 64):
+        """
+        Args:
+            memory_reader: PokemonEmeraldReader whose map stitcher is updated
+                (provides map_stitcher_lock and apply_map_snapshot())
+            max_pending: Snapshots queued before the oldest is dropped
+        """
+        self.memory_reader = memory_reader
+        self.dropped = 0
+        self._queue: "queue.Queue[MapSnapshot]" = queue.Queue(maxsize=max_pending)
+        self._latest: Optional[StitchedMapVersion] = None
+        self._version = 0
+        self._published = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="MapStitcherWorker")
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def submit(self, snapshot: MapSnapshot) -> bool:
+        """
+        Queue a snapshot without blocking the caller.
+
+        Returns:
+            False if the queue was full and the oldest pending snapshot was dropped
+        """
+        try:
+            self._queue.put_nowait(snapshot)
+            return True
+        except queue.Full:
+            pass
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+        except queue.Empty:
+            pass
+        self.dropped += 1
+        logger.debug(f"Map stitcher queue full, dropped a snapshot ({self.dropped} total)")
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            pass
+        return False
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until every submitted snapshot has been stitched"""
+        if not self.running:
+            return self._queue.unfinished_tasks == 0
+        deadline = None if timeout is None else time.time() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def latest(self) -> Optional[StitchedMapVersion]:
+        """Most recently published version (None until the first burst is stitched)"""
+        return self._latest
+
+    def wait_for_version(self, version: int, timeout: Optional[float] = None) -> Optional[StitchedMapVersion]:
+        """Block until a version newer than `version` is published (or timeout)"""
+        with self._published:
+            self._published.wait_for(lambda: self._version > version, timeout)
+            return self._latest
+
+    def _drain(self, first: MapSnapshot) -> List[MapSnapshot]:
+        batch = [first]
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _run(self):
+        while self._running:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = self._drain(first)
+            try:
+                self.process(batch)
+            except Exception as e:
+                logger.error(f"Map stitcher worker failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def process(self, batch: List[MapSnapshot]) -> Optional[StitchedMapVersion]:
+        """Stitch one burst of snapshots and publish the result (runs on the worker thread)"""
+        snapshots = coalesce_snapshots(batch)
+        if not snapshots:
+            return None
+        reader = self.memory_reader
+        with reader.map_stitcher_lock:
+            for i, snapshot in enumerate(snapshots):
+                reader.apply_map_snapshot(snapshot, finalize=(i == len(snapshots) - 1))
+            last = snapshots[-1]
+            stitcher = reader._map_stitcher
+            grid = {}
+            grid_revision = 0
+            location_name = last.location_name
+            if stitcher is not None:
+                area = stitcher.map_areas.get(last.map_id)
+                if area is not None and area.location_name:
+                    location_name = area.location_name
+                grid = stitcher.get_location_grid(location_name, simplified=True)
+                grid_revision = stitcher.location_grid_revision(location_name)
+        return self._publish(last, location_name, grid, grid_revision)
+
+    def _publish(self, snapshot: MapSnapshot, location_name: str, grid: dict,
+                 grid_revision: int = 0) -> StitchedMapVersion:
+        with self._published:
+            self._version += 1
+            self._latest = StitchedMapVersion(
+                version=self._version,
+                map_id=snapshot.map_id,
+                coords=snapshot.coords,
+                location_name=location_name,
+                grid=MappingProxyType(grid),
+                timestamp=snapshot.timestamp,
+                grid_revision=grid_revision,
+            )
+            self._published.notify_all()
+            return self._latest
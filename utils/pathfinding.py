@@ -8,7 +8,14 @@ Avoids warps/doors unless they are the goal, preventing accidental re-entry.
 
 import heapq
 import logging
-from typing import Tuple, List, Optional, Dict, Set
+import threading
+from collections import OrderedDict
+from itertools import chain
+from dataclasses import dataclass, field
+from typing import Any, Callable, Tuple, List, Optional, Dict, Set, Iterable, Mapping, FrozenSet
+
+import numpy as np
+
 from utils.map_stitcher import MapStitcher
 
 logger = logging.getLogger(__name__)
@@ -180,6 +187,593 @@ def get_neighbors(pos: Tuple[int, int], grid: Dict[Tuple[int, int], str],
     return neighbors
 
 
+
+# ---------------------------------------------------------------------------
+# Grid-array search engine
+#
+# A {(x, y): symbol} grid is compiled once per search into flat arrays: step
+# cost per cell and a 4-bit mask per cell of the directions that can be taken
+# out of it. The masks already encode passability and one-way ledges, so the
+# A* inner loop is integer indexing with no symbol comparisons. Score/parent
+# buffers are preallocated per thread and reused across searches, with a
+# generation stamp instead of clearing them.
+# ---------------------------------------------------------------------------
+
+DIR_UP, DIR_DOWN, DIR_LEFT, DIR_RIGHT = 1, 2, 4, 8
+ALL_DIRECTIONS = DIR_UP | DIR_DOWN | DIR_LEFT | DIR_RIGHT
+
+# (bit, dx, dy, button) in expansion order
+GRID_DIRECTIONS = (
+    (DIR_UP, 0, -1, 'UP'),
+    (DIR_DOWN, 0, 1, 'DOWN'),
+    (DIR_LEFT, -1, 0, 'LEFT'),
+    (DIR_RIGHT, 1, 0, 'RIGHT'),
+)
+
+# Direction indices set in each 4-bit mask
+_MASK_DIRECTIONS = tuple(
+    tuple(k for k, (bit, _, _, _) in enumerate(GRID_DIRECTIONS) if mask & bit) for mask in range(16)
+)
+
+# Cardinal ledges can only be left in their arrow direction
+LEDGE_EXITS = {'↓': DIR_DOWN, '↑': DIR_UP, '→': DIR_RIGHT, '←': DIR_LEFT}
+DIAGONAL_LEDGES = frozenset('↗↖↘↙')
+
+
+@dataclass(frozen=True)
+class PathRules:
+    """
+    How tile symbols map onto passability, step cost and ledge direction.
+
+    Attributes:
+        walkable: Symbols that can be stepped onto
+        costs: Cost of stepping onto a symbol (default_cost otherwise)
+        enter: Directions (DIR_* mask) a symbol can be stepped onto moving in; default all
+        exit: Directions a symbol can be left in; default all
+    """
+    walkable: FrozenSet[str]
+    costs: Mapping[str, float] = field(default_factory=dict)
+    default_cost: float = 1.0
+    enter: Mapping[str, int] = field(default_factory=dict)
+    exit: Mapping[str, int] = field(default_factory=dict)
+
+    def tile(self, symbol: str) -> Tuple[int, float, int, int]:
+        """(passable, cost, enter mask, exit mask) for a symbol"""
+        return (
+            1 if symbol in self.walkable else 0,
+            self.costs.get(symbol, self.default_cost),
+            self.enter.get(symbol, ALL_DIRECTIONS),
+            self.exit.get(symbol, ALL_DIRECTIONS),
+        )
+
+
+# Stitched location grids (MapStitcher.get_location_grid symbols), see is_walkable/get_neighbors
+STITCHED_RULES = PathRules(
+    walkable=frozenset(['.', '^', '~', 's', 'I', '↓', '↑', '←', '→']),
+    enter={
+        '↓': ALL_DIRECTIONS & ~DIR_UP,     # Can't approach from the south
+        '↑': ALL_DIRECTIONS & ~DIR_DOWN,   # Can't approach from the north
+        '→': ALL_DIRECTIONS & ~DIR_LEFT,   # Can't approach from the east
+        '←': ALL_DIRECTIONS & ~DIR_RIGHT,  # Can't approach from the west
+        **{symbol: 0 for symbol in DIAGONAL_LEDGES},  # Diagonal ledges act as walls
+    },
+    exit=LEDGE_EXITS,
+)
+STITCHED_RULES_WITH_WARPS = PathRules(
+    walkable=STITCHED_RULES.walkable | {'D', 'S'},
+    enter=STITCHED_RULES.enter,
+    exit=STITCHED_RULES.exit,
+)
+
+
+class PassabilityGrid:
+    """A {(x, y): symbol} grid compiled into flat cost and edge-mask arrays for grid_astar"""
+
+    def __init__(self, grid: Mapping[Tuple[int, int], str], rules: PathRules,
+                 blocked: Iterable[Tuple[int, int]] = ()):
+        """
+        Args:
+            grid: Map grid {(x, y): symbol}
+            rules: Symbol passability/cost/ledge rules
+            blocked: Positions to treat as impassable regardless of symbol (e.g. NPCs)
+        """
+        self.rules = rules
+        if not grid:
+            self.origin_x = self.origin_y = 0
+            self.width = self.height = 0
+            self.present = []
+            self.passable = []
+            self.cost = []
+            self.move = []
+            self.edges = []
+            self.offsets = (0, 0, 0, 0)
+            return
+
+        coords = np.fromiter(chain.from_iterable(grid.keys()), dtype=np.int64, count=2 * len(grid)).reshape(-1, 2)
+        min_x, min_y = coords.min(axis=0)
+        max_x, max_y = coords.max(axis=0)
+        # One-cell border of absent tiles so neighbours of real tiles are always in range
+        self.origin_x = int(min_x) - 1
+        self.origin_y = int(min_y) - 1
+        self.width = int(max_x - min_x) + 3
+        self.height = int(max_y - min_y) + 3
+        size = self.width * self.height
+        self.offsets = tuple(dy * self.width + dx for _, dx, dy, _ in GRID_DIRECTIONS)
+
+        flat = (coords[:, 1] - self.origin_y) * self.width + (coords[:, 0] - self.origin_x)
+        # Look rules up once per distinct symbol, then gather per tile by symbol code
+        symbols = list(set(grid.values()))
+        code_of = {symbol: code for code, symbol in enumerate(symbols)}
+        codes = np.fromiter(map(code_of.__getitem__, grid.values()), dtype=np.intp, count=len(grid))
+        props = np.array([rules.tile(symbol) for symbol in symbols], dtype=np.float64).reshape(-1, 4)[codes]
+
+        present = np.zeros(size, dtype=bool)
+        present[flat] = True
+        passable = np.zeros(size, dtype=np.int8)
+        passable[flat] = props[:, 0]
+        cost = np.ones(size, dtype=np.float64)
+        cost[flat] = props[:, 1]
+        enter = np.zeros(size, dtype=np.uint8)
+        enter[flat] = props[:, 2]
+        exit_ = np.zeros(size, dtype=np.uint8)
+        exit_[flat] = props[:, 3]
+
+        for pos in blocked:
+            index = self.index(pos, present)
+            if index is not None:
+                passable[index] = 0
+
+        # move: directions allowed by ledge rules into any present tile
+        # edges: the subset whose destination is passable
+        move = np.zeros(size, dtype=np.uint8)
+        edges = np.zeros(size, dtype=np.uint8)
+        for (bit, _, _, _), offset in zip(GRID_DIRECTIONS, self.offsets):
+            # np.roll wraps at the ends, but only border cells (which can't be left) see that
+            allowed = (exit_ & bit) & (np.roll(enter, -offset) & bit)
+            move |= allowed
+            edges |= allowed * np.roll(passable, -offset).astype(np.uint8)
+
+        self.present = present.tolist()
+        self.passable = passable.tolist()
+        self.cost = cost.tolist()
+        self.move = move.tolist()
+        self.edges = edges.tolist()
+
+    def index(self, pos: Tuple[int, int], present=None) -> Optional[int]:
+        """Flat index of a position, or None if it isn't in the grid"""
+        x = pos[0] - self.origin_x
+        y = pos[1] - self.origin_y
+        if not (0 < x < self.width - 1 and 0 < y < self.height - 1):
+            return None
+        index = y * self.width + x
+        if not (self.present if present is None else present)[index]:
+            return None
+        return index
+
+    def position(self, index: int) -> Tuple[int, int]:
+        y, x = divmod(index, self.width)
+        return (x + self.origin_x, y + self.origin_y)
+
+    def _open(self, cells: Iterable[int]) -> List[Tuple[int, int]]:
+        """Allow stepping onto otherwise impassable cells (ledge rules still apply); returns an undo log"""
+        undo = []
+        edges, move = self.edges, self.move
+        for cell in cells:
+            for (bit, _, _, _), offset in zip(GRID_DIRECTIONS, self.offsets):
+                source = cell - offset
+                if move[source] & bit and not edges[source] & bit:
+                    undo.append((source, edges[source]))
+                    edges[source] |= bit
+        return undo
+
+    def _restore(self, undo: List[Tuple[int, int]]):
+        for source, mask in reversed(undo):
+            self.edges[source] = mask
+
+
+class PassabilityCache:
+    """
+    Compiled PassabilityGrids, reused while the grid they were compiled from is unchanged.
+
+    Compiling is O(grid size) while a short search only touches a few cells, so callers that
+    search the same grid repeatedly look it up here. As with PathCache, callers key entries on
+    what the grid was built from, e.g. (map_id, grid_version, blocked_tiles_version); the
+    rules are part of the key implicitly. A None key always compiles afresh.
+
+    Searches only patch a shared grid (open_cells) for their own duration, so one thread at
+    a time may search a cached grid.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, PassabilityGrid]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, grid: Mapping[Tuple[int, int], str], rules: PathRules,
+            blocked: Iterable[Tuple[int, int]] = ()) -> PassabilityGrid:
+        """
+        Compiled grid for `key`, compiling `grid` with `rules` and `blocked` on a miss.
+
+        Args:
+            key: Cache key (hashable), or None to skip the cache
+            grid: Map grid {(x, y): symbol}
+            rules: Symbol passability/cost/ledge rules
+            blocked: Positions to treat as impassable
+        """
+        if key is None:
+            return PassabilityGrid(grid, rules, blocked=blocked)
+        # PathRules hold dicts so they can't be hashed; they're module constants, so key on identity
+        full_key = (key, id(rules))
+        with self._lock:
+            passability = self._entries.get(full_key)
+            if passability is not None and passability.rules is rules:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return passability
+            self.misses += 1
+
+        passability = PassabilityGrid(grid, rules, blocked=blocked)
+        with self._lock:
+            self._entries[full_key] = passability
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return passability
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_passability_cache = PassabilityCache()
+
+
+@dataclass
+class GridSearchResult:
+    """Outcome of grid_astar"""
+    path: Optional[List[Tuple[int, int]]]  # start .. reached target, or None
+    cost: float = 0.0
+    reached: Optional[List[Tuple[int, int]]] = None  # every position discovered (collect_reached=True)
+
+
+class _SearchBuffers(threading.local):
+    """Per-thread score/parent arrays reused across searches"""
+
+    def __init__(self):
+        self.generation = 0
+        self.g: List[float] = []
+        self.parent: List[int] = []
+        self.seen: List[int] = []
+        self.closed: List[int] = []
+
+    def begin(self, size: int) -> int:
+        if len(self.g) < size:
+            grow = size - len(self.g)
+            self.g.extend([0.0] * grow)
+            self.parent.extend([-1] * grow)
+            self.seen.extend([0] * grow)
+            self.closed.extend([0] * grow)
+        self.generation += 1
+        return self.generation
+
+
+_search_buffers = _SearchBuffers()
+
+
+def grid_astar(passability: PassabilityGrid,
+               start: Tuple[int, int],
+               targets: Iterable[Tuple[int, int]],
+               heuristic_target: Optional[Tuple[int, int]] = None,
+               open_cells: Iterable[Tuple[int, int]] = (),
+               collect_reached: bool = False) -> GridSearchResult:
+    """
+    A* over a PassabilityGrid to the cheapest-to-reach of one or more targets.
+
+    Args:
+        passability: Compiled grid
+        start: Starting (x, y) position
+        targets: Goal positions; the search stops at the first one reached
+        heuristic_target: Position the Manhattan heuristic aims at (0 heuristic if None)
+        open_cells: Positions that may be stepped onto even if impassable (e.g. a door goal)
+        collect_reached: Also return every position the search discovered
+
+    Returns:
+        GridSearchResult (path is None if no target is reachable)
+    """
+    start_index = passability.index(start)
+    target_set = {index for index in (passability.index(t) for t in targets) if index is not None}
+    if start_index is None or not target_set:
+        return GridSearchResult(path=None, reached=[] if collect_reached else None)
+
+    buffers = _search_buffers
+    generation = buffers.begin(passability.width * passability.height)
+    g, parent, seen, closed = buffers.g, buffers.parent, buffers.seen, buffers.closed
+    edges, cost, offsets = passability.edges, passability.cost, passability.offsets
+    width = passability.width
+
+    if heuristic_target is not None:
+        hx = heuristic_target[0] - passability.origin_x
+        hy = heuristic_target[1] - passability.origin_y
+    use_heuristic = heuristic_target is not None
+
+    opened = [index for index in (passability.index(c) for c in open_cells) if index is not None]
+    undo = passability._open(opened) if opened else None
+
+    reached = [start_index] if collect_reached else None
+    g[start_index] = 0.0
+    parent[start_index] = -1
+    seen[start_index] = generation
+    heap = [(0.0, 0, start_index)]
+    found = -1
+    try:
+        while heap:
+            _, _, current = heapq.heappop(heap)
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            if current in target_set:
+                found = current
+                break
+            base = g[current]
+            for k in _MASK_DIRECTIONS[edges[current]]:
+                neighbor = current + offsets[k]
+                if closed[neighbor] == generation:
+                    continue
+                new_g = base + cost[neighbor]
+                if seen[neighbor] != generation:
+                    seen[neighbor] = generation
+                    if reached is not None:
+                        reached.append(neighbor)
+                elif new_g >= g[neighbor]:
+                    continue
+                g[neighbor] = new_g
+                parent[neighbor] = current
+                if use_heuristic:
+                    ny, nx = divmod(neighbor, width)
+                    h = abs(nx - hx) + abs(ny - hy)
+                else:
+                    h = 0
+                # Ties on f go to the node closest to the target, which keeps open-field searches narrow
+                heapq.heappush(heap, (new_g + h, h, neighbor))
+    finally:
+        if undo:
+            passability._restore(undo)
+
+    reached_positions = [passability.position(i) for i in reached] if reached is not None else None
+    if found < 0:
+        return GridSearchResult(path=None, reached=reached_positions)
+
+    path = []
+    index = found
+    while index != -1:
+        path.append(passability.position(index))
+        index = parent[index]
+    path.reverse()
+    return GridSearchResult(path=path, cost=g[found], reached=reached_positions)
+
+
+class DistanceField:
+    """
+    Cheapest cost and first step from one start to every reachable position.
+
+    Built by distance_field(); choosing among many candidate targets is then a
+    lookup per candidate instead of one search per candidate.
+    """
+
+    def __init__(self, passability: PassabilityGrid, start: Tuple[int, int],
+                 dist: Dict[int, float], parent: Dict[int, int], first: Dict[int, int]):
+        self.passability = passability
+        self.start = start
+        self._dist = dist
+        self._parent = parent
+        self._first = first
+
+    def __contains__(self, pos: Tuple[int, int]) -> bool:
+        return self.passability.index(pos) in self._dist
+
+    def __len__(self) -> int:
+        return len(self._dist)
+
+    def distance(self, pos: Tuple[int, int]) -> Optional[float]:
+        """Path cost from the start, or None if unreachable"""
+        return self._dist.get(self.passability.index(pos))
+
+    def first_step(self, pos: Tuple[int, int]) -> Optional[str]:
+        """First button ('UP', 'DOWN', 'LEFT', 'RIGHT') on the path to pos; None if unreachable or the start"""
+        k = self._first.get(self.passability.index(pos))
+        return None if k is None else GRID_DIRECTIONS[k][3]
+
+    def path_to(self, pos: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Positions from the start to pos (inclusive), or None if unreachable"""
+        index = self.passability.index(pos)
+        if index not in self._dist:
+            return None
+        path = []
+        parent = self._parent
+        while index != -1:
+            path.append(self.passability.position(index))
+            index = parent[index]
+        path.reverse()
+        return path
+
+    def reachable(self) -> List[Tuple[int, int]]:
+        """Every reachable position, in order of increasing cost"""
+        position = self.passability.position
+        return [position(index) for index in self._dist]
+
+    def nearest(self, targets: Iterable[Tuple[int, int]], key=None) -> Optional[Tuple[int, int]]:
+        """
+        Best reachable target.
+
+        Args:
+            targets: Candidate positions (unreachable ones are skipped)
+            key: Optional score(pos, distance) -> comparable; defaults to the path cost
+
+        Returns:
+            Lowest-scoring reachable target (first one wins ties), or None
+        """
+        best = None
+        best_score = None
+        for pos in targets:
+            dist = self.distance(pos)
+            if dist is None:
+                continue
+            score = dist if key is None else key(pos, dist)
+            if best_score is None or score < best_score:
+                best, best_score = pos, score
+        return best
+
+
+def distance_field(passability: PassabilityGrid,
+                   start: Tuple[int, int],
+                   goal_cells: Iterable[Tuple[int, int]] = (),
+                   max_cost: Optional[float] = None) -> Optional[DistanceField]:
+    """
+    Dijkstra from one start over a PassabilityGrid.
+
+    Args:
+        passability: Compiled grid
+        start: Starting (x, y) position
+        goal_cells: Positions that may be stepped onto even if impassable (e.g. doors,
+            portals), but not walked through
+        max_cost: Stop expanding beyond this path cost (None explores everything reachable)
+
+    Returns:
+        DistanceField, or None if start isn't in the grid
+    """
+    start_index = passability.index(start)
+    if start_index is None:
+        return None
+
+    buffers = _search_buffers
+    generation = buffers.begin(passability.width * passability.height)
+    g, parent, seen, closed = buffers.g, buffers.parent, buffers.seen, buffers.closed
+    edges, cost, offsets = passability.edges, passability.cost, passability.offsets
+
+    opened = [index for index in (passability.index(c) for c in goal_cells) if index is not None]
+    terminal = {index for index in opened if not passability.passable[index]}
+    undo = passability._open(opened) if opened else None
+
+    # dist is filled in pop order, so iterating it yields positions by increasing cost
+    dist: Dict[int, float] = {}
+    first: Dict[int, int] = {}
+    g[start_index] = 0.0
+    parent[start_index] = -1
+    seen[start_index] = generation
+    heap = [(0.0, start_index)]
+    try:
+        while heap:
+            base, current = heapq.heappop(heap)
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            dist[current] = base
+            if current in terminal and current != start_index:
+                continue
+            current_first = first.get(current)
+            for k in _MASK_DIRECTIONS[edges[current]]:
+                neighbor = current + offsets[k]
+                if closed[neighbor] == generation:
+                    continue
+                new_g = base + cost[neighbor]
+                if max_cost is not None and new_g > max_cost:
+                    continue
+                if seen[neighbor] == generation and new_g >= g[neighbor]:
+                    continue
+                seen[neighbor] = generation
+                g[neighbor] = new_g
+                parent[neighbor] = current
+                first[neighbor] = k if current_first is None else current_first
+                heapq.heappush(heap, (new_g, neighbor))
+    finally:
+        if undo:
+            passability._restore(undo)
+
+    parents = {index: parent[index] for index in dist}
+    first = {index: first[index] for index in dist if index != start_index}
+    return DistanceField(passability, start, dist, parents, first)
+
+
+def step_allowed(grid: Mapping[Tuple[int, int], str], rules: PathRules,
+                 source: Tuple[int, int], target: Tuple[int, int],
+                 blocked: Iterable[Tuple[int, int]] = ()) -> bool:
+    """Whether one step between adjacent tiles is legal under `rules` (passability and ledges)"""
+    dx, dy = target[0] - source[0], target[1] - source[1]
+    bit = next((bit for bit, step_x, step_y, _ in GRID_DIRECTIONS if (step_x, step_y) == (dx, dy)), None)
+    if bit is None or source not in grid or target not in grid or target in blocked:
+        return False
+    passable, _, enter, _ = rules.tile(grid[target])
+    return bool(passable and enter & bit and rules.tile(grid[source])[3] & bit)
+
+
+class PathCache:
+    """
+    Tile paths from recent searches, reused while the goal and the map are unchanged.
+
+    Callers key entries on everything the search depended on except the start, e.g.
+    (map_id, goal, grid_version, blocked_tiles_version, mode); bumping a version
+    invalidates by missing. A lookup from any tile on a cached path returns the rest of
+    it, and a start one step off the path (pushed by an NPC, a bumped ledge) is repaired
+    by stepping back onto the furthest adjacent path tile.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[List[Tuple[int, int]], Dict[Tuple[int, int], int]]]" = OrderedDict()
+        self.hits = self.repairs = self.misses = 0
+
+    def get(self, key, start: Tuple[int, int],
+            can_step: Optional[Callable[[Tuple[int, int], Tuple[int, int]], bool]] = None
+            ) -> Optional[List[Tuple[int, int]]]:
+        """
+        Remaining path from `start`, or None on a miss.
+
+        Args:
+            key: Cache key (hashable)
+            start: Current position
+            can_step: can_step(a, b) -> bool for repairing a start that is off the path;
+                without it only exact hits are returned
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        path, index_of = entry
+        i = index_of.get(start)
+        if i is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return path[i:]
+        if can_step is not None:
+            x, y = start
+            joins = [index_of[pos] for pos in ((x, y - 1), (x, y + 1), (x - 1, y), (x + 1, y))
+                     if pos in index_of and can_step(start, pos)]
+            if joins:
+                repaired = [start] + path[max(joins):]
+                self.put(key, repaired)
+                self.repairs += 1
+                return repaired
+        self.misses += 1
+        return None
+
+    def put(self, key, path: List[Tuple[int, int]]):
+        """Remember a path (start .. target) for `key`"""
+        self._entries[key] = (list(path), {pos: i for i, pos in enumerate(path)})
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 def reconstruct_path(came_from: Dict[Tuple[int, int], Tuple[int, int]], 
                      start: Tuple[int, int], 
                      goal: Tuple[int, int]) -> List[Tuple[int, int]]:
@@ -235,7 +829,8 @@ def path_to_directions(path: List[Tuple[int, int]]) -> List[str]:
 
 def astar(start: Tuple[int, int], goal: Tuple[int, int], 
           grid: Dict[Tuple[int, int], str], 
-          avoid_warps: bool = True) -> Optional[List[Tuple[int, int]]]:
+          avoid_warps: bool = True,
+          grid_key=None) -> Optional[List[Tuple[int, int]]]:
     """
     A* pathfinding algorithm.
     
@@ -244,6 +839,8 @@ def astar(start: Tuple[int, int], goal: Tuple[int, int],
         goal: Goal (x, y) position
         grid: Map grid {(x, y): symbol}
         avoid_warps: If True, treat warps as obstacles (except if goal)
+        grid_key: Identifies this version of `grid` (e.g. (map_id, location_grid_revision))
+            so its compiled form is reused across calls; None compiles it every time
         
     Returns:
         List of positions from start to goal, or None if no path exists
@@ -259,47 +856,14 @@ def astar(start: Tuple[int, int], goal: Tuple[int, int],
         logger.debug(f"[A*] Goal {goal} is not walkable (symbol: {goal_symbol})")
         return None
     
-    # Priority queue: (f_score, counter, position)
-    counter = 0
-    open_set = [(0, counter, start)]
-    came_from = {}
-    
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, goal)}
-    
-    in_open_set = {start}
-    
-    while open_set:
-        _, _, current = heapq.heappop(open_set)
-        in_open_set.discard(current)
-        
-        # Reached goal
-        if current == goal:
-            return reconstruct_path(came_from, start, goal)
-        
-        # Check neighbors
-        # If current is the goal, allow warps; otherwise follow avoid_warps
-        current_avoid_warps = avoid_warps and (current != goal)
-        neighbors = get_neighbors(current, grid, avoid_warps=current_avoid_warps)
-        
-        for neighbor in neighbors:
-            # Tentative g_score
-            tentative_g = g_score[current] + 1
-            
-            if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                # This path is better
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g
-                f_score[neighbor] = tentative_g + heuristic(neighbor, goal)
-                
-                if neighbor not in in_open_set:
-                    counter += 1
-                    heapq.heappush(open_set, (f_score[neighbor], counter, neighbor))
-                    in_open_set.add(neighbor)
-    
-    # No path found
-    logger.debug(f"[A*] No path from {start} to {goal}")
-    return None
+    # Warps are allowed as the goal even when avoiding them elsewhere
+    rules = STITCHED_RULES if avoid_warps else STITCHED_RULES_WITH_WARPS
+    result = grid_astar(_passability_cache.get(grid_key, grid, rules), start, [goal],
+                        heuristic_target=goal, open_cells=[goal])
+    if result.path is None:
+        logger.debug(f"[A*] No path from {start} to {goal}")
+        return None
+    return result.path
 
 
 def find_path_in_area(map_stitcher: MapStitcher, 
@@ -328,12 +892,7 @@ def find_path_in_area(map_stitcher: MapStitcher,
         return None
     
     # Get the map area to understand coordinate system
-    map_area = None
-    for area in map_stitcher.map_areas.values():
-        if area.location_name and location_name and \
-           area.location_name.lower() == location_name.lower():
-            map_area = area
-            break
+    map_area = map_stitcher.find_area_by_name(location_name)
     
     if not map_area:
         logger.debug(f"[PATHFINDING] Could not find map area for {location_name}")
@@ -391,8 +950,10 @@ def find_path_in_area(map_stitcher: MapStitcher,
     logger.info(f"[PATHFINDING] Grid coords: {start_grid} → {goal_grid}")
     logger.info(f"[PATHFINDING] Grid size: {len(grid)} tiles, avoid_warps={avoid_warps}")
     
-    # Run A*
-    path = astar(start_grid, goal_grid, grid, avoid_warps=avoid_warps)
+    # Run A* (the compiled grid is reused until the stitcher's grid revision changes)
+    revision = map_stitcher.location_grid_revision(location_name)
+    grid_key = (map_area.map_id, revision) if revision else None
+    path = astar(start_grid, goal_grid, grid, avoid_warps=avoid_warps, grid_key=grid_key)
     
     if not path:
         return None
@@ -432,12 +993,7 @@ def find_direction_to_goal(map_stitcher: MapStitcher,
     goal_type, goal_data = _parse_goal_string(goal)
     
     # Get map area
-    map_area = None
-    for area in map_stitcher.map_areas.values():
-        if area.location_name and current_location and \
-           area.location_name.lower() == current_location.lower():
-            map_area = area
-            break
+    map_area = map_stitcher.find_area_by_name(current_location)
     
     if not map_area:
         logger.debug(f"[PATHFINDING] No map area for goal {goal} in {current_location}")
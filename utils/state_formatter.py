@@ -26,8 +26,11 @@ LAST_TRANSITION = None  # Stores transition coordinates
 MAP_STITCHER_SAVE_CALLBACK = None  # Callback to save map stitcher when location connections change
 MAP_STITCHER_INSTANCE = None  # Reference to the MapStitcher instance
 
-def _get_location_connections_from_cache():
-    """Read location connections from MapStitcher's cache file"""
+def _get_location_connections_from_cache(map_stitcher=None):
+    """Read location connections from MapStitcher (live instance if given, else its cache file)"""
+    if map_stitcher is not None:
+        with map_stitcher.lock:
+            return map_stitcher.get_location_connections()
     try:
         cache_file = '.pokeagent_cache/map_stitcher_data.json'
         if os.path.exists(cache_file):
@@ -671,18 +674,20 @@ def _format_map_info(map_info, player_data=None, include_debug_info=False, inclu
                 area = map_stitcher.map_areas[map_id]
                 # print(   Area {map_id}: '{area.location_name}'")
         
-        map_lines = map_stitcher.generate_location_map_display(
-            location_name=location_name,
-            player_pos=player_coords,
-            npcs=npcs,
-            connections=connections
-        )
+        # The live stitcher may be merging on the MapStitcherWorker thread
+        with map_stitcher.lock:
+            map_lines = map_stitcher.generate_location_map_display(
+                location_name=location_name,
+                player_pos=player_coords,
+                npcs=npcs,
+                connections=connections
+            )
+            location_grid = map_stitcher.get_location_grid(location_name) if map_lines else None
         
         if map_lines:
             # print( Generated {len(map_lines)} map lines from MapStitcher")
             context_parts.extend(map_lines)
             # Add exploration statistics
-            location_grid = map_stitcher.get_location_grid(location_name)
             if location_grid:
                 total_tiles = len(location_grid)
                 context_parts.append("")
@@ -869,17 +874,18 @@ def _build_stitched_world_map(stitched_data, full_state_data=None):
         map_stitcher = MAP_STITCHER_INSTANCE
     
     if map_stitcher:
-        # Generate map display using MapStitcher
-        map_lines = map_stitcher.generate_location_map_display(
-            location_name=location_name,
-            player_pos=player_local_pos,
-            npcs=npcs,
-            connections=connections
-        )
+        # Generate map display using MapStitcher (locked against MapStitcherWorker merges)
+        with map_stitcher.lock:
+            map_lines = map_stitcher.generate_location_map_display(
+                location_name=location_name,
+                player_pos=player_local_pos,
+                npcs=npcs,
+                connections=connections
+            )
+            location_grid = map_stitcher.get_location_grid(location_name)
         lines.extend(map_lines)
         
         # Add exploration statistics
-        location_grid = map_stitcher.get_location_grid(location_name)
         if location_grid:
             total_tiles = len(location_grid)
             lines.append("")
@@ -894,7 +900,7 @@ def _build_stitched_world_map(stitched_data, full_state_data=None):
     portal_connections_found = False
     
     # Check location connections from MapStitcher cache first
-    location_connections = _get_location_connections_from_cache()
+    location_connections = _get_location_connections_from_cache(map_stitcher)
     if location_connections and location_name in location_connections:
         if not portal_connections_found:
             lines.append("")
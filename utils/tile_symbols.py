@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Tile symbol lookup tables shared by utils/map_stitcher.py and utils/map_formatter.py
+
+Apart from tile_id 1023 (out-of-bounds, always a wall), a tile's symbol only
+depends on its behavior byte and 2-bit collision value. Each symbol vocabulary
+is written once as a rule below and compiled into a 256x4 [behavior, collision]
+table at import, so converting a tile is a table lookup and converting a whole
+NumPy tile plane is a single fancy-indexing op (symbol_planes).
+
+Two vocabularies exist:
+    location  accumulated location grids (MapStitcher.get_location_grid / A*)
+    view      the 15x15 view around the player (map_formatter.format_map_grid)
+"""
+
+import numpy as np
+
+from pokemon_env.enums import MetatileBehavior
+
+OUT_OF_BOUNDS_TILE_ID = 1023  # 0x3FF: out-of-bounds/unloaded area, shown as a wall
+BEHAVIOR_VALUES = 256
+COLLISION_VALUES = 4
+
+
+def _location_rule(behavior_val, collision) -> str:
+    """Location grid symbol for a behavior value and collision"""
+    # Check behavior first for special terrain (even if impassable)
+    # Grass types (from MetatileBehavior enum)
+    if behavior_val == 2:  # TALL_GRASS
+        return '~'  # Tall grass (encounters)
+    elif behavior_val == 3:  # LONG_GRASS
+        return '^'  # Long grass
+    elif behavior_val == 7:  # SHORT_GRASS
+        return '^'  # Short grass
+    elif behavior_val == 36:  # ASHGRASS
+        return '^'  # Ash grass
+
+    # Water types
+    elif behavior_val in [16, 17, 18, 19, 20, 21, 22, 23, 24, 26]:  # Various water types
+        return 'W'  # Water
+
+    # Ice
+    elif behavior_val in [32, 38, 39]:  # ICE, THIN_ICE, CRACKED_ICE
+        return 'I'  # Ice
+
+    # Sand
+    elif behavior_val in [6, 33]:  # DEEP_SAND, SAND
+        return 's'  # Sand
+
+    # Doors and warps
+    # CRITICAL: Door tiles (behavior 96, 105) are WALKABLE even with collision=1
+    # You walk INTO them to trigger warps, they act as goal tiles
+    elif behavior_val == 96:  # NON_ANIMATED_DOOR
+        return 'D'  # Door (walkable goal)
+    elif behavior_val == 105:  # ANIMATED_DOOR
+        return 'D'  # Door (walkable goal)
+    elif behavior_val in [98, 99, 100, 101]:  # Arrow warps
+        return 'D'  # Warp/Door
+    elif behavior_val == 97:  # LADDER
+        return 'S'  # Stairs/Ladder
+    elif behavior_val in [106, 107]:  # Escalators
+        return 'S'  # Stairs
+
+    # PC and other interactables
+    elif behavior_val in [131, 197]:  # PC, PLAYER_ROOM_PC_ON
+        return 'C'  # Computer/PC (changed from 'P' to avoid conflict with Player)
+    elif behavior_val == 134:  # TELEVISION
+        return 'T'  # TV
+
+    # Ledges/Jumps with directional arrows
+    elif behavior_val == 56:  # JUMP_EAST
+        return '→'  # Ledge east
+    elif behavior_val == 57:  # JUMP_WEST
+        return '←'  # Ledge west
+    elif behavior_val == 58:  # JUMP_NORTH
+        return '↑'  # Ledge north
+    elif behavior_val == 59:  # JUMP_SOUTH
+        return '↓'  # Ledge south
+    elif behavior_val == 60:  # JUMP_NORTHEAST
+        return '↗'  # Ledge northeast
+    elif behavior_val == 61:  # JUMP_NORTHWEST
+        return '↖'  # Ledge northwest
+    elif behavior_val == 62:  # JUMP_SOUTHEAST
+        return '↘'  # Ledge southeast
+    elif behavior_val == 63:  # JUMP_SOUTHWEST
+        return '↙'  # Ledge southwest
+
+    # Now check collision for basic terrain
+    elif collision == 1:  # Impassable
+        return '#'  # Wall
+    elif collision == 0:  # Walkable
+        return '.'  # Floor
+    elif collision == 3:  # Ledge/special
+        return 'L'  # Ledge
+    else:
+        return '?'  # Unknown
+
+
+def _view_rule(behavior_name: str, collision) -> str:
+    """15x15 view symbol for a behavior name and collision"""
+    if behavior_name == "NORMAL":
+        return "." if collision == 0 else "#"
+    elif "DOOR" in behavior_name:
+        return "D"
+    elif "STAIRS" in behavior_name or "WARP" in behavior_name:
+        return "S"
+    elif "WATER" in behavior_name:
+        return "W"
+    elif "TALL_GRASS" in behavior_name:
+        return "~"
+    elif "COMPUTER" in behavior_name or "PC" in behavior_name:
+        return "PC"  # PC/Computer
+    elif "TELEVISION" in behavior_name or "TV" in behavior_name:
+        return "T"  # Television
+    elif "BOOKSHELF" in behavior_name or "SHELF" in behavior_name:
+        return "B"  # Bookshelf
+    elif "SIGN" in behavior_name or "SIGNPOST" in behavior_name:
+        return "?"  # Sign/Information
+    elif "FLOWER" in behavior_name or "PLANT" in behavior_name:
+        return "F"  # Flowers/Plants
+    elif "COUNTER" in behavior_name or "DESK" in behavior_name:
+        return "C"  # Counter/Desk
+    elif "BED" in behavior_name or "SLEEP" in behavior_name:
+        return "="  # Bed
+    elif "TABLE" in behavior_name or "CHAIR" in behavior_name:
+        return "t"  # Table/Chair
+    elif "CLOCK" in behavior_name:
+        return "O"  # Clock (O for clock face)
+    elif "PICTURE" in behavior_name or "PAINTING" in behavior_name:
+        return "^"  # Picture/Painting on wall
+    elif "TRASH" in behavior_name or "BIN" in behavior_name:
+        return "U"  # Trash can/bin
+    elif "POT" in behavior_name or "VASE" in behavior_name:
+        return "V"  # Pot/Vase
+    elif "MACHINE" in behavior_name or "DEVICE" in behavior_name:
+        return "M"  # Machine/Device
+    elif "JUMP" in behavior_name:
+        if "SOUTH" in behavior_name:
+            return "↓"
+        elif "EAST" in behavior_name:
+            return "→"
+        elif "WEST" in behavior_name:
+            return "←"
+        elif "NORTH" in behavior_name:
+            return "↑"
+        elif "NORTHEAST" in behavior_name:
+            return "↗"
+        elif "NORTHWEST" in behavior_name:
+            return "↖"
+        elif "SOUTHEAST" in behavior_name:
+            return "↘"
+        elif "SOUTHWEST" in behavior_name:
+            return "↙"
+        else:
+            return "J"
+    elif "IMPASSABLE" in behavior_name or "SEALED" in behavior_name:
+        return "#"  # Blocked
+    elif "INDOOR" in behavior_name:
+        return "."  # Indoor tiles are walkable
+    elif "DECORATION" in behavior_name or "HOLDS" in behavior_name:
+        return "."  # Decorations are walkable
+    else:
+        # For unknown behavior, mark as blocked for safety
+        return "#"
+
+
+def _behavior_name(value: int) -> str:
+    try:
+        return MetatileBehavior(value).name
+    except ValueError:
+        return "UNKNOWN"
+
+
+def _compile(rule) -> np.ndarray:
+    return np.array([[rule(behavior, collision) for collision in range(COLLISION_VALUES)]
+                     for behavior in range(BEHAVIOR_VALUES)], dtype=object)
+
+
+LOCATION_SYMBOL_LUT = _compile(_location_rule)
+VIEW_SYMBOL_LUT = _compile(lambda behavior, collision: _view_rule(_behavior_name(behavior), collision))
+
+# Nested lists are faster than NumPy scalar indexing for one tile at a time
+_LOCATION_ROWS = LOCATION_SYMBOL_LUT.tolist()
+_VIEW_ROWS = VIEW_SYMBOL_LUT.tolist()
+
+
+def location_symbol(tile_id, behavior, collision) -> str:
+    """Location grid symbol for one tile (behavior may be a MetatileBehavior or int)"""
+    if tile_id == OUT_OF_BOUNDS_TILE_ID:
+        return '#'
+    if isinstance(behavior, int) and 0 <= behavior < BEHAVIOR_VALUES and 0 <= collision < COLLISION_VALUES:
+        return _LOCATION_ROWS[behavior][collision]
+    return _location_rule(getattr(behavior, 'value', behavior), collision)
+
+
+def view_symbol(tile_id, behavior, collision) -> str:
+    """15x15 view symbol for one tile (behavior may be a MetatileBehavior or int)"""
+    if tile_id == OUT_OF_BOUNDS_TILE_ID:
+        return '#'
+    if isinstance(behavior, int) and 0 <= behavior < BEHAVIOR_VALUES and 0 <= collision < COLLISION_VALUES:
+        return _VIEW_ROWS[behavior][collision]
+    if hasattr(behavior, 'name'):
+        return _view_rule(behavior.name, collision)
+    return _view_rule(_behavior_name(behavior) if isinstance(behavior, int) else "UNKNOWN", collision)
+
+
+def symbol_planes(lut: np.ndarray, tile_id: np.ndarray, behavior: np.ndarray, collision: np.ndarray) -> np.ndarray:
+    """
+    Symbols for whole tile planes in one indexing op.
+
+    Args:
+        lut: LOCATION_SYMBOL_LUT or VIEW_SYMBOL_LUT
+        tile_id, behavior, collision: Same-shaped integer arrays
+            (behavior 0-255, collision 0-3, as stored in TileGrid)
+
+    Returns:
+        Array of symbol strings with the same shape
+    """
+    return np.where(tile_id == OUT_OF_BOUNDS_TILE_ID, '#', lut[behavior, collision])
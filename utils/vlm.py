@@ -1,12 +1,19 @@
-from io import BytesIO
 from PIL import Image
 import os
-import base64
+import copy
+import functools
+import hashlib
+import heapq
+import math
 import random
+import re
+import threading
 import time
 import logging
 from abc import ABC, abstractmethod
-from typing import Union, List, Dict, Any, Optional
+from concurrent.futures import Future
+from collections import OrderedDict
+from typing import Union, List, Dict, Any, Optional, Tuple, Callable
 import numpy as np
 
 # CRITICAL FIX: Unset GCP credentials BEFORE any Google imports
@@ -21,6 +28,12 @@ logger = logging.getLogger(__name__)
 
 # Import LLM logger
 from utils.llm_logger import log_llm_interaction, log_llm_error
+from utils.vlm_cache import VLMResponseCache, cache_key, DEFAULT_CACHE_PATH, DEFAULT_TTL_SECONDS
+from utils.vlm_batcher import VLMBatcher
+from utils.vlm_async import AsyncRequestRunner, encode_image, pooled_async_http_client
+
+# Canned replies the Gemini/Vertex backends return instead of raising - never cache these
+FALLBACK_RESPONSE_SUFFIX = "I'll proceed with a basic action: press 'A' to continue."
 
 # Define the retry decorator with exponential backoff
 def retry_with_exponential_backoff(
@@ -49,6 +62,32 @@ def retry_with_exponential_backoff(
                 raise e
     return wrapper
 
+def parse_choice(response: str, choices: List[str]) -> Optional[str]:
+    """
+    First of `choices` to appear as a whole word in a free-text response.
+    
+    Matching whole words (rather than substrings, longest first) keeps 'A' from
+    matching inside 'START' or a chatty "I'd press UP here" from matching 'A'.
+    """
+    if not response:
+        return None
+    upper = response.upper()
+    best = None
+    for choice in choices:
+        match = re.search(rf"(?<![A-Z0-9_]){re.escape(choice.upper())}(?![A-Z0-9_])", upper)
+        if match and (best is None or match.start() < best[0] or
+                      (match.start() == best[0] and len(choice) > len(best[1]))):
+            best = (match.start(), choice)
+    return best[1] if best else None
+
+def serialized(method):
+    """Run a backend method under the backend's _model_lock (one model, several caller threads)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._model_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class VLMBackend(ABC):
     """Abstract base class for VLM backends"""
     
@@ -65,10 +104,10 @@ class VLMBackend(ABC):
 class OpenAIBackend(VLMBackend):
     """OpenAI API backend"""
     
-    def __init__(self, model_name: str, **kwargs):
+    def __init__(self, model_name: str, hedge: bool = True, **kwargs):
         try:
             import openai
-            from openai import OpenAI
+            from openai import AsyncOpenAI
         except ImportError:
             raise ImportError("OpenAI package not found. Install with: pip install openai")
         
@@ -78,38 +117,30 @@ class OpenAIBackend(VLMBackend):
         if not self.api_key:
             raise ValueError("Error: OpenAI API key is missing! Set OPENAI_API_KEY environment variable.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        # Async client on a keep-alive pool, driven from this backend's event loop thread
+        self.client = AsyncOpenAI(api_key=self.api_key, http_client=pooled_async_http_client())
+        self.requests = AsyncRequestRunner("openai", hedge=hedge)
         self.errors = (openai.RateLimitError,)
     
-    @retry_with_exponential_backoff
     def _call_completion(self, messages):
-        """Calls the completions.create method with exponential backoff."""
-        return self.client.chat.completions.create(
+        """Calls the completions.create method with exponential backoff and hedging."""
+        return self.requests.run(lambda: self.client.chat.completions.create(
             model=self.model_name,
             messages=messages
-        )
+        ))
     
     def get_query(self, img: Union[Image.Image, np.ndarray], text: str, module_name: str = "Unknown") -> str:
         """Process an image and text prompt using OpenAI API"""
         start_time = time.time()
         
-        # Handle both PIL Images and numpy arrays
-        if hasattr(img, 'convert'):  # It's a PIL Image
-            image = img
-        elif hasattr(img, 'shape'):  # It's a numpy array
-            image = Image.fromarray(img)
-        else:
-            raise ValueError(f"Unsupported image type: {type(img)}")
-        
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        image_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+        # PNG/base64 is memoized per frame, however many modules query it
+        image = encode_image(img)
         
         messages = [{
             "role": "user",
             "content": [
                 {"type": "text", "text": text},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
+                {"type": "image_url", "image_url": {"url": image.data_url}}
             ]
         }]
         
@@ -197,9 +228,9 @@ class OpenAIBackend(VLMBackend):
 class OpenRouterBackend(VLMBackend):
     """OpenRouter API backend"""
     
-    def __init__(self, model_name: str, **kwargs):
+    def __init__(self, model_name: str, hedge: bool = True, **kwargs):
         try:
-            from openai import OpenAI
+            from openai import AsyncOpenAI
         except ImportError:
             raise ImportError("OpenAI package not found. Install with: pip install openai")
         
@@ -209,38 +240,31 @@ class OpenRouterBackend(VLMBackend):
         if not self.api_key:
             raise ValueError("Error: OpenRouter API key is missing! Set OPENROUTER_API_KEY environment variable.")
         
-        self.client = OpenAI(
+        # Async client on a keep-alive pool, driven from this backend's event loop thread
+        self.client = AsyncOpenAI(
             base_url="https://openrouter.ai/api/v1",
             api_key=self.api_key,
+            http_client=pooled_async_http_client(),
         )
+        self.requests = AsyncRequestRunner("openrouter", hedge=hedge)
     
-    @retry_with_exponential_backoff
     def _call_completion(self, messages):
-        """Calls the completions.create method with exponential backoff."""
-        return self.client.chat.completions.create(
+        """Calls the completions.create method with exponential backoff and hedging."""
+        return self.requests.run(lambda: self.client.chat.completions.create(
             model=self.model_name,
             messages=messages
-        )
+        ))
     
     def get_query(self, img: Union[Image.Image, np.ndarray], text: str, module_name: str = "Unknown") -> str:
         """Process an image and text prompt using OpenRouter API"""
-        # Handle both PIL Images and numpy arrays
-        if hasattr(img, 'convert'):  # It's a PIL Image
-            image = img
-        elif hasattr(img, 'shape'):  # It's a numpy array
-            image = Image.fromarray(img)
-        else:
-            raise ValueError(f"Unsupported image type: {type(img)}")
-        
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        image_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+        # PNG/base64 is memoized per frame, however many modules query it
+        image = encode_image(img)
         
         messages = [{
             "role": "user",
             "content": [
                 {"type": "text", "text": text},
-                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_base64}"}}
+                {"type": "image_url", "image_url": {"url": image.data_url}}
             ]
         }]
         
@@ -332,7 +356,19 @@ class LocalHuggingFaceBackend(VLMBackend):
         logger.warning(f"Could not detect model type for {model_name}, defaulting to phi3_v")
         return "phi3_v"
     
-    def __init__(self, model_name: str, device: str = "auto", load_in_4bit: bool = False, **kwargs):
+    # Prefixes shorter than this aren't worth a cache entry
+    PREFIX_CACHE_MIN_TOKENS = 16
+    
+    def __init__(self, model_name: str, device: str = "auto", load_in_4bit: bool = False,
+                 prefix_cache_size: int = 8, **kwargs):
+        # Static prompt prefixes (see register_prefix) and their prefilled KV caches, LRU by token hash
+        self._registered_prefixes = set()
+        self._prefix_cache = OrderedDict()
+        self.prefix_cache_size = prefix_cache_size
+        self.prefix_cache_hits = 0
+        self.prefix_cache_misses = 0
+        # The batcher thread (utils/vlm_batcher.py) and direct callers share one model
+        self._model_lock = threading.RLock()
         try:
             import torch
             from transformers import AutoProcessor, AutoModelForCausalLM, BitsAndBytesConfig
@@ -403,8 +439,68 @@ class LocalHuggingFaceBackend(VLMBackend):
             logger.error(f"Failed to load model {model_name}: {e}")
             raise
     
-    def _generate_response(self, inputs: Dict[str, Any], text: str, module_name: str) -> str:
-        """Generate response using the local model"""
+    def register_prefix(self, prefix: str):
+        """
+        Register a static prompt prefix (e.g. the system prompt) for KV-cache reuse.
+        
+        Text queries starting with a registered prefix only prefill the part after it;
+        the chat-template header before the user text is reused for every text query.
+        """
+        if prefix:
+            self._registered_prefixes.add(prefix)
+    
+    def _reset_text_rope_deltas(self, device):
+        # Qwen2-VL keeps the M-RoPE offset of its last prefill on the model and applies it
+        # when decoding from a cache; for text-only sequences that offset is zero
+        for module in (self.model, getattr(self.model, 'model', None)):
+            if module is not None and hasattr(module, 'rope_deltas'):
+                module.rope_deltas = self.torch.zeros((1, 1), dtype=self.torch.long, device=device)
+    
+    def _prefix_past(self, inputs: Dict[str, Any], prompt: str, text: str, device):
+        """
+        Forked past_key_values covering the static prefix of a text query, or None.
+        
+        The prefix is the rendered prompt up to the user text plus the longest registered
+        prefix the text starts with. Its KV cache is prefilled once and kept in an LRU
+        keyed by a hash of its token ids; each request gets a deep copy, since generation
+        appends to the cache in place.
+        """
+        if 'pixel_values' in inputs or 'input_ids' not in inputs:
+            # Vision models only merge image embeddings on an uncached first step
+            return None
+        user_start = prompt.find(text)
+        if user_start < 0:
+            return None
+        registered = max((p for p in self._registered_prefixes if text.startswith(p)), key=len, default="")
+        prefix_ids = self.processor(text=prompt[:user_start + len(registered)], return_tensors="pt")["input_ids"][0]
+        input_ids = inputs["input_ids"][0].cpu()
+        
+        # BPE may merge across the prefix/suffix boundary, so use the common token prefix
+        # (and always leave at least one token to prefill for the next-token logits)
+        limit = min(len(prefix_ids), len(input_ids) - 1)
+        mismatch = (prefix_ids[:limit] != input_ids[:limit]).nonzero()
+        length = int(mismatch[0]) if len(mismatch) else limit
+        if length < self.PREFIX_CACHE_MIN_TOKENS:
+            return None
+        
+        key = hashlib.sha256(input_ids[:length].cpu().numpy().tobytes()).hexdigest()
+        past = self._prefix_cache.get(key)
+        if past is not None:
+            self._prefix_cache.move_to_end(key)
+            self.prefix_cache_hits += 1
+        else:
+            self.prefix_cache_misses += 1
+            self._reset_text_rope_deltas(device)
+            past = self.model(input_ids=input_ids[:length].unsqueeze(0).to(device), use_cache=True).past_key_values
+            self._prefix_cache[key] = past
+            while len(self._prefix_cache) > self.prefix_cache_size:
+                self._prefix_cache.popitem(last=False)
+            logger.debug(f"Prefilled {length}-token prompt prefix ({len(self._prefix_cache)} cached)")
+        self._reset_text_rope_deltas(device)
+        return copy.deepcopy(past)
+    
+    def _generate_response(self, inputs: Dict[str, Any], text: str, module_name: str, user_text: Optional[str] = None) -> str:
+        """Generate response using the local model (reusing the cached prompt prefix for text queries)"""
         try:
             import time
             
@@ -418,38 +514,16 @@ class LocalHuggingFaceBackend(VLMBackend):
             
             with self.torch.no_grad():
                 # Ensure all inputs are on the correct device
-                if hasattr(self.model, 'device'):
-                    device = self.model.device
-                elif hasattr(self.model, 'module') and hasattr(self.model.module, 'device'):
-                    device = self.model.module.device
-                else:
-                    device = next(self.model.parameters()).device
+                device = self._model_device()
                 
                 # Move inputs to device if needed
                 inputs_on_device = {k: v.to(device) for k, v in inputs.items()}
-
-                # Set termination condition for generation
-                eos_token_id = self.processor.tokenizer.eos_token_id
-                
-                generated_ids = self.model.generate(
-                    **inputs_on_device,
-                    max_new_tokens=256,  # Reduced for faster JSON generation
-                    do_sample=True, # Enable sampling for variety
-                    temperature=0.7, # Add some randomness
-                    top_p=0.9, # Nucleus sampling
-                    eos_token_id=eos_token_id,
-                    pad_token_id=self.processor.tokenizer.pad_token_id
-                )
-                
-                # Decode the response, removing the prompt part
-                input_token_len = inputs_on_device["input_ids"].shape[1]
-                generated_text = self.processor.batch_decode(
-                    generated_ids[:, input_token_len:],
-                    skip_special_tokens=True
-                )[0]
                 
-                # Clean up the output
-                result = generated_text.strip()
+                prefix_past = self._prefix_past(inputs, text, user_text, device) if user_text else None
+                if prefix_past is not None:
+                    inputs_on_device["past_key_values"] = prefix_past
+
+                result = self._generate_texts(inputs_on_device)[0]
 
             # End timing and log performance
             generation_end = time.time()
@@ -467,8 +541,49 @@ class LocalHuggingFaceBackend(VLMBackend):
             logger.error(f"Error generating response: {e}")
             raise
     
-    def get_query(self, img: Union[Image.Image, np.ndarray, str], text: str, module_name: str = "Unknown") -> str:
-        """Process an image and text prompt using local HuggingFace model"""
+    def _generate_texts(self, inputs_on_device: Dict[str, Any]) -> List[str]:
+        """Run generation on (possibly batched) inputs and decode each row without its prompt"""
+        # Set termination condition for generation
+        eos_token_id = self.processor.tokenizer.eos_token_id
+        
+        generated_ids = self.model.generate(
+            **inputs_on_device,
+            max_new_tokens=256,  # Reduced for faster JSON generation
+            do_sample=True, # Enable sampling for variety
+            temperature=0.7, # Add some randomness
+            top_p=0.9, # Nucleus sampling
+            eos_token_id=eos_token_id,
+            pad_token_id=self.processor.tokenizer.pad_token_id
+        )
+        
+        # Decode the responses, removing the (left-padded) prompt part
+        input_token_len = inputs_on_device["input_ids"].shape[1]
+        generated_texts = self.processor.batch_decode(
+            generated_ids[:, input_token_len:],
+            skip_special_tokens=True
+        )
+        
+        # Clean up the output
+        return [text.strip() for text in generated_texts]
+    
+    def _model_device(self):
+        if hasattr(self.model, 'device'):
+            return self.model.device
+        elif hasattr(self.model, 'module') and hasattr(self.model.module, 'device'):
+            return self.model.module.device
+        return next(self.model.parameters()).device
+    
+    def _image_inputs(self, img: Union[Image.Image, np.ndarray, str], text: str):
+        """Processor inputs and formatted prompt for an image + text query"""
+        image, prompt = self._image_prompt(img, text)
+        if self.model_type == "qwen2_vl":
+            inputs = self.processor(text=prompt, images=[image], return_tensors="pt")
+        else:
+            inputs = self.processor(text=prompt, images=image, return_tensors="pt")
+        return inputs, prompt
+    
+    def _image_prompt(self, img: Union[Image.Image, np.ndarray, str], text: str):
+        """RGB image and formatted prompt for an image + text query"""
         from PIL import Image
         
         # Handle PIL Images, numpy arrays, AND string file paths
@@ -495,32 +610,181 @@ class LocalHuggingFaceBackend(VLMBackend):
                 }
             ]
             prompt = self.processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
-            inputs = self.processor(text=prompt, images=[image], return_tensors="pt")
         else:
             # Phi-3 Vision format - keep existing format for compatibility
             prompt = f"<|user|>\n<|image_1|>\n{text}<|end|>\n<|assistant|>\n"
-            inputs = self.processor(text=prompt, images=image, return_tensors="pt")
-        
-        return self._generate_response(inputs, prompt, module_name)
+        return image, prompt
     
-    def get_text_query(self, text: str, module_name: str = "Unknown") -> str:
-        """Process a text-only prompt using local HuggingFace model"""
+    def _text_inputs(self, text: str):
+        """Processor inputs and formatted prompt for a text-only query"""
         try:
             # Use chat template format for consistency with image processing
             messages = [{"role": "user", "content": text}]
             prompt = self.processor.apply_chat_template(
                 messages, tokenize=False, add_generation_prompt=True
             )
-            
-            # Process the prompt 
-            inputs = self.processor(text=prompt, return_tensors="pt")
-            
-            return self._generate_response(inputs, prompt, module_name)
+            return self.processor(text=prompt, return_tensors="pt"), prompt
         except Exception as e:
             # Fallback to direct text if chat template fails
             logger.warning(f"Chat template failed for text query, falling back to direct text: {e}")
-            inputs = self.processor(text=text, return_tensors="pt")
-            return self._generate_response(inputs, text, module_name)
+            return self.processor(text=text, return_tensors="pt"), text
+    
+    @serialized
+    def get_query(self, img: Union[Image.Image, np.ndarray, str], text: str, module_name: str = "Unknown") -> str:
+        """Process an image and text prompt using local HuggingFace model"""
+        inputs, prompt = self._image_inputs(img, text)
+        return self._generate_response(inputs, prompt, module_name)
+    
+    @serialized
+    def get_text_query(self, text: str, module_name: str = "Unknown") -> str:
+        """Process a text-only prompt using local HuggingFace model"""
+        inputs, prompt = self._text_inputs(text)
+        return self._generate_response(inputs, prompt, module_name, user_text=text)
+    
+    @serialized
+    def get_batch(self, requests: List[Tuple[Optional[Union[Image.Image, np.ndarray, str]], str, str]]) -> List[str]:
+        """
+        Answer several (img or None, text, module_name) requests with one padded generate() call.
+        
+        Only Qwen2-VL's processor handles batches with a variable number of images per
+        prompt; other model types (and single requests) are answered one at a time.
+        """
+        if len(requests) == 1 or self.model_type != "qwen2_vl":
+            return [self.get_query(img, text, module_name) if img is not None else self.get_text_query(text, module_name)
+                    for img, text, module_name in requests]
+        
+        prompts, images = [], []
+        for img, text, _ in requests:
+            if img is None:
+                prompts.append(self.processor.apply_chat_template(
+                    [{"role": "user", "content": text}], tokenize=False, add_generation_prompt=True))
+            else:
+                image, prompt = self._image_prompt(img, text)
+                prompts.append(prompt)
+                images.append(image)
+        
+        modules = ",".join(module_name for _, _, module_name in requests)
+        logger.info(f"[{modules}] LOCAL HF VLM BATCH of {len(requests)} ({len(images)} images)")
+        generation_start = time.time()
+        
+        # Decoder-only generation needs the padding on the left so every row ends at its prompt
+        tokenizer = self.processor.tokenizer
+        padding_side, tokenizer.padding_side = tokenizer.padding_side, "left"
+        try:
+            inputs = self.processor(text=prompts, images=images or None, padding=True, return_tensors="pt")
+        finally:
+            tokenizer.padding_side = padding_side
+        
+        with self.torch.no_grad():
+            device = self._model_device()
+            results = self._generate_texts({k: v.to(device) for k, v in inputs.items()})
+        
+        generation_time = time.time() - generation_start
+        for (_, _, module_name), result in zip(requests, results):
+            result_preview = result[:1000] + "..." if len(result) > 1000 else result
+            logger.info(f"[{module_name}] RESPONSE: {result_preview}")
+        logger.info(f"[{modules}] ⏱️  BATCH GENERATION TIME: {generation_time:.3f} seconds")
+        return results
+    
+    def _next_token_logits(self, inputs_on_device: Dict[str, Any], past=None):
+        """Logits for the token after the prompt, prefilling only what `past` doesn't cover"""
+        if past is None:
+            return self.model(**inputs_on_device).logits[0, -1].float()
+        # generate() works out the uncached positions (and M-RoPE offsets) for us
+        outputs = self.model.generate(
+            **inputs_on_device,
+            past_key_values=past,
+            max_new_tokens=1,
+            do_sample=False,
+            output_logits=True,
+            return_dict_in_generate=True,
+            pad_token_id=self.processor.tokenizer.pad_token_id
+        )
+        return outputs.logits[0][0].float()
+    
+    def _stop_token_ids(self) -> List[int]:
+        """Token ids that end a reply (EOS and the chat template's end-of-turn token)"""
+        stop_ids = set()
+        generation_config = getattr(self.model, 'generation_config', None)
+        for ids in (getattr(generation_config, 'eos_token_id', None),
+                    getattr(self.processor.tokenizer, 'eos_token_id', None)):
+            if isinstance(ids, int):
+                stop_ids.add(ids)
+            elif ids:
+                stop_ids.update(ids)
+        return sorted(stop_ids)
+    
+    @serialized
+    def get_choice(self, img: Optional[Union[Image.Image, np.ndarray, str]], text: str, choices: List[str],
+                   module_name: str = "Unknown") -> Tuple[str, float]:
+        """
+        Pick one of `choices` by constrained decoding instead of free generation.
+        
+        Each choice is scored by the summed log-prob of its tokens followed by a stop
+        token, so "L" only beats "LEFT" if the model would actually end its reply after
+        "L". Choices are expanded best-first over their shared token prefixes: a partial
+        score only drops as tokens are added, so the first complete choice popped is the
+        best one. Typically that is two forward passes (the prompt, then the stop token
+        after the winner), each prefilling only the uncached suffix for text queries
+        (see register_prefix).
+        
+        Returns:
+            (choice, probability of the model replying with exactly that choice)
+        """
+        inputs, prompt = self._image_inputs(img, text) if img is not None else self._text_inputs(text)
+        tokenizer = self.processor.tokenizer
+        sequences = {choice: tuple(tokenizer.encode(choice, add_special_tokens=False)) for choice in choices}
+        candidates = [choice for choice in choices if sequences[choice]]
+        if not candidates:
+            raise ValueError(f"No tokenizable choices in {choices}")
+        stop_ids = self._stop_token_ids()
+        if not stop_ids:
+            raise ValueError(f"{self.model_name} has no EOS token to end a choice with")
+        
+        start_time = time.time()
+        passes = 0
+        # (-log-prob so far, tiebreak, token prefix, choice once its stop token is scored)
+        frontier = [(0.0, 0, (), None)]
+        order = 1
+        with self.torch.no_grad():
+            device = self._model_device()
+            base_inputs = {k: v.to(device) for k, v in inputs.items()}
+            while True:
+                cost, _, tokens, choice = heapq.heappop(frontier)
+                if choice is not None:
+                    break
+                
+                inputs_on_device = dict(base_inputs)
+                if tokens:
+                    extra = self.torch.tensor([list(tokens)], device=device)
+                    inputs_on_device["input_ids"] = self.torch.cat([base_inputs["input_ids"], extra], dim=1)
+                    if "attention_mask" in base_inputs:
+                        inputs_on_device["attention_mask"] = self.torch.cat(
+                            [base_inputs["attention_mask"], self.torch.ones_like(extra)], dim=1)
+                past = self._prefix_past(inputs_on_device, prompt, text, device) if img is None else None
+                log_probs = self.torch.log_softmax(self._next_token_logits(inputs_on_device, past), dim=-1)
+                passes += 1
+                
+                children = {}
+                for candidate in candidates:
+                    sequence = sequences[candidate]
+                    if sequence[:len(tokens)] != tokens:
+                        continue
+                    if len(sequence) == len(tokens):
+                        stop = self.torch.logsumexp(log_probs[stop_ids], dim=0).item()
+                        children[(tokens, candidate)] = cost - stop
+                    else:
+                        child = tokens + (sequence[len(tokens)],)
+                        children.setdefault((child, None), cost - log_probs[sequence[len(tokens)]].item())
+                for (child, candidate), child_cost in children.items():
+                    heapq.heappush(frontier, (child_cost, order, child, candidate))
+                    order += 1
+        
+        probability = math.exp(-cost)
+        duration = time.time() - start_time
+        logger.info(f"[{module_name}] LOCAL HF CHOICE: {choice} (p={probability:.3f}, "
+                    f"{passes} forward pass{'es' if passes != 1 else ''}, {duration:.3f}s)")
+        return choice, probability
 
 class LegacyOllamaBackend(VLMBackend):
     """Legacy Ollama backend for backward compatibility"""
@@ -545,23 +809,14 @@ class LegacyOllamaBackend(VLMBackend):
     
     def get_query(self, img: Union[Image.Image, np.ndarray], text: str, module_name: str = "Unknown") -> str:
         """Process an image and text prompt using legacy Ollama backend"""
-        # Handle both PIL Images and numpy arrays
-        if hasattr(img, 'convert'):  # It's a PIL Image
-            image = img
-        elif hasattr(img, 'shape'):  # It's a numpy array
-            image = Image.fromarray(img)
-        else:
-            raise ValueError(f"Unsupported image type: {type(img)}")
-        
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        image_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+        # PNG/base64 is memoized per frame, however many modules query it
+        image = encode_image(img)
         
         messages = [{
             "role": "user",
             "content": [
                 {"type": "text", "text": text},
-                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}}
+                {"type": "image_url", "image_url": {"url": image.data_url}}
             ]
         }]
         
@@ -605,13 +860,14 @@ class LegacyOllamaBackend(VLMBackend):
 class VertexBackend(VLMBackend):
     """Google Gemini API with Vertex backend"""
     
-    def __init__(self, model_name: str, **kwargs):
+    def __init__(self, model_name: str, hedge: bool = True, **kwargs):
         try:
             from google import genai
         except ImportError:
             raise ImportError("Google Generative AI package not found. Install with: pip install google-generativeai")
         
         self.model_name = model_name
+        self.requests = AsyncRequestRunner("vertex", hedge=hedge)
         
         # Initialize the model
         self.client = genai.Client(
@@ -623,24 +879,17 @@ class VertexBackend(VLMBackend):
         
         logger.info(f"Gemini backend initialized with model: {model_name}")
     
-    def _prepare_image(self, img: Union[Image.Image, np.ndarray]) -> Image.Image:
-        """Prepare image for Gemini API"""
-        # Handle both PIL Images and numpy arrays
-        if hasattr(img, 'convert'):  # It's a PIL Image
-            return img
-        elif hasattr(img, 'shape'):  # It's a numpy array
-            return Image.fromarray(img)
-        else:
-            raise ValueError(f"Unsupported image type: {type(img)}")
+    def _prepare_image(self, img: Union[Image.Image, np.ndarray]):
+        """Prepare image for Gemini API (PNG bytes, encoded once per frame)"""
+        encoded = encode_image(img)
+        return self.genai.types.Part.from_bytes(data=encoded.data, mime_type=encoded.mime_type)
     
-    @retry_with_exponential_backoff
     def _call_generate_content(self, content_parts):
-        """Calls the generate_content method with exponential backoff."""
-        response = self.client.models.generate_content(
+        """Calls the async generate_content method with exponential backoff and hedging."""
+        return self.requests.run(lambda: self.client.aio.models.generate_content(
             model='gemini-2.5-flash',
             contents=content_parts
-        )
-        return response
+        ))
     
     def get_query(self, img: Union[Image.Image, np.ndarray], text: str, module_name: str = "Unknown") -> str:
         """Process an image and text prompt using Gemini API"""
@@ -722,13 +971,14 @@ class VertexBackend(VLMBackend):
 class GeminiBackend(VLMBackend):
     """Google Gemini API backend"""
     
-    def __init__(self, model_name: str, **kwargs):
+    def __init__(self, model_name: str, hedge: bool = True, **kwargs):
         try:
             import google.generativeai as genai
         except ImportError:
             raise ImportError("Google Generative AI package not found. Install with: pip install google-generativeai")
         
         self.model_name = model_name
+        self.requests = AsyncRequestRunner("gemini", hedge=hedge)
         self.api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         
         if not self.api_key:
@@ -743,22 +993,15 @@ class GeminiBackend(VLMBackend):
         
         logger.info(f"Gemini backend initialized with model: {model_name}")
     
-    def _prepare_image(self, img: Union[Image.Image, np.ndarray]) -> Image.Image:
-        """Prepare image for Gemini API"""
-        # Handle both PIL Images and numpy arrays
-        if hasattr(img, 'convert'):  # It's a PIL Image
-            return img
-        elif hasattr(img, 'shape'):  # It's a numpy array
-            return Image.fromarray(img)
-        else:
-            raise ValueError(f"Unsupported image type: {type(img)}")
+    def _prepare_image(self, img: Union[Image.Image, np.ndarray]) -> Dict[str, Any]:
+        """Prepare image for Gemini API (PNG blob, encoded once per frame)"""
+        encoded = encode_image(img)
+        return {"mime_type": encoded.mime_type, "data": encoded.data}
     
-    @retry_with_exponential_backoff
     def _call_generate_content(self, content_parts):
-        """Calls the generate_content method with exponential backoff."""
-        response = self.model.generate_content(content_parts)
-        response.resolve()
-        return response
+        """Calls the generate_content_async method with exponential backoff and hedging."""
+        # Non-streaming async responses arrive complete, so there is nothing to resolve()
+        return self.requests.run(lambda: self.model.generate_content_async(content_parts))
     
     def get_query(self, img: Union[Image.Image, np.ndarray], text: str, module_name: str = "Unknown") -> str:
         """Process an image and text prompt using Gemini API"""
@@ -892,7 +1135,9 @@ class VLM:
         'vertex': VertexBackend,  # Added Vertex backend
     }
     
-    def __init__(self, model_name: str, backend: str = 'openai', port: int = 8010, **kwargs):
+    def __init__(self, model_name: str, backend: str = 'openai', port: int = 8010,
+                 cache_modules=None, cache_path: str = DEFAULT_CACHE_PATH,
+                 cache_ttl: float = DEFAULT_TTL_SECONDS, **kwargs):
         """
         Initialize VLM with specified backend
         
@@ -900,6 +1145,10 @@ class VLM:
             model_name: Name of the model to use
             backend: Backend type ('openai', 'openrouter', 'local', 'gemini', 'ollama')
             port: Port for Ollama backend (legacy)
+            cache_modules: module_name values whose responses may be served from the
+                persistent response cache (utils/vlm_cache.py); None/empty disables it
+            cache_path: SQLite file for the response cache
+            cache_ttl: Seconds a cached response stays valid
             **kwargs: Additional arguments passed to backend
         """
         self.model_name = model_name
@@ -922,6 +1171,18 @@ class VLM:
             self.backend = backend_class(model_name, **kwargs)
         
         logger.info(f"VLM initialized with {self.backend_type} backend using model: {model_name}")
+        
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+        
+        self.cache_modules = frozenset(cache_modules or ())
+        self.cache = None
+        if self.cache_modules:
+            try:
+                self.cache = VLMResponseCache(cache_path, ttl_seconds=cache_ttl)
+                logger.info(f"VLM response cache enabled for {len(self.cache_modules)} modules at {cache_path}")
+            except Exception as e:
+                logger.warning(f"VLM response cache unavailable ({e}), continuing without it")
     
     def _auto_detect_backend(self, model_name: str) -> str:
         """Auto-detect backend based on model name"""
@@ -937,11 +1198,145 @@ class VLM:
             # Default to OpenAI for unknown models
             return 'openai'
     
-    def get_query(self, img: Union[Image.Image, np.ndarray], text: str, module_name: str = "Unknown") -> str:
-        """Process an image and text prompt"""
+    def submit_query(self, img: Union[Image.Image, np.ndarray], text: str, module_name: str = "Unknown") -> Future:
+        """
+        Queue an image and text prompt without waiting for the answer.
+        
+        Requests submitted close together are answered as one padded batch by the local
+        backend, or concurrently for API backends (see utils/vlm_batcher.py).
+        
+        Returns:
+            Future resolving to the response text
+        """
+        return self._get_batcher().submit(img, text, module_name)
+    
+    def submit_text_query(self, text: str, module_name: str = "Unknown") -> Future:
+        """Queue a text-only prompt without waiting for the answer (see submit_query)"""
+        return self._get_batcher().submit(None, text, module_name)
+    
+    def _get_batcher(self) -> VLMBatcher:
+        with self._batcher_lock:
+            if self._batcher is None:
+                self._batcher = VLMBatcher(self)
+            return self._batcher
+    
+    def get_batch(self, requests: List[Tuple[Optional[Union[Image.Image, np.ndarray]], str, str]]) -> List[str]:
+        """
+        Answer several (img or None, text, module_name) requests, batching where the backend can.
+        
+        Cached responses are served first; the rest go to the backend's get_batch in
+        one call, or are answered one by one for backends without it. Batched answers
+        aren't validated, so they are never written to the response cache.
+        """
+        if not hasattr(self.backend, 'get_batch'):
+            return [self.get_query(img, text, module_name) if img is not None else self.get_text_query(text, module_name)
+                    for img, text, module_name in requests]
+        
+        results = [None] * len(requests)
+        pending = []
+        for index, (img, text, module_name) in enumerate(requests):
+            key = self._cache_key(module_name, text, img)
+            results[index] = self._cache_lookup(key, module_name, text, img is not None)
+            if results[index] is None:
+                pending.append(index)
+        if not pending:
+            return results
+        
+        batch = [requests[index] for index in pending]
+        try:
+            answers = self.backend.get_batch(batch)
+        except Exception as e:
+            for img, text, module_name in batch:
+                log_llm_error(
+                    interaction_type=f"{self.backend.__class__.__name__.lower()}_{module_name}",
+                    prompt=text,
+                    error=str(e),
+                    metadata={"model": self.model_name, "backend": self.backend.__class__.__name__,
+                              "duration": 0, "has_image": img is not None, "batch_size": len(batch)}
+                )
+            raise
+        for index, answer in zip(pending, answers):
+            results[index] = answer
+        return results
+    
+    def register_prefix(self, prefix: str) -> bool:
+        """
+        Mark a static prompt prefix (e.g. the system prompt) as reusable.
+        
+        Backends that keep a KV cache (LocalHuggingFaceBackend) prefill it once and only
+        process the rest of each prompt; for API backends this is a no-op.
+        
+        Returns:
+            True if the backend supports prefix reuse
+        """
+        if hasattr(self.backend, 'register_prefix'):
+            self.backend.register_prefix(prefix)
+            return True
+        return False
+    
+    def _cache_key(self, module_name: str, text: str, img=None) -> Optional[str]:
+        """Response cache key, or None if this module isn't opted in"""
+        if self.cache is None or module_name not in self.cache_modules:
+            return None
+        return cache_key(self.backend_type, self.model_name, text, img)
+    
+    def _cache_lookup(self, key: Optional[str], module_name: str, text: str, has_image: bool) -> Optional[str]:
+        """Cached response, logged like a backend call (with metadata cached=True) on a hit"""
+        if key is None:
+            return None
+        try:
+            result = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"[{module_name}] VLM cache read failed: {e}")
+            return None
+        if result is not None:
+            logger.debug(f"[{module_name}] VLM cache hit ({self.cache.hits} hits, {self.cache.misses} misses)")
+            log_llm_interaction(
+                interaction_type=f"{self.backend_type}_{module_name}",
+                prompt=text,
+                response=result,
+                duration=0.0,
+                metadata={"model": self.model_name, "backend": self.backend_type, "has_image": has_image,
+                          "cached": True, "token_usage": {}},
+                model_info={"model": self.model_name, "backend": self.backend_type}
+            )
+        return result
+    
+    def _cache_store(self, key: Optional[str], module_name: str, result: str,
+                     validate: Optional[Callable[[str], bool]]):
+        """Cache `result` only if the caller's validator accepts it"""
+        if key is None or validate is None or not result or result.endswith(FALLBACK_RESPONSE_SUFFIX):
+            return
+        try:
+            if not validate(result):
+                logger.debug(f"[{module_name}] Response failed validation, not cached")
+                return
+        except Exception as e:
+            logger.warning(f"[{module_name}] Response validator failed: {e}")
+            return
+        try:
+            self.cache.put(key, result, module_name)
+        except Exception as e:
+            logger.warning(f"[{module_name}] VLM cache write failed: {e}")
+    
+    def get_query(self, img: Union[Image.Image, np.ndarray], text: str, module_name: str = "Unknown",
+                  validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Process an image and text prompt
+        
+        Args:
+            validate: For modules in cache_modules, the response is cached only if
+                validate(response) is true (e.g. it names a valid button); without a
+                validator nothing is cached, so unusable replies are never replayed
+        """
+        key = self._cache_key(module_name, text, img)
+        cached = self._cache_lookup(key, module_name, text, True)
+        if cached is not None:
+            return cached
         try:
             # Backend handles its own logging, so we don't duplicate it here
             result = self.backend.get_query(img, text, module_name)
+            self._cache_store(key, module_name, result, validate)
             return result
         except Exception as e:
             # Only log errors that aren't already logged by the backend
@@ -954,11 +1349,53 @@ class VLM:
             )
             raise
     
-    def get_text_query(self, text: str, module_name: str = "Unknown") -> str:
-        """Process a text-only prompt"""
+    def get_choice(self, img: Optional[Union[Image.Image, np.ndarray]], text: str, choices: List[str],
+                   module_name: str = "Unknown") -> Tuple[Optional[str], float]:
+        """
+        Ask the model to pick one of `choices` (e.g. button names).
+        
+        Backends that can score the choices directly (LocalHuggingFaceBackend) do so
+        by constrained decoding; the others answer the prompt as usual and the first
+        choice named in the reply is taken.
+        
+        Returns:
+            (choice, probability) - choice is None if the reply named none of them;
+            API backends report probability 1.0 for a parsed choice
+        """
+        if hasattr(self.backend, 'get_choice'):
+            try:
+                return self.backend.get_choice(img, text, choices, module_name)
+            except Exception as e:
+                log_llm_error(
+                    interaction_type=f"{self.backend.__class__.__name__.lower()}_{module_name}",
+                    prompt=text,
+                    error=str(e),
+                    metadata={"model": self.model_name, "backend": self.backend.__class__.__name__,
+                              "duration": 0, "has_image": img is not None, "choices": list(choices)}
+                )
+                raise
+        
+        def names_a_choice(reply):
+            return parse_choice(reply, choices) is not None
+        
+        if img is not None:
+            response = self.get_query(img, text, module_name, validate=names_a_choice)
+        else:
+            response = self.get_text_query(text, module_name, validate=names_a_choice)
+        choice = parse_choice(response, choices)
+        return choice, 1.0 if choice is not None else 0.0
+    
+    def get_text_query(self, text: str, module_name: str = "Unknown",
+                       validate: Optional[Callable[[str], bool]] = None) -> str:
+        """Process a text-only prompt (see get_query for `validate`)"""
+        key = self._cache_key(module_name, text)
+        cached = self._cache_lookup(key, module_name, text, False)
+        if cached is not None:
+            return cached
         try:
             # Backend handles its own logging, so we don't duplicate it here
             result = self.backend.get_text_query(text, module_name)
+            self._cache_store(key, module_name, result, validate)
             return result
         except Exception as e:
             # Only log errors that aren't already logged by the backend
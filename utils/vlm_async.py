@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Asyncio request layer for the remote VLM backends in utils/vlm.py.
+
+The backends keep their synchronous get_query/get_text_query interface, but
+each API call now runs as a coroutine on a per-backend event loop thread:
+
+- one keep-alive connection pool per backend (HTTP/2 when `h2` is installed)
+  instead of a fresh blocking client call each time
+- hedged requests: once an attempt has taken longer than the recent p95 latency,
+  a duplicate is sent and whichever answers first wins (per attempt, so nothing
+  is duplicated while a failed attempt is backing off before its retry)
+- encoded frames are memoized, so a frame sent to several modules (perception,
+  dialogue check, executor) is PNG/base64-encoded once
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from io import BytesIO
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - httpx only negotiates HTTP/2 when this is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20  # Don't hedge until the latency estimate means something
+HEDGE_MIN_DELAY = 1.0  # Seconds; never duplicate calls that are merely "not instant"
+LATENCY_WINDOW = 200
+ENCODED_IMAGE_CACHE_SIZE = 8
+
+
+class EncodedImage(NamedTuple):
+    data: bytes
+    base64: str
+    mime_type: str
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.base64}"
+
+
+_encoded_images = OrderedDict()
+_encoded_images_lock = threading.Lock()
+
+
+def _frame_digest(img) -> str:
+    if hasattr(img, 'shape'):  # numpy array
+        array = np.ascontiguousarray(img)
+        header = f"{array.shape}{array.dtype}"
+        payload = array.tobytes()
+    else:  # PIL Image
+        header = f"{img.mode}{img.size}"
+        payload = img.tobytes()
+    return hashlib.blake2b(header.encode() + payload, digest_size=16).hexdigest()
+
+
+def encode_image(img) -> EncodedImage:
+    """
+    PNG bytes and base64 text for a PIL Image or numpy frame, memoized by pixel content.
+
+    Hashing the raw pixels is far cheaper than PNG-encoding them, and the same frame
+    usually goes to several modules within one step.
+    """
+    if not hasattr(img, 'convert') and not hasattr(img, 'shape'):
+        raise ValueError(f"Unsupported image type: {type(img)}")
+    key = _frame_digest(img)
+    with _encoded_images_lock:
+        encoded = _encoded_images.get(key)
+        if encoded is not None:
+            _encoded_images.move_to_end(key)
+            return encoded
+
+    image = img if hasattr(img, 'convert') else Image.fromarray(img)
+    buffered = BytesIO()
+    image.save(buffered, format="PNG")
+    data = buffered.getvalue()
+    encoded = EncodedImage(data, base64.b64encode(data).decode('utf-8'), "image/png")
+    with _encoded_images_lock:
+        _encoded_images[key] = encoded
+        while len(_encoded_images) > ENCODED_IMAGE_CACHE_SIZE:
+            _encoded_images.popitem(last=False)
+    return encoded
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies, for the hedging threshold"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before sending a duplicate request, or None to not hedge yet"""
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+        return max(HEDGE_MIN_DELAY, self.percentile(HEDGE_PERCENTILE))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+async def retry_with_exponential_backoff_async(
+    call: Callable[[], Awaitable],
+    initial_delay: float = 1,
+    exponential_base: float = 2,
+    jitter: bool = True,
+    max_retries: int = 10,
+    errors: tuple = (Exception,),
+):
+    """Async counterpart of utils.vlm.retry_with_exponential_backoff, for one call factory"""
+    num_retries = 0
+    delay = initial_delay
+    while True:
+        try:
+            return await call()
+        except errors as e:
+            num_retries += 1
+            if num_retries > max_retries:
+                raise Exception(f"Maximum number of retries ({max_retries}) exceeded.") from e
+            # Increase the delay with exponential factor and random jitter
+            delay *= exponential_base * (1 + jitter * random.random())
+            await asyncio.sleep(delay)
+
+
+async def hedged(call: Callable[[], Awaitable], hedge_delay: Optional[float]):
+    """
+    Run call(); if it hasn't finished after hedge_delay seconds, start a second call()
+    and return whichever succeeds first, cancelling the other.
+
+    Args:
+        call: Zero-argument coroutine factory (each attempt needs its own coroutine)
+        hedge_delay: Seconds before the duplicate is sent; None never hedges
+    """
+    tasks = [asyncio.ensure_future(call())]
+    first_error = None
+    try:
+        if hedge_delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                logger.info(f"VLM call still running after {hedge_delay:.2f}s (p95), sending a hedged duplicate")
+                tasks.append(asyncio.ensure_future(call()))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                first_error = first_error or task.exception()
+        raise first_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+class AsyncRequestRunner:
+    """
+    Event loop on a daemon thread that runs a backend's API calls.
+
+    Synchronous callers block on run(); the loop itself is free to overlap calls
+    from several threads (utils/vlm_batcher.py) and to hedge slow ones.
+    """
+
+    def __init__(self, name: str, hedge: bool = True):
+        self.name = name
+        self.hedge = hedge
+        self.latency = LatencyTracker()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name=f"vlm-{name}-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, call: Callable[[], Awaitable]):
+        """Schedule call() (with retries and hedging); returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(self._request(call), self.loop)
+
+    def run(self, call: Callable[[], Awaitable]):
+        """Run call() on the backend loop and wait for its result"""
+        return self.submit(call).result()
+
+    async def _request(self, call: Callable[[], Awaitable]):
+        async def timed_call():
+            start = time.monotonic()
+            result = await call()
+            self.latency.record(time.monotonic() - start)
+            return result
+
+        async def hedged_attempt():
+            # An attempt that fails before the hedge delay raises straight into the
+            # backoff below; only a slow attempt gets a duplicate
+            return await hedged(timed_call, self.latency.hedge_delay() if self.hedge else None)
+
+        return await retry_with_exponential_backoff_async(hedged_attempt)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+def pooled_async_http_client(max_connections: int = 20, keepalive_expiry: float = 60.0):
+    """httpx.AsyncClient with a keep-alive pool (and HTTP/2 if `h2` is installed) for the OpenAI SDK"""
+    import httpx  # Installed with openai
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                            keepalive_expiry=keepalive_expiry),
+        timeout=httpx.Timeout(120.0, connect=10.0),
+    )
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Batching front end for utils.vlm.VLM.
+
+Callers submit queries and get concurrent.futures.Future objects back. For
+backends that can batch (LocalHuggingFaceBackend.get_batch), requests submitted
+within a short window are answered by one padded generate() call; for the API
+backends each request is sent from a small thread pool so independent queries
+overlap instead of running back to back. Use VLM.submit_query /
+VLM.submit_text_query rather than this class directly.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WINDOW = 0.02  # Seconds to wait for more requests after the first one
+DEFAULT_MAX_BATCH = 8
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class _Request:
+    img: Any
+    text: str
+    module_name: str
+    future: Future = field(default_factory=Future)
+
+
+class VLMBatcher:
+    """Collects VLM requests on a background thread and answers them in batches"""
+
+    def __init__(self, vlm, window: float = DEFAULT_BATCH_WINDOW, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        self.vlm = vlm
+        self.batched = hasattr(vlm.backend, 'get_batch')
+        # Without native batching there's nothing to wait for: dispatch each request immediately
+        self.window = window if self.batched else 0.0
+        self.max_batch = max_batch if self.batched else 1
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._pool = None if self.batched else ThreadPoolExecutor(max_workers=max_workers,
+                                                                  thread_name_prefix="vlm-request")
+        self._thread = threading.Thread(target=self._run, name="vlm-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, img, text: str, module_name: str = "Unknown") -> Future:
+        """Queue one query (img None for text-only); the future resolves to the response text"""
+        request = _Request(img, text, module_name)
+        self._queue.put(request)
+        return request.future
+
+    def close(self):
+        """Stop the batcher once already queued requests are answered"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: List[_Request]):
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        if self._pool is not None:
+            for request in batch:
+                self._pool.submit(self._answer, request)
+            return
+        try:
+            results = self.vlm.get_batch([(r.img, r.text, r.module_name) for r in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # Don't let one bad request fail the others: answer them one at a time
+            logger.warning(f"VLM batch of {len(batch)} failed ({e}), retrying requests individually")
+            for request in batch:
+                self._answer(request)
+            return
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+    def _answer(self, request: _Request):
+        try:
+            if request.img is None:
+                result = self.vlm.get_text_query(request.text, request.module_name)
+            else:
+                result = self.vlm.get_query(request.img, request.text, request.module_name)
+        except Exception as e:
+            request.future.set_exception(e)
+        else:
+            request.future.set_result(result)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Persistent prompt/response cache for VLM calls (used by utils.vlm.VLM).
+
+Many executor prompts in agent/action.py are near-templated and have one
+sensible answer ("Press A to continue. What button? Answer: A"), so asking the
+model again only costs latency and API spend. Responses are stored in a local
+SQLite file keyed on (backend, model, normalized prompt, image perceptual hash)
+with a TTL and LRU eviction. Caching is opt-in per module_name; see VLM.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(".pokeagent_cache", "vlm_cache.sqlite")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so re-indented or re-wrapped templates share an entry"""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def image_hash(img) -> str:
+    """
+    64-bit difference hash (dHash) of an image, as hex.
+
+    Frames that differ only by a few pixels of noise (cursor blink, palette
+    flicker) hash the same, which is what we want for template prompts. File
+    paths are hashed as given; None (text-only query) hashes to "".
+    """
+    if img is None:
+        return ""
+    if isinstance(img, str):
+        return "path:" + img
+    if not hasattr(img, "convert"):
+        img = Image.fromarray(np.asarray(img))
+    gray = np.asarray(img.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = (gray[:, 1:] > gray[:, :-1]).flatten()
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+
+
+def cache_key(backend: str, model: str, text: str, img=None) -> str:
+    """Stable key for one query"""
+    payload = json.dumps([backend, model, normalize_prompt(text), image_hash(img)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class VLMResponseCache:
+    """SQLite-backed response cache with TTL expiry and least-recently-used eviction"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The agent may query from more than one thread; all access goes through _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " module TEXT,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            if ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl_seconds,))
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, module_name: str = ""):
+        """Store a response, evicting the least recently used entries beyond max_entries"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, module, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, module_name, response, now, now),
+            )
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()